@@ -4,10 +4,10 @@ FastAPI 엔드포인트 정의
 """
 import os
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
@@ -15,18 +15,17 @@ from config.database import get_db
 from app.api.schemas import *
 from app.models import Session as DBSession, Query, Template, Prompt
 from app.models.queries import QueryStatus
-from app.services.rag_service import rag_service
-from app.services.token_service import token_service
-from app.services.template_generation_service import template_generation_service
-from app.services.template_vector_store import template_vector_store_service
-try:
-    from app.services.vector_store_simple import simple_vector_store_service as vector_store_service
-except ImportError:
-    from app.services.vector_store import vector_store_service
+from app.services.registry import service_registry
+from app.monitoring.timing import span, current_timings, timings_payload, PERSISTENCE, VALIDATION
 
 # 라우터 생성
 router = APIRouter()
 
+def _commit(db: Session):
+    """DB 커밋 (persistence 단계 시간 계측)"""
+    with span("db.commit", PERSISTENCE):
+        db.commit()
+
 # 애플리케이션 시작 시간 (헬스체크용)
 app_start_time = time.time()
 
@@ -49,7 +48,7 @@ async def create_session(
         )
         
         db.add(new_session)
-        db.commit()
+        _commit(db)
         db.refresh(new_session)
         
         return SessionResponse(
@@ -93,7 +92,7 @@ async def generate_template(
             is_active=True
         )
         db.add(anonymous_session)
-        db.commit()
+        _commit(db)
         
         # 질의 기록 생성 (검증 없이 바로 저장)
         new_query = Query(
@@ -108,11 +107,12 @@ async def generate_template(
         )
         
         db.add(new_query)
-        db.commit()
+        _commit(db)
         db.refresh(new_query)
         
         try:
             # RAG 서비스를 통한 템플릿 생성
+            rag_service = service_registry.get("rag_service")
             rag_response = rag_service.generate_template(
                 user_request=request.query_text,
                 business_type=request.business_type,
@@ -124,7 +124,8 @@ async def generate_template(
             clean_template_content = _clean_template_content(rag_response.answer)
             
             # 템플릿 분석
-            analysis = _analyze_template_content(clean_template_content)
+            with span("template.analyze", VALIDATION):
+                analysis = _analyze_template_content(clean_template_content)
             
             # 템플릿 저장
             new_template = Template(
@@ -151,7 +152,7 @@ async def generate_template(
             new_query.processing_completed_at = datetime.now()
             new_query.processing_duration = int(rag_response.processing_time)
             
-            db.commit()
+            _commit(db)
             db.refresh(new_template)
             
             # TokenMetrics 객체를 스키마 모델로 변환
@@ -168,7 +169,8 @@ async def generate_template(
                 template_content=clean_template_content,
                 template_analysis=analysis,
                 processing_time=rag_response.processing_time,
-                token_metrics=token_metrics_dict
+                token_metrics=token_metrics_dict,
+                timings=timings_payload(current_timings())
             )
             
         except Exception as e:
@@ -176,7 +178,7 @@ async def generate_template(
             new_query.status = QueryStatus.FAILED
             new_query.error_message = str(e)
             new_query.processing_completed_at = datetime.now()
-            db.commit()
+            _commit(db)
             raise e
             
     except HTTPException:
@@ -212,7 +214,7 @@ async def query_policies(
             is_active=True
         )
         db.add(anonymous_session)
-        db.commit()
+        _commit(db)
         
         # 질의 기록 생성 (검증 없이 바로 저장)
         new_query = Query(
@@ -225,11 +227,12 @@ async def query_policies(
         )
         
         db.add(new_query)
-        db.commit()
+        _commit(db)
         db.refresh(new_query)
         
         try:
             # RAG 서비스를 통한 응답 생성
+            rag_service = service_registry.get("rag_service")
             rag_response = rag_service.generate_response(
                 query=request.query_text,
                 session_id=request.session_id,
@@ -241,7 +244,7 @@ async def query_policies(
             new_query.processing_completed_at = datetime.now()
             new_query.processing_duration = int(rag_response.processing_time)
             
-            db.commit()
+            _commit(db)
             
             # TokenMetrics 객체를 스키마 모델로 변환
             token_metrics_dict = None
@@ -257,7 +260,8 @@ async def query_policies(
                 source_documents=rag_response.source_documents,
                 confidence_score=rag_response.confidence_score,
                 processing_time=rag_response.processing_time,
-                token_metrics=token_metrics_dict
+                token_metrics=token_metrics_dict,
+                timings=timings_payload(current_timings())
             )
             
         except Exception as e:
@@ -265,7 +269,7 @@ async def query_policies(
             new_query.status = QueryStatus.FAILED
             new_query.error_message = str(e)
             new_query.processing_completed_at = datetime.now()
-            db.commit()
+            _commit(db)
             raise e
             
     except HTTPException:
@@ -372,7 +376,7 @@ async def submit_template_feedback(
         
         template.updated_at = datetime.now()
         
-        db.commit()
+        _commit(db)
         
         return FeedbackResponse(
             success=True,
@@ -397,6 +401,7 @@ async def search_policies(request: PolicySearchRequest):
     """
     try:
         # 벡터 스토어를 통한 검색
+        vector_store_service = service_registry.get("policy_vector_store")
         policy_results = vector_store_service.get_relevant_policies(
             user_query=request.query,
             k=request.limit
@@ -418,7 +423,8 @@ async def search_policies(request: PolicySearchRequest):
             message="정책 문서 검색이 완료되었습니다.",
             query=request.query,
             documents=documents,
-            total_results=len(documents)
+            total_results=len(documents),
+            timings=timings_payload(current_timings())
         )
         
     except Exception as e:
@@ -437,6 +443,7 @@ async def get_token_usage(
     """
     try:
         # 토큰 서비스를 통한 사용량 통계 조회
+        token_service = service_registry.get("token_service")
         stats = token_service.get_usage_stats(
             session_id=request.session_id,
             start_date=request.start_date,
@@ -476,6 +483,7 @@ async def health_check(db: Session = Depends(get_db)):
         vectordb_loaded = False
         vectordb_count = 0
         try:
+            vector_store_service = service_registry.get("policy_vector_store")
             vectordb_info = vector_store_service.get_collection_info()
             vectordb_loaded = bool(vectordb_info)
             vectordb_count = vectordb_info.get("count", 0)
@@ -486,6 +494,7 @@ async def health_check(db: Session = Depends(get_db)):
         ai_available = True
         try:
             # 간단한 테스트 질의
+            rag_service = service_registry.get("rag_service")
             test_response = rag_service.generate_response("테스트", context={"test": True})
             ai_available = bool(test_response.answer)
         except:
@@ -606,23 +615,51 @@ def _analyze_template_content(content: str) -> Dict[str, Any]:
 
 # 새로운 스마트 템플릿 생성 API 엔드포인트들
 
+def _cache_headers(cache: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """응답 캐시 상태 헤더 (X-Cache, X-Cache-Tier, X-Cache-Key, Age)"""
+    if not cache:
+        return {}
+    headers = {"X-Cache": cache["status"].upper()}
+    if cache.get("key"):
+        headers["X-Cache-Key"] = cache["key"][:16]
+    if cache["status"] == "hit":
+        headers["X-Cache-Tier"] = cache["tier"]
+        headers["Age"] = str(int(cache["age"]))
+    return headers
+
+def _set_cache_headers(response: Response, cache: Optional[Dict[str, Any]]):
+    response.headers.update(_cache_headers(cache))
+
 @router.post("/templates/smart-generate", response_model=SmartTemplateGenerationResponse)
 async def smart_generate_template(
-    request: SmartTemplateGenerationRequest
+    request: SmartTemplateGenerationRequest,
+    response: Response
 ):
     """
     스마트 템플릿 생성 - 승인받은 패턴 기반 AI 생성
+    같은 요청은 응답 캐시에서 반환 (X-Cache: HIT / MISS / BYPASS)
     """
     try:
         # 템플릿 생성 서비스 호출
+        template_generation_service = service_registry.get("template_generation_service")
         result = template_generation_service.generate_template(
             user_request=request.user_request,
             business_type=request.business_type,
             category_1=request.category_1,
             category_2=request.category_2,
             target_length=request.target_length,
-            include_variables=request.include_variables
+            include_variables=request.include_variables,
+            cache=request.cache,
+            n_candidates=request.n_candidates
         )
+        _set_cache_headers(response, result.get("cache"))
+
+        if not result["success"] and request.cache == "only" and result["cache"]["status"] == "miss":
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=result["error"],
+                headers=_cache_headers(result["cache"])
+            )
 
         if not result["success"]:
             raise HTTPException(
@@ -651,8 +688,13 @@ async def smart_generate_template(
             generated_template=result["generated_template"],
             validation=validation,
             suggestions=result["suggestions"],
+            alternatives=[
+                TemplateCandidate(template=candidate["template"], validation=TemplateValidation(**candidate["validation"]))
+                for candidate in result.get("alternatives", [])
+            ],
             reference_data=result["reference_data"],
-            metadata=result["metadata"]
+            metadata=result["metadata"],
+            timings=timings_payload(current_timings())
         )
 
     except HTTPException:
@@ -672,6 +714,7 @@ async def optimize_template(
     """
     try:
         # 템플릿 최적화 서비스 호출
+        template_generation_service = service_registry.get("template_generation_service")
         result = template_generation_service.optimize_template(
             template=request.template,
             target_improvements=request.target_improvements
@@ -705,7 +748,11 @@ async def optimize_template(
             optimized_template=result["optimized_template"],
             original_validation=convert_validation(result["original_validation"]),
             optimized_validation=convert_validation(result["optimized_validation"]),
-            improvement=result["improvement"]
+            improvement=result["improvement"],
+            optimization_path=result["optimization_path"],
+            applied_fixes=result["applied_fixes"],
+            remaining_issues=result["remaining_issues"],
+            timings=timings_payload(current_timings())
         )
 
     except HTTPException:
@@ -725,6 +772,7 @@ async def search_similar_templates(
     """
     try:
         # 템플릿 추천 서비스 호출
+        template_vector_store_service = service_registry.get("template_vector_store_service")
         recommendations = template_vector_store_service.get_template_recommendations(
             user_input=request.query,
             category_1=request.category_filter,
@@ -752,7 +800,8 @@ async def search_similar_templates(
             query=request.query,
             similar_templates=similar_templates,
             category_patterns=recommendations['category_patterns'],
-            suggestions=recommendations['suggestions']
+            suggestions=recommendations['suggestions'],
+            timings=timings_payload(current_timings())
         )
 
     except Exception as e:
@@ -767,6 +816,7 @@ async def get_template_vector_store_info():
     템플릿 벡터 스토어 정보 조회
     """
     try:
+        template_vector_store_service = service_registry.get("template_vector_store_service")
         store_info = template_vector_store_service.get_store_info()
 
         return TemplateVectorStoreInfoResponse(
@@ -775,7 +825,9 @@ async def get_template_vector_store_info():
             templates_count=store_info['templates_count'],
             patterns_count=store_info['patterns_count'],
             status=store_info['status'],
-            persist_directory=store_info.get('persist_directory')
+            persist_directory=store_info.get('persist_directory'),
+            templates_index=store_info.get('templates_index'),
+            patterns_index=store_info.get('patterns_index')
         )
 
     except Exception as e:
@@ -2,7 +2,7 @@
 API 요청/응답 스키마 정의
 Pydantic 모델을 사용한 데이터 검증
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -64,6 +64,7 @@ class TemplateGenerationResponse(BaseResponse):
     template_analysis: Dict[str, Any] = Field(description="템플릿 분석 결과")
     processing_time: float = Field(description="처리 시간(초)")
     token_metrics: Optional[TokenMetrics] = Field(None, description="토큰 사용량 정보")
+    timings: Optional[Dict[str, Any]] = Field(None, description="단계별 처리 시간 (디버그 모드에서만 포함)")
 
 class TemplateAnalysis(BaseModel):
     """템플릿 분석 결과"""
@@ -92,6 +93,7 @@ class QueryResponse(BaseResponse):
     confidence_score: float = Field(ge=0.0, le=1.0, description="신뢰도 점수")
     processing_time: float = Field(description="처리 시간(초)")
     token_metrics: Optional[TokenMetrics] = Field(None, description="토큰 사용량 정보")
+    timings: Optional[Dict[str, Any]] = Field(None, description="단계별 처리 시간 (디버그 모드에서만 포함)")
 
 # 템플릿 조회 관련 스키마
 class TemplateListRequest(BaseModel):
@@ -153,6 +155,7 @@ class PolicySearchResponse(BaseResponse):
     query: str = Field(description="검색 쿼리")
     documents: List[PolicyDocument] = Field(description="검색 결과 문서")
     total_results: int = Field(description="전체 결과 수")
+    timings: Optional[Dict[str, Any]] = Field(None, description="단계별 처리 시간 (디버그 모드에서만 포함)")
 
 class TokenUsageRequest(BaseModel):
     """토큰 사용량 조회 요청"""
@@ -200,6 +203,10 @@ class SmartTemplateGenerationRequest(BaseModel):
     target_length: Optional[int] = Field(None, ge=50, le=300, description="목표 길이")
     include_variables: Optional[List[str]] = Field(default=[], description="포함할 변수 목록")
     context: Optional[Dict[str, Any]] = Field(default={}, description="추가 컨텍스트")
+    n_candidates: int = Field(default=1, ge=1, le=5, description="한 번의 생성 호출로 받을 후보 수 (최고 점수 후보 반환, 나머지는 alternatives)")
+    cache: Literal["bypass", "prefer", "only"] = Field(
+        default="prefer", description="응답 캐시 사용 방식 (bypass: 사용 안 함, prefer: 적중 시 재사용, only: 캐시에 있을 때만 응답)"
+    )
 
 class TemplateValidation(BaseModel):
     """템플릿 검증 결과"""
@@ -214,13 +221,20 @@ class TemplateValidation(BaseModel):
     sentence_count: int = Field(description="문장 수")
     compliance_score: float = Field(description="정책 준수 점수 (0-100)")
 
+class TemplateCandidate(BaseModel):
+    """채택되지 않은 생성 후보"""
+    template: str = Field(description="후보 템플릿")
+    validation: TemplateValidation = Field(description="후보 검증 결과")
+
 class SmartTemplateGenerationResponse(BaseResponse):
     """스마트 템플릿 생성 응답"""
     generated_template: str = Field(description="생성된 템플릿")
     validation: TemplateValidation = Field(description="템플릿 검증 결과")
     suggestions: List[str] = Field(description="개선 제안사항")
+    alternatives: List[TemplateCandidate] = Field(default=[], description="나머지 후보 (검증 점수 순)")
     reference_data: Dict[str, Any] = Field(description="참조 데이터 정보")
     metadata: Dict[str, Any] = Field(description="생성 메타데이터")
+    timings: Optional[Dict[str, Any]] = Field(None, description="단계별 처리 시간 (디버그 모드에서만 포함)")
 
 class TemplateOptimizationRequest(BaseModel):
     """템플릿 최적화 요청"""
@@ -234,6 +248,10 @@ class TemplateOptimizationResponse(BaseResponse):
     original_validation: TemplateValidation = Field(description="원본 검증 결과")
     optimized_validation: TemplateValidation = Field(description="최적화된 검증 결과")
     improvement: Dict[str, float] = Field(description="개선 사항")
+    optimization_path: str = Field(default="llm", description="최적화 경로 (none: 수정 불필요, deterministic: 규칙 수정만, llm: LLM 재작성)")
+    applied_fixes: List[str] = Field(default=[], description="규칙으로 적용한 수정 (variable_syntax, duplicate_lines, whitespace, sentence_trim, greeting)")
+    remaining_issues: List[str] = Field(default=[], description="최적화 후에도 남은 문제 (광고성 표현/어조는 LLM 재작성 대상, 길이/변수/인사말/문장 수는 보고만 함)")
+    timings: Optional[Dict[str, Any]] = Field(None, description="단계별 처리 시간 (디버그 모드에서만 포함)")
 
 class TemplateSimilarSearchRequest(BaseModel):
     """유사 템플릿 검색 요청"""
@@ -259,10 +277,13 @@ class TemplateSimilarSearchResponse(BaseResponse):
     similar_templates: List[TemplateInfo] = Field(description="유사한 템플릿 목록")
     category_patterns: List[Dict[str, Any]] = Field(description="카테고리 패턴 정보")
     suggestions: List[str] = Field(description="제안사항")
+    timings: Optional[Dict[str, Any]] = Field(None, description="단계별 처리 시간 (디버그 모드에서만 포함)")
 
 class TemplateVectorStoreInfoResponse(BaseResponse):
     """템플릿 벡터 스토어 정보 응답"""
     templates_count: int = Field(description="템플릿 문서 수")
     patterns_count: int = Field(description="패턴 문서 수")
     status: str = Field(description="상태")
-    persist_directory: Optional[str] = Field(description="저장 디렉토리")
\ No newline at end of file
+    persist_directory: Optional[str] = Field(description="저장 디렉토리")
+    templates_index: Optional[Dict[str, Any]] = Field(None, description="템플릿 인덱스 정보 (유형, 벡터 수, 검색 파라미터)")
+    patterns_index: Optional[Dict[str, Any]] = Field(None, description="패턴 인덱스 정보 (유형, 벡터 수, 검색 파라미터)")
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+템플릿 코퍼스 패키지
+승인 템플릿 엑셀의 적재와 분석 (열 기반 코퍼스/JSONL/벡터DB JSON, 근접 중복 탐지, 패턴 인사이트)
+"""
@@ -0,0 +1,504 @@
+"""
+승인 템플릿 코퍼스 분석 (벡터화)
+행 반복 없이 pandas 문자열/그룹 연산으로 다음을 계산
+- 템플릿별 메타데이터 (변수, 길이, 구조 특징) → approved_templates.json
+- 1차 분류별 패턴 (공통 변수, 특징 단어, 버튼, 길이, 성공 지표) → template_patterns.json
+- 전체 성공 지표 → success_indicators.json
+- 패턴 인사이트 (pattern_insights.py 출력)
+
+분류별 집계는 (분류, 값) → (빈도, 처음 나온 순서) 테이블로 누적하므로
+update()로 추가된 행만 분석해 합칠 수 있음 (빈도가 같으면 Counter.most_common처럼 먼저 나온 값 우선)
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 엑셀 열 순서대로 붙이는 이름
+COLUMNS = ['텍스트', '분류1차', '분류2차', '자동발송관련', '템플릿코드', '버튼', '광고순수', '업무분류', '서비스분류']
+
+VARIABLE_PATTERN = r'#\{([^}]+)\}'
+GREETING_PATTERN = r'안녕하세요|고객님|회원님'
+BUTTON_MENTION_PATTERN = r'버튼|클릭|확인|아래'
+CONTACT_PATTERN = r'연락|문의|전화'
+# 두 글자 이상 한글 단어
+HANGUL_WORD_PATTERN = r'[가-힣]{2,}'
+# 마침표로 나눈 조각 중 공백이 아닌 문자가 있는 조각 (= 문장 수)
+SENTENCE_PATTERN = r'[^.]*[^.\s][^.]*'
+INSIGHT_CLEAN_PATTERN = r'[^\w\s가-힣]'
+
+# 패턴 특징 단어에서 제외할 일반 단어
+PATTERN_EXCLUDE_WORDS = {
+    '안녕하세요', '고객님', '님', '확인', '하실', '수', '있습니다',
+    '바랍니다', '감사합니다', '이용', '서비스', '문의', '연락'
+}
+INSIGHT_EXCLUDE_WORDS = {'안녕하세요', '고객님', '님', '확인', '하실', '수', '있습니다', '바랍니다', '감사합니다'}
+INSIGHT_GREETINGS = ['안녕하세요', '고객님', '회원님', '님,', '님께서']
+
+SHORT_LENGTH = 80
+MEDIUM_LENGTH = 150
+
+TEMPLATE_CREATED_AT = "2024-08-27"
+TEMPLATE_SOURCE = "JJ템플릿_승인받은템플릿"
+DATA_SOURCE = "JJ템플릿.xlsx"
+
+# 성공 지표 중 코퍼스에서 계산하지 않는 참고값 (top_variables만 계산)
+SUCCESS_INDICATOR_REFERENCE = {
+    "optimal_length_range": {"min": 80, "max": 150, "reason": "55.7% of approved templates"},
+    "greeting_patterns": {
+        "안녕하세요": {"usage_rate": 0.684, "context": "universal"},
+        "고객님": {"usage_rate": 0.247, "context": "formal_business"},
+        "회원님": {"usage_rate": 0.042, "context": "membership_service"}
+    },
+    "button_patterns": {
+        "자세히 확인하기": {"usage_rate": 0.641, "context": "detail_information"},
+        "상세 확인": {"usage_rate": 0.069, "context": "additional_info"},
+        "확인하기": {"usage_rate": 0.024, "context": "general_confirmation"}
+    },
+    "structure_patterns": {
+        "greeting_main_guide_action": {"success_rate": 0.78, "description": "인사-본문-안내-행동유도"},
+        "greeting_main_action": {"success_rate": 0.65, "description": "인사-본문-행동유도"},
+        "main_guide_action": {"success_rate": 0.45, "description": "본문-안내-행동유도"}
+    },
+    "approval_factors": {
+        "policy_compliance": {"weight": 0.4, "description": "정책 준수 여부"},
+        "pattern_matching": {"weight": 0.3, "description": "성공 패턴 일치도"},
+        "length_optimization": {"weight": 0.2, "description": "적절한 길이 유지"},
+        "user_experience": {"weight": 0.1, "description": "사용자 경험 고려"}
+    }
+}
+
+# 누적 빈도 테이블 종류
+KIND_VARIABLE = "variable"          # 1차 분류별 변수
+KIND_WORD = "word"                  # 1차 분류별 한글 단어
+KIND_BUTTON = "button"              # 1차 분류별 버튼
+KIND_TOP_VARIABLE = "top_variable"  # 전체 변수
+ALL_CATEGORIES = ""
+
+_CATEGORY_AGGREGATES = {
+    "rows": "sum",
+    "length_sum": "sum",
+    "length_count": "sum",
+    "length_min": "min",
+    "length_max": "max",
+    "greeting_rows": "sum",
+    "button_rows": "sum",
+    "variable_total": "sum",
+    "first": "min",
+}
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """엑셀 열 이름을 위치 기준으로 COLUMNS로 변경"""
+    return df.rename(columns=dict(zip(df.columns[:len(COLUMNS)], COLUMNS)))
+
+
+def load_template_frame(excel_path: str, sheet_name: Any = 0) -> pd.DataFrame:
+    """승인 템플릿 엑셀을 정규화된 열 이름으로 로드"""
+    return normalize_columns(pd.read_excel(excel_path, sheet_name=sheet_name))
+
+
+def _text_or(values: pd.Series, default: str) -> pd.Series:
+    """값은 문자열로, 빈 값은 default로"""
+    return values.astype(str).where(values.notna(), default)
+
+
+def _str_len(values: pd.Series) -> pd.Series:
+    """문자열 길이 (문자열이 아닌 값은 NaN, 전부 비어 있는 열도 허용)"""
+    return values.astype(object).str.len()
+
+
+def annotate_templates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    텍스트가 있는 행의 템플릿 메타데이터 (원본 인덱스 유지)
+
+    Args:
+        df: normalize_columns를 거친 템플릿 프레임
+
+    Returns:
+        pd.DataFrame: text와 approved_templates.json 메타데이터 열
+    """
+    rows = df[df['텍스트'].notna()]
+    text = rows['텍스트'].astype(str).str.strip()
+    variables = text.str.findall(VARIABLE_PATTERN)
+    length = text.str.len()
+
+    return pd.DataFrame({
+        "text": text,
+        "category_1": _text_or(rows['분류1차'], "기타"),
+        "category_2": _text_or(rows['분류2차'], "기타"),
+        "auto_send": _text_or(rows['자동발송관련'], ""),
+        "template_code": _text_or(rows['템플릿코드'], ""),
+        "button": _text_or(rows['버튼'], "X"),
+        "ad_type": _text_or(rows['광고순수'], ""),
+        "business_type": _text_or(rows['업무분류'], "기타"),
+        "service_type": _text_or(rows['서비스분류'], "기타"),
+        "variables": variables,
+        "variable_count": variables.str.len(),
+        "length": length,
+        "length_category": np.select(
+            [length <= SHORT_LENGTH, length <= MEDIUM_LENGTH], ["short", "medium"], "long"
+        ),
+        "sentence_count": text.str.count(SENTENCE_PATTERN),
+        "has_greeting": text.str.contains(GREETING_PATTERN, regex=True),
+        "has_button_mention": text.str.contains(BUTTON_MENTION_PATTERN, regex=True),
+        "has_contact": text.str.contains(CONTACT_PATTERN, regex=True),
+        "politeness_level": np.where(text.str.contains("습니다", regex=False), "formal", "casual"),
+    }, index=rows.index)
+
+
+def _ranked(counts: pd.DataFrame, limit: Optional[int] = None) -> Dict[Any, List[Tuple[Any, int]]]:
+    """(category, value, count, first) 테이블 → 분류별 (값, 빈도) 목록 (빈도 내림차순, 동률은 먼저 나온 순)"""
+    ordered = counts.sort_values(["count", "first"], ascending=[False, True], kind="stable")
+    if limit is not None:
+        ordered = ordered.groupby("category", sort=False, dropna=False).head(limit)
+    ranked: Dict[Any, List[Tuple[Any, int]]] = {}
+    for category, value, count in zip(ordered["category"], ordered["value"], ordered["count"]):
+        ranked.setdefault(category, []).append((value, int(count)))
+    return ranked
+
+
+def _count_values(categories: pd.Series, values: pd.Series, offset: int = 0) -> pd.DataFrame:
+    """
+    (분류, 값)별 빈도와 처음 나온 순서
+    values는 행 순서 → 행 안의 순서로 정렬된 상태여야 하며, categories는 같은 행 인덱스
+    """
+    frame = pd.DataFrame({
+        "category": categories.reindex(values.index).to_numpy(),
+        "value": values.to_numpy(),
+        "order": np.arange(offset, offset + len(values)),
+    })
+    grouped = frame.groupby(["category", "value"], sort=False, dropna=False)["order"]
+    return grouped.agg(count="size", first="min").reset_index()
+
+
+def _most_common(values: pd.Series, limit: Optional[int] = None) -> List[Tuple[Any, int]]:
+    """Counter(values).most_common(limit)와 같은 결과"""
+    values = values.reset_index(drop=True)
+    counts = _count_values(pd.Series(ALL_CATEGORIES, index=values.index), values)
+    return _ranked(counts, limit).get(ALL_CATEGORIES, [])
+
+
+def template_records(annotated: pd.DataFrame) -> List[Dict[str, Any]]:
+    """annotate_templates 결과 → approved_templates.json 항목"""
+    # 열 단위 tolist()로 파이썬 기본 타입 변환 후 행으로 묶기 (to_dict("records")보다 빠름)
+    columns = [column for column in annotated.columns if column != "text"]
+    metadata = (
+        dict(zip(columns, values))
+        for values in zip(*(annotated[column].tolist() for column in columns))
+    )
+    return [
+        {
+            "id": f"template_{index:03d}",
+            "text": text,
+            "metadata": {
+                **meta,
+                "approval_status": "approved",
+                "created_at": TEMPLATE_CREATED_AT,
+                "source": TEMPLATE_SOURCE
+            }
+        }
+        for index, text, meta in zip(annotated.index, annotated['text'], metadata)
+    ]
+
+
+class TemplateCorpusAnalyzer:
+    """
+    승인 템플릿 코퍼스 누적 분석기
+    update()는 추가된 행만 분석해 분류별 집계/빈도 테이블에 합침
+    keep_rows=False면 원본/메타데이터 행을 보관하지 않아 메모리가 집계 테이블 크기로 유지됨
+    (스트리밍 적재용 - 전체 행이 필요한 template_records()/insights()는 사용 불가)
+    """
+
+    def __init__(self, keep_rows: bool = True):
+        self.keep_rows = keep_rows
+        self._frames: List[pd.DataFrame] = []
+        self._annotated: List[pd.DataFrame] = []
+        self._frame: Optional[pd.DataFrame] = None
+        self._rows = 0
+        self._sequence = 0
+        self._categories: Optional[pd.DataFrame] = None
+        self._counts: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TemplateCorpusAnalyzer":
+        return cls().update(df)
+
+    @property
+    def row_count(self) -> int:
+        return self._rows
+
+    def _require_rows(self):
+        if not self.keep_rows:
+            raise RuntimeError("keep_rows=False 분석기는 행 단위 결과를 보관하지 않습니다 (analyze_chunk 결과 사용)")
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """지금까지 추가된 원본 행 전체"""
+        self._require_rows()
+        if self._frame is None:
+            self._frame = pd.concat(self._frames) if self._frames else pd.DataFrame(columns=COLUMNS)
+        return self._frame
+
+    @property
+    def annotated(self) -> pd.DataFrame:
+        """지금까지 추가된 템플릿 메타데이터 전체"""
+        self._require_rows()
+        return pd.concat(self._annotated) if self._annotated else annotate_templates(pd.DataFrame(columns=COLUMNS))
+
+    def update(self, df: pd.DataFrame) -> "TemplateCorpusAnalyzer":
+        """
+        추가된 행 분석 후 누적 집계에 합치기
+
+        Args:
+            df: 새 행 (엑셀 열 순서 또는 COLUMNS 이름), 인덱스는 누적 행 번호로 다시 매김
+        """
+        self._analyze(df)
+        return self
+
+    def analyze_chunk(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """추가된 행을 누적 집계에 합치고 그 행들의 템플릿 항목 반환 (스트리밍 적재용)"""
+        return template_records(self._analyze(df))
+
+    def _analyze(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = normalize_columns(df).reset_index(drop=True)
+        df.index = pd.RangeIndex(self._rows, self._rows + len(df))
+        annotated = annotate_templates(df)
+        if df.empty:
+            return annotated
+
+        self._merge_categories(df, annotated)
+        self._merge_counts(df, annotated)
+
+        if self.keep_rows:
+            self._frames.append(df)
+            self._annotated.append(annotated)
+            self._frame = None
+        self._rows += len(df)
+        return annotated
+
+    def _merge_categories(self, df: pd.DataFrame, annotated: pd.DataFrame):
+        """1차 분류별 행 수/길이/인사말/버튼/변수 집계"""
+        categorized = df[df['분류1차'].notna()]
+        if categorized.empty:
+            return
+        raw_text = categorized['텍스트']
+        lengths = _str_len(raw_text)
+        button = categorized['버튼']
+        frame = pd.DataFrame({
+            "category": categorized['분류1차'],
+            "rows": 1,
+            "length_sum": lengths.fillna(0),
+            "length_count": lengths.notna().astype(int),
+            "length_min": lengths,
+            "length_max": lengths,
+            "greeting_rows": (
+                raw_text.notna() & raw_text.astype(str).str.contains("안녕하세요", regex=False)
+            ).astype(int),
+            "button_rows": (button.notna() & (button != 'X')).astype(int),
+            "variable_total": annotated['variable_count'].reindex(categorized.index).fillna(0),
+            "first": categorized.index,
+        })
+        frame = frame.set_index("category")
+        merged = frame if self._categories is None else pd.concat([self._categories, frame])
+        self._categories = merged.groupby(level=0, sort=False).agg(_CATEGORY_AGGREGATES)
+
+    def _merge_counts(self, df: pd.DataFrame, annotated: pd.DataFrame):
+        """변수/단어/버튼 빈도 테이블 갱신"""
+        categories = df['분류1차']
+        text = annotated['text']
+        variables = annotated['variables'].explode().dropna()
+        words = text.str.findall(HANGUL_WORD_PATTERN).explode().dropna()
+        button = df.loc[annotated.index, '버튼']
+        buttons = button[button.notna() & (button != 'X')].astype(str)
+
+        tables = []
+        for kind, kind_categories, values in (
+            (KIND_VARIABLE, categories, variables),
+            (KIND_WORD, categories, words),
+            (KIND_BUTTON, categories, buttons),
+            (KIND_TOP_VARIABLE, pd.Series(ALL_CATEGORIES, index=df.index), variables),
+        ):
+            counts = _count_values(kind_categories, values, self._sequence)
+            self._sequence += len(values)
+            counts.insert(0, "kind", kind)
+            # 1차 분류가 없는 행은 분류별 집계에서 제외 (전체 집계에만 포함)
+            tables.append(counts[counts["category"].notna()])
+
+        merged = pd.concat(([] if self._counts is None else [self._counts]) + tables, ignore_index=True)
+        self._counts = (
+            merged.groupby(["kind", "category", "value"], sort=False)
+            .agg(count=("count", "sum"), first=("first", "min"))
+            .reset_index()
+        )
+
+    def _ranked_counts(self, kind: str, limit: Optional[int] = None) -> Dict[Any, List[Tuple[Any, int]]]:
+        if self._counts is None:
+            return {}
+        return _ranked(self._counts[self._counts["kind"] == kind], limit)
+
+    # ------------------------------------------------------------------
+    # JSON 출력
+    # ------------------------------------------------------------------
+
+    def template_records(self) -> List[Dict[str, Any]]:
+        """approved_templates.json 항목"""
+        return template_records(self.annotated)
+
+    def category_patterns(self) -> List[Dict[str, Any]]:
+        """template_patterns.json 항목 (1차 분류가 처음 나온 순서)"""
+        variables = self._ranked_counts(KIND_VARIABLE, 5)
+        words = self._ranked_counts(KIND_WORD, 10)
+        buttons = self._ranked_counts(KIND_BUTTON, 3)
+
+        patterns = []
+        if self._categories is None:
+            return patterns
+        categories = self._categories.sort_values("first", kind="stable")
+        for category, stats in zip(categories.index, categories.itertuples(index=False)):
+            rows = stats.rows
+            filtered_words = [
+                (word, count) for word, count in words.get(category, [])
+                if word not in PATTERN_EXCLUDE_WORDS
+            ]
+            average = stats.length_sum / stats.length_count if stats.length_count else 0
+            patterns.append({
+                "id": f"pattern_{str(category).replace('/', '_').replace(' ', '_')}",
+                "category": category,
+                "type": "category_pattern",
+                "metadata": {
+                    "template_count": int(rows),
+                    "common_variables": dict(variables.get(category, [])),
+                    "characteristic_words": dict(filtered_words[:5]),
+                    "common_buttons": dict(buttons.get(category, [])),
+                    "avg_length": int(average),
+                    "length_range": {
+                        "min": int(stats.length_min),
+                        "max": int(stats.length_max)
+                    },
+                    "success_indicators": {
+                        "greeting_usage": stats.greeting_rows / rows,
+                        "variable_usage": stats.variable_total / rows,
+                        "button_usage": stats.button_rows / rows
+                    }
+                }
+            })
+        return patterns
+
+    def success_indicators(self) -> Dict[str, Any]:
+        """success_indicators.json"""
+        top_variables = self._ranked_counts(KIND_TOP_VARIABLE, 10).get(ALL_CATEGORIES, [])
+        reference = dict(SUCCESS_INDICATOR_REFERENCE)
+        return {
+            "id": "success_indicators_summary",
+            "type": "success_metrics",
+            "data": {
+                "optimal_length_range": reference.pop("optimal_length_range"),
+                "top_variables": dict(top_variables),
+                **reference
+            },
+            "updated_at": datetime.now().isoformat()
+        }
+
+    def vectordb_data(self) -> Dict[str, Any]:
+        """kakao_template_vectordb_data.json (템플릿 + 패턴 + 성공 지표)"""
+        templates = self.template_records()
+        patterns = self.category_patterns()
+        return {
+            "templates": templates,
+            "patterns": patterns,
+            "success_indicators": self.success_indicators(),
+            "metadata": {
+                "total_templates": len(templates),
+                "total_patterns": len(patterns),
+                "data_source": DATA_SOURCE,
+                "created_at": datetime.now().isoformat(),
+                "version": "1.0"
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # 패턴 인사이트
+    # ------------------------------------------------------------------
+
+    def insights(self) -> Dict[str, Any]:
+        """pattern_insights.py가 출력하는 분석 결과"""
+        df = self.frame
+        raw_text = df['텍스트']
+        valid = df[raw_text.notna()]
+        text = valid['텍스트'].astype(str)
+
+        # 1. 시작 패턴 (첫 20자)
+        start_patterns = _most_common(text.str[:20].str.strip(), 10)
+
+        # 2. 인사말 사용 템플릿 수
+        greeting_usage = {
+            greeting: int(text.str.contains(greeting, regex=False).sum()) for greeting in INSIGHT_GREETINGS
+        }
+
+        # 3. 1차 분류별 특징 단어 (텍스트가 없는 분류도 빈 목록으로 포함)
+        words = text.str.replace(INSIGHT_CLEAN_PATTERN, ' ', regex=True).str.split().explode().dropna()
+        ranked_words = _ranked(_count_values(valid['분류1차'], words), 10)
+        business_patterns = {
+            category: [
+                (word, count) for word, count in ranked_words.get(category, [])
+                if word not in INSIGHT_EXCLUDE_WORDS and len(word) > 1
+            ][:5]
+            for category in pd.unique(df['분류1차'].dropna())
+        }
+
+        # 4. 길이 구간별 2차 분류
+        lengths = _str_len(raw_text)
+        length_groups = {}
+        for name, mask in (
+            ("short", lengths <= SHORT_LENGTH),
+            ("medium", (lengths > SHORT_LENGTH) & (lengths <= MEDIUM_LENGTH)),
+            ("long", lengths > MEDIUM_LENGTH),
+        ):
+            group = df[mask]
+            length_groups[name] = {
+                "count": len(group),
+                "top_category_2": group['분류2차'].value_counts().head(3).to_dict()
+            }
+
+        # 5. 1차 분류별 상위 변수 (1차 분류가 없는 행 제외)
+        variables = text.str.findall(VARIABLE_PATTERN).explode().dropna()
+        variable_counts = _count_values(valid['분류1차'], variables)
+        ranked_variables = _ranked(variable_counts[variable_counts["category"].notna()], 3)
+        category_variables = {
+            category: ranked_variables[category]
+            for category in pd.unique(valid['분류1차'].dropna())
+            if category and ranked_variables.get(category)
+        }
+
+        # 6. 버튼별 연관 2차 분류
+        buttons = df[df['버튼'].notna() & (df['버튼'] != 'X')]
+        button_categories = {}
+        for button, group in buttons.groupby('버튼', sort=False):
+            related = group['분류2차'].value_counts().head(3)
+            if len(related) > 0:
+                button_categories[button] = related.to_dict()
+
+        # 7. 최다 2차 분류의 구조 패턴 (앞 10개)
+        top_category = df['분류2차'].value_counts().index[0]
+        sample = df[df['분류2차'] == top_category]['텍스트'].head(10).dropna().astype(str)
+        sentence_counts = sample.str.count(r'\.') + 1
+        has_greeting = sample.str.contains("안녕", regex=False) | sample.str.contains("고객님", regex=False)
+        has_button = sample.str.contains("버튼", regex=False) | sample.str.contains("클릭", regex=False)
+        structures = (
+            sentence_counts.astype(str) + "문장-"
+            + np.where(has_greeting, "인사", "무인사") + "-"
+            + np.where(has_button, "버튼언급", "무버튼언급")
+        )[sentence_counts >= 2]
+
+        return {
+            "start_patterns": start_patterns,
+            "greeting_usage": greeting_usage,
+            "business_patterns": business_patterns,
+            "length_groups": length_groups,
+            "category_variables": category_variables,
+            "button_categories": button_categories,
+            "top_category_2": top_category,
+            "structure_patterns": _most_common(structures, 5),
+        }
@@ -0,0 +1,245 @@
+"""
+승인 템플릿 근접 중복 탐지 (MinHash + LSH)
+변수명이나 단어 하나만 다른 템플릿을 적재 시점에 클러스터로 묶고 대표 템플릿을 정함
+
+- 정규화(NFC, #{변수} → #{}, 공백 정리) 후 문자 SHINGLE_SIZE-gram 집합의 MinHash 서명 계산
+- 서명을 LSH_BANDS개 밴드로 나눠 같은 버킷에 들어온 대표 템플릿만 후보로 보고,
+  추정 Jaccard 유사도가 임계값 이상인 가장 가까운 대표의 클러스터에 합류
+- 클러스터는 먼저 나온 템플릿이 대표 (스트리밍 적재에서 이미 기록한 항목의 클러스터가 바뀌지 않음)
+- 클러스터는 검색 필터 키(PARTITION_FIELDS)가 같은 템플릿끼리만 묶음
+  (collapse 모드에서 대표만 임베딩해도 분류/업무 필터 검색 결과에서 빠지는 분류가 없도록)
+- 대표 서명만 보관하므로 메모리는 클러스터 수에 비례
+- 템플릿 스토어는 인덱스 옆에 대표 서명(DEDUP_FILE)을 저장해 두고, 추가 적재 묶음을 기존 클러스터에 배정
+
+항목 메타데이터에 cluster_id(대표 템플릿 id), is_representative, duplicate_similarity를 기록하고,
+검색 쪽은 diversify_by_cluster로 같은 클러스터 결과를 하나만 남김
+서버에서도 import하므로 numpy만 사용
+"""
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+# 밴드 16개 × 8행 → 유사도 약 0.7 이상부터 후보가 될 확률이 급격히 높아짐
+LSH_BANDS = 16
+DEFAULT_THRESHOLD = float(os.getenv("TEMPLATE_DEDUP_THRESHOLD", "0.8"))
+# 유사 템플릿 검색 필터와 같은 필드 - 값이 다른 템플릿은 서로 다른 클러스터
+PARTITION_FIELDS = ("category_1", "business_type")
+
+# 템플릿 인덱스 디렉토리에 저장하는 대표 서명/클러스터 파일
+DEDUP_FILE = "near_duplicates.npz"
+
+DEDUP_OFF = "off"
+DEDUP_ANNOTATE = "annotate"      # 클러스터 메타데이터만 기록, 전부 임베딩
+DEDUP_COLLAPSE = "collapse"      # 대표 템플릿만 임베딩
+DEDUP_MODES = (DEDUP_OFF, DEDUP_ANNOTATE, DEDUP_COLLAPSE)
+
+_PRIME = (1 << 31) - 1
+_HASH_BASE = np.uint64(1_000_003)
+_VARIABLE_PATTERN = re.compile(r'#\{[^}]*\}')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+_rng = np.random.default_rng(20240827)
+_PERM_A = _rng.integers(1, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def dedup_mode_from_env() -> str:
+    mode = os.getenv("TEMPLATE_DEDUP", DEDUP_COLLAPSE).strip().lower()
+    if mode not in DEDUP_MODES:
+        print(f"WARNING: 알 수 없는 TEMPLATE_DEDUP 값입니다: {mode} (collapse 사용)")
+        return DEDUP_COLLAPSE
+    return mode
+
+
+def normalize_for_dedup(text: str) -> str:
+    """변수명/공백 차이를 없앤 비교용 텍스트"""
+    text = unicodedata.normalize("NFC", text or "")
+    text = _VARIABLE_PATTERN.sub("#{}", text)
+    return _WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """문자 size-gram의 64비트 롤링 해시 (중복 제거, 짧은 텍스트는 전체를 한 shingle로)"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < size:
+        codes = np.concatenate([codes, np.zeros(size - len(codes), dtype=np.uint64)])
+    windows = np.lib.stride_tricks.sliding_window_view(codes, size)
+    powers = _HASH_BASE ** np.arange(size - 1, -1, -1, dtype=np.uint64)
+    # uint64 곱/합의 오버플로는 2^64 모듈러 연산으로 그대로 해시에 사용
+    return np.unique((windows * powers).sum(axis=1, dtype=np.uint64))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """정규화한 텍스트의 MinHash 서명 (NUM_PERMUTATIONS개 uint32)"""
+    hashes = shingle_hashes(normalize_for_dedup(text)) % np.uint64(_PRIME)
+    permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % np.uint64(_PRIME)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimated_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """두 서명의 일치 비율 (Jaccard 유사도 추정치)"""
+    return float(np.mean(left == right))
+
+
+class NearDuplicateIndex:
+    """
+    대표 템플릿 LSH 인덱스
+    assign()은 항목을 순서대로 받아 기존 클러스터에 합류시키거나 새 클러스터의 대표로 등록
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, bands: int = LSH_BANDS):
+        if NUM_PERMUTATIONS % bands:
+            raise ValueError(f"밴드 수({bands})가 서명 길이({NUM_PERMUTATIONS})를 나누어 떨어지게 해야 합니다")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self._buckets: Dict[Tuple[Any, int, bytes], List[int]] = {}
+        self._signatures: List[np.ndarray] = []
+        self._cluster_ids: List[str] = []
+        self._cluster_sizes: List[int] = []
+        self._partitions: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._cluster_ids)
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(self._cluster_sizes) - len(self._cluster_sizes)
+
+    def _band_keys(self, signature: np.ndarray, partition: Any = None) -> List[Tuple[Any, int, bytes]]:
+        return [
+            (partition, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: np.ndarray, partition: Any = None) -> Tuple[Optional[int], float]:
+        """같은 파티션에서 임계값 이상인 가장 비슷한 대표 (클러스터 번호, 추정 유사도)"""
+        candidates = {
+            cluster
+            for key in self._band_keys(signature, partition)
+            for cluster in self._buckets.get(key, ())
+        }
+        best, best_similarity = None, 0.0
+        for cluster in sorted(candidates):
+            similarity = estimated_similarity(signature, self._signatures[cluster])
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = cluster, similarity
+        return best, best_similarity
+
+    def add(self, item_id: str, text: str, partition: Any = None) -> Dict[str, Any]:
+        """
+        항목 하나를 클러스터에 배정
+
+        Args:
+            item_id: 템플릿 id (새 클러스터면 클러스터 id로 사용)
+            text: 템플릿 본문
+            partition: 같은 값끼리만 묶을 키 (예: (category_1, business_type))
+
+        Returns:
+            Dict: cluster_id, is_representative, duplicate_similarity
+        """
+        signature = minhash_signature(text)
+        cluster, similarity = self.find(signature, partition)
+        if cluster is not None:
+            self._cluster_sizes[cluster] += 1
+            return {
+                "cluster_id": self._cluster_ids[cluster],
+                "is_representative": False,
+                "duplicate_similarity": round(similarity, 4),
+            }
+
+        self._add_cluster(item_id, signature, partition)
+        return {"cluster_id": item_id, "is_representative": True, "duplicate_similarity": 1.0}
+
+    def _add_cluster(self, cluster_id: str, signature: np.ndarray, partition: Any, size: int = 1):
+        cluster = len(self._cluster_ids)
+        self._signatures.append(signature)
+        self._cluster_ids.append(cluster_id)
+        self._cluster_sizes.append(size)
+        self._partitions.append(partition)
+        for key in self._band_keys(signature, partition):
+            self._buckets.setdefault(key, []).append(cluster)
+
+    def assign(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        템플릿 항목({'id', 'text', 'metadata'}) 메타데이터에 클러스터 정보 기록 (제자리 수정)
+        PARTITION_FIELDS 값이 같은 템플릿끼리만 클러스터로 묶음
+        """
+        for record in records:
+            metadata = record.setdefault("metadata", {})
+            partition = tuple(metadata.get(field) for field in PARTITION_FIELDS)
+            metadata.update(self.add(record.get("id"), record.get("text", ""), partition))
+        return records
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "clusters": len(self),
+            "duplicates": self.duplicate_count,
+            "largest_cluster": max(self._cluster_sizes, default=0),
+        }
+
+    def save(self, directory: str):
+        """대표 서명/클러스터를 directory/DEDUP_FILE로 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(directory) / DEDUP_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        signatures = np.stack(self._signatures) if self._signatures else np.zeros((0, NUM_PERMUTATIONS), np.uint32)
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                bands=np.array(self.bands),
+                signatures=signatures,
+                cluster_ids=np.array([str(cluster_id) for cluster_id in self._cluster_ids], dtype=str),
+                cluster_sizes=np.array(self._cluster_sizes, dtype=np.int64),
+                partitions=np.array([json.dumps(partition, ensure_ascii=False) for partition in self._partitions], dtype=str),
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, directory: str, threshold: float = DEFAULT_THRESHOLD) -> Optional["NearDuplicateIndex"]:
+        """저장된 인덱스 (없으면 None, 임계값은 현재 설정 사용)"""
+        path = Path(directory) / DEDUP_FILE
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(threshold, int(data["bands"]))
+            for signature, cluster_id, size, partition in zip(
+                data["signatures"], data["cluster_ids"], data["cluster_sizes"], data["partitions"]
+            ):
+                partition = json.loads(str(partition))
+                index._add_cluster(
+                    str(cluster_id), signature, tuple(partition) if isinstance(partition, list) else partition, int(size)
+                )
+        return index
+
+
+def is_representative(record: Dict[str, Any]) -> bool:
+    """클러스터 정보가 없는 항목은 대표로 취급"""
+    return record.get("metadata", {}).get("is_representative") is not False
+
+
+def diversify_by_cluster(results: Sequence[Tuple[Any, float]], k: int) -> List[Tuple[Any, float]]:
+    """
+    검색 결과에서 클러스터마다 가장 가까운 문서 하나만 남겨 k개 반환 (순서 유지)
+    cluster_id가 없는 문서는 template_id 기준으로 각자 다른 클러스터
+    """
+    kept: List[Tuple[Any, float]] = []
+    seen = set()
+    for doc, score in results:
+        metadata = doc.metadata or {}
+        cluster = metadata.get("cluster_id") or metadata.get("template_id") or id(doc)
+        if cluster in seen:
+            continue
+        seen.add(cluster)
+        kept.append((doc, score))
+        if len(kept) >= k:
+            break
+    return kept
@@ -0,0 +1,225 @@
+"""
+승인 템플릿 스프레드시트 스트리밍 적재
+openpyxl 읽기 전용 모드로 시트를 행 묶음 단위로 읽어(시트 전체를 DataFrame으로 올리지 않음)
+묶음마다 분석 → JSONL 또는 열 기반 코퍼스(Parquet) 기록 → 임베딩으로 바로 넘김
+
+- 시트 읽기/분석은 백그라운드 스레드에서 최대 PREFETCH_CHUNKS 묶음 앞서 진행하므로
+  파싱이 끝나기 전에 임베딩이 시작되고, 메모리는 묶음 몇 개 + 분류별 집계 크기로 유지됨
+- 분류별 패턴/성공 지표는 전체 행을 본 뒤 기록
+- 근접 중복 템플릿은 묶음마다 MinHash/LSH로 클러스터를 배정해 메타데이터에 기록 (app.corpus.dedup)
+"""
+import os
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar, Union
+
+import pandas as pd
+
+from app.corpus.analysis import TemplateCorpusAnalyzer, normalize_columns, DATA_SOURCE
+from app.corpus.dedup import NearDuplicateIndex, dedup_mode_from_env, DEDUP_OFF
+from app.corpus.jsonl import JsonlCorpusWriter, is_jsonl
+from app.corpus.store import TemplateCorpusWriter
+
+DEFAULT_CHUNK_ROWS = int(os.getenv("TEMPLATE_INGEST_CHUNK_ROWS", "2000"))
+PREFETCH_CHUNKS = 2
+
+# pandas.read_excel이 결측값으로 읽는 문자열 (기본 na_values)
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+T = TypeVar("T")
+
+
+def _cell(value: Any) -> Any:
+    """read_excel과 같은 셀 값 정리 (결측 문자열 → None, 정수인 실수 → int)"""
+    if isinstance(value, str) and value in NA_STRINGS:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _header_names(header: Sequence[Any]) -> List[str]:
+    names = list(header)
+    while names and names[-1] is None:
+        names.pop()
+    return [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(names)]
+
+
+def iter_sheet_chunks(
+    excel_path: Union[str, Path],
+    sheet_name: Union[int, str] = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    시트를 chunk_rows 행씩 DataFrame으로 순회 (첫 행은 헤더)
+    중간의 빈 행은 read_excel처럼 유지하고, 끝의 빈 행은 버림
+
+    Args:
+        excel_path: 엑셀 파일
+        sheet_name: 시트 번호 또는 이름
+        chunk_rows: 묶음당 행 수
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        width = len(columns)
+
+        chunk: List[List[Any]] = []
+        blank_rows: List[List[Any]] = []
+        for row in rows:
+            values = [_cell(value) for value in row[:width]]
+            values.extend([None] * (width - len(values)))
+            if all(value is None for value in values):
+                # 뒤에 데이터 행이 오면 그때 함께 내보냄 (시트 끝의 빈 행 제거)
+                blank_rows.append(values)
+                continue
+            chunk.extend(blank_rows)
+            blank_rows = []
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                yield normalize_columns(pd.DataFrame(chunk, columns=columns, dtype=object))
+                chunk = []
+        if chunk:
+            yield normalize_columns(pd.DataFrame(chunk, columns=columns, dtype=object))
+    finally:
+        workbook.close()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], depth: int = PREFETCH_CHUNKS) -> Iterator[T]:
+    """
+    백그라운드 스레드에서 다음 항목을 최대 depth개 미리 생성
+    (시트 파싱/분석과 소비 쪽 임베딩을 겹쳐 실행, 대기열 크기로 메모리 상한)
+    """
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce():
+        try:
+            for item in items:
+                buffer.put(item)
+            buffer.put(done)
+        except BaseException as e:
+            buffer.put(_Failure(e))
+
+    threading.Thread(target=produce, name="template-ingest-prefetch", daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is done:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
+
+
+def open_corpus_writer(output_path: Union[str, Path]):
+    """출력 경로가 .jsonl이면 JSONL, 아니면 코퍼스 디렉토리(Parquet) 작성기"""
+    return JsonlCorpusWriter(output_path) if is_jsonl(output_path) else TemplateCorpusWriter(output_path)
+
+
+class SpreadsheetIngestion:
+    """
+    스프레드시트 → JSONL / 열 기반 코퍼스 스트리밍 적재
+    순회하면 템플릿 레코드를 묶음 단위로 내주면서 같은 내용을 출력 경로에 기록하고,
+    순회가 끝나면 patterns / success_indicators / template_count를 채움
+
+    사용 예:
+        ingestion = SpreadsheetIngestion("data/JJ템플릿.xlsx", "data/template_corpus")
+        template_store.add_template_chunks(ingestion)
+        template_store.load_pattern_data(ingestion.patterns)
+    """
+
+    def __init__(
+        self,
+        excel_path: Union[str, Path],
+        output_path: Optional[Union[str, Path]] = None,
+        sheet_name: Union[int, str] = 0,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        dedup: Optional[bool] = None
+    ):
+        """
+        Args:
+            excel_path: 승인 템플릿 엑셀
+            output_path: .jsonl 파일 또는 코퍼스 디렉토리 (None이면 기록하지 않음)
+            sheet_name: 시트 번호 또는 이름
+            chunk_rows: 묶음당 행 수
+            dedup: 근접 중복 클러스터 배정 여부 (None이면 TEMPLATE_DEDUP이 off가 아닐 때)
+        """
+        self.excel_path = Path(excel_path)
+        self.output_path = Path(output_path) if output_path else None
+        self.sheet_name = sheet_name
+        self.chunk_rows = chunk_rows
+
+        self.analyzer = TemplateCorpusAnalyzer(keep_rows=False)
+        if dedup is None:
+            dedup = dedup_mode_from_env() != DEDUP_OFF
+        self.dedup = NearDuplicateIndex() if dedup else None
+        self.template_count = 0
+        self.patterns: List[Dict[str, Any]] = []
+        self.success_indicators: Dict[str, Any] = {}
+        self.completed = False
+
+    def _analyzed_chunks(self) -> Iterator[List[Dict[str, Any]]]:
+        for frame in iter_sheet_chunks(self.excel_path, self.sheet_name, self.chunk_rows):
+            records = self.analyzer.analyze_chunk(frame)
+            if self.dedup is not None:
+                self.dedup.assign(records)
+            yield records
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        if self.completed:
+            raise RuntimeError("이미 적재가 끝난 SpreadsheetIngestion입니다")
+
+        writer = open_corpus_writer(self.output_path) if self.output_path is not None else None
+        try:
+            for records in prefetch(self._analyzed_chunks()):
+                if writer is not None:
+                    writer.write_templates(records)
+                self.template_count += len(records)
+                yield records
+
+            # 전체 행을 본 뒤에만 확정되는 분류별 패턴과 성공 지표
+            self.patterns = self.analyzer.category_patterns()
+            self.success_indicators = self.analyzer.success_indicators()
+            if writer is not None:
+                writer.finish(self.patterns, self.success_indicators, self.summary())
+                writer = None
+            self.completed = True
+        finally:
+            if writer is not None:
+                writer.abort()
+
+    def run(self) -> Dict[str, Any]:
+        """임베딩 없이 출력 파일만 생성"""
+        for _ in self:
+            pass
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {
+            "total_templates": self.template_count,
+            "total_patterns": len(self.patterns),
+            "total_rows": self.analyzer.row_count,
+            "data_source": self.excel_path.name or DATA_SOURCE,
+            "created_at": datetime.now().isoformat(),
+            "version": "1.0"
+        }
+        if self.dedup is not None:
+            summary["dedup"] = self.dedup.summary()
+        return summary
@@ -0,0 +1,88 @@
+"""
+템플릿 코퍼스 JSONL 형식
+한 줄에 레코드 하나, 첫 키 "type"으로 종류 구분
+- template: 승인 템플릿 (id, text, metadata) - 시트 순서대로 먼저 기록
+- category_pattern: 1차 분류별 패턴 - 전체 행을 본 뒤 기록
+- success_metrics: 성공 지표 요약
+- metadata: 적재 요약 (마지막 줄)
+서버 쪽(템플릿 벡터 스토어)에서도 읽으므로 pandas 없이 표준 라이브러리만 사용
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+RECORD_TEMPLATE = "template"
+RECORD_PATTERN = "category_pattern"
+RECORD_SUCCESS = "success_metrics"
+RECORD_METADATA = "metadata"
+
+DEFAULT_READ_CHUNK = 1000
+
+
+def is_jsonl(path: Union[str, Path]) -> bool:
+    return Path(path).suffix == ".jsonl"
+
+
+def dump_record(record_type: str, record: Dict[str, Any]) -> str:
+    """레코드 한 줄 (type을 첫 키로 두어 종류만 보고 건너뛸 수 있게)"""
+    body = {key: value for key, value in record.items() if key != "type"}
+    return json.dumps({"type": record_type, **body}, ensure_ascii=False, default=str) + "\n"
+
+
+class JsonlCorpusWriter:
+    """JSONL 작성기 (템플릿 줄을 묶음마다 추가하고 finish()에서 패턴/요약 줄을 쓴 뒤 파일 교체)"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+
+    def write_templates(self, records: List[Dict[str, Any]]):
+        self._file.writelines(dump_record(RECORD_TEMPLATE, record) for record in records)
+
+    def finish(self, patterns: List[Dict[str, Any]], success_indicators: Dict[str, Any], metadata: Dict[str, Any]):
+        self._file.writelines(dump_record(RECORD_PATTERN, pattern) for pattern in patterns)
+        self._file.write(dump_record(RECORD_SUCCESS, success_indicators))
+        self._file.write(dump_record(RECORD_METADATA, metadata))
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def iter_records(path: Union[str, Path], record_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    레코드 순회 (record_type을 지정하면 해당 종류만 파싱)
+
+    Args:
+        path: JSONL 파일
+        record_type: 읽을 레코드 종류 (None이면 전체)
+    """
+    prefix = f'{{"type": "{record_type}"' if record_type else None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if prefix and not line.startswith(prefix):
+                continue
+            yield json.loads(line)
+
+
+def iter_template_chunks(path: Union[str, Path], chunk_size: int = DEFAULT_READ_CHUNK) -> Iterator[List[Dict[str, Any]]]:
+    """템플릿 레코드를 chunk_size개씩 묶어 순회 (파일 전체를 메모리에 올리지 않음)"""
+    chunk: List[Dict[str, Any]] = []
+    for record in iter_records(path, RECORD_TEMPLATE):
+        record.pop("type", None)
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,270 @@
+"""
+템플릿 코퍼스 열 기반 저장소 (Parquet)
+kakao_template_vectordb_data.json 하나에 템플릿/패턴/성공 지표를 담아 매번 전체를 파싱하던 것을
+디렉토리 하나의 타입 지정 Parquet 파일들로 분리
+
+    template_corpus/
+        templates.parquet   승인 템플릿 (id, text, 메타데이터 열)
+        patterns.parquet    1차 분류별 패턴 (id, category, template_count, metadata JSON)
+        manifest.json       성공 지표와 적재 요약
+
+읽는 쪽은 필요한 열만(projection), 조건에 맞는 행 그룹만(predicate pushdown) 읽음
+- 패턴 테이블: patterns.parquet만
+- 분류별 통계: templates.parquet의 통계용 열만
+- 인덱스 빌드: 배치 단위 순회
+pyarrow는 사용 시점에 import (서버 시작 시간에 영향 없음)
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+TEMPLATES_FILE = "templates.parquet"
+PATTERNS_FILE = "patterns.parquet"
+MANIFEST_FILE = "manifest.json"
+
+DEFAULT_CORPUS_DIR = "./data/template_corpus"
+# 열 기반 코퍼스 이전의 단일 JSON (코퍼스가 없을 때만 사용)
+LEGACY_JSON_PATH = "./data/kakao_template_vectordb_data.json"
+
+DEFAULT_BATCH_ROWS = 1000
+
+# (열, 연산자, 값) 목록 - pyarrow DNF 필터 형식 (예: [("category_1", "==", "회원")])
+Filters = Sequence[Tuple[str, str, Any]]
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.dataset
+    except ImportError as e:
+        raise ImportError("템플릿 코퍼스 저장소에는 pyarrow가 필요합니다 (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _template_schema():
+    pa = _arrow()
+    return pa.schema([
+        ("id", pa.string()),
+        ("text", pa.string()),
+        ("category_1", pa.string()),
+        ("category_2", pa.string()),
+        ("auto_send", pa.string()),
+        ("template_code", pa.string()),
+        ("button", pa.string()),
+        ("ad_type", pa.string()),
+        ("business_type", pa.string()),
+        ("service_type", pa.string()),
+        ("variables", pa.list_(pa.string())),
+        ("variable_count", pa.int32()),
+        ("length", pa.int32()),
+        ("length_category", pa.string()),
+        ("sentence_count", pa.int32()),
+        ("has_greeting", pa.bool_()),
+        ("has_button_mention", pa.bool_()),
+        ("has_contact", pa.bool_()),
+        ("politeness_level", pa.string()),
+        ("approval_status", pa.string()),
+        ("created_at", pa.string()),
+        ("source", pa.string()),
+        ("cluster_id", pa.string()),
+        ("is_representative", pa.bool_()),
+        ("duplicate_similarity", pa.float32()),
+    ])
+
+
+def _pattern_schema():
+    pa = _arrow()
+    return pa.schema([
+        ("id", pa.string()),
+        ("category", pa.string()),
+        ("template_count", pa.int32()),
+        ("metadata", pa.string()),
+    ])
+
+
+def is_corpus_dir(path: Union[str, Path]) -> bool:
+    return (Path(path) / TEMPLATES_FILE).exists()
+
+
+def resolve_template_data_path(path: Union[str, Path]) -> Path:
+    """
+    템플릿 데이터 경로 확인
+    기본 코퍼스 디렉토리가 아직 없고 예전 JSON만 있으면 JSON 경로 반환
+    """
+    path = Path(path)
+    if not path.exists() and path == Path(DEFAULT_CORPUS_DIR) and Path(LEGACY_JSON_PATH).exists():
+        return Path(LEGACY_JSON_PATH)
+    return path
+
+
+def _template_rows(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {**record.get("metadata", {}), "id": record.get("id"), "text": record.get("text")}
+        for record in records
+    ]
+
+
+def _records_from_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """열 기반 행 → JSON과 같은 {'id', 'text', 'metadata'} 항목 (읽은 열만 포함)"""
+    for row in rows:
+        record = {"id": row.pop("id", None)}
+        if "text" in row:
+            record["text"] = row.pop("text")
+        record["metadata"] = row
+        yield record
+
+
+class TemplateCorpusWriter:
+    """
+    코퍼스 디렉토리 작성기 (SpreadsheetIngestion 묶음마다 행 그룹 하나씩 추가)
+    파일은 임시 이름으로 쓴 뒤 finish()에서 교체하고 manifest.json을 마지막에 씀
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        pa = _arrow()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._schema = _template_schema()
+        self._templates_tmp = self.directory / f"{TEMPLATES_FILE}.tmp"
+        self._writer = pa.parquet.ParquetWriter(self._templates_tmp, self._schema)
+        self.template_count = 0
+
+    def write_templates(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        pa = _arrow()
+        self._writer.write_table(pa.Table.from_pylist(_template_rows(records), schema=self._schema))
+        self.template_count += len(records)
+
+    def finish(self, patterns: List[Dict[str, Any]], success_indicators: Dict[str, Any], metadata: Dict[str, Any]):
+        pa = _arrow()
+        self._writer.close()
+        self._writer = None
+
+        pattern_rows = [
+            {
+                "id": pattern.get("id"),
+                "category": pattern.get("category"),
+                "template_count": pattern.get("metadata", {}).get("template_count"),
+                "metadata": json.dumps(pattern.get("metadata", {}), ensure_ascii=False),
+            }
+            for pattern in patterns
+        ]
+        patterns_tmp = self.directory / f"{PATTERNS_FILE}.tmp"
+        pa.parquet.write_table(pa.Table.from_pylist(pattern_rows, schema=_pattern_schema()), patterns_tmp)
+
+        manifest_tmp = self.directory / f"{MANIFEST_FILE}.tmp"
+        with open(manifest_tmp, "w", encoding="utf-8") as f:
+            json.dump({"metadata": metadata, "success_indicators": success_indicators}, f, ensure_ascii=False, indent=2)
+
+        os.replace(self._templates_tmp, self.directory / TEMPLATES_FILE)
+        os.replace(patterns_tmp, self.directory / PATTERNS_FILE)
+        os.replace(manifest_tmp, self.directory / MANIFEST_FILE)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._templates_tmp.unlink(missing_ok=True)
+
+
+def write_corpus(directory: Union[str, Path], vector_db_data: Dict[str, Any], batch_rows: int = DEFAULT_BATCH_ROWS):
+    """vectordb_data() 형식(templates/patterns/success_indicators/metadata)을 코퍼스 디렉토리로 저장"""
+    writer = TemplateCorpusWriter(directory)
+    try:
+        templates = vector_db_data.get("templates", [])
+        for start in range(0, len(templates), batch_rows):
+            writer.write_templates(templates[start:start + batch_rows])
+        writer.finish(
+            vector_db_data.get("patterns", []),
+            vector_db_data.get("success_indicators", {}),
+            vector_db_data.get("metadata", {})
+        )
+    except BaseException:
+        writer.abort()
+        raise
+
+
+class TemplateCorpus:
+    """
+    코퍼스 디렉토리 읽기
+    columns로 읽을 열을, filters로 행 조건을 지정하면 Parquet 통계로 행 그룹을 건너뜀
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CORPUS_DIR):
+        self.directory = Path(directory)
+
+    @property
+    def templates_path(self) -> Path:
+        return self.directory / TEMPLATES_FILE
+
+    def exists(self) -> bool:
+        return is_corpus_dir(self.directory)
+
+    def scan(self, columns: Optional[Sequence[str]] = None, filters: Optional[Filters] = None):
+        """템플릿 열 일부를 메모리 매핑으로 읽어 pyarrow Table 반환"""
+        pa = _arrow()
+        return pa.parquet.read_table(
+            self.templates_path,
+            columns=list(columns) if columns else None,
+            filters=list(filters) if filters else None,
+            memory_map=True
+        )
+
+    def frame(self, columns: Optional[Sequence[str]] = None, filters: Optional[Filters] = None):
+        """분석 스크립트용 DataFrame (필요한 열/행만)"""
+        return self.scan(columns, filters).to_pandas()
+
+    def iter_template_chunks(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[Filters] = None,
+        batch_rows: int = DEFAULT_BATCH_ROWS
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        템플릿 항목을 배치 단위로 순회 (JSONL iter_template_chunks와 같은 항목 형식)
+
+        Args:
+            columns: 메타데이터 열 (None이면 전체, id는 항상 포함)
+            filters: 행 조건 (DNF 형식)
+            batch_rows: 배치당 행 수
+        """
+        pa = _arrow()
+        if columns:
+            columns = ["id"] + [column for column in columns if column != "id"]
+        dataset = pa.dataset.dataset(self.templates_path, format="parquet")
+        batches = dataset.to_batches(
+            columns=list(columns) if columns else None,
+            filter=pa.parquet.filters_to_expression(list(filters)) if filters else None,
+            batch_size=batch_rows
+        )
+        for batch in batches:
+            if batch.num_rows:
+                yield list(_records_from_rows(batch.to_pylist()))
+
+    def patterns(self, categories: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """분류별 패턴 (categories를 주면 해당 분류만)"""
+        pa = _arrow()
+        filters = [("category", "in", list(categories))] if categories else None
+        table = pa.parquet.read_table(self.directory / PATTERNS_FILE, filters=filters, memory_map=True)
+        return [
+            {
+                "id": row["id"],
+                "category": row["category"],
+                "type": "category_pattern",
+                "metadata": json.loads(row["metadata"] or "{}"),
+            }
+            for row in table.to_pylist()
+        ]
+
+    def manifest(self) -> Dict[str, Any]:
+        path = self.directory / MANIFEST_FILE
+        if not path.exists():
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def success_indicators(self) -> Dict[str, Any]:
+        return self.manifest().get("success_indicators", {})
@@ -0,0 +1,4 @@
+"""
+모니터링 패키지
+시작 시간 프로파일링 및 성능 계측 도구
+"""
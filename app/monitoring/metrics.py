@@ -0,0 +1,402 @@
+"""
+Prometheus 텍스트 노출 형식(exposition format) 메트릭
+외부 수집기나 클라이언트 라이브러리 없이 /metrics 엔드포인트로 스크랩 가능
+"""
+import asyncio
+import logging
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 히스토그램 기본 경계값 (초)
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _escape_label_value(value: str) -> str:
+    """라벨 값 이스케이프 (\\, \", 줄바꿈)"""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """숫자 값 포맷"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    """라벨 셋 포맷"""
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape_label_value(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    """라벨별 자식 값을 보유하는 메트릭 공통 기반"""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """초기화"""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_child(self):
+        """라벨 셋 하나의 자식 값"""
+
+    def labels(self, **labels: Any):
+        """라벨 값에 해당하는 자식 메트릭"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 라벨이 일치하지 않습니다: {sorted(labels)} != {sorted(self.labelnames)}")
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default_child(self):
+        """라벨이 없는 메트릭의 단일 자식"""
+        if self.labelnames:
+            raise ValueError(f"{self.name}은(는) 라벨이 필요합니다: {self.labelnames}")
+        return self.labels()
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        """(라벨 값, 자식) 목록"""
+        with self._lock:
+            return sorted(self._children.items())
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """샘플 줄 목록"""
+
+    def render(self) -> str:
+        """노출 형식 텍스트"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _ValueChild:
+    """단일 값 자식"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = float(value)
+
+    def get(self) -> float:
+        with self._lock:
+            return self.value
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("카운터는 감소할 수 없습니다.")
+        self._default_child().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in self.children()
+        ]
+
+
+class Gauge(_Metric):
+    """증감 가능한 게이지"""
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default_child().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default_child().dec(amount)
+
+    def set(self, value: float):
+        self._default_child().set(value)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in self.children()
+        ]
+
+
+class _HistogramChild:
+    """고정 경계값 누적 히스토그램 (스레드 안전)"""
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            index = len(self.bounds)
+            for i, bound in enumerate(self.bounds):
+                if value <= bound:
+                    index = i
+                    break
+            self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        with self._lock:
+            return list(self.bucket_counts), self.count, self.sum
+
+    def quantile(self, q: float) -> float:
+        """경계값 기준 분위수 추정 (버킷 내 선형 보간)"""
+        bucket_counts, count, _ = self.snapshot()
+        if count == 0:
+            return 0.0
+        target = q * count
+        cumulative = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(bucket_counts):
+            upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+            if cumulative + bucket_count >= target and bucket_count > 0:
+                return lower + (upper - lower) * ((target - cumulative) / bucket_count)
+            cumulative += bucket_count
+            lower = upper
+        return self.bounds[-1]
+
+    def summary(self) -> Dict[str, Any]:
+        """요약 통계"""
+        _, count, total = self.snapshot()
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "avg": round(total / count, 6) if count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6)
+        }
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        """초기화"""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default_child().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in self.children():
+            bucket_counts, count, total = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 레지스트리"""
+
+    def __init__(self):
+        """초기화"""
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"이미 다른 형태로 등록된 메트릭입니다: {metric.name}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """스크랩 직전에 호출되어 게이지 등을 갱신하는 콜백 등록"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """전체 메트릭 노출 형식 텍스트"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning(f"메트릭 수집 콜백 오류: {e}")
+
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# 전역 메트릭 레지스트리
+metrics_registry = MetricsRegistry()
+
+# HTTP
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간", ("method", "route", "status")
+)
+HTTP_REQUESTS_TOTAL = metrics_registry.counter(
+    "http_requests_total", "HTTP 요청 수", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight", "처리 중인 HTTP 요청 수"
+)
+
+# 이벤트 루프 지연 (async 엔드포인트의 동기 LLM/임베딩/검색 호출이 루프를 막은 시간)
+EVENT_LOOP_LAG = metrics_registry.histogram(
+    "event_loop_lag_seconds", "이벤트 루프 지연 (예약한 깨어남 시각보다 늦어진 시간)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+EVENT_LOOP_LAG_INTERVAL = 0.1
+
+# LLM
+LLM_REQUEST_DURATION = metrics_registry.histogram(
+    "llm_request_duration_seconds", "LLM 호출 처리 시간", ("model", "request_type")
+)
+LLM_REQUESTS_TOTAL = metrics_registry.counter(
+    "llm_requests_total", "LLM 호출 수", ("model", "status")
+)
+LLM_TOKENS_TOTAL = metrics_registry.counter(
+    "llm_tokens_total", "LLM 토큰 사용량", ("model", "type")
+)
+LLM_COST_TOTAL = metrics_registry.counter(
+    "llm_cost_usd_total", "LLM 누적 비용 (USD)", ("model",)
+)
+
+RAG_LLM_CALLS = metrics_registry.histogram(
+    "rag_llm_calls_per_request", "RAG 요청당 LLM 호출 수 (재구성/압축/답변)", ("request_type",),
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16)
+)
+
+# 벡터 검색 및 파이프라인 단계
+VECTOR_SEARCH_DURATION = metrics_registry.histogram(
+    "vector_search_duration_seconds", "벡터 스토어 검색 시간", ("store",)
+)
+PIPELINE_STAGE_DURATION = metrics_registry.histogram(
+    "pipeline_stage_duration_seconds", "생성 파이프라인 단계별 처리 시간", ("stage", "bucket")
+)
+
+# 프롬프트 컨텍스트 패킹
+PROMPT_CONTEXT_TOKENS_TOTAL = metrics_registry.counter(
+    "prompt_context_tokens_total", "프롬프트 검색 컨텍스트 토큰 수 (packed: 사용, saved: 예산/중복으로 절감)", ("context", "type")
+)
+
+# 캐시
+CACHE_REQUESTS_TOTAL = metrics_registry.counter(
+    "cache_requests_total", "캐시 조회 수", ("cache", "result")
+)
+CACHE_HIT_RATIO = metrics_registry.gauge(
+    "cache_hit_ratio", "캐시 적중률", ("cache",)
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """캐시 조회 결과 기록"""
+    CACHE_REQUESTS_TOTAL.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_context_tokens(context: str, packed: int, saved: int):
+    """컨텍스트 패킹 토큰 수 기록"""
+    PROMPT_CONTEXT_TOKENS_TOTAL.labels(context=context, type="packed").inc(packed)
+    PROMPT_CONTEXT_TOKENS_TOTAL.labels(context=context, type="saved").inc(saved)
+
+
+def _collect_cache_hit_ratios():
+    """캐시별 적중률 계산"""
+    totals: Dict[str, Dict[str, float]] = {}
+    for (cache, result), child in CACHE_REQUESTS_TOTAL.children():
+        totals.setdefault(cache, {})[result] = child.get()
+
+    for cache, results in totals.items():
+        lookups = results.get("hit", 0.0) + results.get("miss", 0.0)
+        CACHE_HIT_RATIO.labels(cache=cache).set(results.get("hit", 0.0) / lookups if lookups else 0.0)
+
+
+async def monitor_event_loop_lag(interval: float = EVENT_LOOP_LAG_INTERVAL):
+    """
+    이벤트 루프 지연 측정 (lifespan에서 백그라운드 태스크로 실행, 취소될 때까지)
+    interval마다 깨어나도록 예약하고 늦어진 시간을 기록 - 그동안 다른 요청은 처리되지 못함
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - scheduled))
+
+
+metrics_registry.add_collector(_collect_cache_hit_ratios)
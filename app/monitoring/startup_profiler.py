@@ -0,0 +1,224 @@
+"""
+시작 시간 프로파일러
+import 시간 트리(`python -X importtime`)와 lifespan 단계별 소요 시간을 수집하여
+JSON으로 저장하고 정렬된 리포트로 출력
+"""
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import platform
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# `import time:       123 |        456 |   package.module`
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+# 프로세스 단위 lifespan 단계 기록
+_lifespan_stages: List[Dict[str, Any]] = []
+
+
+@contextmanager
+def lifespan_stage(name: str, parent: Optional[str] = None):
+    """lifespan 단계 소요 시간 기록"""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_lifespan_stage(name, time.perf_counter() - start_time, parent=parent)
+
+
+def record_lifespan_stage(name: str, duration: float, parent: Optional[str] = None):
+    """이미 측정된 단계 소요 시간 기록"""
+    _lifespan_stages.append({
+        "name": name,
+        "parent": parent,
+        "duration": round(duration, 6)
+    })
+
+
+def get_lifespan_stages() -> List[Dict[str, Any]]:
+    """기록된 lifespan 단계 조회"""
+    return list(_lifespan_stages)
+
+
+def clear_lifespan_stages():
+    """기록된 lifespan 단계 초기화"""
+    _lifespan_stages.clear()
+
+
+def parse_import_times(stderr: str) -> List[Dict[str, Any]]:
+    """
+    `-X importtime` 출력을 트리로 변환
+
+    importtime은 자식 모듈을 부모보다 먼저 출력하므로,
+    들여쓰기 깊이를 기준으로 대기 중인 자식들을 부모에 붙인다.
+    """
+    pending: Dict[int, List[Dict[str, Any]]] = {}
+    roots: List[Dict[str, Any]] = []
+
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if not match:
+            continue
+
+        self_us, cumulative_us, indent, module = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = {
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "children": pending.pop(depth + 1, [])
+        }
+
+        if depth == 0:
+            roots.append(node)
+        else:
+            pending.setdefault(depth, []).append(node)
+
+    return roots
+
+
+def flatten_import_tree(nodes: List[Dict[str, Any]], depth: int = 0) -> List[Dict[str, Any]]:
+    """import 트리를 (모듈, 깊이, 시간) 목록으로 평탄화"""
+    flat = []
+    for node in nodes:
+        flat.append({
+            "module": node["module"],
+            "depth": depth,
+            "self_ms": node["self_ms"],
+            "cumulative_ms": node["cumulative_ms"]
+        })
+        flat.extend(flatten_import_tree(node["children"], depth + 1))
+    return flat
+
+
+def profile_imports(module: str = "main", cwd: Optional[str] = None) -> Dict[str, Any]:
+    """별도 프로세스에서 모듈 import 시간 측정 (이미 로드된 모듈의 영향 배제)"""
+    env = dict(os.environ)
+    # import 단계만 측정하도록 워밍업 비활성화
+    env["SERVICE_WARMUP"] = "False"
+
+    start_time = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd or os.getcwd(),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall_time = time.perf_counter() - start_time
+
+    tree = parse_import_times(completed.stderr)
+    return {
+        "module": module,
+        "success": completed.returncode == 0,
+        "wall_time": round(wall_time, 6),
+        "total_import_ms": round(sum(node["cumulative_ms"] for node in tree), 3),
+        "tree": tree,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode != 0 and completed.stderr.strip() else None
+    }
+
+
+def profile_lifespan(app) -> Dict[str, Any]:
+    """FastAPI lifespan 시작/종료를 실행하며 단계별 시간 측정"""
+    clear_lifespan_stages()
+
+    async def _run():
+        async with app.router.lifespan_context(app):
+            pass
+
+    start_time = time.perf_counter()
+    asyncio.run(_run())
+    total = time.perf_counter() - start_time
+
+    return {
+        "total": round(total, 6),
+        "stages": get_lifespan_stages()
+    }
+
+
+def run_startup_profile(app, module: str = "main", output_path: Optional[str] = None) -> Dict[str, Any]:
+    """import 트리와 lifespan 단계를 함께 측정하여 JSON으로 저장"""
+    imports = profile_imports(module)
+    lifespan = profile_lifespan(app)
+
+    profile = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "imports": imports,
+        "lifespan": lifespan,
+        "total_startup": round(imports["total_import_ms"] / 1000 + lifespan["total"], 6)
+    }
+
+    if output_path:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+
+    return profile
+
+
+def compare_profiles(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2
+) -> Dict[str, Any]:
+    """기준 프로파일 대비 시작 시간 회귀 여부 판단"""
+    checks = {
+        "total_startup": (current["total_startup"], baseline["total_startup"]),
+        "import_time": (current["imports"]["total_import_ms"] / 1000, baseline["imports"]["total_import_ms"] / 1000),
+        "lifespan_time": (current["lifespan"]["total"], baseline["lifespan"]["total"])
+    }
+
+    results = {}
+    for name, (current_value, baseline_value) in checks.items():
+        limit = baseline_value * (1 + tolerance)
+        results[name] = {
+            "current": round(current_value, 6),
+            "baseline": round(baseline_value, 6),
+            "limit": round(limit, 6),
+            "regressed": current_value > limit
+        }
+
+    return {
+        "tolerance": tolerance,
+        "checks": results,
+        "regressed": any(check["regressed"] for check in results.values())
+    }
+
+
+def render_report(profile: Dict[str, Any], top: int = 25) -> str:
+    """프로파일 결과를 소요 시간 순으로 정렬한 텍스트 리포트"""
+    lines = ["=== 시작 시간 프로파일 ==="]
+    imports = profile["imports"]
+    lifespan = profile["lifespan"]
+
+    lines.append(f"총 시작 시간: {profile['total_startup']:.3f}s")
+    lines.append(f"  - import: {imports['total_import_ms'] / 1000:.3f}s (프로세스 wall time {imports['wall_time']:.3f}s)")
+    lines.append(f"  - lifespan: {lifespan['total']:.3f}s")
+    if not imports["success"]:
+        lines.append(f"  ⚠ import 실패: {imports['error']}")
+
+    flat = flatten_import_tree(imports["tree"])
+
+    lines.append(f"\n[import 누적 시간 상위 {top}개]")
+    for entry in sorted(flat, key=lambda e: e["cumulative_ms"], reverse=True)[:top]:
+        lines.append(f"  {entry['cumulative_ms']:>10.1f} ms  {'  ' * entry['depth']}{entry['module']}")
+
+    lines.append(f"\n[import 자체 시간 상위 {top}개]")
+    for entry in sorted(flat, key=lambda e: e["self_ms"], reverse=True)[:top]:
+        lines.append(f"  {entry['self_ms']:>10.1f} ms  {entry['module']}")
+
+    lines.append("\n[lifespan 단계]")
+    for stage in sorted(lifespan["stages"], key=lambda s: s["duration"], reverse=True):
+        name = f"{stage['parent']} > {stage['name']}" if stage["parent"] else stage["name"]
+        lines.append(f"  {stage['duration'] * 1000:>10.1f} ms  {name}")
+
+    return "\n".join(lines)
@@ -0,0 +1,159 @@
+"""
+요청 단위 단계별 시간 계측 (span API)
+임베딩, 검색, 압축, LLM, 검증, 저장 단계를 버킷별로 분리하여 기록하고
+프로세스 전역 히스토그램(/metrics)으로 집계
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.monitoring.metrics import PIPELINE_STAGE_DURATION, VECTOR_SEARCH_DURATION
+
+# 단계 버킷
+EMBEDDING = "embedding"
+SEARCH = "search"
+COMPRESSION = "compression"
+LLM = "llm"
+VALIDATION = "validation"
+PERSISTENCE = "persistence"
+OTHER = "other"
+
+STAGE_BUCKETS = (EMBEDDING, SEARCH, COMPRESSION, LLM, VALIDATION, PERSISTENCE, OTHER)
+
+@dataclass
+class SpanRecord:
+    """완료된 span 정보"""
+    name: str
+    bucket: str
+    duration: float
+    self_time: float
+    depth: int
+
+
+@dataclass
+class _ActiveSpan:
+    """진행 중인 span (중첩된 자식 span 시간 누적용)"""
+    name: str
+    bucket: str
+    depth: int
+    child_time: float = 0.0
+
+
+class RequestTimings:
+    """
+    요청 하나의 span 기록
+    버킷 합계는 중첩된 자식 span 시간을 제외한 self time 기준이므로
+    버킷 간 중복 집계가 없다
+    """
+
+    def __init__(self):
+        """초기화"""
+        self.started_at = time.perf_counter()
+        self.spans: List[SpanRecord] = []
+        self._stack: List[_ActiveSpan] = []
+
+    def bucket_totals(self) -> Dict[str, float]:
+        """버킷별 소요 시간 합계"""
+        totals: Dict[str, float] = {}
+        for record in self.spans:
+            totals[record.bucket] = totals.get(record.bucket, 0.0) + record.self_time
+        return totals
+
+    def as_dict(self) -> Dict[str, Any]:
+        """응답용 딕셔너리"""
+        return {
+            "total": round(time.perf_counter() - self.started_at, 6),
+            "buckets": {bucket: round(value, 6) for bucket, value in self.bucket_totals().items()},
+            "spans": [
+                {
+                    "name": record.name,
+                    "bucket": record.bucket,
+                    "duration": round(record.duration, 6),
+                    "depth": record.depth
+                }
+                for record in self.spans
+            ]
+        }
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def _observe_stage(name: str, bucket: str, value: float):
+    """프로세스 전역 단계 히스토그램에 기록 (검색 단계는 스토어별로도 기록)"""
+    PIPELINE_STAGE_DURATION.labels(stage=name, bucket=bucket).observe(value)
+    if bucket == SEARCH:
+        VECTOR_SEARCH_DURATION.labels(store=name.split(".")[0]).observe(value)
+
+
+@contextmanager
+def span(name: str, bucket: str = OTHER) -> Iterator[None]:
+    """
+    단계 시간 측정
+
+    Args:
+        name: 단계 이름 (예: "template_store.search")
+        bucket: 단계 버킷 (embedding, search, compression, llm, validation, persistence)
+    """
+    timings = _current_timings.get()
+    active = None
+    if timings is not None:
+        active = _ActiveSpan(name=name, bucket=bucket, depth=len(timings._stack))
+        timings._stack.append(active)
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start_time
+        _observe_stage(name, bucket, duration)
+
+        if timings is not None:
+            timings._stack.pop()
+            if timings._stack:
+                timings._stack[-1].child_time += duration
+            timings.spans.append(SpanRecord(
+                name=name,
+                bucket=bucket,
+                duration=duration,
+                self_time=max(duration - active.child_time, 0.0),
+                depth=active.depth
+            ))
+
+
+@contextmanager
+def collect_timings() -> Iterator[RequestTimings]:
+    """현재 컨텍스트(요청)의 span 수집 시작"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """현재 컨텍스트의 span 기록 조회"""
+    return _current_timings.get()
+
+
+def timings_enabled() -> bool:
+    """응답에 timings 필드를 포함할지 여부 (디버그 모드)"""
+    return os.getenv("APP_DEBUG", "False").lower() == "true"
+
+
+def timings_payload(timings: Optional[RequestTimings]) -> Optional[Dict[str, Any]]:
+    """디버그 모드일 때만 응답용 timings 반환"""
+    if timings is None or not timings_enabled():
+        return None
+    return timings.as_dict()
+
+
+def get_stage_histograms() -> Dict[str, Dict[str, Any]]:
+    """단계별 히스토그램 요약"""
+    return {
+        f"{bucket}:{name}": histogram.summary()
+        for (name, bucket), histogram in PIPELINE_STAGE_DURATION.children()
+    }
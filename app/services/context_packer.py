@@ -0,0 +1,172 @@
+"""
+토큰 예산 기반 컨텍스트 패킹
+검색된 근거(유사 템플릿, 패턴, 정책 청크)를 관련성 점수 순으로 모델별 토큰 예산 안에 채움
+- 이미 담긴 근거와 거의 같은 스니펫은 제외 (문자 3-gram 포함도)
+- 남은 예산보다 긴 스니펫은 문장 경계에서 자름 (첫 문장부터 넘치면 토큰 단위로)
+- 예산 때문에 줄어든 토큰 수는 /metrics의 prompt_context_tokens_total{type="saved"}에 기록
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from app.services.token_counter import TokenCounter, get_token_counter
+from app.services.policy_chunker import SENTENCE_END
+
+# 모델별 검색 컨텍스트 토큰 예산 (CONTEXT_TOKEN_BUDGET으로 일괄 변경)
+MODEL_CONTEXT_BUDGETS = {
+    "gpt-4o-mini": 1500,
+    "gpt-4o": 1200,
+    "gpt-4-turbo": 1200,
+    "gpt-4": 1000,
+    "gpt-3.5-turbo": 1200,
+}
+DEFAULT_CONTEXT_BUDGET = 1500
+
+# 이 비율 이상이 이미 담긴 스니펫에 포함되면 중복으로 간주
+DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+# 잘라서라도 넣을 최소 남은 예산 (이보다 작으면 다음 스니펫으로)
+MIN_TRUNCATED_TOKENS = 40
+TRUNCATION_MARK = " …"
+
+_LINE_OR_SENTENCE = re.compile(rf"\n+|{SENTENCE_END.pattern}")
+
+
+def context_budget(model: Optional[str]) -> int:
+    """모델의 검색 컨텍스트 토큰 예산"""
+    override = os.getenv("CONTEXT_TOKEN_BUDGET")
+    if override:
+        return int(override)
+    for prefix, budget in sorted(MODEL_CONTEXT_BUDGETS.items(), key=lambda item: -len(item[0])):
+        if model and model.startswith(prefix):
+            return budget
+    return DEFAULT_CONTEXT_BUDGET
+
+
+@dataclass
+class ContextSnippet:
+    """프롬프트에 넣을 근거 하나"""
+    text: str
+    score: float
+    group: str = ""
+    payload: Any = None
+    truncated: bool = False
+
+
+@dataclass
+class PackedContext:
+    """패킹 결과 (snippets는 입력 순서 유지)"""
+    snippets: List[ContextSnippet]
+    budget: int
+    tokens_used: int
+    tokens_original: int
+    duplicates: int = 0
+    dropped: int = 0
+    truncated: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_original - self.tokens_used)
+
+    def by_group(self, group: str) -> List[ContextSnippet]:
+        return [snippet for snippet in self.snippets if snippet.group == group]
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    compact = re.sub(r"\s+", " ", text).strip()
+    if len(compact) <= size:
+        return {compact} if compact else set()
+    return {compact[i:i + size] for i in range(len(compact) - size + 1)}
+
+
+def _is_duplicate(shingles: Set[str], kept: Sequence[Set[str]], threshold: float) -> bool:
+    """새 스니펫의 3-gram 중 threshold 이상이 이미 담긴 스니펫 하나에 포함되면 중복"""
+    if not shingles:
+        return True
+    return any(len(shingles & other) / len(shingles) >= threshold for other in kept)
+
+
+def truncate_at_sentence(text: str, max_tokens: int, counter: TokenCounter) -> str:
+    """max_tokens 이내의 마지막 문장/줄 경계까지 자르기 (첫 문장도 넘치면 토큰 단위로 자름)"""
+    if counter.count(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - counter.count(TRUNCATION_MARK)
+    best = ""
+    for match in _LINE_OR_SENTENCE.finditer(text):
+        candidate = text[:match.start() + len(match.group(0).rstrip())].rstrip()
+        if counter.count(candidate) > budget:
+            break
+        best = candidate
+    if not best:
+        # 문장 경계 없이 긴 스니펫 (표, 목록 한 줄 등)
+        best = counter.truncate(text, budget).rstrip()
+    return best + TRUNCATION_MARK if best else ""
+
+
+def pack_context(
+    snippets: Sequence[ContextSnippet],
+    budget: int,
+    model: Optional[str] = None,
+    duplicate_threshold: float = DUPLICATE_THRESHOLD,
+) -> PackedContext:
+    """
+    관련성 점수가 높은 스니펫부터 토큰 예산 안에 채우기
+
+    Args:
+        snippets: 후보 스니펫
+        budget: 토큰 예산
+        model: 토큰 수를 셀 모델 이름
+        duplicate_threshold: 중복 판정 3-gram 포함 비율
+
+    Returns:
+        PackedContext: 채택된 스니펫 (입력 순서) 과 토큰 통계
+    """
+    counter = get_token_counter(model)
+    counts = [counter.count(snippet.text) for snippet in snippets]
+    order = sorted(range(len(snippets)), key=lambda i: -snippets[i].score)
+
+    selected: Dict[int, ContextSnippet] = {}
+    kept_shingles: List[Set[str]] = []
+    used = duplicates = dropped = truncated = 0
+
+    for i in order:
+        snippet = snippets[i]
+        shingles = _shingles(snippet.text)
+        if _is_duplicate(shingles, kept_shingles, duplicate_threshold):
+            duplicates += 1
+            continue
+
+        remaining = budget - used
+        if counts[i] <= remaining:
+            selected[i] = snippet
+            used += counts[i]
+        elif remaining >= MIN_TRUNCATED_TOKENS:
+            text = truncate_at_sentence(snippet.text, remaining, counter)
+            if not text:
+                dropped += 1
+                continue
+            selected[i] = ContextSnippet(text, snippet.score, snippet.group, snippet.payload, truncated=True)
+            used += counter.count(text)
+            truncated += 1
+        else:
+            dropped += 1
+            continue
+        kept_shingles.append(shingles)
+
+    return PackedContext(
+        snippets=[selected[i] for i in sorted(selected)],
+        budget=budget,
+        tokens_used=used,
+        tokens_original=sum(counts),
+        duplicates=duplicates,
+        dropped=dropped,
+        truncated=truncated,
+    )
+
+
+def record_context_packing(context: str, packed: PackedContext):
+    """패킹 토큰 통계를 메트릭에 기록"""
+    from app.monitoring.metrics import record_context_tokens
+
+    record_context_tokens(context, packed.tokens_used, packed.tokens_saved)
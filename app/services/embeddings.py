@@ -0,0 +1,184 @@
+"""
+임베딩 구성
+text-embedding-3 계열의 Matryoshka 축소 임베딩(앞쪽 N차원 + 재정규화)을
+인덱스 생성과 질의 시점에 동일하게 적용
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+import numpy as np
+
+try:
+    from langchain.embeddings.base import Embeddings
+except ImportError:
+    Embeddings = object
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# 컬렉션별 질의 임베딩 LRU 캐시 크기 (0이면 비활성화)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "256"))
+
+# 모델별 전체 차원
+MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+# Matryoshka 축소를 지원하는 모델
+TRUNCATABLE_MODELS = ("text-embedding-3-small", "text-embedding-3-large")
+
+
+def truncate_vectors(vectors: np.ndarray, dimensions: Optional[int]) -> np.ndarray:
+    """앞쪽 dimensions 차원만 남기고 L2 재정규화 (None이면 그대로)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not dimensions or dimensions >= vectors.shape[-1]:
+        return vectors
+
+    truncated = vectors[..., :dimensions]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    return truncated / np.where(norms == 0, 1.0, norms)
+
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    축소 차원 임베딩 래퍼
+    OpenAI API의 dimensions 파라미터와 같은 결과(앞쪽 N차원 + 재정규화)를 클라이언트에서 계산하므로
+    주입된 임베딩(가짜/캐시 백엔드)에도 동일하게 적용 가능
+    """
+
+    def __init__(self, base: Any, dimensions: int):
+        """
+        Args:
+            base: 전체 차원 임베딩 백엔드
+            dimensions: 사용할 차원 수
+        """
+        self.base = base
+        self.dimensions = dimensions
+        self.model = getattr(base, "model", None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return truncate_vectors(self.base.embed_documents(texts), self.dimensions).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return truncate_vectors(self.base.embed_query(text), self.dimensions).tolist()
+
+
+def embedding_dimensions_from_env(prefix: str) -> Optional[int]:
+    """
+    {PREFIX}_EMBEDDING_DIMENSIONS → EMBEDDING_DIMENSIONS 순으로 축소 차원 조회
+    미설정/0/full이면 None (모델 전체 차원 사용)
+    """
+    value = os.getenv(f"{prefix}_EMBEDDING_DIMENSIONS") or os.getenv("EMBEDDING_DIMENSIONS")
+    if not value or value.strip().lower() in ("0", "full"):
+        return None
+
+    try:
+        dimensions = int(value)
+    except ValueError:
+        print(f"WARNING: 잘못된 임베딩 차원 '{value}' ({prefix}) - 전체 차원 사용")
+        return None
+
+    full = MODEL_DIMENSIONS[EMBEDDING_MODEL]
+    if dimensions <= 0 or dimensions >= full:
+        return None
+    return dimensions
+
+
+def create_embeddings(dimensions: Optional[int] = None, embeddings: Optional[Any] = None) -> Any:
+    """
+    서비스용 임베딩 생성
+
+    Args:
+        dimensions: 축소 차원 (None이면 전체 차원)
+        embeddings: 주입된 전체 차원 임베딩 (없으면 OpenAI 임베딩 생성)
+    """
+    if embeddings is None:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            model=EMBEDDING_MODEL,
+        )
+
+    if dimensions is None:
+        return embeddings
+
+    model = getattr(embeddings, "model", None)
+    if model and model not in TRUNCATABLE_MODELS:
+        print(f"WARNING: {model}은 차원 축소를 지원하지 않아 전체 차원을 사용합니다")
+        return embeddings
+    return TruncatedEmbeddings(embeddings, dimensions)
+
+
+def expected_dimensions(embeddings: Any) -> Optional[int]:
+    """임베딩이 생성할 벡터 차원 (알 수 없으면 None)"""
+    dimensions = getattr(embeddings, "dimensions", None)
+    if dimensions:
+        return dimensions
+    return MODEL_DIMENSIONS.get(getattr(embeddings, "model", None))
+
+
+def embedding_meta(embeddings: Any) -> dict:
+    """인덱스 메타데이터에 기록할 임베딩 정보"""
+    return {
+        "embedding_model": getattr(embeddings, "model", None),
+        "embedding_dimensions": expected_dimensions(embeddings),
+    }
+
+
+class QueryEmbeddingCache:
+    """
+    질의 임베딩 LRU 캐시
+    같은 질의 텍스트의 반복 임베딩 호출을 없애고, 미스만 모아 한 번의 배치 호출로 임베딩
+    """
+
+    def __init__(self, name: str, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        """
+        Args:
+            name: 캐시 이름 (/metrics의 cache 라벨)
+            max_size: 최대 항목 수
+        """
+        self.name = name
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, embeddings: Any, texts: List[str]) -> np.ndarray:
+        """텍스트 목록 임베딩 (캐시 미스만 embed_documents 한 번으로 계산)"""
+        from app.monitoring.metrics import record_cache_lookup
+
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                cached = self._entries.get(text) if self.max_size > 0 else None
+                if cached is not None:
+                    self._entries.move_to_end(text)
+                    vectors[i] = cached
+                else:
+                    missing.setdefault(text, []).append(i)
+                if self.max_size > 0:
+                    record_cache_lookup(self.name, hit=cached is not None)
+
+        if missing:
+            computed = np.asarray(embeddings.embed_documents(list(missing.keys())), dtype=np.float32)
+            with self._lock:
+                for (text, positions), vector in zip(missing.items(), computed):
+                    for i in positions:
+                        vectors[i] = vector
+                    if self.max_size > 0:
+                        self._entries[text] = vector
+                        self._entries.move_to_end(text)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,394 @@
+"""
+FAISS 인덱스 구성
+스토어별로 flat / HNSW / IVF-PQ 인덱스를 선택하고 (auto는 코퍼스 크기로 결정)
+학습, nprobe/efSearch 설정, 양자화 저장(sq8/pq)과 원본 정밀도 재정렬, 인덱스 저장/로드를 담당
+"""
+import os
+import json
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+INDEX_TYPES = ("auto", "flat", "hnsw", "ivfpq")
+QUANTIZATIONS = ("none", "sq8", "pq")
+INDEX_META_FILE = "index_meta.json"
+# 양자화 인덱스 재정렬용 float32 원본 벡터 (memmap으로 열어 상주 메모리에 올리지 않음)
+VECTORS_FILE = "vectors.npy"
+
+# auto 선택 기준 (벡터 수)
+AUTO_HNSW_MIN_VECTORS = 20_000
+AUTO_IVFPQ_MIN_VECTORS = 1_000_000
+
+# IVF-PQ 학습 샘플 수 상한
+MAX_TRAINING_VECTORS = 100_000
+
+
+@dataclass
+class IndexConfig:
+    """FAISS 인덱스 설정"""
+    index_type: str = "auto"
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    ef_search: int = 64
+    nlist: Optional[int] = None
+    nprobe: int = 16
+    pq_m: Optional[int] = None
+    pq_bits: int = 8
+    quantization: str = "none"
+    rerank_factor: int = 4
+
+    def resolve(self, vector_count: int) -> str:
+        """auto일 때 코퍼스 크기로 인덱스 유형 결정"""
+        if self.index_type != "auto":
+            return self.index_type
+        if vector_count >= AUTO_IVFPQ_MIN_VECTORS:
+            return "ivfpq"
+        if vector_count >= AUTO_HNSW_MIN_VECTORS:
+            return "hnsw"
+        return "flat"
+
+
+def _env(prefix: str, name: str, default: Optional[str] = None) -> Optional[str]:
+    """스토어별 환경 변수 우선, 없으면 공통 VECTOR_INDEX_* 사용"""
+    return os.getenv(f"{prefix}_INDEX_{name}", os.getenv(f"VECTOR_INDEX_{name}", default))
+
+
+def index_config_from_env(prefix: str) -> IndexConfig:
+    """
+    환경 변수에서 인덱스 설정 로드
+
+    Args:
+        prefix: 스토어 접두어 (예: "POLICY" → POLICY_INDEX_TYPE, POLICY_INDEX_NPROBE)
+    """
+    index_type = (_env(prefix, "TYPE", "auto") or "auto").lower()
+    if index_type not in INDEX_TYPES:
+        print(f"WARNING: 알 수 없는 인덱스 유형 '{index_type}' ({prefix}) - auto 사용")
+        index_type = "auto"
+
+    quantization = (_env(prefix, "QUANTIZATION", "none") or "none").lower()
+    if quantization not in QUANTIZATIONS:
+        print(f"WARNING: 알 수 없는 양자화 방식 '{quantization}' ({prefix}) - none 사용")
+        quantization = "none"
+
+    nlist = _env(prefix, "NLIST")
+    pq_m = _env(prefix, "PQ_M")
+    return IndexConfig(
+        index_type=index_type,
+        hnsw_m=int(_env(prefix, "HNSW_M", "32")),
+        ef_construction=int(_env(prefix, "EF_CONSTRUCTION", "200")),
+        ef_search=int(_env(prefix, "EF_SEARCH", "64")),
+        nlist=int(nlist) if nlist else None,
+        nprobe=int(_env(prefix, "NPROBE", "16")),
+        pq_m=int(pq_m) if pq_m else None,
+        pq_bits=int(_env(prefix, "PQ_BITS", "8")),
+        quantization=quantization,
+        rerank_factor=int(_env(prefix, "RERANK_FACTOR", "4"))
+    )
+
+
+def _default_nlist(vector_count: int) -> int:
+    """IVF 리스트 수 (4√n, 리스트당 학습 벡터 39개 이상 확보)"""
+    return max(1, min(int(4 * np.sqrt(vector_count)), vector_count // 39))
+
+
+def _default_pq_m(dimension: int) -> int:
+    """PQ 서브 양자화기 수 (차원을 나누어 떨어지는 값 중 서브벡터가 16차원 이상인 최댓값)"""
+    for m in (96, 64, 48, 32, 24, 16, 8, 4, 2, 1):
+        if dimension % m == 0 and dimension // m >= 16:
+            return m
+    return 1
+
+
+def _training_sample(vectors: np.ndarray) -> np.ndarray:
+    """학습용 샘플 (상한 초과 시 고정 시드로 무작위 추출)"""
+    if len(vectors) <= MAX_TRAINING_VECTORS:
+        return vectors
+    sample = np.random.default_rng(0).choice(len(vectors), MAX_TRAINING_VECTORS, replace=False)
+    return vectors[sample]
+
+
+def build_faiss_index(vectors: np.ndarray, config: IndexConfig):
+    """
+    벡터로 FAISS 인덱스 생성 (학습이 필요한 인덱스는 학습 후 추가)
+    기존 LangChain FAISS와 같은 L2 거리를 사용하므로 relevance 점수 계산 방식은 동일
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    vector_count, dimension = vectors.shape
+    index_type = config.resolve(vector_count)
+    quantization = config.quantization
+    pq_m = config.pq_m or _default_pq_m(dimension)
+
+    # PQ 코드북 학습에는 2^bits개 이상의 벡터가 필요
+    if index_type == "ivfpq":
+        nlist = config.nlist or _default_nlist(vector_count)
+        if vector_count < max(nlist, 2 ** config.pq_bits):
+            print(f"WARNING: 벡터 수({vector_count})가 IVF-PQ 학습에 부족하여 flat 인덱스를 사용합니다")
+            index_type = "flat"
+    if quantization == "pq" and vector_count < 2 ** config.pq_bits:
+        print(f"WARNING: 벡터 수({vector_count})가 PQ 학습에 부족하여 sq8 양자화를 사용합니다")
+        quantization = "sq8"
+
+    if index_type == "flat":
+        if quantization == "sq8":
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit)
+        elif quantization == "pq":
+            index = faiss.IndexPQ(dimension, pq_m, config.pq_bits)
+        else:
+            index = faiss.IndexFlatL2(dimension)
+    elif index_type == "hnsw":
+        if quantization == "sq8":
+            index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, config.hnsw_m)
+        elif quantization == "pq":
+            index = faiss.IndexHNSWPQ(dimension, pq_m, config.hnsw_m)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, config.hnsw_m)
+        index.hnsw.efConstruction = config.ef_construction
+    elif index_type == "ivfpq":
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m, config.pq_bits)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 유형입니다: {index_type}")
+
+    if not index.is_trained:
+        index.train(_training_sample(vectors))
+    index.add(vectors)
+    apply_search_params(index, config)
+    return index
+
+
+def apply_search_params(index, config: IndexConfig):
+    """검색 파라미터 적용 (nprobe/efSearch는 저장 파일에 유지되지 않으므로 로드 후에도 호출)"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(config.nprobe, ivf.nlist)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = config.ef_search
+
+
+def index_type_of(index) -> str:
+    """FAISS 인덱스 객체의 유형 이름"""
+    if hasattr(index, "hnsw"):
+        return "hnsw"
+    if faiss.try_extract_index_ivf(index) is not None:
+        return "ivfpq"
+    return "flat"
+
+
+def quantization_of(index) -> str:
+    """인덱스의 벡터 저장 방식 (none / sq8 / pq)"""
+    if faiss.try_extract_index_ivf(index) is not None:
+        return "pq"
+    storage = faiss.downcast_index(index.storage) if hasattr(index, "hnsw") else index
+    if isinstance(storage, faiss.IndexScalarQuantizer):
+        return "sq8"
+    if isinstance(storage, faiss.IndexPQ):
+        return "pq"
+    return "none"
+
+
+class FullPrecisionReranker:
+    """
+    양자화 인덱스 후보를 float32 원본 벡터로 재정렬
+    원본은 디스크의 memmap에서 후보 행만 읽으므로 워커 상주 메모리에 포함되지 않음
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        """초기화"""
+        self.vectors = vectors
+
+    @classmethod
+    def open(cls, directory: str) -> Optional["FullPrecisionReranker"]:
+        """저장된 원본 벡터 파일을 memmap으로 열기 (없으면 None)"""
+        path = Path(directory) / VECTORS_FILE
+        if not path.exists():
+            return None
+        return cls(np.load(path, mmap_mode="r"))
+
+    def rerank(self, query: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """후보 id를 정확한 L2 제곱 거리로 재정렬하여 상위 k개 반환"""
+        ids = np.unique(ids[ids >= 0])
+        if len(ids) == 0:
+            return ids, np.empty(0, dtype=np.float32)
+
+        candidates = np.asarray(self.vectors[ids], dtype=np.float32)
+        distances = ((candidates - query) ** 2).sum(axis=1)
+        order = np.argsort(distances)[:k]
+        return ids[order], distances[order]
+
+
+def _uses_rerank(store, config: IndexConfig) -> bool:
+    return config.rerank_factor > 1 and quantization_of(store.index) != "none"
+
+
+def _attach_reranker(store, directory: str, config: IndexConfig):
+    store.reranker = FullPrecisionReranker.open(directory) if _uses_rerank(store, config) else None
+    store.rerank_factor = config.rerank_factor
+
+
+def create_faiss_store(documents: List[Any], embeddings: Any, config: IndexConfig, vectors: Optional[np.ndarray] = None):
+    """
+    문서로 LangChain FAISS 스토어 생성
+    FAISS.from_documents와 같지만 설정된 인덱스 유형을 사용 (vectors가 주어지면 임베딩 생략)
+    """
+    if vectors is None:
+        vectors = embeddings.embed_documents([doc.page_content for doc in documents])
+    vectors = np.asarray(vectors, dtype=np.float32)
+    index = build_faiss_index(vectors, config)
+
+    ids = [str(i) for i in range(len(documents))]
+    store = FAISS(
+        embeddings,
+        index,
+        InMemoryDocstore(dict(zip(ids, documents))),
+        dict(enumerate(ids))
+    )
+    # 저장 전까지 재정렬용 원본 벡터를 보관 (save_faiss_store에서 파일로 내림)
+    store.full_vectors = vectors if _uses_rerank(store, config) else None
+    store.reranker = FullPrecisionReranker(vectors) if store.full_vectors is not None else None
+    store.rerank_factor = config.rerank_factor
+    return store
+
+
+def add_documents_to_store(store, documents: List[Any], embeddings: Any, vectors: Optional[np.ndarray] = None):
+    """기존 스토어에 문서 추가 (재정렬용 원본 벡터도 함께 확장)"""
+    texts = [doc.page_content for doc in documents]
+    if vectors is None:
+        vectors = embeddings.embed_documents(texts)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    store.add_embeddings(
+        list(zip(texts, vectors.tolist())),
+        metadatas=[doc.metadata for doc in documents]
+    )
+
+    reranker = getattr(store, "reranker", None)
+    if reranker is not None:
+        store.full_vectors = np.vstack([np.asarray(reranker.vectors, dtype=np.float32), vectors])
+        store.reranker = FullPrecisionReranker(store.full_vectors)
+
+
+def save_faiss_store(store, directory: str, config: IndexConfig, extra: Optional[Dict[str, Any]] = None):
+    """스토어 저장 (양자화 인덱스는 원본 벡터를 파일로 내리고 memmap으로 다시 연결)"""
+    store.save_local(directory)
+
+    full_vectors = getattr(store, "full_vectors", None)
+    if full_vectors is not None:
+        np.save(Path(directory) / VECTORS_FILE, full_vectors)
+        store.full_vectors = None
+        _attach_reranker(store, directory, config)
+
+    save_index_meta(directory, store, config, extra)
+
+
+def load_faiss_store(directory: str, embeddings: Any, config: IndexConfig, dimensions: Optional[int] = None):
+    """
+    저장된 스토어 로드 후 검색 파라미터와 재정렬기 연결
+    dimensions가 주어지면 인덱스 차원과 비교하여 다르면 ValueError (재임베딩 필요)
+    """
+    store = FAISS.load_local(
+        directory,
+        embeddings,
+        allow_dangerous_deserialization=True,
+    )
+    if dimensions is not None and store.index.d != dimensions:
+        raise ValueError(
+            f"인덱스 차원({store.index.d})이 임베딩 차원({dimensions})과 다릅니다: {directory} "
+            f"- scripts/re_embed_with_new_model.py --dimensions {dimensions} 로 재임베딩하세요"
+        )
+    apply_search_params(store.index, config)
+    _attach_reranker(store, directory, config)
+    return store
+
+
+def search_many_by_vectors(store, embeddings: Sequence[Sequence[float]], k: int) -> List[List[Tuple[Any, float]]]:
+    """
+    여러 질의 벡터를 한 번의 행렬 검색으로 처리하여 질의별 (문서, L2 거리) 목록 반환
+    재정렬은 질의별로 후보 행만 읽어 수행
+    """
+    queries = np.asarray(embeddings, dtype=np.float32)
+    if len(queries) == 0 or store.index.ntotal == 0:
+        return [[] for _ in range(len(queries))]
+
+    reranker = getattr(store, "reranker", None)
+    fetch_k = k * getattr(store, "rerank_factor", 1) if reranker is not None else k
+    distances, candidate_ids = store.index.search(queries, fetch_k)
+
+    results = []
+    for query, row_distances, row_ids in zip(queries, distances, candidate_ids):
+        if reranker is not None:
+            row_ids, row_distances = reranker.rerank(query, row_ids, k)
+        results.append([
+            (store.docstore.search(store.index_to_docstore_id[int(i)]), float(distance))
+            for i, distance in zip(row_ids, row_distances)
+            if i >= 0
+        ])
+    return results
+
+
+def save_index_meta(directory: str, store, config: IndexConfig, extra: Optional[Dict[str, Any]] = None):
+    """인덱스 옆에 메타데이터 저장 (유형, 파라미터, 벡터 수, 차원)"""
+    meta = {
+        "index_type": index_type_of(store.index),
+        "quantization": quantization_of(store.index),
+        "reranked": getattr(store, "reranker", None) is not None,
+        "config": asdict(config),
+        "ntotal": store.index.ntotal,
+        "dimension": store.index.d,
+        "built_at": datetime.now().isoformat(),
+        **(extra or {})
+    }
+    with open(Path(directory) / INDEX_META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def load_index_meta(directory: str) -> Dict[str, Any]:
+    """저장된 인덱스 메타데이터 (없으면 빈 딕셔너리)"""
+    path = Path(directory) / INDEX_META_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def describe_index(store) -> Dict[str, Any]:
+    """상태 조회용 인덱스 정보"""
+    if store is None or not hasattr(store, "index"):
+        return {}
+    index = store.index
+    info = {
+        "index_type": index_type_of(index),
+        "quantization": quantization_of(index),
+        "reranked": getattr(store, "reranker", None) is not None,
+        "ntotal": index.ntotal,
+        "dimension": index.d,
+        "code_size_bytes": index_code_size(index)
+    }
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        info.update({"nlist": ivf.nlist, "nprobe": ivf.nprobe})
+    if hasattr(index, "hnsw"):
+        info["ef_search"] = index.hnsw.efSearch
+    return info
+
+
+def index_code_size(index) -> int:
+    """벡터 저장 크기 추정(바이트) - 워커당 상주 메모리 근사치 (HNSW는 0층 그래프 링크 포함)"""
+    if hasattr(index, "hnsw"):
+        storage = faiss.downcast_index(index.storage)
+        links = index.ntotal * index.hnsw.nb_neighbors(0) * 4
+        return int(storage.ntotal * storage.code_size + links)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        # 역색인 리스트의 벡터 id(int64) 포함
+        return int(ivf.ntotal * (ivf.code_size + 8))
+    return int(index.ntotal * index.code_size)
@@ -0,0 +1,28 @@
+"""
+후속 질문 판별 (RAG 대화의 검색용 질문 재구성 여부)
+이전 대화를 가리키는 표현이 있는 질문만 후속 질문으로 보고, 길이로는 판단하지 않음
+(한국어는 "변수 형식은?", "광고 문구 기준"처럼 짧아도 독립적인 질문이 많음)
+LangChain 없이 import할 수 있도록 규칙만 둠
+"""
+import re
+from typing import Any, Sequence
+
+CONDENSE_OFF = "off"
+
+# 이전 대화를 가리키는 표현 (문두 접속사, 지시어, 앞 내용 언급)
+FOLLOW_UP_PATTERN = re.compile(
+    r"^(그럼|그러면|그리고|또|근데|그런데|그건|그거|이건|이거|저건)|"
+    r"그거|그것|이것|저것|위의|앞의|방금|아까|해당\s*(템플릿|내용|문구|정책)|"
+    r"\b(it|that|this|those|them)\b",
+    re.IGNORECASE
+)
+
+
+def is_follow_up(question: str) -> bool:
+    """이전 대화 맥락이 있어야 뜻이 통하는 질문인지"""
+    return bool(FOLLOW_UP_PATTERN.search(question.strip()))
+
+
+def needs_standalone_question(question: str, chat_history: Sequence[Any], mode: str) -> bool:
+    """검색 전에 질문을 재구성해야 하는지 (첫 턴/재구성 off/독립 질문이면 False)"""
+    return bool(chat_history) and mode != CONDENSE_OFF and is_follow_up(question)
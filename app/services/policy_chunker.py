@@ -0,0 +1,317 @@
+"""
+정책 마크다운 청킹
+마크다운 제목 구조와 한국어 문장 경계("다.", "요." 등)를 따라 중첩 없이 분할하고
+제목 경로(문서 > 절 > 소절)를 메타데이터와 청크 머리말로 붙여 청크 하나만으로 맥락이 통하도록 함
+
+청크에는 원문 내 문자 위치(char_start/char_end)를 기록하여
+검색 시점에 같은 원문 구간을 가리키는 중복 결과를 제거 (dedupe_chunks)
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from langchain.docstore.document import Document
+except ImportError:
+    class Document:
+        def __init__(self, page_content: str, metadata: Dict[str, Any] = None):
+            self.page_content = page_content
+            self.metadata = metadata or {}
+
+# `#{변수}`와 구분하기 위해 '#' 뒤 공백 필수
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$", re.MULTILINE)
+# 코드 블록 울타리 (``` 또는 ~~~, 들여쓰기 3칸까지) - 안쪽의 '#' 줄은 제목이 아님
+FENCE_PATTERN = re.compile(r"^[ ]{0,3}(`{3,}|~{3,})", re.MULTILINE)
+BLOCK_SEPARATOR = re.compile(r"\n[ \t]*\n+")
+# 한국어 종결어미/영문·숫자 뒤 문장부호 + 공백 (목록 번호 "1. "은 줄 단위로 먼저 나뉘므로 영향 없음)
+SENTENCE_END = re.compile(r"(?<=[가-힣a-zA-Z0-9)\]][.!?])[\"'”’)\]]*\s+")
+
+DEFAULT_CHUNK_SIZE = 1000
+# 이 수준 이하(#, ##) 제목은 항상 새 청크로 시작
+DEFAULT_BOUNDARY_LEVEL = 2
+HEADING_PATH_SEPARATOR = " > "
+
+
+@dataclass
+class _Section:
+    """제목 하나가 다스리는 원문 구간 (다음 제목 직전까지)"""
+    level: int
+    path: List[str]
+    start: int
+    end: int
+
+
+@dataclass
+class _Piece:
+    """청크 후보 구간"""
+    start: int
+    end: int
+    path: List[str]
+    starts_with_heading: bool
+    paths: List[List[str]] = field(default_factory=list)
+
+
+def _fenced_ranges(content: str) -> List[Tuple[int, int]]:
+    """코드 블록 구간 (닫는 울타리는 여는 울타리와 같은 문자로 같거나 더 길게, 닫히지 않으면 문서 끝까지)"""
+    ranges = []
+    opening = None
+    for match in FENCE_PATTERN.finditer(content):
+        fence = match.group(1)
+        if opening is None:
+            opening = match
+        elif fence[0] == opening.group(1)[0] and len(fence) >= len(opening.group(1)):
+            ranges.append((opening.start(), match.end()))
+            opening = None
+    if opening is not None:
+        ranges.append((opening.start(), len(content)))
+    return ranges
+
+
+def _headings(content: str) -> List[re.Match]:
+    """코드 블록 밖의 제목 줄"""
+    fences = _fenced_ranges(content)
+    return [
+        match for match in HEADING_PATTERN.finditer(content)
+        if not any(start <= match.start() < end for start, end in fences)
+    ]
+
+
+def _sections(content: str) -> List[_Section]:
+    """제목 기준 구간 목록 (첫 제목 이전 머리말은 level 0)"""
+    headings = _headings(content)
+    sections = []
+    if not headings or headings[0].start() > 0:
+        sections.append(_Section(0, [], 0, headings[0].start() if headings else len(content)))
+
+    stack: List[Tuple[int, str]] = []
+    for index, match in enumerate(headings):
+        level = len(match.group(1))
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, match.group(2).strip()))
+        end = headings[index + 1].start() if index + 1 < len(headings) else len(content)
+        sections.append(_Section(level, [title for _, title in stack], match.start(), end))
+    return sections
+
+
+def _trim(content: str, start: int, end: int) -> Tuple[int, int]:
+    """앞뒤 공백 제외 구간"""
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _units(content: str, start: int, end: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    chunk_size를 넘지 않는 최소 분할 단위 (문단 → 줄 → 문장 → 고정 길이 순으로 세분화)
+    """
+    def split(pattern, lo: int, hi: int) -> List[Tuple[int, int]]:
+        spans, cursor = [], lo
+        for match in pattern.finditer(content, lo, hi):
+            spans.append((cursor, match.start()))
+            cursor = match.end()
+        spans.append((cursor, hi))
+        return [span for span in (_trim(content, *s) for s in spans) if span[0] < span[1]]
+
+    units = []
+    for block in split(BLOCK_SEPARATOR, start, end):
+        if block[1] - block[0] <= chunk_size:
+            units.append(block)
+            continue
+        for line in split(re.compile(r"\n"), *block):
+            if line[1] - line[0] <= chunk_size:
+                units.append(line)
+                continue
+            for sentence in split(SENTENCE_END, *line):
+                for cut in range(sentence[0], sentence[1], chunk_size):
+                    units.append((cut, min(cut + chunk_size, sentence[1])))
+    return units
+
+
+def _pack(units: List[Tuple[int, int]], chunk_size: int) -> List[Tuple[int, int]]:
+    """연속된 단위를 chunk_size 이내로 묶은 구간 (묶음은 원문에서 연속된 구간)"""
+    packed: List[Tuple[int, int]] = []
+    for start, end in units:
+        if packed and end - packed[-1][0] <= chunk_size:
+            packed[-1] = (packed[-1][0], end)
+        else:
+            packed.append((start, end))
+    return packed
+
+
+def _common_path(paths: Sequence[List[str]]) -> List[str]:
+    common = list(paths[0])
+    for path in paths[1:]:
+        length = 0
+        while length < min(len(common), len(path)) and common[length] == path[length]:
+            length += 1
+        common = common[:length]
+    return common
+
+
+def _pieces(content: str, chunk_size: int, boundary_level: int) -> List[_Piece]:
+    """
+    구간 → 청크 후보
+    작은 하위 절은 chunk_size 안에서 앞 절과 합치고, 큰 절은 문단/문장 경계로 나눔
+    본문 없는 제목(문서 제목 등)은 단독 청크로 두지 않고 뒤따르는 하위 절 앞에 붙임
+    """
+    pieces: List[_Piece] = []
+    for section in _sections(content):
+        start, end = _trim(content, section.start, section.end)
+        if start >= end:
+            continue
+
+        previous = pieces[-1] if pieces else None
+        heading_only = (
+            previous is not None
+            and previous.starts_with_heading
+            and "\n" not in content[previous.start:previous.end]
+            and section.path[:len(previous.path)] == previous.path
+        )
+        if previous is not None and (section.level > boundary_level or heading_only) \
+                and end - previous.start <= chunk_size:
+            previous.end = end
+            previous.paths.append(section.path)
+            previous.path = _common_path(previous.paths)
+            continue
+
+        leading_paths: List[List[str]] = []
+        if heading_only:
+            pieces.pop()
+            start, leading_paths = previous.start, previous.paths
+
+        if end - start <= chunk_size:
+            spans = [(start, end)]
+        else:
+            spans = _pack(_units(content, start, end, chunk_size), chunk_size)
+            spans[0] = (start, spans[0][1])
+
+        for index, (piece_start, piece_end) in enumerate(spans):
+            first = index == 0
+            paths = leading_paths + [section.path] if first else [section.path]
+            pieces.append(_Piece(
+                piece_start, piece_end, _common_path(paths),
+                first and (section.level > 0 or bool(leading_paths)), paths
+            ))
+    return pieces
+
+
+def _breadcrumb(piece: _Piece) -> str:
+    """청크 머리말 - 본문이 제목으로 시작하면 그 제목을 뺀 상위 경로만"""
+    path = piece.paths[0][:-1] if piece.starts_with_heading else piece.path
+    return HEADING_PATH_SEPARATOR.join(path)
+
+
+def split_policy_markdown(
+    content: str,
+    source: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    boundary_level: int = DEFAULT_BOUNDARY_LEVEL
+) -> List[Document]:
+    """
+    정책 마크다운을 구조 보존 청크로 분할
+
+    Args:
+        content: 마크다운 원문
+        source: 문서 이름 (메타데이터 source)
+        chunk_size: 청크 최대 길이 (문자 수, 제목 경로 머리말 제외)
+        boundary_level: 이 수준 이하 제목은 항상 새 청크로 시작
+
+    Returns:
+        List[Document]: 청크 (heading_path, section, char_start, char_end 메타데이터 포함)
+    """
+    pieces = _pieces(content, chunk_size, boundary_level)
+
+    documents = []
+    for i, piece in enumerate(pieces):
+        breadcrumb = _breadcrumb(piece)
+        text = content[piece.start:piece.end]
+        documents.append(Document(
+            page_content=f"[{breadcrumb}]\n{text}" if breadcrumb else text,
+            metadata={
+                "source": source,
+                "chunk_id": i,
+                "total_chunks": len(pieces),
+                "document_type": "policy",
+                "language": "korean",
+                "heading_path": HEADING_PATH_SEPARATOR.join(piece.path),
+                "section": piece.path[-1] if piece.path else "",
+                "char_start": piece.start,
+                "char_end": piece.end,
+            }
+        ))
+    return documents
+
+
+def _char_range(doc: Any) -> Optional[Tuple[int, int]]:
+    metadata = getattr(doc, "metadata", None) or {}
+    start, end = metadata.get("char_start"), metadata.get("char_end")
+    if start is None or end is None:
+        return None
+    return int(start), int(end)
+
+
+def dedupe_chunks(results: List[Tuple[Any, float]]) -> List[Tuple[Any, float]]:
+    """
+    검색 결과 중복 제거 (순서 유지)
+    같은 문서에서 이미 채택된 청크에 완전히 포함되는 청크와 본문이 같은 청크는 제외하고,
+    반대로 이미 채택된 청크를 완전히 포함하는 청크는 그 자리(순위와 점수 유지)를 더 넓은 청크로 교체
+    일부만 겹치는 청크(중첩 분할)는 원문 구간 그대로인 경우 겹친 부분을 잘라냄
+    """
+    kept: List[Optional[Tuple[Any, float]]] = []
+    # 문서별 채택 구간 (start, end, kept 위치)
+    ranges: Dict[Any, List[Tuple[int, int, int]]] = {}
+    seen_texts = set()
+
+    for doc, score in results:
+        if doc.page_content in seen_texts:
+            continue
+
+        char_range = _char_range(doc)
+        if char_range is None:
+            seen_texts.add(doc.page_content)
+            kept.append((doc, score))
+            continue
+
+        source = doc.metadata.get("source")
+        start, end = char_range
+        for kept_start, kept_end, _ in ranges.get(source, []):
+            if kept_start <= start and end <= kept_end:
+                start = end
+                break
+            if start <= kept_start and kept_end <= end:
+                continue
+            if kept_start <= start < kept_end:
+                start = kept_end
+            elif kept_start < end <= kept_end:
+                end = kept_start
+        if start >= end:
+            continue
+
+        if (start, end) != char_range:
+            raw = len(doc.page_content) == char_range[1] - char_range[0]
+            if not raw:
+                # 머리말이 붙은 청크는 잘라낼 위치를 알 수 없으므로 그대로 사용
+                start, end = char_range
+            else:
+                text = doc.page_content[start - char_range[0]:end - char_range[0]]
+                doc = Document(page_content=text, metadata={**doc.metadata, "char_start": start, "char_end": end})
+
+        absorbed = [
+            index for kept_start, kept_end, index in ranges.get(source, [])
+            if start <= kept_start and kept_end <= end
+        ]
+        if absorbed:
+            position = absorbed[0]
+            kept[position] = (doc, kept[position][1])
+            for index in absorbed[1:]:
+                kept[index] = None
+            ranges[source] = [entry for entry in ranges[source] if entry[2] not in absorbed]
+        else:
+            position = len(kept)
+            kept.append((doc, score))
+        ranges.setdefault(source, []).append((start, end, position))
+        seen_texts.add(doc.page_content)
+    return [item for item in kept if item is not None]
@@ -3,6 +3,8 @@ RAG (Retrieval-Augmented Generation) 서비스
 LangChain 기반으로 정책 문서 검색과 AI 응답 생성을 결합
 """
 import os
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
@@ -10,19 +12,44 @@ from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import HumanMessage, SystemMessage, AIMessage
 from langchain.memory import ConversationBufferWindowMemory
-from langchain.chains import ConversationalRetrievalChain
+from langchain.chains import LLMChain
+from langchain.chains.question_answering import load_qa_chain
+from langchain.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
+from langchain.callbacks.base import BaseCallbackHandler
 from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
+from langchain.retrievers.document_compressors import LLMChainExtractor, DocumentCompressorPipeline
+from langchain.retrievers.document_compressors.base import BaseDocumentCompressor
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun, Callbacks
+from langchain.schema import BaseRetriever, Document
 
-try:
-    from app.services.vector_store_simple import simple_vector_store_service as vector_store_service
-except ImportError:
-    from app.services.vector_store import vector_store_service
-from app.services.token_service import token_service, TokenMetrics
+from app.services.registry import service_registry, lazy_module_getattr
+from app.services.token_service import TokenMetrics
+from app.services.follow_up import needs_standalone_question
+from app.services.context_packer import ContextSnippet, pack_context, context_budget, record_context_packing
+from app.monitoring.timing import span, COMPRESSION, LLM
+from app.monitoring.metrics import RAG_LLM_CALLS
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# 후속 질문 재구성 방식: heuristic(로컬 규칙, LLM 호출 없음) / llm(소형 모델 재작성) / off
+RAG_CONDENSE_MODE = os.getenv("RAG_CONDENSE_MODE", "heuristic").lower()
+RAG_CONDENSE_MODEL = os.getenv("RAG_CONDENSE_MODEL", "gpt-4o-mini")
+# 세션별 대화 기록 보관 수 (오래된 세션부터 제거)
+RAG_MAX_SESSIONS = int(os.getenv("RAG_MAX_SESSIONS", "1000"))
+
+class LLMCallCounter(BaseCallbackHandler):
+    """요청 하나에서 실행된 LLM 호출 수"""
+
+    def __init__(self):
+        self.count = 0
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self.count += 1
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any) -> None:
+        self.count += 1
+
 @dataclass
 class RAGResponse:
     """RAG 응답 데이터 클래스"""
@@ -33,50 +60,120 @@ class RAGResponse:
     metadata: Dict[str, Any]
     token_metrics: Optional[TokenMetrics] = None
 
+class PolicyStoreRetriever(BaseRetriever):
+    """
+    정책 벡터 스토어 리트리버
+    스토어 서비스의 검색 메서드를 사용하여 임베딩/검색 단계를 분리 계측
+    관련성 점수는 메타데이터(relevance_score)로 전달 (스토어 문서는 수정하지 않도록 복사)
+    """
+    vector_store_service: Any
+    k: int = 10
+    score_threshold: Optional[float] = None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        results = self.vector_store_service.similarity_search_with_relevance_scores(
+            query, k=self.k, score_threshold=self.score_threshold
+        )
+        return [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, "relevance_score": score})
+            for doc, score in results
+        ]
+
+class TimedDocumentCompressor(BaseDocumentCompressor):
+    """컨텍스트 압축 단계 시간 계측 래퍼"""
+    base_compressor: BaseDocumentCompressor
+
+    def compress_documents(
+        self,
+        documents: List[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None
+    ) -> List[Document]:
+        with span("rag.compression", COMPRESSION):
+            return list(self.base_compressor.compress_documents(documents, query, callbacks=callbacks))
+
+class TokenBudgetCompressor(BaseDocumentCompressor):
+    """
+    토큰 예산 컨텍스트 패킹 단계
+    관련성 점수 순으로 모델별 예산만큼만 남기고 중복 스니펫 제거, 넘치는 문서는 문장 경계에서 절단
+    """
+    model_name: Optional[str] = None
+    budget: Optional[int] = None
+
+    def compress_documents(
+        self,
+        documents: List[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None
+    ) -> List[Document]:
+        snippets = [
+            ContextSnippet(
+                text=doc.page_content,
+                # 점수가 없으면 검색 순위를 유지
+                score=doc.metadata.get("relevance_score", -rank),
+                payload=doc
+            )
+            for rank, doc in enumerate(documents)
+        ]
+        packed = pack_context(snippets, self.budget or context_budget(self.model_name), self.model_name)
+        record_context_packing("rag", packed)
+        return [
+            Document(page_content=snippet.text, metadata=snippet.payload.metadata)
+            if snippet.truncated else snippet.payload
+            for snippet in packed.snippets
+        ]
+
 class RAGService:
     """
     RAG 서비스 클래스
     벡터 검색과 LLM을 결합하여 정책 기반 응답 생성
     """
     
-    def __init__(self):
-        """초기화"""
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
+        """
+        초기화
+
+        Args:
+            llm: OpenAI LLM 인스턴스 (선택사항)
+        """
         # OpenAI LLM 설정
-        self.llm = ChatOpenAI(
+        self.llm = llm or ChatOpenAI(
             api_key=os.getenv('OPENAI_API_KEY'),
             model_name=os.getenv('AGENT_MODEL', 'gpt-4o-mini'),
             temperature=float(os.getenv('AGENT_TEMPERATURE', 0.1)),
             max_tokens=int(os.getenv('AGENT_MAX_TOKENS', 2000))
         )
         
-        # 메모리 설정 (대화 히스토리)
-        self.memory = ConversationBufferWindowMemory(
-            k=5,  # 최근 5개 대화만 기억
-            memory_key="chat_history",
-            return_messages=True,
-            output_key="answer"
-        )
-        
+        # 세션별 대화 히스토리 (세션 없는 요청은 기록하지 않음)
+        self.session_memories: "OrderedDict[str, ConversationBufferWindowMemory]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+
         # 컨텍스트 압축 리트리버 설정
         self.retriever = self._setup_retriever()
-        
-        # 대화형 RAG 체인 설정
-        self.rag_chain = self._setup_rag_chain()
+
+        # 답변 체인과 후속 질문 재구성 체인 설정
+        self.qa_chain = self._setup_qa_chain()
+        self.condense_chain = self._setup_condense_chain()
     
     def _setup_retriever(self):
         """리트리버 설정"""
+        vector_store_service = service_registry.get("policy_vector_store")
+
         try:
             # 기본 벡터 스토어 리트리버
-            base_retriever = vector_store_service.vector_store.as_retriever(
-                search_type="similarity_score_threshold",
-                search_kwargs={
-                    "k": 10,  # 더 많은 문서를 가져온 후 압축
-                    "score_threshold": 0.3  # 유사도 임계값
-                }
+            base_retriever = PolicyStoreRetriever(
+                vector_store_service=vector_store_service,
+                k=10,  # 더 많은 문서를 가져온 후 압축
+                score_threshold=0.3  # 유사도 임계값
             )
             
-            # LLM 기반 컨텍스트 압축기
-            compressor = LLMChainExtractor.from_llm(self.llm)
+            # LLM 기반 컨텍스트 압축기 → 토큰 예산 패킹
+            compressor = DocumentCompressorPipeline(transformers=[
+                TimedDocumentCompressor(base_compressor=LLMChainExtractor.from_llm(self.llm)),
+                TokenBudgetCompressor(model_name=self.llm.model_name)
+            ])
             
             # 압축 리트리버 생성
             compression_retriever = ContextualCompressionRetriever(
@@ -88,40 +185,93 @@ class RAGService:
             
         except Exception as e:
             print(f"리트리버 설정 중 오류: {e}")
-            # 기본 리트리버로 폴백
-            return vector_store_service.vector_store.as_retriever(search_kwargs={"k": 5})
+            # 압축 없는 기본 리트리버로 폴백
+            return PolicyStoreRetriever(vector_store_service=vector_store_service, k=5)
     
-    def _setup_rag_chain(self):
-        """RAG 체인 설정"""
+    def _setup_qa_chain(self):
+        """검색 문서를 프롬프트에 채워 답변하는 체인 설정"""
         try:
-            # 대화형 RAG 체인 생성
-            rag_chain = ConversationalRetrievalChain.from_llm(
-                llm=self.llm,
-                retriever=self.retriever,
-                memory=self.memory,
-                return_source_documents=True,
+            return load_qa_chain(
+                self.llm,
+                chain_type="stuff",
                 verbose=os.getenv('APP_DEBUG', 'False').lower() == 'true'
             )
-            
-            return rag_chain
-            
         except Exception as e:
             print(f"RAG 체인 설정 중 오류: {e}")
             raise
-    
+
+    def _setup_condense_chain(self) -> Optional[LLMChain]:
+        """후속 질문 재구성 체인 (RAG_CONDENSE_MODE=llm일 때만, 소형 모델 사용)"""
+        if RAG_CONDENSE_MODE != "llm":
+            return None
+        condense_llm = self.llm
+        if RAG_CONDENSE_MODEL and RAG_CONDENSE_MODEL != getattr(self.llm, "model_name", None):
+            condense_llm = ChatOpenAI(
+                api_key=os.getenv('OPENAI_API_KEY'),
+                model_name=RAG_CONDENSE_MODEL,
+                temperature=0,
+                max_tokens=200
+            )
+        return LLMChain(llm=condense_llm, prompt=CONDENSE_QUESTION_PROMPT)
+
+    def _session_memory(self, session_id: Optional[str], create: bool = False) -> Optional[ConversationBufferWindowMemory]:
+        """세션 대화 메모리 (최근 RAG_MAX_SESSIONS개 세션만 유지)"""
+        if not session_id:
+            return None
+        with self._memory_lock:
+            memory = self.session_memories.get(session_id)
+            if memory is None and create:
+                memory = ConversationBufferWindowMemory(
+                    k=5,  # 최근 5개 대화만 기억
+                    memory_key="chat_history",
+                    return_messages=True,
+                    output_key="answer"
+                )
+                self.session_memories[session_id] = memory
+                while len(self.session_memories) > RAG_MAX_SESSIONS:
+                    self.session_memories.popitem(last=False)
+            if memory is not None:
+                self.session_memories.move_to_end(session_id)
+            return memory
+
+    def _standalone_question(self, question: str, chat_history: List[Any], callbacks: List[Any]) -> str:
+        """
+        검색용 독립 질문
+        첫 턴(기록 없음)과 독립적인 질문은 그대로 사용하고, 후속 질문만
+        직전 사용자 질문을 붙이거나(heuristic) 소형 모델로 재작성(llm)
+        """
+        if not needs_standalone_question(question, chat_history, RAG_CONDENSE_MODE):
+            return question
+
+        if self.condense_chain is not None:
+            history = "\n".join(f"{type(msg).__name__}: {msg.content}" for msg in chat_history)
+            with span("rag.condense", LLM):
+                return self.condense_chain.predict(
+                    question=question, chat_history=history, callbacks=callbacks
+                ).strip()
+
+        previous = next(
+            (msg.content for msg in reversed(chat_history) if isinstance(msg, HumanMessage)), ""
+        )
+        return f"{previous} {question}".strip()
+
     def generate_response(
         self, 
         query: str, 
         session_id: Optional[str] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        use_history: bool = True,
+        request_type: str = "rag_query"
     ) -> RAGResponse:
         """
         사용자 쿼리에 대한 RAG 기반 응답 생성
         
         Args:
             query: 사용자 질의
-            session_id: 세션 ID (대화 컨텍스트용)
+            session_id: 세션 ID (대화 컨텍스트용, 없으면 기록 없는 단발 질의)
             context: 추가 컨텍스트 정보
+            use_history: 세션 대화 기록 사용/저장 여부
+            request_type: 토큰/LLM 호출 메트릭의 요청 유형
             
         Returns:
             RAGResponse: 생성된 응답
@@ -133,11 +283,36 @@ class RAGService:
             # 컨텍스트 정보 추가
             enhanced_query = self._enhance_query(query, context)
             
-            # RAG 체인 실행
-            result = self.rag_chain({
-                "question": enhanced_query,
-                "chat_history": self.memory.chat_memory.messages
-            })
+            # 세션 대화 기록 (세션이 없거나 첫 턴이면 빈 기록 → 질문 재구성 LLM 호출 없음)
+            memory = self._session_memory(session_id) if use_history else None
+            chat_history = list(memory.chat_memory.messages) if memory else []
+            llm_calls = LLMCallCounter()
+
+            # 검색 → 압축 → 답변 (압축/답변 단계의 LLM 호출을 모두 집계)
+            standalone_question = self._standalone_question(enhanced_query, chat_history, [llm_calls])
+            source_documents = self.retriever.get_relevant_documents(
+                standalone_question, callbacks=[llm_calls]
+            )
+            answer_started = time.perf_counter()
+            with span("rag.answer", LLM):
+                answer = self.qa_chain(
+                    {"input_documents": source_documents, "question": enhanced_query},
+                    callbacks=[llm_calls]
+                )["output_text"]
+            answer_latency = time.perf_counter() - answer_started
+
+            if use_history and session_id:
+                memory = self._session_memory(session_id, create=True)
+                memory.chat_memory.add_user_message(query)
+                memory.chat_memory.add_ai_message(answer)
+
+            RAG_LLM_CALLS.labels(request_type=request_type).observe(llm_calls.count)
+            result = {
+                "question": standalone_question,
+                "chat_history": chat_history,
+                "answer": answer,
+                "source_documents": source_documents
+            }
 
             # 처리 시간 계산 (토큰 추적 전)
             processing_time = time.time() - start_time
@@ -145,14 +320,16 @@ class RAGService:
             # 토큰 사용량 추적
             token_metrics_obj = None
             try:
+                token_service = service_registry.get("token_service")
                 metrics, usage_record = token_service.track_llm_call(
                     llm_response=result,
                     model_name=self.llm.model_name,
                     provider="openai",
                     session_id=session_id,
-                    request_type="rag_query",
+                    request_type=request_type,
                     user_query=query,
-                    processing_time=processing_time
+                    processing_time=processing_time,
+                    llm_latency=answer_latency
                 )
                 token_metrics_obj = metrics
             except Exception as e:
@@ -175,7 +352,9 @@ class RAGService:
                     "enhanced_query": enhanced_query,
                     "session_id": session_id,
                     "model_used": self.llm.model_name,
-                    "retrieval_count": len(source_docs)
+                    "retrieval_count": len(source_docs),
+                    "standalone_question": standalone_question,
+                    "llm_calls": llm_calls.count
                 },
                 token_metrics=token_metrics_obj
             )
@@ -222,7 +401,7 @@ class RAGService:
                 "source": doc.metadata.get("source", "unknown"),
                 "chunk_id": doc.metadata.get("chunk_id", 0),
                 "document_type": doc.metadata.get("document_type", "policy"),
-                "relevance_score": getattr(doc, 'relevance_score', None)
+                "relevance_score": doc.metadata.get("relevance_score", getattr(doc, 'relevance_score', None))
             }
             processed_docs.append(doc_info)
         
@@ -250,21 +429,29 @@ class RAGService:
             print(f"신뢰도 점수 계산 중 오류: {e}")
             return 0.5
     
-    def clear_memory(self):
-        """대화 메모리 초기화"""
-        self.memory.clear()
-    
-    def get_memory_summary(self) -> Dict[str, Any]:
-        """현재 메모리 상태 조회"""
+    def clear_memory(self, session_id: Optional[str] = None):
+        """대화 메모리 초기화 (세션 미지정 시 전체)"""
+        with self._memory_lock:
+            if session_id:
+                self.session_memories.pop(session_id, None)
+            else:
+                self.session_memories.clear()
+
+    def get_memory_summary(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """현재 메모리 상태 조회 (세션 미지정 시 세션 수만)"""
+        memory = self._session_memory(session_id)
+        if memory is None:
+            return {"session_count": len(self.session_memories), "message_count": 0, "messages": []}
         return {
-            "message_count": len(self.memory.chat_memory.messages),
-            "memory_key": self.memory.memory_key,
+            "session_count": len(self.session_memories),
+            "message_count": len(memory.chat_memory.messages),
+            "memory_key": memory.memory_key,
             "messages": [
                 {
                     "type": type(msg).__name__,
                     "content": msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
                 }
-                for msg in self.memory.chat_memory.messages
+                for msg in memory.chat_memory.messages
             ]
         }
 
@@ -274,8 +461,8 @@ class TemplateRAGService(RAGService):
     알림톡 템플릿 생성에 최적화된 RAG 시스템
     """
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
+        super().__init__(llm=llm)
         # 템플릿 생성용 특별 프롬프트 설정
         self.template_prompt = self._setup_template_prompt()
     
@@ -331,12 +518,14 @@ class TemplateRAGService(RAGService):
             "purpose": "template_generation"
         }
         
-        # RAG 기반 템플릿 생성
+        # RAG 기반 템플릿 생성 (단발 요청이므로 대화 기록 없이 - 질문 재구성 없음)
         return self.generate_response(
             query=user_request,
             session_id=session_id,
-            context=context
+            context=context,
+            use_history=False,
+            request_type="template_generation"
         )
 
-# 전역 RAG 서비스 인스턴스
-rag_service = TemplateRAGService()
\ No newline at end of file
+# 전역 RAG 서비스 인스턴스 (서비스 레지스트리에서 지연 생성)
+__getattr__ = lazy_module_getattr(__name__, "rag_service")
@@ -0,0 +1,203 @@
+"""
+서비스 레지스트리
+LLM/임베딩 클라이언트와 FAISS 인덱스를 보유한 무거운 서비스들을
+import 시점이 아닌 최초 사용 시점(또는 lifespan 워밍업)에 생성
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ComponentStartup:
+    """컴포넌트 생성 결과"""
+    name: str
+    duration: float
+    success: bool
+    error: Optional[str] = None
+
+
+class ServiceRegistry:
+    """
+    이름으로 등록된 팩토리를 지연 실행하는 스레드 안전 레지스트리
+    동일 서비스는 한 번만 생성되며, 서로 다른 서비스는 병렬로 생성 가능
+    """
+
+    def __init__(self):
+        """초기화"""
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._warm_up_names: List[str] = []
+        self._registry_lock = threading.Lock()
+        self.startup_report: Dict[str, ComponentStartup] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], warm_up: bool = False):
+        """서비스 팩토리 등록"""
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.RLock())
+            if warm_up and name not in self._warm_up_names:
+                self._warm_up_names.append(name)
+
+    def override(self, name: str, factory: Callable[[], Any]):
+        """팩토리 교체 (테스트/벤치마크용) - 기존 인스턴스는 폐기"""
+        with self._registry_lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.RLock())
+            self._instances.pop(name, None)
+            self.startup_report.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """서비스 인스턴스 조회 (없으면 생성)"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        lock = self._locks.get(name)
+        if lock is None:
+            raise KeyError(f"등록되지 않은 서비스입니다: {name}")
+
+        with lock:
+            # 다른 스레드가 먼저 생성했을 수 있으므로 재확인
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+
+            start_time = time.perf_counter()
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                self.startup_report[name] = ComponentStartup(
+                    name=name,
+                    duration=time.perf_counter() - start_time,
+                    success=False,
+                    error=str(e)
+                )
+                raise
+
+            self._instances[name] = instance
+            self.startup_report[name] = ComponentStartup(
+                name=name,
+                duration=time.perf_counter() - start_time,
+                success=True
+            )
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        """서비스 생성 여부"""
+        return name in self._instances
+
+    def warm_up(
+        self,
+        names: Optional[List[str]] = None,
+        max_workers: Optional[int] = None
+    ) -> List[ComponentStartup]:
+        """
+        서비스들을 병렬로 미리 생성
+
+        Args:
+            names: 생성할 서비스 이름 (기본값: warm_up=True로 등록된 서비스)
+            max_workers: 병렬 스레드 수
+
+        Returns:
+            List[ComponentStartup]: 컴포넌트별 생성 결과
+        """
+        names = list(names or self._warm_up_names)
+        if not names:
+            return []
+
+        def _load(name: str) -> ComponentStartup:
+            if self.is_loaded(name):
+                return self.startup_report.get(
+                    name, ComponentStartup(name=name, duration=0.0, success=True)
+                )
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"서비스 '{name}' 생성 실패: {e}")
+            return self.startup_report.get(
+                name, ComponentStartup(name=name, duration=0.0, success=False)
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers or len(names),
+            thread_name_prefix="service-warmup"
+        ) as executor:
+            return list(executor.map(_load, names))
+
+    def reset(self, name: Optional[str] = None):
+        """생성된 인스턴스 폐기 (다음 get 시 재생성)"""
+        with self._registry_lock:
+            if name is None:
+                self._instances.clear()
+                self.startup_report.clear()
+            else:
+                self._instances.pop(name, None)
+                self.startup_report.pop(name, None)
+
+
+def lazy_module_getattr(module_name: str, *service_names: str) -> Callable[[str], Any]:
+    """
+    모듈 전역 서비스 인스턴스를 레지스트리에서 지연 조회하는 __getattr__ 생성
+    (`from app.services.rag_service import rag_service` 형태의 기존 import 호환)
+    """
+    def __getattr__(name: str) -> Any:
+        if name in service_names:
+            return service_registry.get(name)
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
+
+
+# 기본 서비스 팩토리 (모듈 import 자체도 지연)
+
+def _create_token_service():
+    from app.services.token_service import TokenService
+    return TokenService()
+
+
+def _create_simple_vector_store_service():
+    from app.services.vector_store_simple import SimpleVectorStoreService
+    return SimpleVectorStoreService()
+
+
+def _create_vector_store_service():
+    from app.services.vector_store import VectorStoreService
+    return VectorStoreService()
+
+
+def _create_policy_vector_store():
+    """정책 벡터 스토어 - 백엔드는 POLICY_VECTOR_BACKEND로 선택 (기본: numpy 정확 검색, faiss / chroma 선택 가능)"""
+    return service_registry.get("simple_vector_store_service")
+
+
+def _create_rag_service():
+    from app.services.rag_service import TemplateRAGService
+    return TemplateRAGService()
+
+
+def _create_template_vector_store_service():
+    from app.services.template_vector_store import TemplateVectorStoreService
+    return TemplateVectorStoreService()
+
+
+def _create_template_generation_service():
+    from app.services.template_generation_service import TemplateGenerationService
+    return TemplateGenerationService()
+
+
+# 전역 서비스 레지스트리
+service_registry = ServiceRegistry()
+service_registry.register("token_service", _create_token_service, warm_up=True)
+service_registry.register("simple_vector_store_service", _create_simple_vector_store_service)
+service_registry.register("vector_store_service", _create_vector_store_service)
+service_registry.register("policy_vector_store", _create_policy_vector_store, warm_up=True)
+service_registry.register("template_vector_store_service", _create_template_vector_store_service, warm_up=True)
+service_registry.register("rag_service", _create_rag_service, warm_up=True)
+service_registry.register("template_generation_service", _create_template_generation_service, warm_up=True)
@@ -0,0 +1,191 @@
+"""
+응답 캐시
+같은 요청(정규화 후 동일)을 같은 모델/온도/인덱스 버전으로 다시 받으면 검색과 LLM 호출 없이 이전 결과 반환
+- 메모리 LRU 계층: 워커 프로세스별, 항목 수 제한
+- 디스크 계층 (선택): 디렉토리를 공유하는 모든 워커가 함께 사용, TTL 경과 항목은 무시
+- 키: 정규화한 요청 + 모델 + 온도 + 인덱스 버전의 SHA-256
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# 캐시 사용 방식 (요청별 cache 옵션)
+CACHE_BYPASS = "bypass"   # 조회/저장 모두 안 함
+CACHE_PREFER = "prefer"   # 적중하면 반환, 아니면 생성 후 저장
+CACHE_ONLY = "only"       # 적중할 때만 반환 (미스면 생성하지 않음)
+CACHE_MODES = (CACHE_BYPASS, CACHE_PREFER, CACHE_ONLY)
+
+# 키 형식이 바뀌면 올려서 이전 항목을 무효화
+CACHE_KEY_VERSION = 1
+
+
+def _canonical(value: Any) -> Any:
+    """문자열은 NFC 정규화 + 공백 정리, 빈 값은 None으로 통일"""
+    if isinstance(value, str):
+        value = " ".join(unicodedata.normalize("NFC", value).split())
+        return value or None
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_canonical(item) for item in value]
+        return items or None
+    return value
+
+
+def request_cache_key(request: Dict[str, Any], model: Optional[str], temperature: Optional[float], index_version: str) -> str:
+    """
+    요청 캐시 키
+
+    Args:
+        request: 생성 결과에 영향을 주는 요청 필드
+        model: LLM 모델 이름
+        temperature: LLM 온도 (온도가 다르면 다른 응답 분포이므로 키에 포함)
+        index_version: 검색 인덱스 버전 (재임베딩 시 캐시 무효화)
+
+    Returns:
+        str: SHA-256 16진 문자열
+    """
+    payload = {
+        "v": CACHE_KEY_VERSION,
+        "request": _canonical(request),
+        "model": model,
+        "temperature": None if temperature is None else round(float(temperature), 3),
+        "index": index_version,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheLookup:
+    """캐시 조회 결과 (tier: memory / disk, 미스면 None)"""
+    key: str
+    value: Optional[Dict[str, Any]] = None
+    tier: Optional[str] = None
+    age: float = 0.0
+
+    @property
+    def hit(self) -> bool:
+        return self.value is not None
+
+
+class ResponseCache:
+    """
+    메모리 LRU + 디스크 2계층 응답 캐시
+    값은 JSON 직렬화 가능한 딕셔너리
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 256,
+        directory: Optional[str] = None,
+        ttl_seconds: float = 86400.0,
+    ):
+        """
+        Args:
+            name: 캐시 이름 (/metrics의 cache 라벨)
+            max_size: 메모리 계층 최대 항목 수 (0이면 메모리 계층 사용 안 함)
+            directory: 디스크 계층 디렉토리 (없으면 디스크 계층 사용 안 함)
+            ttl_seconds: 항목 유효 시간 (0 이하면 만료 없음)
+        """
+        self.name = name
+        self.max_size = max_size
+        self.directory = Path(directory) if directory else None
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> CacheLookup:
+        """메모리 → 디스크 순으로 조회 (디스크 적중은 메모리에도 올림)"""
+        from app.monitoring.metrics import record_cache_lookup
+
+        lookup = self._get_memory(key) or self._get_disk(key) or CacheLookup(key)
+        record_cache_lookup(self.name, hit=lookup.hit)
+        return lookup
+
+    def _get_memory(self, key: str) -> Optional[CacheLookup]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self._expired(created_at):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return CacheLookup(key, value, "memory", time.time() - created_at)
+
+    def _get_disk(self, key: str) -> Optional[CacheLookup]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"WARNING: 응답 캐시 파일 읽기 실패 ({key[:12]}): {e}")
+            return None
+
+        created_at = record.get("created_at", 0.0)
+        if record.get("key") != key or self._expired(created_at):
+            return None
+        self._put_memory(key, created_at, record["value"])
+        return CacheLookup(key, record["value"], "disk", time.time() - created_at)
+
+    def _put_memory(self, key: str, created_at: float, value: Dict[str, Any]):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (created_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """두 계층에 저장 (디스크는 임시 파일 후 교체로 다른 워커가 반쯤 쓴 파일을 읽지 않게)"""
+        created_at = time.time()
+        self._put_memory(key, created_at, value)
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "created_at": created_at, "value": value}, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"WARNING: 응답 캐시 파일 저장 실패 ({key[:12]}): {e}")
+
+    def clear(self):
+        """메모리 계층 비우기 (디스크 계층은 다른 워커와 공유하므로 유지)"""
+        with self._lock:
+            self._entries.clear()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "memory_entries": len(self._entries),
+            "max_size": self.max_size,
+            "directory": str(self.directory) if self.directory else None,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -5,14 +5,30 @@ Template Generation Service
 
 import os
 import re
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from langchain.schema import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
-from app.services.template_vector_store import template_vector_store_service
-from app.services.rag_service import rag_service
+from app.services.registry import service_registry, lazy_module_getattr
+from app.services.vector_backends import VectorCollection
+from app.services.context_packer import ContextSnippet, pack_context, context_budget, record_context_packing
+from app.services.template_rewriter import deterministic_rewrite, semantic_issues, structural_issues
+from app.services.response_cache import ResponseCache, CacheLookup, request_cache_key, CACHE_BYPASS, CACHE_PREFER, CACHE_ONLY
+from app.monitoring.timing import span, LLM, VALIDATION
+
+# 카테고리 패턴은 질의가 아닌 분류로 찾은 짧은 요약이므로 항상 우선 포함
+PATTERN_CONTEXT_SCORE = 1.0
+
+# 스마트 생성 응답 캐시 (디렉토리를 지정하면 워커 간 공유 디스크 계층 사용)
+SMART_GENERATE_CACHE_SIZE = int(os.getenv("SMART_GENERATE_CACHE_SIZE", "256"))
+SMART_GENERATE_CACHE_DIR = os.getenv("SMART_GENERATE_CACHE_DIR") or None
+SMART_GENERATE_CACHE_TTL = float(os.getenv("SMART_GENERATE_CACHE_TTL", "86400"))
+
+# 한 번의 LLM 호출(n>1)로 받을 최대 후보 수
+MAX_CANDIDATES = 5
 
 
 class TemplateGenerationService:
@@ -21,13 +37,39 @@ class TemplateGenerationService:
     승인받은 템플릿 패턴을 분석하여 새로운 템플릿 생성
     """
 
-    def __init__(self):
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
         """Initialize template generation service"""
-        self.llm = ChatOpenAI(
+        self.llm = llm or ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.3,  # 창의성과 일관성 균형
             openai_api_key=os.getenv("OPENAI_API_KEY")
         )
+        self.response_cache = ResponseCache(
+            "smart_generate",
+            max_size=SMART_GENERATE_CACHE_SIZE,
+            directory=SMART_GENERATE_CACHE_DIR,
+            ttl_seconds=SMART_GENERATE_CACHE_TTL
+        )
+
+    def _index_version(self) -> str:
+        """생성에 쓰이는 검색 인덱스(템플릿/패턴/정책) 버전"""
+        versions = []
+        for name in ("template_vector_store_service", "policy_vector_store"):
+            try:
+                versions.append(service_registry.get(name).index_version)
+            except Exception as e:
+                versions.append(f"error:{type(e).__name__}")
+        return "|".join(versions)
+
+    def _cache_key(self, request: Dict[str, Any]) -> str:
+        # 변수 목록은 순서와 무관하게 같은 요청
+        request = {**request, "include_variables": sorted(set(request.get("include_variables") or []))}
+        return request_cache_key(
+            request,
+            model=getattr(self.llm, "model_name", None),
+            temperature=getattr(self.llm, "temperature", None),
+            index_version=self._index_version()
+        )
 
     def generate_template(
         self,
@@ -36,19 +78,76 @@ class TemplateGenerationService:
         category_1: Optional[str] = None,
         category_2: Optional[str] = None,
         target_length: Optional[int] = None,
-        include_variables: Optional[List[str]] = None
+        include_variables: Optional[List[str]] = None,
+        cache: str = CACHE_PREFER,
+        n_candidates: int = 1
     ) -> Dict[str, Any]:
         """
         사용자 요청에 맞는 카카오 알림톡 템플릿 생성
+
+        Args:
+            cache: 응답 캐시 사용 방식 (bypass / prefer / only)
+            n_candidates: 한 번의 LLM 호출로 받을 후보 수 (최고 점수 후보를 반환, 나머지는 alternatives)
+
+        Returns:
+            생성 결과 - cache 항목에 status(hit/miss/bypass), tier, key, age
         """
+        request = {
+            "user_request": user_request,
+            "business_type": business_type,
+            "category_1": category_1,
+            "category_2": category_2,
+            "target_length": target_length,
+            "include_variables": include_variables,
+            "n_candidates": max(1, min(n_candidates, MAX_CANDIDATES)),
+        }
+        if cache == CACHE_BYPASS:
+            result = self._generate_uncached(**request)
+            result["cache"] = {"status": "bypass", "tier": None, "key": None, "age": 0.0}
+            return result
+
+        lookup = self.response_cache.get(self._cache_key(request))
+        if lookup.hit:
+            return {**lookup.value, "cache": self._cache_info("hit", lookup)}
+        if cache == CACHE_ONLY:
+            return {
+                "success": False,
+                "error": "캐시된 응답이 없습니다 (cache=only)",
+                "cache": self._cache_info("miss", lookup)
+            }
+
+        result = self._generate_uncached(**request)
+        if result["success"]:
+            self.response_cache.set(lookup.key, dict(result))
+        result["cache"] = self._cache_info("miss", lookup)
+        return result
+
+    @staticmethod
+    def _cache_info(status: str, lookup: CacheLookup) -> Dict[str, Any]:
+        return {"status": status, "tier": lookup.tier, "key": lookup.key, "age": lookup.age}
+
+    def _generate_uncached(
+        self,
+        user_request: str,
+        business_type: Optional[str] = None,
+        category_1: Optional[str] = None,
+        category_2: Optional[str] = None,
+        target_length: Optional[int] = None,
+        include_variables: Optional[List[str]] = None,
+        n_candidates: int = 1
+    ) -> Dict[str, Any]:
+        """검색 → 생성 → 검증 (캐시 미사용)"""
         try:
+            template_vector_store_service = service_registry.get("template_vector_store_service")
+
             # 1. 유사한 승인받은 템플릿 검색
-            similar_templates = template_vector_store_service.find_similar_templates(
+            scored_templates = template_vector_store_service.find_similar_templates_with_scores(
                 user_request,
                 category_filter=category_1,
                 business_type_filter=business_type,
                 k=3
             )
+            similar_templates = [doc for doc, _ in scored_templates]
 
             # 2. 카테고리별 패턴 정보 수집
             category_patterns = []
@@ -59,27 +158,30 @@ class TemplateGenerationService:
 
             # 3. 정책 문서 검색 (기존 벡터 스토어 활용)
             try:
-                from app.services.vector_store_simple import simple_vector_store_service
-                policy_context = simple_vector_store_service.get_relevant_policies(user_request, k=3)
+                policy_vector_store = service_registry.get("policy_vector_store")
+                policy_context = policy_vector_store.get_relevant_policies(user_request, k=3)
             except Exception as e:
                 print(f"정책 검색 오류: {e}")
                 policy_context = {"policies": []}
 
-            # 4. AI를 사용한 템플릿 생성
-            generated_template = self._generate_with_ai(
+            # 4. AI를 사용한 템플릿 생성 (같은 프롬프트로 후보 n개)
+            candidates = self._generate_with_ai(
                 user_request=user_request,
-                similar_templates=similar_templates,
+                similar_templates=scored_templates,
                 category_patterns=category_patterns,
                 policy_context=policy_context,
                 target_length=target_length,
                 include_variables=include_variables,
                 business_type=business_type,
                 category_1=category_1,
-                category_2=category_2
+                category_2=category_2,
+                n_candidates=n_candidates
             )
 
-            # 5. 생성된 템플릿 검증
-            validation_result = self._validate_template(generated_template)
+            # 5. 후보 검증 후 점수 순 정렬 (최고 점수 후보 채택)
+            with span("template_generation.validate", VALIDATION):
+                ranked = self._rank_candidates(candidates, include_variables, target_length)
+            generated_template, validation_result = ranked[0]
 
             # 6. 개선 제안 생성
             suggestions = self._generate_suggestions(
@@ -91,6 +193,10 @@ class TemplateGenerationService:
                 "generated_template": generated_template,
                 "validation": validation_result,
                 "suggestions": suggestions,
+                "alternatives": [
+                    {"template": template, "validation": validation}
+                    for template, validation in ranked[1:]
+                ],
                 "reference_data": {
                     "similar_templates": len(similar_templates),
                     "category_patterns": len(category_patterns),
@@ -101,7 +207,8 @@ class TemplateGenerationService:
                     "business_type": business_type,
                     "category_1": category_1,
                     "category_2": category_2,
-                    "user_request": user_request
+                    "user_request": user_request,
+                    "n_candidates": len(candidates)
                 }
             }
 
@@ -112,6 +219,7 @@ class TemplateGenerationService:
                 "generated_template": "",
                 "validation": {},
                 "suggestions": [],
+                "alternatives": [],
                 "reference_data": {},
                 "metadata": {}
             }
@@ -126,49 +234,32 @@ class TemplateGenerationService:
         include_variables: Optional[List[str]],
         business_type: Optional[str],
         category_1: Optional[str],
-        category_2: Optional[str]
-    ) -> str:
-        """AI를 사용하여 템플릿 생성"""
+        category_2: Optional[str],
+        n_candidates: int = 1
+    ) -> List[str]:
+        """AI를 사용하여 템플릿 후보 생성 (n_candidates > 1이면 한 번의 호출로 n개 완성)"""
+
+        # 검색 근거를 모델별 토큰 예산 안에서 관련성 순으로 채움 (중복 제외, 문장 경계 절단)
+        packed = self._pack_reference_context(similar_templates, category_patterns, policy_context)
 
         # 유사 템플릿 정보 구성
         similar_examples = ""
-        if similar_templates:
+        examples = packed.by_group("template")
+        if examples:
             similar_examples = "\n\n승인받은 유사 템플릿 예시:\n"
-            for i, doc in enumerate(similar_templates[:3], 1):
-                original_text = doc.metadata.get('original_text', '')
-                variables = doc.metadata.get('variables', [])
-                button = doc.metadata.get('button', '')
-
-                similar_examples += f"""
-예시 {i}:
-- 텍스트: {original_text}
-- 사용변수: {', '.join(f'#{{{var}}}' for var in variables)}
-- 버튼: {button}
-"""
+            for i, snippet in enumerate(examples, 1):
+                similar_examples += f"\n예시 {i}:\n{snippet.text}\n"
 
         # 카테고리 패턴 정보 구성
-        pattern_info = ""
-        if category_patterns:
-            for doc in category_patterns:
-                metadata = doc.metadata
-                common_variables = metadata.get('common_variables', {})
-                common_buttons = metadata.get('common_buttons', {})
-                avg_length = metadata.get('avg_length', 0)
-
-                pattern_info += f"""
-카테고리 '{metadata.get('category')}' 패턴 정보:
-- 일반적 변수: {', '.join(f'#{{{var}}}' for var in list(common_variables.keys())[:5])}
-- 일반적 버튼: {', '.join(list(common_buttons.keys())[:3])}
-- 평균 길이: {avg_length}자
-"""
+        pattern_info = "".join(f"\n{snippet.text}\n" for snippet in packed.by_group("pattern"))
 
         # 정책 정보 구성
         policy_info = ""
-        policies = policy_context.get("policies", [])
+        policies = packed.by_group("policy")
         if policies:
             policy_info = "\n\n준수해야 할 정책:\n"
-            for i, policy in enumerate(policies[:3], 1):
-                policy_info += f"- {policy['content']}\n"
+            for snippet in policies:
+                policy_info += f"- {snippet.text}\n"
 
         # 변수 요구사항
         variable_requirements = ""
@@ -219,8 +310,96 @@ class TemplateGenerationService:
 """)
 
         # AI를 통한 템플릿 생성
-        response = self.llm.invoke([system_message, human_message])
-        return response.content.strip()
+        messages = [system_message, human_message]
+        started = time.perf_counter()
+        with span("template_generation.llm", LLM):
+            if n_candidates <= 1:
+                response = self.llm.invoke(messages)
+            else:
+                response = self.llm.generate([messages], n=n_candidates)
+        self._track_llm_call(response, "template_generation", messages, time.perf_counter() - started)
+
+        if n_candidates <= 1:
+            return [response.content.strip()]
+
+        # 같은 완성은 한 번만 (순서 유지)
+        candidates = [generation.message.content.strip() for generation in response.generations[0]]
+        return list(dict.fromkeys(candidate for candidate in candidates if candidate)) or [""]
+
+    def _rank_candidates(
+        self,
+        candidates: List[str],
+        include_variables: Optional[List[str]],
+        target_length: Optional[int]
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        후보를 로컬 검증 점수 순으로 정렬
+        컴플라이언스 점수 → 필수 변수 누락 수 → 목표 길이와의 차이 순
+        """
+        required = set(include_variables or [])
+        target = target_length or 115  # 권장 길이 80-150자의 중간
+
+        def rank_key(item: Tuple[str, Dict[str, Any]]):
+            _, validation = item
+            missing = len(required - set(validation["variables"]))
+            return (-validation["compliance_score"], missing, abs(validation["length"] - target))
+
+        scored = [(candidate, self._validate_template(candidate)) for candidate in candidates]
+        return sorted(scored, key=rank_key)
+
+    def _pack_reference_context(
+        self,
+        similar_templates: List,
+        category_patterns: List,
+        policy_context: Dict
+    ):
+        """
+        유사 템플릿/카테고리 패턴/정책 청크를 스니펫으로 만들어 토큰 예산 안에 패킹
+
+        Args:
+            similar_templates: (템플릿 문서, 관련성 점수) 목록
+            category_patterns: 카테고리 패턴 문서 목록
+            policy_context: get_relevant_policies 결과 (relevance_score는 L2 거리)
+        """
+        snippets = []
+        for doc, score in similar_templates[:3]:
+            variables = doc.metadata.get('variables', [])
+            snippets.append(ContextSnippet(
+                text=(
+                    f"- 텍스트: {doc.metadata.get('original_text', '')}\n"
+                    f"- 사용변수: {', '.join(f'#{{{var}}}' for var in variables)}\n"
+                    f"- 버튼: {doc.metadata.get('button', '')}"
+                ),
+                score=score,
+                group="template"
+            ))
+
+        for doc in category_patterns:
+            metadata = doc.metadata
+            common_variables = metadata.get('common_variables', {})
+            common_buttons = metadata.get('common_buttons', {})
+            snippets.append(ContextSnippet(
+                text=(
+                    f"카테고리 '{metadata.get('category')}' 패턴 정보:\n"
+                    f"- 일반적 변수: {', '.join(f'#{{{var}}}' for var in list(common_variables.keys())[:5])}\n"
+                    f"- 일반적 버튼: {', '.join(list(common_buttons.keys())[:3])}\n"
+                    f"- 평균 길이: {metadata.get('avg_length', 0)}자"
+                ),
+                score=PATTERN_CONTEXT_SCORE,
+                group="pattern"
+            ))
+
+        for policy in policy_context.get("policies", [])[:3]:
+            snippets.append(ContextSnippet(
+                text=policy['content'],
+                score=VectorCollection.relevance_score(policy.get('relevance_score', 0.0)),
+                group="policy"
+            ))
+
+        model_name = getattr(self.llm, "model_name", None)
+        packed = pack_context(snippets, context_budget(model_name), model_name)
+        record_context_packing("template_generation", packed)
+        return packed
 
     def _validate_template(self, template: str) -> Dict[str, Any]:
         """생성된 템플릿 검증"""
@@ -318,13 +497,76 @@ class TemplateGenerationService:
         template: str,
         target_improvements: Optional[List[str]] = None
     ) -> Dict[str, Any]:
-        """기존 템플릿 최적화"""
+        """
+        기존 템플릿 최적화
+        형식 문제는 규칙으로 먼저 고치고 재검증한 뒤, 광고성 표현/어조 문제가 남았거나
+        개선 요청이 있을 때만 LLM 호출 (길이/변수/문장 수 등 구조 문제는 remaining_issues로 보고만 함)
+
+        Returns:
+            최적화 결과 - optimization_path(none / deterministic / llm), applied_fixes, remaining_issues
+        """
         try:
             # 현재 템플릿 검증
-            current_validation = self._validate_template(template)
+            with span("template_optimization.validate", VALIDATION):
+                current_validation = self._validate_template(template)
+
+            # 1. 결정적 수정 (변수 문법, 중복 줄, 공백, 문장 경계 자르기, 인사말) 후 재검증
+            with span("template_optimization.rewrite", VALIDATION):
+                rewrite = deterministic_rewrite(template, current_validation)
+                optimized_template = rewrite.template
+                optimized_validation = (
+                    self._validate_template(optimized_template) if rewrite.changed else current_validation
+                )
+            llm_issues = semantic_issues(optimized_validation)
+
+            # 2. 광고성 표현/어조 문제가 남았거나 명시적 개선 요청이 있을 때만 LLM 재작성
+            if llm_issues or target_improvements:
+                optimized_template = self._optimize_with_ai(
+                    optimized_template, optimized_validation, llm_issues, target_improvements
+                )
+                with span("template_optimization.validate", VALIDATION):
+                    optimized_validation = self._validate_template(optimized_template)
+                path = "llm"
+            else:
+                path = "deterministic" if rewrite.changed else "none"
+            remaining_issues = semantic_issues(optimized_validation) + structural_issues(optimized_validation)
 
-            # 최적화 프롬프트 생성
-            system_message = SystemMessage(content="""
+            return {
+                "success": True,
+                "original_template": template,
+                "optimized_template": optimized_template,
+                "original_validation": current_validation,
+                "optimized_validation": optimized_validation,
+                "improvement": {
+                    "compliance_score_change": optimized_validation["compliance_score"] - current_validation["compliance_score"],
+                    "length_change": optimized_validation["length"] - current_validation["length"],
+                    "variable_count_change": optimized_validation["variable_count"] - current_validation["variable_count"]
+                },
+                "optimization_path": path,
+                "applied_fixes": rewrite.fixes,
+                "remaining_issues": remaining_issues
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"템플릿 최적화 중 오류 발생: {str(e)}",
+                "original_template": template,
+                "optimized_template": "",
+                "original_validation": {},
+                "optimized_validation": {},
+                "improvement": {}
+            }
+
+    def _optimize_with_ai(
+        self,
+        template: str,
+        validation: Dict[str, Any],
+        issues: List[str],
+        target_improvements: Optional[List[str]] = None
+    ) -> str:
+        """LLM으로 템플릿 재작성 (형식 수정은 이미 적용된 템플릿 기준)"""
+        system_message = SystemMessage(content="""
 당신은 카카오 알림톡 템플릿 최적화 전문가입니다.
 주어진 템플릿을 카카오 정책에 더 적합하도록 개선하세요.
 
@@ -337,55 +579,48 @@ class TemplateGenerationService:
 응답 형식: 최적화된 템플릿 텍스트만 제공하세요.
 """)
 
-            improvements_text = ""
-            if target_improvements:
-                improvements_text = f"특히 다음 사항을 개선해주세요: {', '.join(target_improvements)}"
+        improvements_text = ""
+        if target_improvements:
+            improvements_text = f"특히 다음 사항을 개선해주세요: {', '.join(target_improvements)}"
+
+        issues_text = f"\n- 수정 필요: {', '.join(issues)}" if issues else ""
 
-            human_message = HumanMessage(content=f"""
+        human_message = HumanMessage(content=f"""
 다음 템플릿을 최적화해주세요:
 
 원본 템플릿:
 {template}
 
 현재 문제점:
-- 길이: {current_validation['length']}자
-- 변수 개수: {current_validation['variable_count']}개
-- 정책 준수도: {current_validation['compliance_score']:.1f}점
+- 길이: {validation['length']}자
+- 변수 개수: {validation['variable_count']}개
+- 정책 준수도: {validation['compliance_score']:.1f}점{issues_text}
 
 {improvements_text}
 """)
 
-            # AI를 통한 최적화
-            response = self.llm.invoke([system_message, human_message])
-            optimized_template = response.content.strip()
-
-            # 최적화된 템플릿 검증
-            optimized_validation = self._validate_template(optimized_template)
-
-            return {
-                "success": True,
-                "original_template": template,
-                "optimized_template": optimized_template,
-                "original_validation": current_validation,
-                "optimized_validation": optimized_validation,
-                "improvement": {
-                    "compliance_score_change": optimized_validation["compliance_score"] - current_validation["compliance_score"],
-                    "length_change": optimized_validation["length"] - current_validation["length"],
-                    "variable_count_change": optimized_validation["variable_count"] - current_validation["variable_count"]
-                }
-            }
+        # AI를 통한 최적화
+        messages = [system_message, human_message]
+        started = time.perf_counter()
+        with span("template_optimization.llm", LLM):
+            response = self.llm.invoke(messages)
+        self._track_llm_call(response, "template_optimization", messages, time.perf_counter() - started)
+        return response.content.strip()
 
+    def _track_llm_call(self, response: Any, request_type: str, messages: List[Any], llm_latency: float):
+        """LLM 호출 토큰/비용/지연 기록 (RAG 답변과 같은 토큰 서비스 경로)"""
+        try:
+            service_registry.get("token_service").track_llm_call(
+                llm_response=response,
+                model_name=getattr(self.llm, "model_name", "unknown"),
+                request_type=request_type,
+                processing_time=llm_latency,
+                prompt=messages,
+                llm_latency=llm_latency
+            )
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"템플릿 최적화 중 오류 발생: {str(e)}",
-                "original_template": template,
-                "optimized_template": "",
-                "original_validation": {},
-                "optimized_validation": {},
-                "improvement": {}
-            }
+            print(f"토큰 추적 중 오류: {e}")
 
 
-# Global instance
-template_generation_service = TemplateGenerationService()
\ No newline at end of file
+# Global instance (lazily created by the service registry)
+__getattr__ = lazy_module_getattr(__name__, "template_generation_service")
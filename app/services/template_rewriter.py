@@ -0,0 +1,176 @@
+"""
+템플릿 결정적 수정
+LLM 없이 고칠 수 있는 형식 문제(잘못된 변수 문법, 중복 줄, 인사말 누락, 길이 초과)를 규칙으로 수정
+- semantic_issues: 광고성 표현/어조처럼 문구를 바꿔야 하는 문제 - LLM 재작성 대상
+- structural_issues: 길이/변수 수/인사말/문장 수 - 결과에 보고만 하고 LLM은 호출하지 않음
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+# 잘못된 변수 형식 (정규식, 표시 이름) - 정책 도구의 형식 위반 탐지와 공용
+WRONG_VARIABLE_FORMATS = (
+    (r'\$\{\s*([^}]+?)\s*\}', "${}"),
+    (r'\%\{\s*([^}]+?)\s*\}', "%{}"),
+    (r'\#\[\s*([^\]]+?)\s*\]', "#[]"),
+)
+
+MAX_TEMPLATE_LENGTH = 300
+MIN_TEMPLATE_LENGTH = 50
+# 이만큼까지 넘친 템플릿은 문장 경계에서 뒤를 잘라 맞춤 (더 길면 구조 문제로 보고)
+TRIM_SLACK = 60
+# 문장 끝 (마침표/느낌표/물음표 뒤 공백·줄끝, 또는 줄바꿈)
+SENTENCE_END_PATTERN = re.compile(r'[.!?](?=\s|$)|\n')
+VARIABLE_PATTERN = re.compile(r'#\{([^}]+)\}')
+
+# 인사말에 쓸 수 있는 이름 변수
+NAME_VARIABLE_PATTERN = re.compile(r'고객|회원|성명|이름|수신자')
+DEFAULT_GREETING = "안녕하세요 고객님,"
+
+# 수정 종류
+FIX_VARIABLE_SYNTAX = "variable_syntax"
+FIX_DUPLICATE_LINES = "duplicate_lines"
+FIX_GREETING = "greeting"
+FIX_WHITESPACE = "whitespace"
+FIX_SENTENCE_TRIM = "sentence_trim"
+
+
+@dataclass
+class RewriteResult:
+    """결정적 수정 결과"""
+    template: str
+    fixes: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.fixes)
+
+
+def fix_variable_syntax(template: str) -> Tuple[str, int]:
+    """${x} / %{x} / #[x] → #{x}"""
+    total = 0
+    for pattern, _ in WRONG_VARIABLE_FORMATS:
+        template, count = re.subn(pattern, lambda m: f"#{{{m.group(1)}}}", template)
+        total += count
+    return template, total
+
+
+def remove_duplicate_lines(template: str) -> Tuple[str, int]:
+    """같은 내용의 줄은 처음 한 번만 유지 (빈 줄은 그대로)"""
+    seen = set()
+    kept = []
+    removed = 0
+    for line in template.split("\n"):
+        key = line.strip()
+        if key and key in seen:
+            removed += 1
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept), removed
+
+
+def add_greeting(template: str, variables: List[str]) -> str:
+    """첫 줄에 인사말 추가 (이름 변수가 있으면 사용)"""
+    name_variable = next((var for var in variables if NAME_VARIABLE_PATTERN.search(var)), None)
+    greeting = f"안녕하세요 #{{{name_variable}}}님," if name_variable else DEFAULT_GREETING
+    return f"{greeting}\n{template}"
+
+
+def tighten_whitespace(template: str) -> str:
+    """줄 끝 공백, 연속 공백, 두 줄 이상 빈 줄 정리"""
+    template = re.sub(r'[ \t]+\n', '\n', template)
+    template = re.sub(r'[ \t]{2,}', ' ', template)
+    template = re.sub(r'\n{3,}', '\n\n', template)
+    return template.strip()
+
+
+def trim_to_sentence(template: str, max_length: int = MAX_TEMPLATE_LENGTH) -> str:
+    """
+    max_length 이내의 마지막 문장 경계에서 뒤를 잘라냄
+    잘라낼 부분에 변수가 있거나 남는 길이가 MIN_TEMPLATE_LENGTH 미만이면 원본 그대로 반환
+    """
+    if len(template) <= max_length:
+        return template
+    cut = None
+    for match in SENTENCE_END_PATTERN.finditer(template, 0, max_length):
+        cut = match.end()
+    if cut is None:
+        return template
+    trimmed = template[:cut].rstrip()
+    if len(trimmed) < MIN_TEMPLATE_LENGTH or VARIABLE_PATTERN.search(template[cut:]):
+        return template
+    return trimmed
+
+
+def deterministic_rewrite(template: str, validation: Dict[str, Any]) -> RewriteResult:
+    """
+    검증 결과에서 규칙으로 고칠 수 있는 문제만 수정
+
+    Args:
+        template: 원본 템플릿
+        validation: _validate_template 결과
+
+    Returns:
+        RewriteResult: 수정된 템플릿과 적용한 수정 종류
+    """
+    result = RewriteResult(template)
+
+    fixed, count = fix_variable_syntax(result.template)
+    if count:
+        result.template = fixed
+        result.fixes.append(FIX_VARIABLE_SYNTAX)
+
+    fixed, count = remove_duplicate_lines(result.template)
+    if count:
+        result.template = fixed
+        result.fixes.append(FIX_DUPLICATE_LINES)
+
+    if len(result.template) > MAX_TEMPLATE_LENGTH:
+        fixed = tighten_whitespace(result.template)
+        if fixed != result.template:
+            result.template = fixed
+            result.fixes.append(FIX_WHITESPACE)
+
+    # 조금 넘친 경우만 문장 경계에서 자름 (많이 넘치면 내용 재구성이 필요하므로 보고만)
+    if MAX_TEMPLATE_LENGTH < len(result.template) <= MAX_TEMPLATE_LENGTH + TRIM_SLACK:
+        fixed = trim_to_sentence(result.template)
+        if fixed != result.template:
+            result.template = fixed
+            result.fixes.append(FIX_SENTENCE_TRIM)
+
+    if not validation["has_greeting"]:
+        variables = VARIABLE_PATTERN.findall(result.template)
+        greeted = add_greeting(result.template, variables)
+        # 인사말 때문에 길이 제한을 넘기면 LLM 재작성에 맡김
+        if len(greeted) <= MAX_TEMPLATE_LENGTH:
+            result.template = greeted
+            result.fixes.append(FIX_GREETING)
+
+    return result
+
+
+def semantic_issues(validation: Dict[str, Any]) -> List[str]:
+    """문구/어조를 바꿔야 해서 LLM 재작성이 필요한 문제"""
+    issues = []
+    if validation["potential_ad_content"]:
+        issues.append("광고성 표현")
+    if not validation["has_politeness"]:
+        issues.append("정중한 어조")
+    return issues
+
+
+def structural_issues(validation: Dict[str, Any]) -> List[str]:
+    """규칙 수정 후에도 남은 구조 문제 (보고용 - LLM 호출 조건 아님)"""
+    issues = []
+    if not validation["length_appropriate"]:
+        issues.append("길이")
+    if validation["variable_count"] == 0:
+        issues.append("변수 미사용")
+    elif validation["variable_count"] > 10:
+        issues.append("변수 과다")
+    if not validation["has_greeting"]:
+        issues.append("인사말")
+    if not 2 <= validation["sentence_count"] <= 5:
+        issues.append("문장 수")
+    return issues
@@ -0,0 +1,200 @@
+"""
+분류별 승인 템플릿 통계
+인덱스 빌드 시 전체 승인 템플릿에서 category_1 / category_2 / business_type별
+변수 빈도, 버튼 빈도, 길이 분위수를 한 번 계산해 인덱스 옆에 저장하고,
+추천 요청에서는 메모리 조회로 제안사항을 만듦
+그룹마다 원시 빈도(변수/버튼/길이별 개수)를 함께 저장해 증분 적재 시 기존 통계에 합침
+"""
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+STATS_FILE = "category_stats.json"
+GROUP_FIELDS = ("category_2", "category_1", "business_type")
+# 통계 계산에 쓰는 메타데이터 필드 (스트리밍 적재 시 이 필드만 누적)
+STATS_FIELDS = GROUP_FIELDS + ("variables", "button", "length", "has_greeting")
+ALL_GROUP = "all"
+
+LENGTH_QUANTILES = (10, 25, 50, 75, 90)
+TOP_N = 10
+# 이보다 템플릿이 적은 그룹은 통계가 불안정하므로 상위 그룹 사용
+MIN_GROUP_SIZE = 3
+# 인사말 사용률이 이 이상이면 인사말 권장
+GREETING_RATIO_THRESHOLD = 0.5
+
+
+def group_key(field: str, value: Any) -> str:
+    return f"{field}={value}"
+
+
+def stats_entry(template: Dict[str, Any]) -> Dict[str, Any]:
+    """템플릿 항목에서 통계에 필요한 메타데이터 필드만 남긴 항목"""
+    metadata = template.get('metadata', {})
+    return {"metadata": {field: metadata.get(field) for field in STATS_FIELDS}}
+
+
+def _group_counts(templates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """템플릿 메타데이터 목록의 원시 빈도 (배치끼리 합칠 수 있는 형태)"""
+    variables = Counter(var for meta in templates for var in dict.fromkeys(meta.get('variables') or []))
+    buttons = Counter(
+        meta.get('button') for meta in templates
+        if meta.get('button') and meta.get('button') != 'X'
+    )
+    lengths = Counter(str(int(meta.get('length') or 0)) for meta in templates)
+    return {
+        "count": len(templates),
+        "variable_counts": dict(variables),
+        "button_counts": dict(buttons),
+        "length_counts": dict(lengths),
+        "greeting_count": sum(1 for meta in templates if meta.get('has_greeting')),
+    }
+
+
+def _merge_counts(left: Dict[str, int], right: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(left)
+    for key, count in right.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def _finalize(counts: Dict[str, Any]) -> Dict[str, Any]:
+    """원시 빈도 → 제안사항에 쓰는 상위 변수/버튼, 길이 분위수, 인사말 사용률"""
+    total = counts["count"]
+    length_counts = counts["length_counts"]
+    lengths = np.repeat(
+        np.array([int(length) for length in length_counts], dtype=np.float64),
+        np.array(list(length_counts.values()), dtype=np.int64)
+    )
+    quantiles = np.percentile(lengths, LENGTH_QUANTILES) if len(lengths) else np.zeros(len(LENGTH_QUANTILES))
+    return {
+        **counts,
+        "variables": Counter(counts["variable_counts"]).most_common(TOP_N),
+        "buttons": Counter(counts["button_counts"]).most_common(TOP_N),
+        "length_quantiles": {f"p{q}": int(round(value)) for q, value in zip(LENGTH_QUANTILES, quantiles)},
+        "greeting_ratio": counts["greeting_count"] / total if total else 0.0,
+    }
+
+
+def is_mergeable(stats: Dict[str, Any]) -> bool:
+    """원시 빈도가 있는 통계인지 (원시 빈도 도입 전에 저장된 통계는 합칠 수 없음)"""
+    return all(key in stats for key in ("variable_counts", "button_counts", "length_counts", "greeting_count"))
+
+
+def merge_group_stats(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """같은 그룹의 두 통계 합치기 (두 배치를 한 번에 계산한 결과와 같음)"""
+    return _finalize({
+        "count": left["count"] + right["count"],
+        "variable_counts": _merge_counts(left["variable_counts"], right["variable_counts"]),
+        "button_counts": _merge_counts(left["button_counts"], right["button_counts"]),
+        "length_counts": _merge_counts(left["length_counts"], right["length_counts"]),
+        "greeting_count": left["greeting_count"] + right["greeting_count"],
+    })
+
+
+def build_category_stats(templates_data: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    승인 템플릿 전체에서 그룹별 통계 계산
+
+    Args:
+        templates_data: JSON의 templates 항목 ({'text', 'metadata'} 목록)
+
+    Returns:
+        Dict: "category_1=회원" 형태의 그룹 키 → 통계 (전체는 "all")
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {ALL_GROUP: []}
+    for template in templates_data:
+        metadata = template.get('metadata', {})
+        groups[ALL_GROUP].append(metadata)
+        for field in GROUP_FIELDS:
+            if metadata.get(field):
+                groups.setdefault(group_key(field, metadata[field]), []).append(metadata)
+    return {key: _finalize(_group_counts(members)) for key, members in groups.items()}
+
+
+def render_suggestions(stats: Dict[str, Any]) -> List[str]:
+    """그룹 통계 → 제안사항 문장"""
+    suggestions = []
+    variables = [var for var, _ in stats["variables"][:3]]
+    if variables:
+        suggestions.append(f"권장 변수: {', '.join(f'#{{{var}}}' for var in variables)}")
+
+    buttons = [button for button, _ in stats["buttons"][:3]]
+    if buttons:
+        suggestions.append(f"추천 버튼: {', '.join(buttons)}")
+
+    lengths = stats["length_quantiles"]
+    if lengths.get("p50"):
+        suggestions.append(f"권장 길이: {lengths['p50']}자 내외 (승인 템플릿 중간 50%: {lengths['p25']}-{lengths['p75']}자)")
+
+    if stats["greeting_ratio"] >= GREETING_RATIO_THRESHOLD:
+        name_variable = next((var for var, _ in stats["variables"] if '성명' in var or '고객' in var), None)
+        greeting = f"'안녕하세요 #{{{name_variable}}}님'" if name_variable else "인사말"
+        suggestions.append(
+            f"이 분류 승인 템플릿의 {stats['greeting_ratio']:.0%}가 {greeting}으로 시작합니다"
+        )
+    return suggestions
+
+
+class CategoryStatsTable:
+    """
+    그룹별 통계와 미리 렌더링한 제안사항 (메모리 조회)
+    """
+
+    def __init__(self, stats: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.stats = stats or {}
+        self.suggestions = {key: render_suggestions(value) for key, value in self.stats.items()}
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def merge(self, stats: Dict[str, Dict[str, Any]]) -> "CategoryStatsTable":
+        """
+        새 배치 통계를 합친 테이블 (증분 적재용)
+        기존 통계가 원시 빈도 없는 예전 형식이면 합칠 수 없으므로 새 배치 통계만 사용
+        """
+        if not all(is_mergeable(value) for value in self.stats.values()):
+            print("WARNING: 예전 형식의 분류별 통계는 합칠 수 없어 새 배치 통계로 교체합니다 (rebuild 권장)")
+            return CategoryStatsTable(stats)
+
+        merged = dict(self.stats)
+        for key, value in stats.items():
+            merged[key] = merge_group_stats(merged[key], value) if key in merged else value
+        return CategoryStatsTable(merged)
+
+    def best_group(
+        self,
+        category_1: Optional[str] = None,
+        category_2: Optional[str] = None,
+        business_type: Optional[str] = None
+    ) -> Optional[str]:
+        """템플릿 수가 충분한 가장 구체적인 그룹 키 (category_2 → category_1 → business_type → 전체)"""
+        values = {"category_2": category_2, "category_1": category_1, "business_type": business_type}
+        for field in GROUP_FIELDS:
+            key = group_key(field, values[field])
+            if values[field] and self.stats.get(key, {}).get("count", 0) >= MIN_GROUP_SIZE:
+                return key
+        return ALL_GROUP if ALL_GROUP in self.stats else None
+
+    def lookup(self, **group_values: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = self.best_group(**group_values)
+        return self.stats.get(key) if key else None
+
+    def suggestions_for(self, **group_values: Optional[str]) -> List[str]:
+        key = self.best_group(**group_values)
+        return list(self.suggestions.get(key, [])) if key else []
+
+    def save(self, directory: str):
+        with open(Path(directory) / STATS_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.stats, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["CategoryStatsTable"]:
+        """저장된 통계 (없으면 None)"""
+        path = Path(directory) / STATS_FILE
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
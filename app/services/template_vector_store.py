@@ -5,18 +5,11 @@ Template Vector Store Implementation
 
 import os
 import json
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 try:
-    import faiss
-    from langchain_community.vectorstores import FAISS
-    from langchain_openai import OpenAIEmbeddings
     from langchain.docstore.document import Document
-    FAISS_AVAILABLE = True
 except ImportError:
-    FAISS_AVAILABLE = False
-
     # Fallback dummy classes
     class Document:
         def __init__(self, page_content: str, metadata: Dict[str, Any] = None):
@@ -25,8 +18,28 @@ except ImportError:
 
 from dotenv import load_dotenv
 
+from app.services.registry import lazy_module_getattr
+from app.services.embeddings import embedding_dimensions_from_env, create_embeddings
+from app.services.vector_backends import VectorCollection, Filters, backends_from_env
+from app.services.template_stats import CategoryStatsTable, build_category_stats, stats_entry, STATS_FIELDS
+from app.corpus.jsonl import is_jsonl, iter_records, iter_template_chunks, RECORD_PATTERN
+from app.corpus.store import TemplateCorpus, is_corpus_dir, resolve_template_data_path, DEFAULT_CORPUS_DIR
+from app.corpus.dedup import (
+    NearDuplicateIndex, diversify_by_cluster, dedup_mode_from_env, is_representative,
+    DEDUP_OFF, DEDUP_COLLAPSE
+)
+
 load_dotenv()
 
+# TEMPLATE_/PATTERN_VECTOR_BACKEND 미설정 시 백엔드 (faiss가 없으면 numpy 전수 검색으로 폴백)
+DEFAULT_TEMPLATE_BACKENDS = ("faiss", "numpy")
+
+# 승인 템플릿/분류별 패턴 코퍼스 디렉토리(Parquet), JSONL 또는 JSON (패턴 테이블은 시작 시 여기서 로드)
+TEMPLATE_DATA_PATH = os.getenv("TEMPLATE_DATA_PATH", DEFAULT_CORPUS_DIR)
+
+# 유사 템플릿 검색 시 근접 중복 클러스터를 걸러낼 여유분 (k × 배수만큼 조회)
+CLUSTER_OVERFETCH = 3
+
 
 class TemplateVectorStoreService:
     """
@@ -34,8 +47,14 @@ class TemplateVectorStoreService:
     승인받은 템플릿, 패턴, 성공 지표 관리
     """
 
-    def __init__(self):
-        """Initialize template vector store"""
+    def __init__(self, embeddings: Optional[Any] = None, backend: Optional[str] = None):
+        """
+        Initialize template vector store
+
+        Args:
+            embeddings: 주입할 임베딩 (없으면 OpenAI 임베딩 생성)
+            backend: 벡터 백엔드 이름 (없으면 TEMPLATE_/PATTERN_VECTOR_BACKEND, 기본 faiss)
+        """
         self.persist_directory = os.getenv(
             "TEMPLATE_PERSIST_DIRECTORY", "./data/vectordb_templates"
         )
@@ -44,104 +63,163 @@ class TemplateVectorStoreService:
         self.templates_dir = f"{self.persist_directory}/templates"
         self.patterns_dir = f"{self.persist_directory}/patterns"
 
-        # Create persist directories
-        Path(self.templates_dir).mkdir(parents=True, exist_ok=True)
-        Path(self.patterns_dir).mkdir(parents=True, exist_ok=True)
-
-        if not FAISS_AVAILABLE:
-            print("WARNING: FAISS not available. Template vector search will be disabled.")
-            self.templates_store = None
-            self.patterns_store = None
-            self.embeddings = None
+        # Matryoshka 축소 차원 (TEMPLATE_EMBEDDING_DIMENSIONS, 템플릿/패턴 스토어 공통)
+        self.embedding_dimensions = embedding_dimensions_from_env("TEMPLATE")
+
+        # 1차 분류 → 패턴 문서 (분류를 이미 알고 있으면 임베딩/검색 없이 조회)
+        self.pattern_table: Dict[str, Document] = {}
+        # 분류/업무유형별 변수·버튼·길이 통계와 제안사항 (인덱스 빌드 시 계산)
+        self.category_stats = CategoryStatsTable()
+        # 근접 중복 템플릿 처리 (collapse: 대표만 임베딩, annotate: 클러스터 정보만 기록, off)
+        self.dedup_mode = dedup_mode_from_env()
+        # 적재된 템플릿의 대표 서명 (추가 적재 묶음을 기존 클러스터에 배정, 첫 적재 시 디스크에서 로드)
+        self._dedup_index: Optional[NearDuplicateIndex] = None
+        self._load_lookup_tables(TEMPLATE_DATA_PATH)
+
+        self.embeddings = None
+        self.templates: Optional[VectorCollection] = None
+        self.patterns: Optional[VectorCollection] = None
+        try:
+            # OpenAI embeddings (주입된 임베딩이 있으면 사용, 설정 시 차원 축소)
+            self.embeddings = create_embeddings(self.embedding_dimensions, embeddings)
+
+            # 컬렉션별 백엔드/인덱스 설정 (TEMPLATE_* / PATTERN_* 환경변수)
+            self.templates = VectorCollection(
+                "template_store",
+                self.templates_dir,
+                self.embeddings,
+                backends=[backend] if backend else backends_from_env("TEMPLATE", DEFAULT_TEMPLATE_BACKENDS),
+                prefix="TEMPLATE",
+                collection_name="kakao_alimtalk_templates",
+            )
+            self.patterns = VectorCollection(
+                "pattern_store",
+                self.patterns_dir,
+                self.embeddings,
+                backends=[backend] if backend else backends_from_env("PATTERN", DEFAULT_TEMPLATE_BACKENDS),
+                prefix="PATTERN",
+                collection_name="kakao_alimtalk_patterns",
+            )
+        except ImportError as e:
+            print(f"WARNING: Vector backend not available ({e}). Template vector search will be disabled.")
             return
 
-        # OpenAI embeddings
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
-            model="text-embedding-3-small",
-        )
-
-        # Vector stores
-        self.templates_store = None
-        self.patterns_store = None
-
         # Initialize vector stores
         self._initialize_vector_stores()
 
+    @staticmethod
+    def _ready(collection: Optional[VectorCollection]) -> bool:
+        return collection is not None and not collection.is_empty()
+
     def _initialize_vector_stores(self):
         """Initialize both template and pattern vector stores"""
-        if not FAISS_AVAILABLE:
-            return
-
         try:
-            # Initialize templates vector store
-            templates_index_path = Path(self.templates_dir) / "index.faiss"
-            if templates_index_path.exists():
-                self.templates_store = FAISS.load_local(
-                    self.templates_dir,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True,
-                )
+            if self.templates.load():
                 print(f"Templates vector store loaded from {self.templates_dir}")
 
-            # Initialize patterns vector store
-            patterns_index_path = Path(self.patterns_dir) / "index.faiss"
-            if patterns_index_path.exists():
-                self.patterns_store = FAISS.load_local(
-                    self.patterns_dir,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True,
-                )
+            if self.patterns.load():
                 print(f"Patterns vector store loaded from {self.patterns_dir}")
 
         except Exception as e:
             print(f"Template vector stores initialization error: {e}")
 
-    def load_template_data(self, json_data_path: str = "./data/kakao_template_vectordb_data.json") -> bool:
+    @staticmethod
+    def _category_key(category: Optional[str]) -> str:
+        return (category or "").strip()
+
+    def _load_lookup_tables(self, json_data_path: str):
+        """
+        패턴 테이블과 분류별 통계 로드
+        통계는 인덱스 옆에 저장된 파일을 우선 사용하고, 없으면 원본 데이터에서 계산
+        (코퍼스 디렉토리는 patterns.parquet과 템플릿의 통계용 열만 읽음)
+        """
+        try:
+            stats = CategoryStatsTable.load(self.templates_dir)
+            if stats is not None:
+                self.category_stats = stats
+        except Exception as e:
+            print(f"Category stats loading error: {e}")
+
+        json_path = resolve_template_data_path(json_data_path)
+        if not json_path.exists():
+            return
+
+        try:
+            if is_corpus_dir(json_path):
+                corpus = TemplateCorpus(json_path)
+                self._set_pattern_table(self._create_pattern_documents(corpus.patterns()))
+                if not self.category_stats:
+                    self.category_stats = CategoryStatsTable(build_category_stats([
+                        stats_entry(template)
+                        for templates_data in corpus.iter_template_chunks(columns=STATS_FIELDS)
+                        for template in templates_data
+                    ]))
+                return
+
+            if is_jsonl(json_path):
+                self._set_pattern_table(self._create_pattern_documents(list(iter_records(json_path, RECORD_PATTERN))))
+                if not self.category_stats:
+                    self.category_stats = CategoryStatsTable(build_category_stats([
+                        stats_entry(template)
+                        for templates_data in iter_template_chunks(json_path)
+                        for template in templates_data
+                    ]))
+                return
+
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._set_pattern_table(self._create_pattern_documents(data.get('patterns', [])))
+            if not self.category_stats:
+                self.category_stats = CategoryStatsTable(build_category_stats(data.get('templates', [])))
+        except Exception as e:
+            print(f"Category lookup tables loading error: {e}")
+
+    def _set_pattern_table(self, pattern_documents: List[Document]):
+        self.pattern_table = {
+            self._category_key(doc.metadata.get('category')): doc
+            for doc in pattern_documents
+            if self._category_key(doc.metadata.get('category'))
+        }
+
+    def load_template_data(
+        self,
+        json_data_path: str = TEMPLATE_DATA_PATH,
+        rebuild: bool = False
+    ) -> bool:
         """
-        JSON 데이터에서 템플릿과 패턴 정보를 로드하여 벡터 데이터베이스에 저장
+        템플릿 코퍼스/JSONL/JSON에서 템플릿과 패턴 정보를 로드하여 벡터 데이터베이스에 저장
+        코퍼스 디렉토리와 JSONL(scripts/ingest_templates.py 출력)은 묶음 단위로 읽으며 바로 임베딩
+
+        Args:
+            json_data_path: 템플릿 코퍼스 디렉토리, JSONL 또는 JSON 경로
+            rebuild: 기존 인덱스를 버리고 전체 재임베딩
         """
-        if not FAISS_AVAILABLE:
-            print("FAISS not available - skipping template data loading")
+        if self.templates is None or self.patterns is None:
+            print("Vector backend not available - skipping template data loading")
             return False
 
         try:
             # JSON 데이터 로드
-            json_path = Path(json_data_path)
+            json_path = resolve_template_data_path(json_data_path)
             if not json_path.exists():
                 print(f"Template JSON data file not found: {json_data_path}")
                 return False
 
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # 템플릿 데이터 처리
-            templates_data = data.get('templates', [])
-            if templates_data:
-                template_documents = self._create_template_documents(templates_data)
-                if template_documents:
-                    if self.templates_store is None:
-                        self.templates_store = FAISS.from_documents(template_documents, self.embeddings)
-                    else:
-                        self.templates_store.add_documents(template_documents)
-
-                    # 저장
-                    self.templates_store.save_local(self.templates_dir)
-                    print(f"템플릿 문서 {len(template_documents)}개 임베딩 완료")
-
-            # 패턴 데이터 처리
-            patterns_data = data.get('patterns', [])
-            if patterns_data:
-                pattern_documents = self._create_pattern_documents(patterns_data)
-                if pattern_documents:
-                    if self.patterns_store is None:
-                        self.patterns_store = FAISS.from_documents(pattern_documents, self.embeddings)
-                    else:
-                        self.patterns_store.add_documents(pattern_documents)
-
-                    # 저장
-                    self.patterns_store.save_local(self.patterns_dir)
-                    print(f"패턴 문서 {len(pattern_documents)}개 임베딩 완료")
+            if is_corpus_dir(json_path):
+                corpus = TemplateCorpus(json_path)
+                self.add_template_chunks(corpus.iter_template_chunks(), rebuild=rebuild)
+                patterns_data = corpus.patterns()
+            elif is_jsonl(json_path):
+                # 패턴 줄은 템플릿 줄 뒤에 있으므로 템플릿 임베딩 후 읽음
+                self.add_template_chunks(iter_template_chunks(json_path), rebuild=rebuild)
+                patterns_data = list(iter_records(json_path, RECORD_PATTERN))
+            else:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.add_template_chunks([data.get('templates', [])], rebuild=rebuild)
+                patterns_data = data.get('patterns', [])
+
+            self.load_pattern_data(patterns_data, rebuild=rebuild)
 
             print("템플릿 벡터 데이터베이스 로딩 완료!")
             return True
@@ -150,7 +228,92 @@ class TemplateVectorStoreService:
             print(f"Template data loading error: {e}")
             return False
 
-    def _create_template_documents(self, templates_data: List[Dict]) -> List[Document]:
+    def add_template_chunks(self, template_chunks: Iterable[List[Dict]], rebuild: bool = False) -> int:
+        """
+        승인 템플릿을 묶음 단위로 임베딩 (전체 목록을 메모리에 올리지 않음)
+        분류별 통계용으로는 통계에 필요한 메타데이터 필드만 누적
+        스토어의 근접 중복 인덱스(이미 적재된 대표 포함)로 클러스터를 배정하고, collapse 모드면 대표 템플릿만 임베딩
+        (적재 스크립트가 기록한 클러스터는 그 실행 안에서만 비교한 결과이므로 스토어 기준으로 다시 배정)
+        (분류별 통계는 중복을 포함한 승인 템플릿 기준, rebuild가 아니면 기존 통계에 합침)
+
+        Args:
+            template_chunks: 템플릿 항목 묶음 순회 (JSONL 묶음, SpreadsheetIngestion 등)
+            rebuild: 기존 인덱스를 버리고 전체 재임베딩 (첫 묶음에만 적용)
+
+        Returns:
+            int: 임베딩한 템플릿 수
+        """
+        total = 0
+        skipped = 0
+        stats_entries = []
+        assigned = 0
+        dedup = self._near_duplicate_index(rebuild) if self.dedup_mode != DEDUP_OFF else None
+        for templates_data in template_chunks:
+            if dedup is not None:
+                dedup.assign(templates_data)
+                assigned += len(templates_data)
+            stats_entries.extend(stats_entry(template) for template in templates_data)
+
+            indexed = templates_data
+            if self.dedup_mode == DEDUP_COLLAPSE:
+                indexed = [template for template in templates_data if is_representative(template)]
+                skipped += len(templates_data) - len(indexed)
+
+            template_documents = self._create_template_documents(indexed)
+            if not template_documents:
+                continue
+            self.templates.add_documents(template_documents, rebuild=rebuild and total == 0)
+            total += len(template_documents)
+
+        if total:
+            self.templates.save()
+            print(f"템플릿 문서 {total}개 임베딩 완료" + (f" (근접 중복 {skipped}개 제외)" if skipped else ""))
+
+            # 분류별 통계: 재구축이면 이번 템플릿 기준으로 교체, 추가 적재면 기존 통계에 합쳐 저장
+            batch_stats = build_category_stats(stats_entries)
+            if rebuild or not self.category_stats:
+                self.category_stats = CategoryStatsTable(batch_stats)
+            else:
+                self.category_stats = self.category_stats.merge(batch_stats)
+            self.category_stats.save(self.templates_dir)
+        if assigned:
+            dedup.save(self.templates_dir)
+        return total
+
+    def _near_duplicate_index(self, rebuild: bool) -> NearDuplicateIndex:
+        """재구축이면 빈 인덱스, 추가 적재면 메모리/디스크의 기존 인덱스"""
+        if rebuild:
+            self._dedup_index = NearDuplicateIndex()
+        elif self._dedup_index is None:
+            try:
+                self._dedup_index = NearDuplicateIndex.load(self.templates_dir)
+            except Exception as e:
+                print(f"Near-duplicate index loading error: {e}")
+            if self._dedup_index is None:
+                if self._ready(self.templates):
+                    print("WARNING: 저장된 근접 중복 서명이 없어 기존 템플릿과는 중복 비교하지 않습니다 (rebuild로 재구축하면 생성)")
+                self._dedup_index = NearDuplicateIndex()
+        return self._dedup_index
+
+    def load_pattern_data(self, patterns_data: List[Dict], rebuild: bool = False) -> int:
+        """
+        분류별 패턴을 패턴 테이블에 반영하고 임베딩
+
+        Returns:
+            int: 임베딩한 패턴 수
+        """
+        if not patterns_data:
+            return 0
+        pattern_documents = self._create_pattern_documents(patterns_data)
+        self._set_pattern_table(pattern_documents)
+        if pattern_documents:
+            self.patterns.add_documents(pattern_documents, rebuild=rebuild)
+            self.patterns.save()
+            print(f"패턴 문서 {len(pattern_documents)}개 임베딩 완료")
+        return len(pattern_documents)
+
+    @staticmethod
+    def _create_template_documents(templates_data: List[Dict]) -> List[Document]:
         """승인받은 템플릿을 Document 객체로 변환"""
         documents = []
 
@@ -248,59 +411,122 @@ class TemplateVectorStoreService:
         k: int = 5
     ) -> List[Document]:
         """유사한 승인받은 템플릿 검색"""
-        if not FAISS_AVAILABLE or not self.templates_store:
+        return [
+            doc for doc, _ in self.find_similar_templates_with_scores(
+                query, category_filter, business_type_filter, k
+            )
+        ]
+
+    def find_similar_templates_with_scores(
+        self,
+        query: str,
+        category_filter: Optional[str] = None,
+        business_type_filter: Optional[str] = None,
+        k: int = 5
+    ) -> List[Tuple[Document, float]]:
+        """유사한 승인받은 템플릿 검색 - (문서, 0~1 관련성 점수) 목록"""
+        if not self._ready(self.templates):
             print("Templates vector search not available")
             return []
 
         try:
-            # 기본 검색
-            results = self.templates_store.similarity_search(query, k=k*2)  # 여유있게 더 가져와서 필터링
-
-            # 필터 적용
-            filtered_results = []
-            for doc in results:
-                metadata = doc.metadata
-
-                # 카테고리 필터
-                if category_filter and metadata.get('category_1') != category_filter:
-                    continue
-
-                # 업무분류 필터
-                if business_type_filter and metadata.get('business_type') != business_type_filter:
-                    continue
-
-                filtered_results.append(doc)
-
-                if len(filtered_results) >= k:
-                    break
-
-            return filtered_results
+            embedding = self.templates.embed_queries([query])[0]
+            return [
+                (doc, VectorCollection.relevance_score(distance))
+                for doc, distance in self._similar_templates_by_vector(
+                    embedding, category_filter, business_type_filter, k
+                )
+            ]
 
         except Exception as e:
             print(f"Similar templates search error: {e}")
             return []
 
+    def _similar_templates_by_vector(
+        self,
+        embedding,
+        category_filter: Optional[str],
+        business_type_filter: Optional[str],
+        k: int
+    ) -> List[Tuple[Document, float]]:
+        """
+        임베딩된 질의로 템플릿 검색 (여유있게 k×2개를 가져와 분류/업무 필터 적용) - (문서, L2 거리)
+        근접 중복 클러스터마다 가장 가까운 템플릿 하나만 남김 (예시 자리를 같은 템플릿 변형이 차지하지 않도록)
+        """
+        filters = {'category_1': category_filter, 'business_type': business_type_filter}
+        results = self.templates.search_by_vectors([embedding], k * CLUSTER_OVERFETCH, filters, overfetch=2)[0]
+        return diversify_by_cluster(results, k)
+
     def find_category_patterns(
         self,
         category: str,
         k: int = 3
     ) -> List[Document]:
-        """특정 카테고리의 패턴 정보 검색"""
-        if not FAISS_AVAILABLE or not self.patterns_store:
+        """
+        특정 카테고리의 패턴 정보 검색
+        패턴 테이블에 있는 분류는 바로 반환하고, 모르는 분류만 유사도 검색
+        """
+        from app.monitoring.metrics import record_cache_lookup
+
+        pattern = self.pattern_table.get(self._category_key(category))
+        record_cache_lookup("category_pattern", hit=pattern is not None)
+        if pattern is not None:
+            return [pattern][:k]
+
+        if not self._ready(self.patterns):
             print("Patterns vector search not available")
             return []
 
         try:
             # 카테고리 기반 검색
-            query = f"카테고리 {category} 패턴 특징 변수 버튼"
-            results = self.patterns_store.similarity_search(query, k=k)
-
-            return results
+            results = self.patterns.search(self._pattern_query(category), k)
+            return [doc for doc, _ in results]
 
         except Exception as e:
             print(f"Category patterns search error: {e}")
             return []
 
+    @staticmethod
+    def _pattern_query(category: str) -> str:
+        """카테고리 패턴 검색 질의"""
+        return f"카테고리 {category} 패턴 특징 변수 버튼"
+
+    def search_many(
+        self,
+        queries: List[str],
+        k: int = 5,
+        filters: Filters = None,
+        collection: str = "templates"
+    ) -> List[List[tuple]]:
+        """
+        여러 질의 일괄 검색
+        질의 전체를 한 번의 임베딩 호출로 벡터화하고 한 번의 행렬 검색으로 처리
+
+        Args:
+            queries: 질의 목록
+            k: 질의별 결과 수
+            filters: 모든 질의에 공통인 메타데이터 필터 또는 질의별 필터 목록
+                     (예: {'category_1': '회원', 'business_type': '서비스'})
+            collection: 'templates' 또는 'patterns'
+
+        Returns:
+            List[List[tuple]]: 질의별 (Document, L2 거리) 목록
+        """
+        collections = {'templates': self.templates, 'patterns': self.patterns}
+        if collection not in collections:
+            raise ValueError(f"지원하지 않는 컬렉션입니다: {collection}")
+
+        target = collections[collection]
+        if not self._ready(target):
+            print(f"{collection} vector search not available")
+            return [[] for _ in queries]
+
+        try:
+            return target.search_many(queries, k, filters)
+        except Exception as e:
+            print(f"Batched {collection} search error: {e}")
+            return [[] for _ in queries]
+
     def get_template_recommendations(
         self,
         user_input: str,
@@ -317,15 +543,26 @@ class TemplateVectorStoreService:
                 'suggestions': []
             }
 
+            # 템플릿 질의와 패턴 질의를 한 번의 임베딩 호출로 처리 (두 컬렉션은 같은 임베딩을 공유)
+            search_templates = self._ready(self.templates)
+            table_pattern = self.pattern_table.get(self._category_key(category_1)) if category_1 else None
+            search_patterns = bool(category_1) and table_pattern is None and self._ready(self.patterns)
+            queries = [user_input] + ([self._pattern_query(category_1)] if search_patterns else [])
+            embeddings = []
+            if search_templates or search_patterns:
+                embeddings = self.templates.embed_queries(queries)
+
             # 1. 유사한 승인 템플릿 검색
-            similar_templates = self.find_similar_templates(
-                user_input,
-                category_filter=category_1,
-                business_type_filter=business_type,
-                k=5
-            )
+            similar_templates = []
+            if search_templates:
+                similar_templates = self._similar_templates_by_vector(
+                    embeddings[0],
+                    category_filter=category_1,
+                    business_type_filter=business_type,
+                    k=5
+                )
 
-            for doc in similar_templates:
+            for doc, _ in similar_templates:
                 template_info = {
                     'text': doc.metadata.get('original_text', ''),
                     'category_1': doc.metadata.get('category_1'),
@@ -338,24 +575,25 @@ class TemplateVectorStoreService:
                 }
                 recommendations['similar_templates'].append(template_info)
 
-            # 2. 카테고리 패턴 정보
-            if category_1:
-                patterns = self.find_category_patterns(category_1)
-                for doc in patterns:
-                    pattern_info = {
-                        'category': doc.metadata.get('category'),
-                        'template_count': doc.metadata.get('template_count'),
-                        'common_variables': doc.metadata.get('common_variables', {}),
-                        'characteristic_words': doc.metadata.get('characteristic_words', {}),
-                        'common_buttons': doc.metadata.get('common_buttons', {}),
-                        'avg_length': doc.metadata.get('avg_length'),
-                        'success_indicators': doc.metadata.get('success_indicators', {})
-                    }
-                    recommendations['category_patterns'].append(pattern_info)
+            # 2. 카테고리 패턴 정보 (테이블에 없는 분류만 검색)
+            patterns = [table_pattern] if table_pattern is not None else []
+            if search_patterns:
+                patterns = [doc for doc, _ in self.patterns.search_by_vectors(embeddings[1:], k=3)[0]]
+            for doc in patterns:
+                pattern_info = {
+                    'category': doc.metadata.get('category'),
+                    'template_count': doc.metadata.get('template_count'),
+                    'common_variables': doc.metadata.get('common_variables', {}),
+                    'characteristic_words': doc.metadata.get('characteristic_words', {}),
+                    'common_buttons': doc.metadata.get('common_buttons', {}),
+                    'avg_length': doc.metadata.get('avg_length'),
+                    'success_indicators': doc.metadata.get('success_indicators', {})
+                }
+                recommendations['category_patterns'].append(pattern_info)
 
             # 3. 개선 제안 생성
             recommendations['suggestions'] = self._generate_suggestions(
-                similar_templates, category_1, category_2
+                [doc for doc, _ in similar_templates], category_1, category_2, business_type
             )
 
             return recommendations
@@ -373,9 +611,18 @@ class TemplateVectorStoreService:
         self,
         similar_templates: List[Document],
         category_1: Optional[str],
-        category_2: Optional[str]
+        category_2: Optional[str],
+        business_type: Optional[str] = None
     ) -> List[str]:
-        """템플릿 생성을 위한 제안사항 생성"""
+        """
+        템플릿 생성을 위한 제안사항 생성
+        분류별 통계가 있으면 미리 계산된 제안사항을 조회하고, 없으면 검색된 문서로 계산
+        """
+        if self.category_stats:
+            return self.category_stats.suggestions_for(
+                category_1=category_1, category_2=category_2, business_type=business_type
+            )
+
         suggestions = []
 
         if similar_templates:
@@ -417,9 +664,16 @@ class TemplateVectorStoreService:
 
         return suggestions
 
+    @property
+    def index_version(self) -> str:
+        """템플릿/패턴 인덱스 버전 (응답 캐시 키용)"""
+        if self.templates is None or self.patterns is None:
+            return "not_available"
+        return f"templates={self.templates.version};patterns={self.patterns.version}"
+
     def get_store_info(self) -> Dict[str, Any]:
         """벡터 스토어 정보 조회"""
-        if not FAISS_AVAILABLE:
+        if self.templates is None or self.patterns is None:
             return {
                 'templates_count': 0,
                 'patterns_count': 0,
@@ -427,20 +681,16 @@ class TemplateVectorStoreService:
             }
 
         try:
-            templates_count = 0
-            patterns_count = 0
-
-            if self.templates_store and hasattr(self.templates_store, 'index'):
-                templates_count = self.templates_store.index.ntotal
-
-            if self.patterns_store and hasattr(self.patterns_store, 'index'):
-                patterns_count = self.patterns_store.index.ntotal
-
             return {
-                'templates_count': templates_count,
-                'patterns_count': patterns_count,
+                'templates_count': self.templates.count(),
+                'patterns_count': self.patterns.count(),
                 'status': 'available',
-                'persist_directory': self.persist_directory
+                'persist_directory': self.persist_directory,
+                'templates_index': self.templates.describe(),
+                'patterns_index': self.patterns.describe(),
+                'pattern_table_size': len(self.pattern_table),
+                'category_stats_groups': len(self.category_stats),
+                'dedup_mode': self.dedup_mode
             }
 
         except Exception as e:
@@ -452,5 +702,5 @@ class TemplateVectorStoreService:
             }
 
 
-# Global instance
-template_vector_store_service = TemplateVectorStoreService()
\ No newline at end of file
+# Global instance (lazily created by the service registry)
+__getattr__ = lazy_module_getattr(__name__, "template_vector_store_service")
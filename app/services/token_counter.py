@@ -0,0 +1,172 @@
+"""
+로컬 토큰 카운터
+tiktoken이 있으면 모델 인코딩(o200k_base / cl100k_base)으로 정확히 세고
+(o200k_base를 불러올 수 없으면 cl100k_base로),
+설치되지 않았거나 인코딩 파일을 받을 수 없는 오프라인 환경에서는 문자 종류별 근사치를 사용
+
+인코더는 인코딩 이름별로 한 번만 생성하여 재사용
+응답에 usage가 없을 때 토큰 서비스가 프롬프트/완성 토큰을 세는 데도 사용
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_ENCODING = "cl100k_base"
+
+# 모델 이름 접두어 → 인코딩 (앞에서부터 먼저 일치하는 항목 사용)
+MODEL_ENCODINGS = (
+    ("gpt-4o", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+    ("text-embedding", "cl100k_base"),
+)
+
+# 인코딩을 불러올 수 없을 때 근사치 전에 시도할 인코딩 (o200k_base가 없는 예전 tiktoken 등)
+FALLBACK_ENCODINGS = {
+    "o200k_base": "cl100k_base",
+}
+
+# 채팅 메시지당 구조 토큰과 응답 시작 토큰 (OpenAI 채팅 포맷)
+TOKENS_PER_MESSAGE = 3
+REPLY_PRIMING_TOKENS = 3
+
+# 근사 계산용 한글 음절당 토큰 수 (인코딩별 한국어 코퍼스 평균)
+HANGUL_TOKENS_PER_CHAR = {
+    "o200k_base": 0.7,
+    "cl100k_base": 1.1,
+}
+
+_APPROX_PIECE = re.compile(r"[가-힣]+|[A-Za-z]+|\d+|\n+|[ \t]+|.", re.DOTALL)
+
+
+def encoding_for_model(model: Optional[str]) -> str:
+    """모델 이름에 해당하는 인코딩 이름"""
+    for prefix, encoding in MODEL_ENCODINGS:
+        if model and model.startswith(prefix):
+            return encoding
+    return DEFAULT_ENCODING
+
+
+class TokenCounter:
+    """
+    인코딩 하나에 대한 토큰 카운터
+    exact가 False면 tiktoken 없이 근사치로 계산 중
+    """
+
+    def __init__(self, encoding_name: str):
+        """
+        Args:
+            encoding_name: tiktoken 인코딩 이름
+        """
+        self.encoding_name = encoding_name
+        self._encoding = self._load_encoding(encoding_name)
+        self.hangul_ratio = HANGUL_TOKENS_PER_CHAR.get(encoding_name, HANGUL_TOKENS_PER_CHAR[DEFAULT_ENCODING])
+
+    @staticmethod
+    def _load_encoding(encoding_name: str):
+        """tiktoken 인코딩 (실패하면 FALLBACK_ENCODINGS, 그래도 실패하면 None → 근사치)"""
+        try:
+            import tiktoken
+        except ImportError:
+            return None
+
+        candidates = [encoding_name]
+        if FALLBACK_ENCODINGS.get(encoding_name):
+            candidates.append(FALLBACK_ENCODINGS[encoding_name])
+        for name in candidates:
+            try:
+                return tiktoken.get_encoding(name)
+            except Exception as e:
+                # 예전 tiktoken에 없는 인코딩, 또는 인코딩 파일을 내려받을 수 없는 오프라인 환경 (TIKTOKEN_CACHE_DIR 미지정)
+                print(f"WARNING: tiktoken 인코딩 {name} 로드 실패 ({e})")
+        print(f"WARNING: {encoding_name} 대신 근사 토큰 수 사용")
+        return None
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: Optional[str]) -> int:
+        """텍스트 토큰 수"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return self._approximate(text)
+
+    def _approximate(self, text: str) -> int:
+        """문자 종류별 근사 토큰 수 (한글 음절, 영단어 4자, 숫자 3자리, 줄바꿈 묶음, 기호 1개당)"""
+        tokens = 0.0
+        for piece in _APPROX_PIECE.findall(text):
+            first = piece[0]
+            if "가" <= first <= "힣":
+                tokens += len(piece) * self.hangul_ratio
+            elif first.isascii() and first.isalpha():
+                tokens += math.ceil(len(piece) / 4)
+            elif first.isdigit():
+                tokens += math.ceil(len(piece) / 3)
+            elif first in " \t":
+                # 공백은 대부분 다음 단어 토큰에 붙음
+                continue
+            else:
+                tokens += 1
+        return max(1, math.ceil(tokens))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """앞에서부터 max_tokens 토큰 이내로 자르기 (문장 경계와 무관한 하드 컷)"""
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            # 한글 음절 중간에서 잘린 바이트는 대체 문자로 디코딩되므로 제거
+            return self._encoding.decode(tokens[:max_tokens]).rstrip("\ufffd")
+
+        if self.count(text) <= max_tokens:
+            return text
+        # 근사 모드: 토큰 수가 단조 증가하므로 이분 탐색으로 최대 길이
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+
+
+@lru_cache(maxsize=None)
+def _counter_for_encoding(encoding_name: str) -> TokenCounter:
+    return TokenCounter(encoding_name)
+
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """모델용 토큰 카운터 (인코딩별로 캐시)"""
+    return _counter_for_encoding(encoding_for_model(model or DEFAULT_MODEL))
+
+
+def count_tokens(text: Optional[str], model: Optional[str] = None) -> int:
+    """텍스트 토큰 수"""
+    return get_token_counter(model).count(text)
+
+
+def message_text(message: Any) -> str:
+    """채팅 메시지(BaseMessage / dict / (role, content) / 문자열)의 본문"""
+    if isinstance(message, str):
+        return message
+    if isinstance(message, dict):
+        return str(message.get("content", ""))
+    if isinstance(message, (tuple, list)) and len(message) == 2:
+        return str(message[1])
+    return str(getattr(message, "content", message))
+
+
+def count_message_tokens(messages: Sequence[Any], model: Optional[str] = None) -> int:
+    """채팅 메시지 목록의 프롬프트 토큰 수 (메시지 구조 토큰 포함)"""
+    counter = get_token_counter(model)
+    return sum(TOKENS_PER_MESSAGE + counter.count(message_text(m)) for m in messages) + REPLY_PRIMING_TOKENS
@@ -11,6 +11,16 @@ from sqlalchemy.orm import Session
 
 from app.models.token_usage import TokenUsage, TokenPricing
 from config.database import SessionLocal
+from app.services.registry import service_registry, lazy_module_getattr
+from app.services.token_counter import count_tokens, count_message_tokens, message_text
+from app.monitoring.timing import span, PERSISTENCE
+from app.monitoring.metrics import (
+    record_cache_lookup,
+    LLM_REQUEST_DURATION,
+    LLM_REQUESTS_TOTAL,
+    LLM_TOKENS_TOTAL,
+    LLM_COST_TOTAL
+)
 
 
 @dataclass
@@ -71,7 +81,9 @@ class TokenService:
 
         # 캐시에서 먼저 확인
         if key in self.pricing_cache:
+            record_cache_lookup("token_pricing", hit=True)
             return self.pricing_cache[key]
+        record_cache_lookup("token_pricing", hit=False)
 
         # DB에서 조회
         try:
@@ -184,9 +196,10 @@ class TokenService:
             )
 
             # 데이터베이스에 저장
-            db.add(token_usage)
-            db.commit()
-            db.refresh(token_usage)
+            with span("token_usage.save", PERSISTENCE):
+                db.add(token_usage)
+                db.commit()
+                db.refresh(token_usage)
 
             return token_usage
 
@@ -305,6 +318,83 @@ class TokenService:
         finally:
             self._close_db_session()
 
+    def _record_llm_metrics(
+        self,
+        metrics: TokenMetrics,
+        request_type: Optional[str],
+        success: bool,
+        llm_latency: Optional[float] = None
+    ):
+        """LLM 호출 지연 및 토큰/비용 메트릭 기록 (지연은 모델 호출 시간을 받은 경우에만)"""
+        model = metrics.model_name
+        LLM_REQUESTS_TOTAL.labels(model=model, status="success" if success else "error").inc()
+        if llm_latency is not None:
+            LLM_REQUEST_DURATION.labels(model=model, request_type=request_type or "unknown").observe(llm_latency)
+        LLM_TOKENS_TOTAL.labels(model=model, type="prompt").inc(metrics.prompt_tokens)
+        LLM_TOKENS_TOTAL.labels(model=model, type="completion").inc(metrics.completion_tokens)
+        LLM_COST_TOTAL.labels(model=model).inc(metrics.total_cost)
+
+    @staticmethod
+    def _reported_usage(llm_response: Any) -> Optional[Tuple[int, int]]:
+        """응답에 포함된 토큰 사용량 (없으면 None)"""
+        if hasattr(llm_response, 'usage') and llm_response.usage is not None:
+            usage = llm_response.usage
+            return usage.prompt_tokens, usage.completion_tokens
+        for attribute in ('response_metadata', 'llm_output'):
+            # 채팅 메시지(invoke)는 response_metadata, 일괄 생성 결과(generate)는 llm_output
+            usage = (getattr(llm_response, attribute, None) or {}).get('token_usage') or {}
+            if usage:
+                return usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+        return None
+
+    @staticmethod
+    def _completion_text(llm_response: Any) -> str:
+        """응답 객체에서 완성 텍스트 추출 (체인 결과 dict / 메시지 / 문자열)"""
+        if isinstance(llm_response, dict):
+            for key in ("answer", "result", "output", "text"):
+                if key in llm_response:
+                    return message_text(llm_response[key])
+            return ""
+        if hasattr(llm_response, "generations"):
+            # 일괄 생성 결과: 모든 후보 완성
+            return "\n".join(generation.text for generations in llm_response.generations for generation in generations)
+        return message_text(llm_response) if llm_response is not None else ""
+
+    def count_usage_locally(
+        self,
+        llm_response: Any,
+        model_name: str,
+        user_query: Optional[str] = None,
+        prompt: Optional[Any] = None
+    ) -> Tuple[int, int]:
+        """
+        usage가 없는 응답의 프롬프트/완성 토큰 수를 로컬 토크나이저로 계산
+        검색 체인 결과는 최종 답변 호출만 계산하며, 컨텍스트 압축(LLMChainExtractor, 검색 문서마다 1회)과
+        후속 질문 재구성 호출의 토큰은 포함하지 않음 (호출 수는 rag_llm_calls_per_request에 기록)
+
+        Args:
+            llm_response: LLM 응답 또는 체인 결과 dict
+            model_name: 모델 이름 (인코딩 선택)
+            user_query: 사용자 질의 (프롬프트 정보가 없을 때 사용)
+            prompt: 실제 전송한 프롬프트 (문자열 또는 메시지 목록)
+        """
+        if isinstance(prompt, str):
+            prompt_tokens = count_message_tokens([prompt], model_name)
+        elif prompt is not None:
+            prompt_tokens = count_message_tokens(list(prompt), model_name)
+        elif isinstance(llm_response, dict):
+            # 검색 체인 결과: 대화 기록 + (검색 문서 + 질문)
+            context = "\n\n".join(
+                getattr(doc, "page_content", "") for doc in llm_response.get("source_documents", [])
+            )
+            question = llm_response.get("question") or user_query or ""
+            history = list(llm_response.get("chat_history") or [])
+            prompt_tokens = count_message_tokens(history + [f"{context}\n\n{question}"], model_name)
+        else:
+            prompt_tokens = count_message_tokens([user_query or ""], model_name)
+
+        return prompt_tokens, count_tokens(self._completion_text(llm_response), model_name)
+
     def track_llm_call(
         self,
         llm_response: Any,
@@ -313,25 +403,22 @@ class TokenService:
         session_id: Optional[str] = None,
         request_type: Optional[str] = None,
         user_query: Optional[str] = None,
-        processing_time: float = 0.0
+        processing_time: float = 0.0,
+        prompt: Optional[Any] = None,
+        llm_latency: Optional[float] = None
     ) -> Tuple[TokenMetrics, TokenUsage]:
-        """LLM 호출 추적"""
+        """
+        LLM 호출 추적
+        응답에 usage가 없으면 (체인 결과 dict 등) 프롬프트/완성 텍스트를 로컬에서 토큰화하여 계산
+        processing_time은 요청 전체 처리 시간(사용량 기록용), llm_latency는 모델 호출만의 시간
+        (llm_request_duration_seconds에 기록, 없으면 지연은 기록하지 않음)
+        """
         try:
             # OpenAI response에서 토큰 정보 추출
-            if hasattr(llm_response, 'usage'):
-                usage = llm_response.usage
-                prompt_tokens = usage.prompt_tokens
-                completion_tokens = usage.completion_tokens
-            elif hasattr(llm_response, 'response_metadata'):
-                usage = llm_response.response_metadata.get('token_usage', {})
-                prompt_tokens = usage.get('prompt_tokens', 0)
-                completion_tokens = usage.get('completion_tokens', 0)
-            else:
-                # 기본값 설정
-                prompt_tokens = len(str(user_query).split()) * 1.5 if user_query else 100
-                completion_tokens = len(str(llm_response).split()) * 1.5 if llm_response else 50
-                prompt_tokens = int(prompt_tokens)
-                completion_tokens = int(completion_tokens)
+            usage = self._reported_usage(llm_response)
+            if usage is None:
+                usage = self.count_usage_locally(llm_response, model_name, user_query, prompt)
+            prompt_tokens, completion_tokens = usage
 
             # 메트릭 생성
             metrics = self.create_token_metrics(
@@ -342,8 +429,11 @@ class TokenService:
                 processing_time=processing_time
             )
 
+            # 모델별 지연/토큰/비용 메트릭
+            self._record_llm_metrics(metrics, request_type, success=True, llm_latency=llm_latency)
+
             # 응답 길이 계산
-            response_length = len(str(llm_response)) if llm_response else 0
+            response_length = len(self._completion_text(llm_response))
 
             # 데이터베이스에 저장
             token_usage = self.save_token_usage(
@@ -361,6 +451,7 @@ class TokenService:
             print(f"LLM 호출 추적 중 오류: {e}")
             # 오류 발생 시 기본 메트릭 반환
             metrics = TokenMetrics(model_name=model_name, provider=provider)
+            LLM_REQUESTS_TOTAL.labels(model=model_name, status="error").inc()
             token_usage = self.save_token_usage(
                 metrics=metrics,
                 session_id=session_id,
@@ -372,8 +463,8 @@ class TokenService:
             return metrics, token_usage
 
 
-# 전역 토큰 서비스 인스턴스
-token_service = TokenService()
+# 전역 토큰 서비스 인스턴스 (서비스 레지스트리에서 지연 생성)
+__getattr__ = lazy_module_getattr(__name__, "token_service")
 
 
 def initialize_default_pricing():
@@ -388,6 +479,8 @@ def initialize_default_pricing():
         {"provider": "openai", "model": "gpt-3.5-turbo-instruct", "prompt": 0.0015, "completion": 0.002},
     ]
 
+    token_service = service_registry.get("token_service")
+
     try:
         for pricing_info in default_pricings:
             try:
@@ -0,0 +1,672 @@
+"""
+벡터 스토어 백엔드
+백엔드(faiss / chroma / numpy)는 이름으로 등록되며 벡터 저장, 검색, 영속화만 담당하고
+임베딩(질의 캐시 포함), 배치 검색, 메타데이터 필터(마스크 미지원 백엔드), 단계 계측은 VectorCollection이 한 번만 구현
+
+모든 백엔드는 L2 제곱 거리를 반환하므로 관련성 점수(1 - 거리/√2)도 공통으로 계산
+"""
+import os
+import json
+import math
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+try:
+    from langchain.docstore.document import Document
+except ImportError:
+    class Document:
+        def __init__(self, page_content: str, metadata: Dict[str, Any] = None):
+            self.page_content = page_content
+            self.metadata = metadata or {}
+
+from app.services.embeddings import QueryEmbeddingCache, expected_dimensions, embedding_meta
+from app.monitoring.timing import span, EMBEDDING, SEARCH
+
+# 메타데이터 필터 검색 시 과다 조회 배수
+FILTER_OVERFETCH = 2
+
+BACKEND_META_FILE = "index_meta.json"
+
+SearchResults = List[List[Tuple[Any, float]]]
+Filters = Optional[Union[Dict[str, Any], Sequence[Optional[Dict[str, Any]]]]]
+
+
+class VectorBackend(ABC):
+    """
+    벡터 백엔드 인터페이스
+    벡터는 호출자가 임베딩하여 전달하며, search는 질의별 (문서, L2 제곱 거리) 목록을 반환
+    """
+    name = ""
+    # True면 search가 메타데이터 필터를 직접 적용 (False면 VectorCollection이 과다 조회 후 거름)
+    supports_filters = False
+
+    def __init__(self, directory: str, prefix: str, **options):
+        """
+        Args:
+            directory: 영속화 디렉토리
+            prefix: 백엔드별 환경변수 접두어 (POLICY / TEMPLATE / PATTERN)
+        """
+        self.directory = directory
+        self.prefix = prefix
+
+    @abstractmethod
+    def exists(self) -> bool:
+        """저장된 데이터가 있는지 여부"""
+
+    @abstractmethod
+    def load(self, dimensions: Optional[int] = None):
+        """저장된 데이터 로드 (dimensions가 다르면 ValueError)"""
+
+    @abstractmethod
+    def add(self, documents: List[Any], vectors: np.ndarray):
+        """문서와 벡터 추가"""
+
+    @abstractmethod
+    def search(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        filters: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ) -> SearchResults:
+        """질의 벡터 행렬 검색 (filters는 supports_filters인 백엔드에만 전달되는 질의별 필터)"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """저장된 벡터 수"""
+
+    @abstractmethod
+    def reset(self):
+        """저장된 데이터 폐기 (다음 add에서 새로 생성)"""
+
+    def save(self, meta: Optional[Dict[str, Any]] = None):
+        """영속화 (기본: 메타데이터만 기록)"""
+        write_backend_meta(self.directory, {"backend": self.name, "ntotal": self.count(), **(meta or {})})
+
+    def describe(self) -> Dict[str, Any]:
+        """인덱스 정보"""
+        return {"ntotal": self.count()}
+
+
+_BACKENDS: Dict[str, Type[VectorBackend]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type[VectorBackend]], Type[VectorBackend]]:
+    """백엔드 클래스를 이름으로 등록하는 데코레이터"""
+    def decorator(cls: Type[VectorBackend]) -> Type[VectorBackend]:
+        cls.name = name
+        _BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def available_backends() -> List[str]:
+    """등록된 백엔드 이름"""
+    return list(_BACKENDS)
+
+
+def create_backend(names: Union[str, Sequence[str]], directory: str, prefix: str, **options) -> VectorBackend:
+    """
+    이름 순서대로 백엔드 생성을 시도하여 처음 성공한 백엔드 반환
+    (의존성이 없어 ImportError가 나면 다음 이름으로 폴백)
+    """
+    if isinstance(names, str):
+        names = [names]
+
+    errors = []
+    for name in names:
+        if name not in _BACKENDS:
+            raise ValueError(f"등록되지 않은 벡터 백엔드입니다: {name} (사용 가능: {', '.join(_BACKENDS)})")
+        try:
+            return _BACKENDS[name](directory, prefix, **options)
+        except ImportError as e:
+            errors.append(f"{name}: {e}")
+            print(f"WARNING: {name} 백엔드를 사용할 수 없습니다 ({e})")
+
+    raise ImportError(f"사용 가능한 벡터 백엔드가 없습니다 - {'; '.join(errors)}")
+
+
+def backends_from_env(prefix: str, default: Sequence[str]) -> List[str]:
+    """
+    {PREFIX}_VECTOR_BACKEND → VECTOR_BACKEND 순으로 백엔드 이름 조회
+    쉼표로 여러 개를 지정하면 앞에서부터 폴백 순서로 사용
+    """
+    value = os.getenv(f"{prefix}_VECTOR_BACKEND") or os.getenv("VECTOR_BACKEND")
+    if not value:
+        return list(default)
+    return [name.strip().lower() for name in value.split(",") if name.strip()]
+
+
+def write_backend_meta(directory: str, meta: Dict[str, Any]):
+    """백엔드 메타데이터 저장"""
+    with open(Path(directory) / BACKEND_META_FILE, "w", encoding="utf-8") as f:
+        json.dump({**meta, "built_at": datetime.now().isoformat()}, f, ensure_ascii=False, indent=2)
+
+
+def matches_filter(metadata: Dict[str, Any], filter_dict: Optional[Dict[str, Any]]) -> bool:
+    """메타데이터 일치 필터 (값이 None인 조건은 무시)"""
+    if not filter_dict:
+        return True
+    return all(metadata.get(key) == value for key, value in filter_dict.items() if value is not None)
+
+
+def _check_dimensions(actual: int, expected: Optional[int], directory: str):
+    if expected is not None and actual != expected:
+        raise ValueError(
+            f"인덱스 차원({actual})이 임베딩 차원({expected})과 다릅니다: {directory} "
+            f"- scripts/re_embed_with_new_model.py --dimensions {expected} 로 재임베딩하세요"
+        )
+
+
+# ---------------------------------------------------------------------------
+# 백엔드 구현
+# ---------------------------------------------------------------------------
+
+@register_backend("faiss")
+class FaissBackend(VectorBackend):
+    """LangChain FAISS 스토어 (인덱스 유형/양자화 설정은 faiss_index가 담당)"""
+
+    def __init__(self, directory: str, prefix: str, embeddings: Any = None, **options):
+        """초기화"""
+        super().__init__(directory, prefix)
+        from app.services import faiss_index
+        if not faiss_index.FAISS_AVAILABLE:
+            raise ImportError("faiss 또는 langchain_community가 설치되지 않았습니다")
+
+        self._faiss = faiss_index
+        self.config = faiss_index.index_config_from_env(prefix)
+        self.embeddings = embeddings
+        self.store = None
+
+    INDEX_FILES = ("index.faiss", "index.pkl")
+
+    @classmethod
+    def persisted(cls, directory: str) -> bool:
+        """디렉토리에 저장된 인덱스가 있는지 (faiss import 없이 확인)"""
+        return all((Path(directory) / name).exists() for name in cls.INDEX_FILES)
+
+    def exists(self) -> bool:
+        return self.persisted(self.directory)
+
+    def load(self, dimensions: Optional[int] = None):
+        self.store = self._faiss.load_faiss_store(self.directory, self.embeddings, self.config, dimensions)
+
+    def add(self, documents: List[Any], vectors: np.ndarray):
+        if self.store is None:
+            self.store = self._faiss.create_faiss_store(documents, self.embeddings, self.config, vectors)
+        else:
+            self._faiss.add_documents_to_store(self.store, documents, self.embeddings, vectors)
+
+    def search(self, vectors: np.ndarray, k: int, filters=None) -> SearchResults:
+        if self.store is None:
+            return [[] for _ in range(len(vectors))]
+        return self._faiss.search_many_by_vectors(self.store, vectors, k)
+
+    def count(self) -> int:
+        return self.store.index.ntotal if self.store is not None else 0
+
+    def reset(self):
+        self.store = None
+
+    def save(self, meta: Optional[Dict[str, Any]] = None):
+        if self.store is None:
+            return
+        self._faiss.save_faiss_store(self.store, self.directory, self.config, {"backend": self.name, **(meta or {})})
+
+    def describe(self) -> Dict[str, Any]:
+        return self._faiss.describe_index(self.store) or {"ntotal": 0}
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (연속 float32 배열 반환, 영벡터는 그대로)"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class ExactIndex:
+    """
+    정규화 벡터 전수 검색 인덱스 (FAISS 인덱스와 같은 search 인터페이스)
+    단위 벡터에서는 ||q - x||² = 2 - 2q·x이므로 내적 한 번과 argpartition으로 정확한 상위 k를 구함
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        """
+        Args:
+            vectors: (n, d) 벡터 행렬 (정규화되지 않았으면 정규화, 정규화된 memmap은 복사 없이 사용)
+        """
+        vectors = np.asanyarray(vectors)
+        norms = np.linalg.norm(vectors, axis=1) if len(vectors) else np.empty(0)
+        if vectors.dtype != np.float32 or not vectors.flags.c_contiguous or not np.allclose(norms, 1.0, atol=1e-3):
+            vectors = normalize_rows(vectors)
+        self.vectors = vectors
+
+    @property
+    def ntotal(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def d(self) -> int:
+        return self.vectors.shape[1]
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        masks: Optional[Sequence[Optional[np.ndarray]]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의별 상위 k (L2 제곱 거리, 인덱스) - 결과가 k보다 적으면 FAISS와 같이 -1로 채움
+
+        Args:
+            queries: (m, d) 질의 행렬
+            k: 질의당 결과 수
+            masks: 질의별 후보 불리언 마스크 (None이면 전체)
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if self.ntotal == 0 or k <= 0:
+            return distances, ids
+
+        # 질의 하나면 행렬-벡터 곱, 여러 개면 한 번의 행렬 곱
+        if len(queries) == 1:
+            scores = (self.vectors @ queries[0])[None, :]
+        else:
+            scores = queries @ self.vectors.T
+
+        for row, score in enumerate(scores):
+            mask = masks[row] if masks is not None else None
+            candidates = self.ntotal if mask is None else int(mask.sum())
+            top_k = min(k, candidates)
+            if top_k == 0:
+                continue
+            if mask is not None:
+                score = np.where(mask, score, -np.inf)
+
+            top = np.argpartition(-score, top_k - 1)[:top_k] if top_k < self.ntotal else np.arange(self.ntotal)
+            top = top[np.argsort(-score[top], kind="stable")]
+            ids[row, :top_k] = top
+            distances[row, :top_k] = np.maximum(2.0 - 2.0 * score[top], 0.0)
+        return distances, ids
+
+
+@register_backend("numpy")
+class NumpyBackend(VectorBackend):
+    """
+    NumPy 전수(brute-force) 검색 백엔드
+    정규화된 float32 연속 배열 하나에 벡터를 두고 (저장 파일은 memmap으로 로드) 정확한 상위 k를 계산
+    메타데이터 필터는 필드/값별 불리언 마스크로 검색 전에 적용 (과다 조회 없이 정확한 필터 결과)
+    FAISS/LangChain 없이 동작하므로 수백 개 청크 규모의 정책 코퍼스 기본 백엔드로 사용
+    """
+    VECTORS_FILE = "numpy_vectors.npy"
+    DOCUMENTS_FILE = "numpy_documents.json"
+    supports_filters = True
+
+    def __init__(self, directory: str, prefix: str, **options):
+        """초기화"""
+        super().__init__(directory, prefix)
+        self.mmap = os.getenv(f"{prefix}_NUMPY_MMAP", os.getenv("NUMPY_MMAP", "true")).lower() == "true"
+        self.index: Optional[ExactIndex] = None
+        self.documents: List[Any] = []
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+
+    @classmethod
+    def persisted(cls, directory: str) -> bool:
+        """디렉토리에 저장된 인덱스가 있는지"""
+        return (Path(directory) / cls.VECTORS_FILE).exists() and (Path(directory) / cls.DOCUMENTS_FILE).exists()
+
+    def exists(self) -> bool:
+        return self.persisted(self.directory)
+
+    def load(self, dimensions: Optional[int] = None):
+        vectors = np.load(Path(self.directory) / self.VECTORS_FILE, mmap_mode="r" if self.mmap else None)
+        _check_dimensions(vectors.shape[1], dimensions, self.directory)
+        with open(Path(self.directory) / self.DOCUMENTS_FILE, "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        self.index = ExactIndex(vectors)
+        self.documents = [Document(page_content=r["page_content"], metadata=r["metadata"]) for r in records]
+        self._masks = {}
+
+    def add(self, documents: List[Any], vectors: np.ndarray):
+        vectors = normalize_rows(vectors)
+        if self.index is not None:
+            vectors = np.concatenate([self.index.vectors, vectors])
+        self.index = ExactIndex(vectors)
+        self.documents.extend(documents)
+        self._masks = {}
+
+    def _field_mask(self, key: str, value: Any) -> np.ndarray:
+        """필드/값 일치 마스크 (문서가 바뀔 때까지 캐시)"""
+        cache_key = (key, json.dumps(value, sort_keys=True, default=str))
+        mask = self._masks.get(cache_key)
+        if mask is None:
+            mask = np.fromiter(
+                (doc.metadata.get(key) == value for doc in self.documents),
+                dtype=bool, count=len(self.documents)
+            )
+            self._masks[cache_key] = mask
+        return mask
+
+    def metadata_mask(self, filter_dict: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """필터 조건의 불리언 마스크 (조건이 없으면 None, matches_filter와 같은 의미)"""
+        conditions = [(key, value) for key, value in (filter_dict or {}).items() if value is not None]
+        if not conditions:
+            return None
+        mask = self._field_mask(*conditions[0])
+        for key, value in conditions[1:]:
+            mask = mask & self._field_mask(key, value)
+        return mask
+
+    def search(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        filters: Optional[Sequence[Optional[Dict[str, Any]]]] = None
+    ) -> SearchResults:
+        if self.index is None or self.index.ntotal == 0:
+            return [[] for _ in range(len(vectors))]
+
+        masks = [self.metadata_mask(filter_dict) for filter_dict in filters] if filters else None
+        distances, ids = self.index.search(vectors, k, masks)
+        return [
+            [(self.documents[i], float(distance)) for i, distance in zip(row_ids, row_distances) if i >= 0]
+            for row_ids, row_distances in zip(ids, distances)
+        ]
+
+    def count(self) -> int:
+        return 0 if self.index is None else self.index.ntotal
+
+    def reset(self):
+        self.index, self.documents, self._masks = None, [], {}
+
+    def save(self, meta: Optional[Dict[str, Any]] = None):
+        if self.index is None:
+            return
+        vectors = self.index.vectors
+        if isinstance(vectors, np.memmap):
+            # 같은 파일을 덮어쓰기 전에 메모리로 복사
+            vectors = np.array(vectors)
+        # 프로세스별 임시 파일에 쓴 뒤 교체 (여러 워커가 동시에 저장해도 읽는 쪽은 완성된 파일만 봄)
+        suffix = f".{os.getpid()}.tmp"
+        vectors_path = Path(self.directory) / self.VECTORS_FILE
+        documents_path = Path(self.directory) / self.DOCUMENTS_FILE
+        with open(f"{vectors_path}{suffix}", "wb") as f:
+            np.save(f, vectors)
+        with open(f"{documents_path}{suffix}", "w", encoding="utf-8") as f:
+            json.dump(
+                [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in self.documents],
+                f, ensure_ascii=False, default=str
+            )
+        os.replace(f"{vectors_path}{suffix}", vectors_path)
+        os.replace(f"{documents_path}{suffix}", documents_path)
+        super().save({"dimension": self.index.d, "normalized": True, **(meta or {})})
+
+    def describe(self) -> Dict[str, Any]:
+        if self.index is None:
+            return {"index_type": "exact", "ntotal": 0}
+        return {
+            "index_type": "exact",
+            "ntotal": self.count(),
+            "dimension": self.index.d,
+            "code_size_bytes": int(self.index.vectors.nbytes),
+            "memory_mapped": isinstance(self.index.vectors, np.memmap)
+        }
+
+
+@register_backend("chroma")
+class ChromaBackend(VectorBackend):
+    """
+    Chroma 영속 컬렉션
+    리스트/딕셔너리 메타데이터는 Chroma가 허용하지 않으므로 JSON 문자열로 저장 후 읽을 때 복원
+    """
+    JSON_FIELDS_KEY = "_json_fields"
+    ADD_BATCH_SIZE = 1000
+
+    def __init__(self, directory: str, prefix: str, collection_name: Optional[str] = None, **options):
+        """초기화"""
+        super().__init__(directory, prefix)
+        import chromadb
+        from chromadb.config import Settings
+
+        self.client = chromadb.PersistentClient(
+            path=directory,
+            settings=Settings(anonymized_telemetry=False, allow_reset=True)
+        )
+        self.collection_name = collection_name or f"kakao_alimtalk_{prefix.lower()}"
+        self.collection = None
+
+    def exists(self) -> bool:
+        return any(col.name == self.collection_name for col in self.client.list_collections())
+
+    def load(self, dimensions: Optional[int] = None):
+        self.collection = self.client.get_collection(self.collection_name)
+        sample = self.collection.peek(1).get("embeddings")
+        if sample is not None and len(sample) > 0:
+            _check_dimensions(len(sample[0]), dimensions, self.directory)
+
+    @classmethod
+    def _encode_metadata(cls, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        encoded, json_fields = {}, []
+        for key, value in metadata.items():
+            if value is None:
+                continue
+            if isinstance(value, (str, int, float, bool)):
+                encoded[key] = value
+            else:
+                encoded[key] = json.dumps(value, ensure_ascii=False, default=str)
+                json_fields.append(key)
+        if json_fields:
+            encoded[cls.JSON_FIELDS_KEY] = ",".join(json_fields)
+        return encoded
+
+    @classmethod
+    def _decode_metadata(cls, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        metadata = dict(metadata or {})
+        for key in filter(None, metadata.pop(cls.JSON_FIELDS_KEY, "").split(",")):
+            metadata[key] = json.loads(metadata[key])
+        return metadata
+
+    def add(self, documents: List[Any], vectors: np.ndarray):
+        if self.collection is None:
+            self.collection = self.client.get_or_create_collection(
+                self.collection_name, metadata={"hnsw:space": "l2"}
+            )
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        for start in range(0, len(documents), self.ADD_BATCH_SIZE):
+            batch = documents[start:start + self.ADD_BATCH_SIZE]
+            self.collection.add(
+                ids=[str(uuid.uuid4()) for _ in batch],
+                embeddings=vectors[start:start + len(batch)].tolist(),
+                documents=[doc.page_content for doc in batch],
+                metadatas=[self._encode_metadata(doc.metadata) for doc in batch]
+            )
+
+    def search(self, vectors: np.ndarray, k: int, filters=None) -> SearchResults:
+        total = self.count()
+        if total == 0:
+            return [[] for _ in range(len(vectors))]
+
+        response = self.collection.query(
+            query_embeddings=np.asarray(vectors, dtype=np.float32).tolist(),
+            n_results=min(k, total),
+            include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [
+                (Document(page_content=text, metadata=self._decode_metadata(metadata)), float(distance))
+                for text, metadata, distance in zip(texts, metadatas, distances)
+            ]
+            for texts, metadatas, distances in zip(
+                response["documents"], response["metadatas"], response["distances"]
+            )
+        ]
+
+    def count(self) -> int:
+        return self.collection.count() if self.collection is not None else 0
+
+    def reset(self):
+        if self.exists():
+            self.client.delete_collection(self.collection_name)
+        self.collection = None
+
+    def describe(self) -> Dict[str, Any]:
+        return {"index_type": "hnsw", "collection": self.collection_name, "ntotal": self.count()}
+
+
+# ---------------------------------------------------------------------------
+# 공통 컬렉션
+# ---------------------------------------------------------------------------
+
+class VectorCollection:
+    """
+    이름 있는 벡터 컬렉션
+    임베딩 → 백엔드 검색 → 메타데이터 필터 → 단계 계측을 모든 백엔드에 공통으로 제공
+    """
+
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        embeddings: Any,
+        backends: Union[str, Sequence[str]],
+        prefix: str,
+        **options
+    ):
+        """
+        Args:
+            name: 컬렉션 이름 (span/캐시 이름 접두어, 예: policy_store)
+            directory: 영속화 디렉토리
+            embeddings: 임베딩 백엔드
+            backends: 백엔드 이름 (여러 개면 폴백 순서)
+            prefix: 백엔드 설정 환경변수 접두어
+            **options: 백엔드별 옵션 (collection_name 등)
+        """
+        self.name = name
+        self.directory = directory
+        self.embeddings = embeddings
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+        self.backend = create_backend(backends, directory, prefix, embeddings=embeddings, **options)
+        self.query_cache = QueryEmbeddingCache(f"{name}_query_embedding")
+        # 인덱스 버전 구성 요소 (저장된 빌드 시각, 저장 전 메모리 변경 횟수)
+        self._built_at: Optional[str] = None
+        self._revision = 0
+
+    @property
+    def backend_name(self) -> str:
+        return self.backend.name
+
+    def load(self) -> bool:
+        """저장된 데이터가 있으면 로드"""
+        if not self.backend.exists():
+            return False
+        self.backend.load(expected_dimensions(self.embeddings))
+        self._built_at = self._read_built_at()
+        return True
+
+    def count(self) -> int:
+        return self.backend.count()
+
+    def is_empty(self) -> bool:
+        return self.backend.count() == 0
+
+    def add_documents(self, documents: List[Any], rebuild: bool = False):
+        """문서 임베딩 후 추가 (rebuild면 기존 데이터 폐기)"""
+        with span(f"{self.name}.embed_documents", EMBEDDING):
+            vectors = np.asarray(
+                self.embeddings.embed_documents([doc.page_content for doc in documents]),
+                dtype=np.float32
+            )
+        if rebuild:
+            self.backend.reset()
+        self.backend.add(documents, vectors)
+        self._built_at = None
+        self._revision += 1
+
+    def save(self):
+        """백엔드 영속화 (임베딩 모델/차원 메타데이터 포함)"""
+        self.backend.save(embedding_meta(self.embeddings))
+        self._built_at = self._read_built_at()
+
+    def _read_built_at(self) -> Optional[str]:
+        path = Path(self.directory) / BACKEND_META_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("built_at")
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def version(self) -> str:
+        """
+        인덱스 버전 (응답 캐시 키용)
+        같은 저장 인덱스를 로드한 워커끼리는 같은 값, 재임베딩/문서 추가 시 변경
+        """
+        return f"{self.backend_name}:{self.count()}:{self._built_at or f'mem{self._revision}'}"
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """질의 임베딩 (캐시 미스만 한 번의 배치 호출)"""
+        with span(f"{self.name}.embed_query", EMBEDDING):
+            return self.query_cache.embed(self.embeddings, queries)
+
+    def search_by_vectors(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        filters: Filters = None,
+        overfetch: int = FILTER_OVERFETCH
+    ) -> SearchResults:
+        """
+        임베딩된 질의들을 한 번의 행렬 검색으로 처리
+        filters는 모든 질의에 공통인 딕셔너리 또는 질의별 목록
+        마스크를 지원하는 백엔드는 필터를 검색에 직접 적용하고, 나머지는 k × overfetch개를 조회 후 거름
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * len(vectors)
+        if len(filters) != len(vectors):
+            raise ValueError(f"filters 수({len(filters)})가 질의 수({len(vectors)})와 다릅니다")
+
+        if self.backend.supports_filters:
+            with span(f"{self.name}.search", SEARCH):
+                return self.backend.search(vectors, k, filters if any(filters) else None)
+
+        fetch_k = k * overfetch if any(filters) else k
+        with span(f"{self.name}.search", SEARCH):
+            results = self.backend.search(vectors, fetch_k)
+        return [
+            [(doc, distance) for doc, distance in rows if matches_filter(doc.metadata, filter_dict)][:k]
+            for rows, filter_dict in zip(results, filters)
+        ]
+
+    def search_many(
+        self,
+        queries: List[str],
+        k: int,
+        filters: Filters = None,
+        overfetch: int = FILTER_OVERFETCH
+    ) -> SearchResults:
+        """질의 목록 일괄 검색 - 질의별 (문서, L2 거리) 목록"""
+        if not queries:
+            return []
+        return self.search_by_vectors(self.embed_queries(queries), k, filters, overfetch)
+
+    def search(self, query: str, k: int, filter_dict: Optional[Dict[str, Any]] = None) -> List[Tuple[Any, float]]:
+        """단일 질의 검색"""
+        return self.search_many([query], k, filter_dict)[0]
+
+    @staticmethod
+    def relevance_score(distance: float) -> float:
+        """L2 제곱 거리 → 0~1 관련성 점수 (LangChain 유클리드 relevance 함수와 동일)"""
+        return 1.0 - distance / math.sqrt(2)
+
+    def describe(self) -> Dict[str, Any]:
+        """백엔드/인덱스 정보"""
+        return {"backend": self.backend_name, "version": self.version, **self.backend.describe()}
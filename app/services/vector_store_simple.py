@@ -1,25 +1,18 @@
 """
-Simple Vector Store Implementation using FAISS
-Fallback for ChromaDB when dependencies are missing
+Policy vector store service
+Chunks policy markdown documents and stores them in a pluggable vector backend
+(numpy exact search by default, faiss / chroma selectable with POLICY_VECTOR_BACKEND)
 """
 
 import os
-import json
-import pickle
+import threading
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 try:
-    import faiss
-    from langchain_community.vectorstores import FAISS
-    from langchain_openai import OpenAIEmbeddings
     from langchain.text_splitter import RecursiveCharacterTextSplitter
     from langchain.docstore.document import Document
-
-    FAISS_AVAILABLE = True
 except ImportError:
-    FAISS_AVAILABLE = False
-
     # Fallback dummy classes
     class Document:
         def __init__(self, page_content: str, metadata: Dict[str, Any] = None):
@@ -36,76 +29,161 @@ except ImportError:
 
 from dotenv import load_dotenv
 
+from app.services.registry import lazy_module_getattr
+from app.services.embeddings import embedding_dimensions_from_env, create_embeddings
+from app.services.vector_backends import VectorCollection, Filters, backends_from_env, NumpyBackend, FaissBackend
+from app.services.policy_chunker import split_policy_markdown, dedupe_chunks
+
 load_dotenv()
 
+# Backend fallback order when POLICY_VECTOR_BACKEND is not set.
+# The policy corpus is a few hundred chunks, so exact NumPy search beats loading FAISS
+# and needs no optional dependency.
+DEFAULT_POLICY_BACKENDS = ("numpy",)
+# Policy backend before numpy became the default; its persisted index is still served
+# until a numpy index is built (POLICY_VECTOR_BACKEND=numpy + re_embed_with_new_model.py --stores policy)
+LEGACY_POLICY_BACKENDS = ("faiss",)
+
+# Policy chunker: "markdown" (heading/sentence aware, no overlap) or "recursive" (legacy)
+POLICY_CHUNKER = os.getenv("POLICY_CHUNKER", "markdown").lower()
+POLICY_CHUNK_SIZE = int(os.getenv("POLICY_CHUNK_SIZE", "1000"))
+POLICY_CHUNK_OVERLAP = int(os.getenv("POLICY_CHUNK_OVERLAP", "200"))
+
+# Build the index from POLICIES_DIR at startup (service warm-up) when nothing is persisted.
+# Off by default: production indexes are built with scripts/re_embed_with_new_model.py --stores policy
+POLICY_AUTO_EMBED = os.getenv("POLICY_AUTO_EMBED", "false").lower() == "true"
+
+
+def default_policy_backends(persist_directory: str) -> List[str]:
+    """
+    Backends to try when POLICY_VECTOR_BACKEND is not set
+    An existing deployment keeps its persisted legacy (FAISS) index until a numpy index exists,
+    instead of starting empty and re-embedding every policy
+    """
+    if not NumpyBackend.persisted(persist_directory) and FaissBackend.persisted(persist_directory):
+        print(
+            f"Serving the existing FAISS policy index in {persist_directory} until a numpy index is built "
+            "(POLICY_VECTOR_BACKEND=numpy python scripts/re_embed_with_new_model.py --stores policy)"
+        )
+        return [*LEGACY_POLICY_BACKENDS, *DEFAULT_POLICY_BACKENDS]
+    return list(DEFAULT_POLICY_BACKENDS)
+
 
 class SimpleVectorStoreService:
     """
-    Simple FAISS-based vector store as ChromaDB alternative
+    Policy vector store on top of a VectorCollection
+    Embedding, query caching, batching, filtering and timing live in the collection,
+    so every backend gets them
     """
 
-    def __init__(self):
-        """Initialize simple vector store"""
-        self.persist_directory = os.getenv(
+    def __init__(
+        self,
+        embeddings: Optional[Any] = None,
+        backend: Optional[str] = None,
+        persist_directory: Optional[str] = None,
+    ):
+        """
+        Initialize policy vector store
+
+        Args:
+            embeddings: injected embeddings (OpenAI embeddings when omitted)
+            backend: vector backend name (POLICY_VECTOR_BACKEND when omitted)
+            persist_directory: persist directory (CHROMA_PERSIST_DIRECTORY when omitted)
+        """
+        self.persist_directory = persist_directory or os.getenv(
             "CHROMA_PERSIST_DIRECTORY", "./data/vectordb_simple"
         )
         self.collection_name = os.getenv(
             "CHROMA_COLLECTION_NAME", "kakao_alimtalk_policies"
         )
 
-        # Create persist directory
-        Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
+        # Matryoshka embedding dimension (POLICY_EMBEDDING_DIMENSIONS, None = full)
+        self.embedding_dimensions = embedding_dimensions_from_env("POLICY")
 
-        if not FAISS_AVAILABLE:
-            print("WARNING: FAISS not available. Vector search will be disabled.")
-            self.vector_store = None
-            self.embeddings = None
-            return
+        self.policies_dir = os.getenv("POLICIES_DIR", "./data/cleaned_policies")
+        self.auto_embed = POLICY_AUTO_EMBED
+        self._auto_embed_lock = threading.Lock()
+        self._auto_embed_attempted = False
 
-        # OpenAI embeddings
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
-            model="text-embedding-3-small",
-        )
+        self.embeddings = None
+        self.collection: Optional[VectorCollection] = None
+        try:
+            # OpenAI embeddings (주입된 임베딩이 있으면 사용, 설정 시 차원 축소)
+            self.embeddings = create_embeddings(self.embedding_dimensions, embeddings)
+            self.collection = VectorCollection(
+                "policy_store",
+                self.persist_directory,
+                self.embeddings,
+                backends=[backend] if backend else backends_from_env(
+                    "POLICY", default_policy_backends(self.persist_directory)
+                ),
+                prefix="POLICY",
+                collection_name=self.collection_name,
+            )
+        except ImportError as e:
+            print(f"WARNING: Vector backend not available ({e}). Vector search will be disabled.")
+            return
 
-        # Vector store
-        self.vector_store = None
         self._initialize_vector_store()
+        self._auto_embed()
 
-    def _initialize_vector_store(self):
-        """Initialize FAISS vector store"""
-        if not FAISS_AVAILABLE:
+    @property
+    def backend_name(self) -> Optional[str]:
+        return self.collection.backend_name if self.collection else None
+
+    def _available(self) -> bool:
+        return self.collection is not None and not self.collection.is_empty()
+
+    def _auto_embed(self):
+        """
+        Embed the policy directory once when the store is empty (no persisted index yet)
+        Runs at construction, i.e. during the lifespan warm-up, never inside a search request.
+        Embedding failures leave the store empty instead of persisting dummy policies.
+        """
+        if not self.auto_embed or self._auto_embed_attempted or self.collection is None:
             return
 
+        with self._auto_embed_lock:
+            if self._auto_embed_attempted or not self.collection.is_empty():
+                return
+            self._auto_embed_attempted = True
+            if not any(Path(self.policies_dir).glob("*.md")):
+                return
+
+            print(f"Empty {self.backend_name} vector store - embedding policies from {self.policies_dir}")
+            self.load_and_embed_policies(self.policies_dir, rebuild=True, dummy_fallback=False)
+
+    def _initialize_vector_store(self):
+        """Load the persisted collection if present"""
         try:
-            faiss_index_path = Path(self.persist_directory) / "index.faiss"
-            faiss_pkl_path = Path(self.persist_directory) / "index.pkl"
-
-            if faiss_index_path.exists() and faiss_pkl_path.exists():
-                # Load existing index
-                self.vector_store = FAISS.load_local(
-                    self.persist_directory,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True,
-                )
+            if self.collection.load():
                 print(
-                    f"Existing FAISS vector store loaded from {self.persist_directory}"
+                    f"Existing {self.backend_name} vector store loaded from {self.persist_directory}"
                 )
             else:
-                # Create empty vector store
-                print("Creating new empty FAISS vector store")
+                print(f"Creating new empty {self.backend_name} vector store")
 
         except Exception as e:
             print(f"Vector store initialization error: {e}")
 
     def load_and_embed_policies(
-        self, policies_dir: str = "./data/cleaned_policies"
+        self,
+        policies_dir: str = "./data/cleaned_policies",
+        rebuild: bool = False,
+        dummy_fallback: bool = True,
     ) -> bool:
         """
         Load and embed policy documents
+
+        Args:
+            policies_dir: policy markdown directory
+            rebuild: discard the existing index and re-embed everything
+            dummy_fallback: create dummy policies when no documents could be embedded
         """
-        if not FAISS_AVAILABLE:
-            print("FAISS not available - skipping policy embedding")
+        fallback = self._create_dummy_policies if dummy_fallback else (lambda: False)
+
+        if self.collection is None:
+            print("Vector backend not available - skipping policy embedding")
             return False
 
         try:
@@ -113,13 +191,13 @@ class SimpleVectorStoreService:
             if not policies_path.exists():
                 print(f"Policy directory not found: {policies_dir}")
                 # Create dummy data for testing
-                return self._create_dummy_policies()
+                return fallback()
 
             # Find markdown files
             md_files = list(policies_path.glob("*.md"))
             if not md_files:
                 print(f"No policy documents found in: {policies_dir}")
-                return self._create_dummy_policies()
+                return fallback()
 
             print(f"Loading {len(md_files)} policy documents...")
 
@@ -134,29 +212,24 @@ class SimpleVectorStoreService:
 
             if not documents:
                 print("No documents to embed.")
-                return self._create_dummy_policies()
+                return fallback()
 
             print(f"Embedding {len(documents)} document chunks...")
 
-            # Create or update vector store
-            if self.vector_store is None:
-                self.vector_store = FAISS.from_documents(documents, self.embeddings)
-            else:
-                self.vector_store.add_documents(documents)
-
-            # Save vector store
-            self.vector_store.save_local(self.persist_directory)
+            # Create or update vector store, then persist
+            self.collection.add_documents(documents, rebuild=rebuild)
+            self.collection.save()
 
             print("Policy document embedding completed!")
             return True
 
         except Exception as e:
             print(f"Policy document embedding error: {e}")
-            return self._create_dummy_policies()
+            return fallback()
 
     def _create_dummy_policies(self) -> bool:
         """Create dummy policy data for testing"""
-        if not FAISS_AVAILABLE:
+        if self.collection is None:
             return False
 
         try:
@@ -200,8 +273,8 @@ class SimpleVectorStoreService:
                 documents.append(doc)
 
             # Create vector store
-            self.vector_store = FAISS.from_documents(documents, self.embeddings)
-            self.vector_store.save_local(self.persist_directory)
+            self.collection.add_documents(documents, rebuild=True)
+            self.collection.save()
 
             print("Dummy policy data created for testing!")
             return True
@@ -219,11 +292,28 @@ class SimpleVectorStoreService:
             print(f"File load error ({file_path}): {e}")
             return None
 
-    def _split_document(self, content: str, source: str) -> List[Document]:
-        """Split document into chunks"""
+    @staticmethod
+    def _split_document(
+        content: str,
+        source: str,
+        chunk_size: int = POLICY_CHUNK_SIZE,
+        chunk_overlap: int = POLICY_CHUNK_OVERLAP,
+        chunker: str = POLICY_CHUNKER,
+    ) -> List[Document]:
+        """
+        Split document into chunks
+
+        The markdown chunker follows headings and Korean sentence boundaries without
+        overlap (chunk_overlap is ignored); the recursive chunker is the legacy
+        character splitter. Both record char_start/char_end so overlapping hits
+        can be deduplicated at search time.
+        """
+        if chunker == "markdown":
+            return split_policy_markdown(content, source, chunk_size)
+
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
             length_function=len,
             separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
         )
@@ -231,18 +321,22 @@ class SimpleVectorStoreService:
         chunks = text_splitter.split_text(content)
 
         documents = []
+        cursor = 0
         for i, chunk in enumerate(chunks):
-            doc = Document(
-                page_content=chunk,
-                metadata={
-                    "source": source,
-                    "chunk_id": i,
-                    "total_chunks": len(chunks),
-                    "document_type": "policy",
-                    "language": "korean",
-                },
-            )
-            documents.append(doc)
+            start = content.find(chunk, cursor)
+            if start < 0:
+                start = content.find(chunk)
+            metadata = {
+                "source": source,
+                "chunk_id": i,
+                "total_chunks": len(chunks),
+                "document_type": "policy",
+                "language": "korean",
+            }
+            if start >= 0:
+                cursor = start + 1
+                metadata.update(char_start=start, char_end=start + len(chunk))
+            documents.append(Document(page_content=chunk, metadata=metadata))
 
         return documents
 
@@ -250,32 +344,61 @@ class SimpleVectorStoreService:
         self, query: str, k: int = 5, filter_dict: Optional[Dict[str, Any]] = None
     ) -> List[Document]:
         """Similarity search"""
-        if not FAISS_AVAILABLE or not self.vector_store:
-            print("Vector search not available")
-            return []
-
-        try:
-            results = self.vector_store.similarity_search(query, k=k)
-            return results
-        except Exception as e:
-            print(f"Document search error: {e}")
-            return []
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter_dict)]
 
     def similarity_search_with_score(
         self, query: str, k: int = 5, filter_dict: Optional[Dict[str, Any]] = None
     ) -> List[tuple]:
-        """Similarity search with scores"""
-        if not FAISS_AVAILABLE or not self.vector_store:
+        """Similarity search with scores (L2 distance), overlapping chunks deduplicated"""
+        if not self._available():
             print("Vector search not available")
             return []
 
         try:
-            results = self.vector_store.similarity_search_with_score(query, k=k)
-            return results
+            return dedupe_chunks(self.collection.search(query, k, filter_dict))
         except Exception as e:
             print(f"Document search with score error: {e}")
             return []
 
+    def search_many(
+        self,
+        queries: List[str],
+        k: int = 5,
+        filters: Filters = None,
+    ) -> List[List[tuple]]:
+        """
+        Batched similarity search
+
+        Embeds all queries in one call and runs a single matrix search.
+
+        Args:
+            queries: query texts
+            k: results per query
+            filters: metadata equality filter shared by all queries, or one per query
+
+        Returns:
+            List[List[tuple]]: (Document, L2 distance) results per query
+        """
+        if not self._available():
+            print("Vector search not available")
+            return [[] for _ in queries]
+
+        try:
+            return [dedupe_chunks(rows) for rows in self.collection.search_many(queries, k, filters)]
+        except Exception as e:
+            print(f"Batched document search error: {e}")
+            return [[] for _ in queries]
+
+    def similarity_search_with_relevance_scores(
+        self, query: str, k: int = 5, score_threshold: Optional[float] = None
+    ) -> List[tuple]:
+        """Similarity search with relevance scores in [0, 1], filtered by threshold"""
+        results = self.similarity_search_with_score(query, k=k)
+        scored = [(doc, VectorCollection.relevance_score(score)) for doc, score in results]
+        if score_threshold is not None:
+            scored = [(doc, score) for doc, score in scored if score >= score_threshold]
+        return scored
+
     def get_relevant_policies(
         self, user_query: str, template_type: Optional[str] = None, k: int = 5
     ) -> Dict[str, Any]:
@@ -303,9 +426,14 @@ class SimpleVectorStoreService:
             print(f"Relevant policy search error: {e}")
             return {"query": user_query, "total_results": 0, "policies": []}
 
+    @property
+    def index_version(self) -> str:
+        """Index version for response cache keys"""
+        return self.collection.version if self.collection is not None else "not_available"
+
     def get_collection_info(self) -> Dict[str, Any]:
-        """Get collection information"""
-        if not FAISS_AVAILABLE or not self.vector_store:
+        """Get collection information (never triggers auto-embedding)"""
+        if self.collection is None or self.collection.is_empty():
             return {
                 "name": self.collection_name,
                 "count": 0,
@@ -313,15 +441,15 @@ class SimpleVectorStoreService:
             }
 
         try:
-            # FAISS doesn't have a direct count method, so we estimate
+            index_info = self.collection.describe()
             return {
                 "name": self.collection_name,
-                "count": (
-                    self.vector_store.index.ntotal
-                    if hasattr(self.vector_store, "index")
-                    else 0
-                ),
-                "metadata": {"status": "available", "type": "faiss"},
+                "count": self.collection.count(),
+                "metadata": {
+                    "status": "available",
+                    "type": index_info.pop("backend"),
+                    **index_info,
+                },
             }
         except Exception as e:
             print(f"Collection info error: {e}")
@@ -332,5 +460,5 @@ class SimpleVectorStoreService:
             }
 
 
-# Global instance
-simple_vector_store_service = SimpleVectorStoreService()
+# Global instance (lazily created by the service registry)
+__getattr__ = lazy_module_getattr(__name__, "simple_vector_store_service")
@@ -11,7 +11,7 @@ from datetime import datetime
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from app.services.vector_store import vector_store_service
+from app.services.template_rewriter import WRONG_VARIABLE_FORMATS
 
 logger = logging.getLogger(__name__)
 
@@ -766,20 +766,14 @@ class ViolationDetectorTool(BaseTool):
         """형식 관련 위반 탐지"""
         violations = []
         
-        # 잘못된 변수 형식 탐지
-        wrong_variable_formats = [
-            (r'\$\{[^}]+\}', "잘못된 변수 형식 ${} 사용"),
-            (r'\%\{[^}]+\}', "잘못된 변수 형식 %{} 사용"),
-            (r'\#\[[^\]]+\]', "잘못된 변수 형식 #[] 사용")
-        ]
-        
-        for pattern, description in wrong_variable_formats:
-            matches = re.findall(pattern, content)
+        # 잘못된 변수 형식 탐지 (템플릿 결정적 수정과 같은 패턴)
+        for pattern, label in WRONG_VARIABLE_FORMATS:
+            matches = [match.group(0) for match in re.finditer(pattern, content)]
             if matches:
                 violations.append({
                     "type": "format_violation",
                     "severity": "major",
-                    "message": f"{description}: {', '.join(matches)}",
+                    "message": f"잘못된 변수 형식 {label} 사용: {', '.join(matches)}",
                     "location": "변수 형식",
                     "wrong_formats": matches,
                     "suggestion": "#{변수명} 형식을 사용하세요"
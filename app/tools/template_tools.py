@@ -11,7 +11,7 @@ from datetime import datetime
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from app.services.vector_store import vector_store_service
+from app.services.registry import service_registry
 
 logger = logging.getLogger(__name__)
 
@@ -172,7 +172,7 @@ class PolicyCheckerTool(BaseTool):
         """
         try:
             # 벡터 데이터베이스에서 관련 정책 검색
-            policy_results = vector_store_service.get_relevant_policies(
+            policy_results = service_registry.get("policy_vector_store").get_relevant_policies(
                 user_query=query,
                 k=3
             )
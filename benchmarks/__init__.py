@@ -0,0 +1,8 @@
+"""
+오프라인 벤치마크 스위트
+가짜 LLM/임베딩 백엔드와 인프로세스 앱으로 엔드포인트별 지연/처리량/메모리 할당 측정
+
+사용법:
+    python -m benchmarks --concurrency 1,4,16 --requests 40
+    python -m benchmarks --save-baseline
+"""
@@ -0,0 +1,202 @@
+"""
+임베딩 차원 축소(Matryoshka) 리포트
+캐시된 전체 차원 임베딩을 앞쪽 N차원 + 재정규화로 축소하여 (서비스의 TruncatedEmbeddings와 동일)
+차원별 레이블 recall@k, 전체 차원 검색 대비 상위 k 일치율, 인덱스 크기, 검색 지연을 비교
+
+전체 차원 벡터에서 축소하므로 차원을 바꿔도 임베딩 API를 다시 호출하지 않음
+
+사용법:
+    python -m benchmarks.dimensions --offline
+    python -m benchmarks.dimensions --offline --store policy --dimensions 256,512,full --k 5
+"""
+import sys
+import json
+import argparse
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.embeddings import truncate_vectors
+from benchmarks.retrieval import (
+    DEFAULT_CACHE_DIR,
+    Chunk,
+    create_embedding_cache,
+    load_policy_documents,
+    chunk_policies,
+    build_policy_queries,
+    load_templates,
+    template_chunks,
+    build_template_queries,
+    sample_queries,
+    build_index,
+    evaluate,
+)
+
+DEFAULT_DIMENSIONS = "128,256,512,768,full"
+DEFAULT_OUTPUT = "./logs/dimension_report.json"
+
+
+@dataclass
+class DimensionResult:
+    """스토어/차원 하나의 결과"""
+    store: str
+    dimensions: int
+    k: int
+    queries: int
+    recall_at_k: float
+    recall_delta: float
+    mrr: float
+    overlap_at_k: float
+    search_p50_ms: float
+    search_p95_ms: float
+    bytes_per_vector: int
+    index_bytes: int
+
+
+def overlap_at_k(index, query_vectors: np.ndarray, reference: np.ndarray, k: int) -> float:
+    """전체 차원 검색 상위 k와의 평균 일치율"""
+    _, found = index.search(query_vectors, k)
+    overlaps = [
+        len(set(row[row >= 0].tolist()) & set(expected[expected >= 0].tolist())) / k
+        for row, expected in zip(found, reference)
+    ]
+    return round(float(np.mean(overlaps)), 4) if overlaps else 0.0
+
+
+def sweep_dimensions(
+    store: str,
+    chunks: List[Chunk],
+    vectors: np.ndarray,
+    query_vectors: np.ndarray,
+    queries: List[Dict[str, Any]],
+    is_relevant,
+    relevant_count,
+    dimension_values: List[Optional[int]],
+    k: int,
+    overfetch: int
+) -> List[DimensionResult]:
+    """스토어 하나에 대해 차원별 평가 (첫 기준은 전체 차원)"""
+    full_index = build_index(vectors, "flat")
+    _, reference = full_index.search(query_vectors, k)
+    full_metrics = evaluate(full_index, chunks, query_vectors, queries, is_relevant, relevant_count, k, None, overfetch)
+
+    results = []
+    for dimensions in dimension_values:
+        truncated = truncate_vectors(vectors, dimensions)
+        truncated_queries = truncate_vectors(query_vectors, dimensions)
+        index = build_index(truncated, "flat")
+        metrics = evaluate(index, chunks, truncated_queries, queries, is_relevant, relevant_count, k, None, overfetch)
+
+        dim = truncated.shape[1]
+        results.append(DimensionResult(
+            store=store,
+            dimensions=dim,
+            k=k,
+            queries=len(queries),
+            recall_at_k=metrics["recall_at_k"],
+            recall_delta=round(metrics["recall_at_k"] - full_metrics["recall_at_k"], 4),
+            mrr=metrics["mrr"],
+            overlap_at_k=overlap_at_k(index, truncated_queries, reference, k),
+            search_p50_ms=metrics["search_p50_ms"],
+            search_p95_ms=metrics["search_p95_ms"],
+            bytes_per_vector=dim * 4,
+            index_bytes=dim * 4 * len(truncated)
+        ))
+    return results
+
+
+def render_results(results: List[DimensionResult]) -> str:
+    """결과 표"""
+    lines = []
+    for store in ("policy", "template"):
+        rows = [r for r in results if r.store == store]
+        if not rows:
+            continue
+        lines.append(f"\n=== {store} 스토어 ({rows[0].queries}개 질의, recall@{rows[0].k}) ===")
+        lines.append(f"  {'dims':>5} {'recall':>7} {'Δrecall':>8} {'mrr':>6} {'overlap':>8} {'p50ms':>8} {'p95ms':>8} {'KiB':>9}")
+        for r in rows:
+            lines.append(
+                f"  {r.dimensions:>5} {r.recall_at_k:>7.3f} {r.recall_delta:>+8.3f} {r.mrr:>6.3f} "
+                f"{r.overlap_at_k:>8.3f} {r.search_p50_ms:>8.3f} {r.search_p95_ms:>8.3f} {r.index_bytes / 1024:>9.1f}"
+            )
+    return "\n".join(lines)
+
+
+def _dimension_list(value: str) -> List[Optional[int]]:
+    return [None if v.strip().lower() in ("full", "0") else int(v) for v in value.split(",") if v.strip()]
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="임베딩 차원 축소 recall 리포트")
+    parser.add_argument("--store", choices=["policy", "template", "all"], default="all", help="평가할 스토어")
+    parser.add_argument("--dimensions", default=DEFAULT_DIMENSIONS, help="비교할 차원 목록 (full = 전체 차원)")
+    parser.add_argument("--k", type=int, default=5, help="recall@k의 k")
+    parser.add_argument("--max-queries", type=int, default=None, help="스토어별 최대 질의 수")
+    parser.add_argument("--embeddings", choices=["openai", "fake"], default="openai", help="캐시 미스 시 사용할 임베딩")
+    parser.add_argument("--offline", action="store_true", help="캐시된 임베딩만 사용")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="임베딩 캐시 디렉토리")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """리포트 실행"""
+    args = _parse_args(argv)
+    dimension_values = _dimension_list(args.dimensions)
+    cache = create_embedding_cache(args.embeddings, args.cache_dir, args.offline)
+    results: List[DimensionResult] = []
+
+    try:
+        if args.store in ("policy", "all"):
+            documents = load_policy_documents()
+            queries = sample_queries(build_policy_queries(documents), args.max_queries)
+            chunks = chunk_policies(documents, 1000, 200)
+
+            def is_relevant(query, chunk):
+                return chunk.source == query["source"] and chunk.start < query["end"] and chunk.end > query["start"]
+
+            counts = {id(query): sum(is_relevant(query, chunk) for chunk in chunks) for query in queries}
+            results.extend(sweep_dimensions(
+                "policy", chunks,
+                cache.embed_documents([chunk.text for chunk in chunks]),
+                cache.embed_documents([query["query"] for query in queries]),
+                queries, is_relevant, lambda query: counts[id(query)],
+                dimension_values, args.k, overfetch=1
+            ))
+
+        if args.store in ("template", "all"):
+            templates = load_templates()
+            queries = sample_queries(build_template_queries(templates), args.max_queries)
+            chunks = template_chunks(templates)
+            results.extend(sweep_dimensions(
+                "template", chunks,
+                cache.embed_documents([chunk.text for chunk in chunks]),
+                cache.embed_documents([query["query"] for query in queries]),
+                queries,
+                lambda query, chunk: chunk.source in query["relevant_ids"],
+                lambda query: len(query["relevant_ids"]),
+                dimension_values, args.k, overfetch=2
+            ))
+    finally:
+        cache.save()
+
+    print(render_results(results))
+
+    output = {
+        "generated_at": datetime.now().isoformat(),
+        "embeddings": args.embeddings,
+        "k": args.k,
+        "results": [asdict(result) for result in results]
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+결정적(deterministic) 가짜 LLM/임베딩 백엔드
+OpenAI 호출 없이 지정한 지연 시간을 흉내내어 파이프라인 자체의 오버헤드를 측정
+"""
+import re
+import time
+import zlib
+import hashlib
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain.chat_models.base import BaseChatModel
+from langchain.embeddings.base import Embeddings
+from langchain.schema import AIMessage, BaseMessage, ChatGeneration, ChatResult
+
+from app.services.token_counter import count_tokens
+
+
+# 템플릿 생성 프롬프트에 대한 가짜 응답
+FAKE_TEMPLATES = [
+    "안녕하세요, #{고객명}님.\n주문하신 #{상품명}의 배송이 시작되었습니다.\n\n■ 주문번호: #{주문번호}\n■ 배송예정일: #{배송예정일}\n\n아래 버튼을 눌러 배송 현황을 확인하실 수 있습니다.",
+    "안녕하세요, #{고객명}님.\n#{예약일시} #{매장명} 예약이 확정되었습니다.\n\n예약 변경 및 취소는 방문 하루 전까지 가능합니다.\n문의사항은 고객센터로 연락 부탁드립니다.",
+    "안녕하세요, #{고객명}님.\n요청하신 #{서비스명} 신청이 정상적으로 접수되었습니다.\n\n■ 접수번호: #{접수번호}\n■ 처리예정일: #{처리예정일}\n\n처리 결과는 완료 후 다시 안내해 드리겠습니다.",
+    "안녕하세요, #{고객명}님.\n#{결제일시}에 결제하신 #{결제금액}원이 정상 처리되었습니다.\n\n결제 내역은 아래 버튼을 통해 확인하실 수 있습니다.",
+]
+
+# 압축 체인 프롬프트의 컨텍스트 구간 (`>>>\n{context}\n>>>`)
+EXTRACTOR_CONTEXT_PATTERN = re.compile(r">>>\n(.*?)\n>>>", re.DOTALL)
+FOLLOW_UP_PATTERN = re.compile(r"Follow Up Input:\s*(.*?)\s*(?:Standalone question:|$)", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 (서비스와 같은 로컬 토큰 카운터, 최소 1)"""
+    return max(1, count_tokens(text))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    가짜 채팅 모델
+    입력 메시지 해시로 응답을 고르므로 같은 입력에는 항상 같은 응답을 반환
+    """
+    model_name: str = "fake-gpt-4o-mini"
+    temperature: float = 0.0
+    latency: float = 0.0
+    latency_per_token: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, prompt: str) -> str:
+        """프롬프트 종류에 맞는 결정적 응답"""
+        # LLMChainExtractor: 컨텍스트 앞부분을 그대로 추출
+        if "NO_OUTPUT" in prompt:
+            match = EXTRACTOR_CONTEXT_PATTERN.search(prompt)
+            return match.group(1)[:300] if match else "NO_OUTPUT"
+
+        # 질문 재구성 체인: 후속 질문을 그대로 반환
+        match = FOLLOW_UP_PATTERN.search(prompt)
+        if match:
+            return match.group(1)
+
+        digest = int(hashlib.md5(prompt.encode("utf-8")).hexdigest(), 16)
+        return FAKE_TEMPLATES[digest % len(FAKE_TEMPLATES)]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = self._respond(prompt)
+
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        delay = self.latency + self.latency_per_token * completion_tokens
+        if delay > 0:
+            time.sleep(delay)
+
+        token_usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))],
+            llm_output={"token_usage": token_usage, "model_name": self.model_name}
+        )
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    가짜 임베딩
+    문자 bigram 해시 특징을 정규화한 벡터라서 비슷한 문장은 비슷한 벡터를 가진다
+    """
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.0, latency_per_text: float = 0.0):
+        """
+        Args:
+            dimensions: 벡터 차원 (text-embedding-3-small 기본값 1536)
+            latency: 호출당 지연 시간(초)
+            latency_per_text: 텍스트당 추가 지연 시간(초)
+        """
+        self.dimensions = dimensions
+        self.latency = latency
+        self.latency_per_text = latency_per_text
+        self.call_count = 0
+        self.text_count = 0
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for i in range(len(text) - 1):
+            bigram = text[i:i + 2]
+            if bigram.isspace():
+                continue
+            hashed = zlib.crc32(bigram.encode("utf-8"))
+            sign = 1.0 if hashed & 0x80000000 else -1.0
+            vector[hashed % self.dimensions] += sign
+
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0] = 1.0
+        else:
+            vector /= norm
+        return vector.tolist()
+
+    def _sleep(self, text_count: int):
+        self.call_count += 1
+        self.text_count += text_count
+        delay = self.latency + self.latency_per_text * text_count
+        if delay > 0:
+            time.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._sleep(len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._sleep(1)
+        return self._vector(text)
+
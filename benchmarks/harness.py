@@ -0,0 +1,251 @@
+"""
+벤치마크용 인프로세스 앱 구성
+서비스 레지스트리의 팩토리를 가짜 백엔드로 교체하고 DB를 SQLite 메모리 DB로 대체
+"""
+import os
+import json
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.corpus.store import is_corpus_dir
+from app.services.token_service import TokenService
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+
+TEMPLATE_CORPUS_DIR = Path("./data/template_corpus")
+TEMPLATE_DATA_PATH = Path("./data/kakao_template_vectordb_data.json")
+POLICIES_DIR = Path("./data/cleaned_policies")
+
+# 템플릿 JSON이 없을 때 사용하는 합성 코퍼스 재료
+SYNTHETIC_CATEGORIES = [
+    ("주문/배송", "배송안내", "상품", ["고객명", "상품명", "주문번호", "배송예정일"]),
+    ("예약", "예약확정", "예약", ["고객명", "예약일시", "매장명"]),
+    ("회원", "가입안내", "서비스", ["고객명", "가입일", "회원등급"]),
+    ("결제", "결제완료", "상품", ["고객명", "결제일시", "결제금액"]),
+    ("신청/접수", "접수완료", "서비스", ["고객명", "서비스명", "접수번호", "처리예정일"]),
+]
+
+
+@dataclass
+class BenchmarkConfig:
+    """가짜 백엔드 설정"""
+    llm_latency: float = 0.05
+    llm_latency_per_token: float = 0.0
+    embedding_latency: float = 0.005
+    embedding_latency_per_text: float = 0.0
+    embedding_dimensions: int = 1536
+    synthetic_templates: int = 200
+
+
+def synthetic_template_data(count: int) -> Dict[str, Any]:
+    """템플릿/패턴 벡터DB용 합성 데이터 (create_template_json.py 출력 형식)"""
+    templates = []
+    for i in range(count):
+        category_1, category_2, business_type, variables = SYNTHETIC_CATEGORIES[i % len(SYNTHETIC_CATEGORIES)]
+        body = " ".join(f"#{{{name}}}" for name in variables[1:])
+        text = f"안녕하세요, #{{{variables[0]}}}님.\n{category_2} 관련 안내드립니다. ({i})\n{body}\n자세한 내용은 아래 버튼을 눌러 확인해 주세요."
+        templates.append({
+            "id": f"template_{i:03d}",
+            "text": text,
+            "metadata": {
+                "category_1": category_1,
+                "category_2": category_2,
+                "business_type": business_type,
+                "service_type": "기타",
+                "variables": variables,
+                "variable_count": len(variables),
+                "length": len(text),
+                "has_greeting": True,
+                "has_button_mention": True,
+                "button": "자세히 확인하기"
+            }
+        })
+
+    patterns = []
+    for category_1, _, _, variables in SYNTHETIC_CATEGORIES:
+        category_templates = [t for t in templates if t["metadata"]["category_1"] == category_1]
+        lengths = [t["metadata"]["length"] for t in category_templates]
+        patterns.append({
+            "id": f"pattern_{category_1.replace('/', '_')}",
+            "category": category_1,
+            "type": "category_pattern",
+            "metadata": {
+                "template_count": len(category_templates),
+                "common_variables": {name: len(category_templates) for name in variables},
+                "characteristic_words": {},
+                "common_buttons": {"자세히 확인하기": len(category_templates)},
+                "avg_length": int(sum(lengths) / max(len(lengths), 1)),
+                "length_range": {"min": min(lengths, default=0), "max": max(lengths, default=0)},
+                "success_indicators": {"greeting_usage": 1.0, "variable_usage": len(variables), "button_usage": 1.0}
+            }
+        })
+
+    return {"templates": templates, "patterns": patterns}
+
+
+class NullTokenService(TokenService):
+    """
+    DB 없이 동작하는 토큰 서비스
+    메트릭 계산/기록 경로는 그대로 두고 가격 조회와 저장만 생략
+    """
+
+    def __init__(self):
+        """초기화 (가격 캐시 로드 생략)"""
+        self.db_session = None
+        self.pricing_cache: Dict[str, Any] = {}
+
+    def get_pricing(self, provider: str, model_name: str):
+        return None
+
+    def save_token_usage(self, metrics, **kwargs):
+        return None
+
+    def get_usage_stats(self, **kwargs) -> Dict[str, Any]:
+        return {
+            "total_requests": 0,
+            "total_tokens": 0,
+            "total_cost": 0.0,
+            "avg_tokens_per_request": 0,
+            "avg_cost_per_request": 0.0,
+            "models_used": [],
+            "success_rate": 100.0
+        }
+
+
+class BenchmarkApp:
+    """
+    가짜 백엔드로 구성된 인프로세스 앱
+    임시 디렉토리에 벡터 인덱스를 새로 만들고 종료 시 정리
+    """
+
+    def __init__(self, config: Optional[BenchmarkConfig] = None):
+        """초기화"""
+        self.config = config or BenchmarkConfig()
+        self.work_dir = Path(tempfile.mkdtemp(prefix="alimtalk-bench-"))
+        self.embeddings = FakeEmbeddings(
+            dimensions=self.config.embedding_dimensions,
+            latency=self.config.embedding_latency,
+            latency_per_text=self.config.embedding_latency_per_text
+        )
+        self.app = None
+        self._saved_env: Dict[str, Optional[str]] = {}
+
+    def _fake_llm(self, temperature: float) -> FakeChatModel:
+        return FakeChatModel(
+            temperature=temperature,
+            latency=self.config.llm_latency,
+            latency_per_token=self.config.llm_latency_per_token
+        )
+
+    def _set_env(self, name: str, value: str):
+        self._saved_env.setdefault(name, os.environ.get(name))
+        os.environ[name] = value
+
+    def _template_data_path(self) -> Path:
+        """실제 템플릿 코퍼스/JSON이 있으면 사용, 없으면 합성 데이터 생성"""
+        if is_corpus_dir(TEMPLATE_CORPUS_DIR):
+            return TEMPLATE_CORPUS_DIR
+        if TEMPLATE_DATA_PATH.exists():
+            return TEMPLATE_DATA_PATH
+
+        path = self.work_dir / "templates.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(synthetic_template_data(self.config.synthetic_templates), f, ensure_ascii=False)
+        return path
+
+    def _override_services(self):
+        """서비스 레지스트리 팩토리를 가짜 백엔드 버전으로 교체"""
+        from app.services.registry import service_registry
+
+        def _token_service():
+            return NullTokenService()
+
+        def _policy_store():
+            from app.services.vector_store_simple import SimpleVectorStoreService
+            store = SimpleVectorStoreService(embeddings=self.embeddings)
+            store.load_and_embed_policies(str(POLICIES_DIR))
+            return store
+
+        def _template_store():
+            from app.services.template_vector_store import TemplateVectorStoreService
+            store = TemplateVectorStoreService(embeddings=self.embeddings)
+            store.load_template_data(str(self._template_data_path()))
+            return store
+
+        def _rag_service():
+            from app.services.rag_service import TemplateRAGService
+            return TemplateRAGService(llm=self._fake_llm(temperature=0.1))
+
+        def _template_generation_service():
+            from app.services.template_generation_service import TemplateGenerationService
+            return TemplateGenerationService(llm=self._fake_llm(temperature=0.3))
+
+        service_registry.override("token_service", _token_service)
+        service_registry.override("simple_vector_store_service", _policy_store)
+        service_registry.override("policy_vector_store", lambda: service_registry.get("simple_vector_store_service"))
+        service_registry.override("template_vector_store_service", _template_store)
+        service_registry.override("rag_service", _rag_service)
+        service_registry.override("template_generation_service", _template_generation_service)
+        return service_registry
+
+    def _override_database(self):
+        """get_db 의존성을 SQLite 메모리 DB 세션으로 교체"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from config.database import Base, get_db
+        import app.models  # noqa: F401 - 테이블 메타데이터 등록
+
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def _get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        self.app.dependency_overrides[get_db] = _get_db
+
+    def start(self) -> List[Any]:
+        """
+        앱 구성 및 서비스 워밍업
+
+        Returns:
+            List[ComponentStartup]: 컴포넌트별 생성 결과
+        """
+        self._set_env("SERVICE_WARMUP", "False")
+        self._set_env("APP_DEBUG", "False")
+        self._set_env("OPENAI_API_KEY", os.environ.get("OPENAI_API_KEY") or "sk-benchmark-offline")
+        self._set_env("CHROMA_PERSIST_DIRECTORY", str(self.work_dir / "vectordb"))
+        self._set_env("TEMPLATE_PERSIST_DIRECTORY", str(self.work_dir / "vectordb_templates"))
+
+        from main import app
+        self.app = app
+
+        self._override_database()
+        service_registry = self._override_services()
+        return service_registry.warm_up()
+
+    def close(self):
+        """의존성 오버라이드 해제 및 임시 디렉토리 정리"""
+        from app.services.registry import service_registry
+
+        if self.app is not None:
+            self.app.dependency_overrides.clear()
+        service_registry.reset()
+
+        for name, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(self.work_dir, ignore_errors=True)
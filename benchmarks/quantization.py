@@ -0,0 +1,222 @@
+"""
+양자화 인덱스 메모리/정확도 리포트
+인덱스 유형 × 양자화(none/sq8/pq) × 원본 재정렬 여부별로 벡터 저장 크기, 압축률,
+정확 검색(flat float32) 대비 recall@k, 검색 지연을 비교
+
+코퍼스:
+    - 기본: 정책 청크와 템플릿 문서의 캐시된 임베딩 (benchmarks.retrieval과 같은 캐시 사용)
+    - --synthetic N: N개 합성 벡터 (대규모 템플릿 코퍼스의 메모리 추정용)
+
+사용법:
+    python -m benchmarks.quantization --offline
+    python -m benchmarks.quantization --synthetic 100000 --configs flat:none,hnsw:sq8,ivfpq:pq
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.services.faiss_index import (
+    IndexConfig,
+    FullPrecisionReranker,
+    VECTORS_FILE,
+    build_faiss_index,
+    index_code_size,
+    quantization_of,
+)
+from benchmarks.retrieval import (
+    DEFAULT_CACHE_DIR,
+    create_embedding_cache,
+    load_policy_documents,
+    chunk_policies,
+    build_policy_queries,
+    load_templates,
+    template_chunks,
+    build_template_queries,
+)
+
+DEFAULT_CONFIGS = "flat:none,flat:sq8,flat:pq,hnsw:none,hnsw:sq8,hnsw:pq,ivfpq:pq"
+DEFAULT_OUTPUT = "./logs/quantization_report.json"
+
+
+@dataclass
+class QuantizationResult:
+    """구성 하나의 메모리/정확도 결과"""
+    index_type: str
+    quantization: str
+    reranked: bool
+    vectors: int
+    dimension: int
+    code_size_bytes: int
+    bytes_per_vector: float
+    compression_ratio: float
+    recall_at_k: float
+    search_p50_ms: float
+    search_p95_ms: float
+
+
+def real_corpus(cache_dir: str, embeddings: str, offline: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """정책 청크 + 템플릿 문서 임베딩과 레이블 질의 임베딩"""
+    cache = create_embedding_cache(embeddings, cache_dir, offline)
+    try:
+        documents = load_policy_documents()
+        templates = load_templates()
+        texts = [chunk.text for chunk in chunk_policies(documents, 1000, 200)]
+        texts += [chunk.text for chunk in template_chunks(templates)]
+        queries = [query["query"] for query in build_policy_queries(documents)]
+        queries += [query["query"] for query in build_template_queries(templates)]
+        return cache.embed_documents(texts), cache.embed_documents(queries)
+    finally:
+        cache.save()
+
+
+def synthetic_corpus(count: int, dimension: int, queries: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    군집 구조를 가진 정규화 합성 벡터
+    (균일 난수보다 실제 임베딩 분포에 가깝도록 군집 중심 + 잡음으로 생성)
+    """
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((max(1, count // 100), dimension)).astype(np.float32)
+    assignments = rng.integers(0, len(centers), count + queries)
+    vectors = centers[assignments] + 0.6 * rng.standard_normal((count + queries, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors[:count], vectors[count:]
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """정답 이웃 (flat float32 정확 검색)"""
+    index = build_faiss_index(vectors, IndexConfig(index_type="flat"))
+    _, ids = index.search(queries, k)
+    return ids
+
+
+def evaluate_config(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    index_type: str,
+    quantization: str,
+    rerank_factor: int,
+    k: int,
+    vectors_path: Path
+) -> List[QuantizationResult]:
+    """구성 하나를 재정렬 없이/재정렬 포함으로 평가"""
+    config = IndexConfig(index_type=index_type, quantization=quantization, rerank_factor=rerank_factor)
+    index = build_faiss_index(vectors, config)
+    actual_quantization = quantization_of(index)
+    code_size = index_code_size(index)
+    float32_size = vectors.shape[0] * vectors.shape[1] * 4
+
+    reranker = FullPrecisionReranker(np.load(vectors_path, mmap_mode="r"))
+    modes = [False, True] if actual_quantization != "none" else [False]
+
+    results = []
+    for reranked in modes:
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth):
+            start_time = time.perf_counter()
+            if reranked:
+                _, candidates = index.search(query[None, :], k * rerank_factor)
+                ids, _ = reranker.rerank(query, candidates[0], k)
+            else:
+                _, found = index.search(query[None, :], k)
+                ids = found[0]
+            latencies.append(time.perf_counter() - start_time)
+            recalls.append(len(set(ids.tolist()) & set(expected.tolist())) / k)
+
+        latencies_ms = np.array(latencies) * 1000
+        results.append(QuantizationResult(
+            index_type=index_type,
+            quantization=actual_quantization,
+            reranked=reranked,
+            vectors=int(vectors.shape[0]),
+            dimension=int(vectors.shape[1]),
+            code_size_bytes=code_size,
+            bytes_per_vector=round(code_size / vectors.shape[0], 1),
+            compression_ratio=round(float32_size / code_size, 2) if code_size else 0.0,
+            recall_at_k=round(float(np.mean(recalls)), 4),
+            search_p50_ms=round(float(np.percentile(latencies_ms, 50)), 4),
+            search_p95_ms=round(float(np.percentile(latencies_ms, 95)), 4)
+        ))
+    return results
+
+
+def render_results(results: List[QuantizationResult], k: int) -> str:
+    """결과 표"""
+    lines = [
+        f"=== 양자화 메모리/정확도 (recall@{k}은 flat float32 정확 검색 대비) ===",
+        f"  {'index':<6} {'quant':<5} {'rerank':<6} {'MiB':>9} {'B/vec':>8} {'압축':>6} {'recall':>7} {'p50ms':>8} {'p95ms':>8}"
+    ]
+    for r in results:
+        lines.append(
+            f"  {r.index_type:<6} {r.quantization:<5} {'yes' if r.reranked else 'no':<6} "
+            f"{r.code_size_bytes / 1024 / 1024:>9.2f} {r.bytes_per_vector:>8.1f} {r.compression_ratio:>5.1f}x "
+            f"{r.recall_at_k:>7.3f} {r.search_p50_ms:>8.3f} {r.search_p95_ms:>8.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="양자화 인덱스 메모리/정확도 리포트")
+    parser.add_argument("--configs", default=DEFAULT_CONFIGS, help="인덱스유형:양자화 목록 (쉼표 구분)")
+    parser.add_argument("--k", type=int, default=5, help="recall@k의 k")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="재정렬 후보 배수")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 벡터 수 (0이면 실제 코퍼스 사용)")
+    parser.add_argument("--dimension", type=int, default=1536, help="합성 벡터 차원")
+    parser.add_argument("--queries", type=int, default=200, help="합성 질의 수")
+    parser.add_argument("--embeddings", choices=["openai", "fake"], default="openai", help="캐시 미스 시 사용할 임베딩")
+    parser.add_argument("--offline", action="store_true", help="캐시된 임베딩만 사용")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="임베딩 캐시 디렉토리")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """리포트 실행"""
+    args = _parse_args(argv)
+
+    if args.synthetic:
+        vectors, queries = synthetic_corpus(args.synthetic, args.dimension, args.queries)
+    else:
+        vectors, queries = real_corpus(args.cache_dir, args.embeddings, args.offline)
+    print(f"코퍼스: 벡터 {len(vectors)}개 × {vectors.shape[1]}차원, 질의 {len(queries)}개")
+
+    truth = exact_neighbors(vectors, queries, args.k)
+    results: List[QuantizationResult] = []
+
+    with tempfile.TemporaryDirectory(prefix="alimtalk-quant-") as work_dir:
+        vectors_path = Path(work_dir) / VECTORS_FILE
+        np.save(vectors_path, vectors)
+
+        for spec in args.configs.split(","):
+            index_type, _, quantization = spec.strip().partition(":")
+            results.extend(evaluate_config(
+                vectors, queries, truth, index_type, quantization or "none",
+                args.rerank_factor, args.k, vectors_path
+            ))
+
+    print(render_results(results, args.k))
+
+    output = {
+        "generated_at": datetime.now().isoformat(),
+        "corpus": "synthetic" if args.synthetic else "policies+templates",
+        "k": args.k,
+        "rerank_factor": args.rerank_factor,
+        "results": [asdict(result) for result in results]
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
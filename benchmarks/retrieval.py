@@ -0,0 +1,612 @@
+"""
+검색 품질 대비 지연/비용 벤치마크
+정책/템플릿 스토어의 검색 파라미터(k, 임계값, 청크 크기/중첩, 과다 조회 배수, 인덱스 유형)를
+조합별로 평가하여 recall@k, MRR, 검색 지연, 프롬프트 토큰 비용을 보고
+
+레이블 질의 생성:
+    - 정책: 정책 마크다운의 소제목을 질의로, 해당 절(section)과 겹치는 청크를 정답으로 사용
+    - 템플릿: JJ템플릿.xlsx의 (분류1차, 분류2차) 조합을 질의로, 같은 분류의 템플릿을 정답으로 사용
+
+임베딩은 디스크 캐시를 거치므로 한 번 채운 뒤에는 --offline으로 네트워크 없이 실행 가능
+
+사용법:
+    python -m benchmarks.retrieval --target-recall 0.8
+    python -m benchmarks.retrieval --offline --store policy --k 3,5 --index-types flat,hnsw
+    python -m benchmarks.retrieval --offline --store policy --index-types numpy,flat
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import itertools
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from benchmarks.fakes import FakeEmbeddings, estimate_tokens
+
+POLICIES_DIR = Path("./data/cleaned_policies")
+TEMPLATE_CORPUS_DIR = Path("./data/template_corpus")
+TEMPLATE_JSON_PATH = Path("./data/kakao_template_vectordb_data.json")
+TEMPLATE_XLSX_PATH = Path("./data/JJ템플릿.xlsx")
+DEFAULT_CACHE_DIR = "./benchmarks/.cache"
+DEFAULT_OUTPUT = "./logs/retrieval_benchmark.json"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# `#{변수}`와 구분하기 위해 '#' 뒤 공백 필수
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*$", re.MULTILINE)
+# "1-1.", "(1)", "1)" 같은 번호 접두어
+HEADING_NUMBER_PATTERN = re.compile(r"^(\(?\d+(-\d+)*[.)]?\)?\s*)+")
+MIN_SECTION_LENGTH = 80
+
+
+class EmbeddingCache:
+    """
+    텍스트 해시 기준 임베딩 디스크 캐시
+    backend가 None이면 오프라인 모드로, 캐시에 없는 텍스트는 오류
+    """
+
+    def __init__(self, path: Path, backend: Optional[Any] = None):
+        """초기화"""
+        self.path = Path(path)
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._dirty = False
+
+        if self.path.exists():
+            data = np.load(self.path)
+            self._vectors = dict(zip(data["keys"].tolist(), data["vectors"]))
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """여러 텍스트 임베딩 (캐시 미스만 백엔드 호출)"""
+        keys = [self._key(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self._vectors:
+                missing.setdefault(key, text)
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            if self.backend is None:
+                raise RuntimeError(
+                    f"캐시에 없는 임베딩이 {len(missing)}개 있습니다 (오프라인 모드). "
+                    f"--offline 없이 한 번 실행하여 캐시를 채워주세요: {self.path}"
+                )
+            vectors = self.backend.embed_documents(list(missing.values()))
+            for key, vector in zip(missing.keys(), vectors):
+                self._vectors[key] = np.asarray(vector, dtype=np.float32)
+            self._dirty = True
+
+        return np.vstack([self._vectors[key] for key in keys]).astype(np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """단일 텍스트 임베딩"""
+        return self.embed_documents([text])[0]
+
+    def save(self):
+        """새로 계산한 임베딩이 있으면 캐시 파일 갱신"""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        keys = list(self._vectors.keys())
+        np.savez_compressed(
+            self.path,
+            keys=np.array(keys),
+            vectors=np.vstack([self._vectors[key] for key in keys])
+        )
+        self._dirty = False
+
+
+def create_embedding_cache(backend: str, cache_dir: str, offline: bool) -> EmbeddingCache:
+    """백엔드별 캐시 파일을 사용하는 임베딩 캐시 생성"""
+    path = Path(cache_dir) / f"embeddings-{backend}-{EMBEDDING_MODEL}.npz"
+    if offline:
+        return EmbeddingCache(path)
+
+    if backend == "fake":
+        embeddings = FakeEmbeddings()
+    else:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"), model=EMBEDDING_MODEL)
+    return EmbeddingCache(path, embeddings)
+
+
+# ---------------------------------------------------------------------------
+# 코퍼스와 레이블 질의
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Chunk:
+    """검색 대상 청크 (원문 내 위치 포함)"""
+    text: str
+    source: str
+    start: int
+    end: int
+    metadata: Dict[str, Any]
+
+
+def load_policy_documents(policies_dir: Path = POLICIES_DIR) -> Dict[str, str]:
+    """정책 마크다운 원문 (파일명 stem → 내용)"""
+    return {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in sorted(Path(policies_dir).glob("*.md"))
+    }
+
+
+def chunk_policies(
+    documents: Dict[str, str],
+    chunk_size: int,
+    chunk_overlap: int,
+    chunker: str = "markdown"
+) -> List[Chunk]:
+    """서비스와 같은 분할 로직으로 청크를 만들고 원문 내 위치를 기록 (markdown 청커는 chunk_overlap 무시)"""
+    from app.services.vector_store_simple import SimpleVectorStoreService
+
+    chunks = []
+    for source, content in documents.items():
+        for doc in SimpleVectorStoreService._split_document(content, source, chunk_size, chunk_overlap, chunker):
+            start = doc.metadata.get("char_start", 0)
+            end = doc.metadata.get("char_end", start + len(doc.page_content))
+            chunks.append(Chunk(
+                text=doc.page_content,
+                source=source,
+                start=start,
+                end=end,
+                metadata=doc.metadata
+            ))
+    return chunks
+
+
+def build_policy_queries(documents: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    정책 소제목 기반 레이블 질의
+    문서 제목(#)은 문서 전체가 정답이 되므로 제외하고, 본문이 짧은 절도 제외
+    """
+    queries = []
+    for source, content in documents.items():
+        headings = [
+            (match.start(), len(match.group(1)), HEADING_NUMBER_PATTERN.sub("", match.group(2)).strip())
+            for match in HEADING_PATTERN.finditer(content)
+        ]
+
+        parents: Dict[int, str] = {}
+        for index, (start, level, title) in enumerate(headings):
+            parents[level] = title
+            for deeper in [lvl for lvl in parents if lvl > level]:
+                del parents[deeper]
+
+            end = len(content)
+            for next_start, next_level, _ in headings[index + 1:]:
+                if next_level <= level:
+                    end = next_start
+                    break
+
+            if level == 1 or end - start < MIN_SECTION_LENGTH or not title:
+                continue
+
+            parent = parents.get(level - 1)
+            queries.append({
+                "query": f"{parent} {title}" if parent else title,
+                "source": source,
+                "start": start,
+                "end": end
+            })
+    return queries
+
+
+def load_templates() -> List[Dict[str, Any]]:
+    """
+    승인 템플릿 목록
+    템플릿 코퍼스(검색 평가에 쓰는 열만) 또는 벡터DB용 JSON이 있으면 사용하고, 없으면 원본 엑셀에서 직접 읽음
+    """
+    from app.corpus.store import TemplateCorpus
+
+    corpus = TemplateCorpus(TEMPLATE_CORPUS_DIR)
+    if corpus.exists():
+        columns = ["text", "category_1", "category_2", "business_type", "variables", "length"]
+        return [template for chunk in corpus.iter_template_chunks(columns=columns) for template in chunk]
+
+    if TEMPLATE_JSON_PATH.exists():
+        with open(TEMPLATE_JSON_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get("templates", [])
+
+    import pandas as pd
+
+    df = pd.read_excel(TEMPLATE_XLSX_PATH, sheet_name=0)
+    templates = []
+    for idx, row in df.iterrows():
+        text = row.iloc[0]
+        if pd.isna(text):
+            continue
+        templates.append({
+            "id": f"template_{idx:03d}",
+            "text": str(text).strip(),
+            "metadata": {
+                "category_1": str(row.iloc[1]) if pd.notna(row.iloc[1]) else "기타",
+                "category_2": str(row.iloc[2]) if pd.notna(row.iloc[2]) else "기타",
+                "business_type": str(row.iloc[7]) if len(row) > 7 and pd.notna(row.iloc[7]) else "기타",
+                "variables": re.findall(r"#\{([^}]+)\}", str(text)),
+                "length": len(str(text))
+            }
+        })
+    return templates
+
+
+def template_chunks(templates: List[Dict[str, Any]]) -> List[Chunk]:
+    """서비스와 같은 보강 텍스트로 템플릿 문서 생성"""
+    from app.services.template_vector_store import TemplateVectorStoreService
+
+    return [
+        Chunk(text=doc.page_content, source=doc.metadata.get("template_id"), start=0, end=0, metadata=doc.metadata)
+        for doc in TemplateVectorStoreService._create_template_documents(templates)
+    ]
+
+
+def build_template_queries(templates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """(분류1차, 분류2차) 조합별 레이블 질의 - 필터 없는 질의와 분류1차 필터 질의를 함께 생성"""
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for template in templates:
+        metadata = template.get("metadata", {})
+        key = (metadata.get("category_1", "기타"), metadata.get("category_2", "기타"))
+        groups.setdefault(key, []).append(template.get("id"))
+
+    queries = []
+    for (category_1, category_2), template_ids in sorted(groups.items()):
+        for category_filter in (None, category_1):
+            queries.append({
+                "query": f"{category_1} {category_2} 안내 알림톡 템플릿",
+                "category_filter": category_filter,
+                "relevant_ids": template_ids
+            })
+    return queries
+
+
+def sample_queries(queries: List[Dict[str, Any]], limit: Optional[int]) -> List[Dict[str, Any]]:
+    """고른 간격으로 질의 샘플링 (실행마다 동일)"""
+    if not limit or len(queries) <= limit:
+        return queries
+    step = len(queries) / limit
+    return [queries[int(i * step)] for i in range(limit)]
+
+
+# ---------------------------------------------------------------------------
+# 인덱스와 평가
+# ---------------------------------------------------------------------------
+
+def build_index(vectors: np.ndarray, index_type: str):
+    """
+    서비스와 같은 설정 로직으로 FAISS 인덱스 생성 (flat은 LangChain FAISS 기본값과 동일)
+    numpy는 서비스 numpy 백엔드와 같은 전수 검색 인덱스 (FAISS 불필요)
+    """
+    if index_type == "numpy":
+        from app.services.vector_backends import ExactIndex
+        return ExactIndex(vectors)
+
+    from app.services.faiss_index import IndexConfig, build_faiss_index
+
+    return build_faiss_index(vectors, IndexConfig(index_type=index_type))
+
+
+def relevance_score(distance: float) -> float:
+    """LangChain FAISS 기본 relevance 함수와 동일 (1 - 거리/√2)"""
+    return 1.0 - distance / np.sqrt(2)
+
+
+@dataclass
+class RetrievalResult:
+    """구성 하나의 평가 결과"""
+    store: str
+    index_type: str
+    k: int
+    score_threshold: Optional[float]
+    overfetch: int
+    chunk_size: Optional[int]
+    chunk_overlap: Optional[int]
+    queries: int
+    recall_at_k: float
+    mrr: float
+    search_p50_ms: float
+    search_p95_ms: float
+    prompt_tokens_per_query: float
+    index_build_ms: float
+    chunker: Optional[str] = None
+
+
+def evaluate(
+    index,
+    chunks: List[Chunk],
+    query_vectors: np.ndarray,
+    queries: List[Dict[str, Any]],
+    is_relevant,
+    relevant_count,
+    k: int,
+    score_threshold: Optional[float],
+    overfetch: int
+) -> Dict[str, float]:
+    """
+    질의별 검색을 실행하여 recall@k, MRR, 지연, 프롬프트 토큰 계산
+    recall@k는 정답 수가 k보다 많을 때 k로 나눈 값(상한 1.0)
+    """
+    recalls, reciprocal_ranks, latencies, tokens = [], [], [], []
+
+    for query, vector in zip(queries, query_vectors):
+        start_time = time.perf_counter()
+        distances, indices = index.search(vector[None, :], k * overfetch)
+        latencies.append(time.perf_counter() - start_time)
+
+        retrieved = []
+        for distance, idx in zip(distances[0], indices[0]):
+            if idx < 0:
+                continue
+            if score_threshold is not None and relevance_score(float(distance)) < score_threshold:
+                continue
+            chunk = chunks[idx]
+            category_filter = query.get("category_filter")
+            if category_filter and chunk.metadata.get("category_1") != category_filter:
+                continue
+            retrieved.append(chunk)
+            if len(retrieved) >= k:
+                break
+
+        hits = [is_relevant(query, chunk) for chunk in retrieved]
+        expected = min(relevant_count(query), k)
+        recalls.append(sum(hits) / expected if expected else 0.0)
+        first_hit = next((rank for rank, hit in enumerate(hits, start=1) if hit), None)
+        reciprocal_ranks.append(1.0 / first_hit if first_hit else 0.0)
+        tokens.append(sum(estimate_tokens(chunk.text) for chunk in retrieved))
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else 0.0,
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4) if reciprocal_ranks else 0.0,
+        "search_p50_ms": round(float(np.percentile(latencies_ms, 50)), 4) if latencies else 0.0,
+        "search_p95_ms": round(float(np.percentile(latencies_ms, 95)), 4) if latencies else 0.0,
+        "prompt_tokens_per_query": round(float(np.mean(tokens)), 1) if tokens else 0.0
+    }
+
+
+def _timed_build(vectors: np.ndarray, index_type: str):
+    start_time = time.perf_counter()
+    index = build_index(vectors, index_type)
+    return index, round((time.perf_counter() - start_time) * 1000, 3)
+
+
+def sweep_policy_store(
+    cache: EmbeddingCache,
+    queries: List[Dict[str, Any]],
+    documents: Dict[str, str],
+    index_types: Sequence[str],
+    k_values: Sequence[int],
+    thresholds: Sequence[Optional[float]],
+    chunk_configs: Sequence[Tuple[str, int, int]]
+) -> List[RetrievalResult]:
+    """정책 스토어 파라미터 조합 평가"""
+    results = []
+    query_vectors = cache.embed_documents([query["query"] for query in queries])
+
+    def is_relevant(query, chunk):
+        return chunk.source == query["source"] and chunk.start < query["end"] and chunk.end > query["start"]
+
+    for chunker, chunk_size, chunk_overlap in chunk_configs:
+        chunks = chunk_policies(documents, chunk_size, chunk_overlap, chunker)
+        vectors = cache.embed_documents([chunk.text for chunk in chunks])
+        relevant_counts = [sum(is_relevant(query, chunk) for chunk in chunks) for query in queries]
+        count_by_query = {id(query): count for query, count in zip(queries, relevant_counts)}
+
+        for index_type in index_types:
+            index, build_ms = _timed_build(vectors, index_type)
+            for k, threshold in itertools.product(k_values, thresholds):
+                metrics = evaluate(
+                    index, chunks, query_vectors, queries,
+                    is_relevant, lambda query: count_by_query[id(query)],
+                    k, threshold, overfetch=1
+                )
+                results.append(RetrievalResult(
+                    store="policy", index_type=index_type, k=k, score_threshold=threshold,
+                    overfetch=1, chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                    queries=len(queries), index_build_ms=build_ms, chunker=chunker, **metrics
+                ))
+    return results
+
+
+def sweep_template_store(
+    cache: EmbeddingCache,
+    queries: List[Dict[str, Any]],
+    templates: List[Dict[str, Any]],
+    index_types: Sequence[str],
+    k_values: Sequence[int],
+    overfetch_values: Sequence[int]
+) -> List[RetrievalResult]:
+    """템플릿 스토어 파라미터 조합 평가 (find_similar_templates의 과다 조회 배수 포함)"""
+    results = []
+    chunks = template_chunks(templates)
+    vectors = cache.embed_documents([chunk.text for chunk in chunks])
+    query_vectors = cache.embed_documents([query["query"] for query in queries])
+
+    def is_relevant(query, chunk):
+        return chunk.source in query["relevant_ids"]
+
+    for index_type in index_types:
+        index, build_ms = _timed_build(vectors, index_type)
+        for k, overfetch in itertools.product(k_values, overfetch_values):
+            metrics = evaluate(
+                index, chunks, query_vectors, queries,
+                is_relevant, lambda query: len(query["relevant_ids"]),
+                k, None, overfetch
+            )
+            results.append(RetrievalResult(
+                store="template", index_type=index_type, k=k, score_threshold=None,
+                overfetch=overfetch, chunk_size=None, chunk_overlap=None,
+                queries=len(queries), index_build_ms=build_ms, **metrics
+            ))
+    return results
+
+
+def cheapest_meeting_target(results: List[RetrievalResult], store: str, target_recall: float) -> Optional[RetrievalResult]:
+    """목표 recall을 만족하는 구성 중 프롬프트 토큰 → 검색 p95 순으로 가장 저렴한 구성"""
+    candidates = [r for r in results if r.store == store and r.recall_at_k >= target_recall]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (r.prompt_tokens_per_query, r.search_p95_ms))
+
+
+def render_results(results: List[RetrievalResult], target_recall: float) -> str:
+    """스토어별 결과 표와 추천 구성"""
+    lines = []
+    for store in ("policy", "template"):
+        rows = [r for r in results if r.store == store]
+        if not rows:
+            continue
+
+        lines.append(f"\n=== {store} 스토어 ({rows[0].queries}개 질의) ===")
+        lines.append(f"  {'index':<6} {'chunk':<10} {'k':>3} {'thr':>5} {'over':>4} {'recall':>7} {'mrr':>6} {'p50ms':>8} {'p95ms':>8} {'tokens':>8}")
+        for r in sorted(rows, key=lambda r: (-r.recall_at_k, r.prompt_tokens_per_query)):
+            chunk = _chunk_label(r)
+            threshold = f"{r.score_threshold:.2f}" if r.score_threshold is not None else "-"
+            lines.append(
+                f"  {r.index_type:<6} {chunk:<10} {r.k:>3} {threshold:>5} {r.overfetch:>4} "
+                f"{r.recall_at_k:>7.3f} {r.mrr:>6.3f} {r.search_p50_ms:>8.3f} {r.search_p95_ms:>8.3f} {r.prompt_tokens_per_query:>8.1f}"
+            )
+
+        best = cheapest_meeting_target(results, store, target_recall)
+        if best:
+            lines.append(
+                f"  → recall ≥ {target_recall} 최저 비용: index={best.index_type} k={best.k} "
+                f"threshold={best.score_threshold} overfetch={best.overfetch} "
+                f"chunk={_chunk_label(best)} (tokens {best.prompt_tokens_per_query})"
+            )
+        else:
+            lines.append(f"  → recall ≥ {target_recall}을 만족하는 구성이 없습니다")
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _threshold_list(value: str) -> List[Optional[float]]:
+    return [None if v.strip().lower() == "none" else float(v) for v in value.split(",") if v.strip()]
+
+
+def _chunk_label(result: RetrievalResult) -> str:
+    if not result.chunk_size:
+        return "-"
+    if result.chunker == "markdown":
+        return f"md:{result.chunk_size}"
+    return f"{result.chunk_size}/{result.chunk_overlap}"
+
+
+def _chunk_configs(value: str) -> List[Tuple[str, int, int]]:
+    """md:크기 = 마크다운 청커, 크기/중첩 = 기존 recursive 청커"""
+    configs = []
+    for item in value.split(","):
+        item = item.strip()
+        if item.startswith("md:"):
+            configs.append(("markdown", int(item[3:]), 0))
+        else:
+            size, overlap = item.split("/")
+            configs.append(("recursive", int(size), int(overlap)))
+    return configs
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="검색 품질 대비 지연/비용 벤치마크")
+    parser.add_argument("--store", choices=["policy", "template", "all"], default="all", help="평가할 스토어")
+    parser.add_argument("--k", default="3,5,10", help="k 값 목록")
+    parser.add_argument("--thresholds", default="none,0.3,0.5", help="정책 검색 score_threshold 목록 (none=미사용)")
+    parser.add_argument("--chunks", default="md:600,md:1000,500/100,1000/200,1500/300", help="정책 청크 구성 목록 (md:크기 = 마크다운 청커, 크기/중첩 = recursive 청커)")
+    parser.add_argument("--overfetch", default="1,2,4", help="템플릿 검색 과다 조회 배수 목록")
+    parser.add_argument("--index-types", default="flat,hnsw,ivfpq", help="인덱스 유형 목록 (flat, hnsw, ivfpq, auto, numpy)")
+    parser.add_argument("--max-queries", type=int, default=200, help="스토어별 최대 질의 수")
+    parser.add_argument("--queries", help="레이블 질의 JSON 경로 (없으면 데이터에서 생성)")
+    parser.add_argument("--export-queries", help="생성한 레이블 질의를 JSON으로 저장")
+    parser.add_argument("--embeddings", choices=["openai", "fake"], default="openai", help="캐시 미스 시 사용할 임베딩")
+    parser.add_argument("--offline", action="store_true", help="캐시된 임베딩만 사용 (네트워크 호출 없음)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="임베딩 캐시 디렉토리")
+    parser.add_argument("--target-recall", type=float, default=0.8, help="추천 구성의 목표 recall@k")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 저장 경로")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """검색 벤치마크 실행"""
+    args = _parse_args(argv)
+    stores = ["policy", "template"] if args.store == "all" else [args.store]
+
+    documents = load_policy_documents() if "policy" in stores else {}
+    templates = load_templates() if "template" in stores else []
+
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            labeled = json.load(f)
+    else:
+        labeled = {
+            "policy": build_policy_queries(documents) if documents else [],
+            "template": build_template_queries(templates) if templates else []
+        }
+    labeled = {store: sample_queries(labeled.get(store, []), args.max_queries) for store in stores}
+
+    if args.export_queries:
+        Path(args.export_queries).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.export_queries, "w", encoding="utf-8") as f:
+            json.dump(labeled, f, ensure_ascii=False, indent=2)
+        print(f"레이블 질의 저장: {args.export_queries}")
+
+    cache = create_embedding_cache(args.embeddings, args.cache_dir, args.offline)
+    index_types = [value.strip() for value in args.index_types.split(",") if value.strip()]
+    k_values = _int_list(args.k)
+
+    results: List[RetrievalResult] = []
+    try:
+        if "policy" in stores and labeled["policy"]:
+            results.extend(sweep_policy_store(
+                cache, labeled["policy"], documents, index_types, k_values,
+                _threshold_list(args.thresholds), _chunk_configs(args.chunks)
+            ))
+        if "template" in stores and labeled["template"]:
+            results.extend(sweep_template_store(
+                cache, labeled["template"], templates, index_types, k_values,
+                _int_list(args.overfetch)
+            ))
+    finally:
+        cache.save()
+
+    print(render_results(results, args.target_recall))
+    print(f"\n임베딩 캐시: 적중 {cache.hits}, 미스 {cache.misses} ({cache.path})")
+
+    recommendations = {}
+    for store in stores:
+        best = cheapest_meeting_target(results, store, args.target_recall)
+        recommendations[store] = asdict(best) if best else None
+
+    output = {
+        "generated_at": datetime.now().isoformat(),
+        "embedding_backend": "cache" if args.offline else args.embeddings,
+        "target_recall": args.target_recall,
+        "query_counts": {store: len(queries) for store, queries in labeled.items()},
+        "results": [asdict(result) for result in results],
+        "recommendations": recommendations
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+벤치마크 실행기
+시나리오마다 고정 동시성 수준으로 요청을 보내 p50/p95/p99 지연, 처리량, 메모리 할당을 측정하고
+기준(baseline) JSON과 비교하여 회귀 여부를 판단
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.harness import BenchmarkApp, BenchmarkConfig
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+DEFAULT_OUTPUT = "./logs/benchmark_results.json"
+DEFAULT_BASELINE = "./benchmarks/baseline.json"
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """지연 시간 분포 요약 (밀리초)"""
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "max_ms": 0.0}
+
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+
+async def _send(client: httpx.AsyncClient, scenario: Scenario, index: int) -> httpx.Response:
+    return await client.request(scenario.method, scenario.path, json=scenario.payload(index))
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int
+) -> Dict[str, Any]:
+    """고정 동시성으로 요청을 보내고 지연/처리량 측정"""
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    next_index = 0
+
+    async def _worker():
+        nonlocal next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+
+            start_time = time.perf_counter()
+            try:
+                response = await _send(client, scenario, index)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start_time)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    wall_time = time.perf_counter() - start_time
+
+    errors = sum(count for status, count in status_counts.items() if not status.startswith("2"))
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "wall_time": round(wall_time, 6),
+        "throughput_rps": round(requests / wall_time, 3) if wall_time > 0 else 0.0,
+        "errors": errors,
+        "status_counts": status_counts,
+        **summarize_latencies(latencies)
+    }
+
+
+async def measure_allocations(client: httpx.AsyncClient, scenario: Scenario, requests: int) -> Dict[str, Any]:
+    """
+    순차 요청 동안의 메모리 할당 측정 (tracemalloc)
+    추적 오버헤드가 지연 측정에 섞이지 않도록 부하 측정과 분리하여 실행
+    """
+    if requests <= 0:
+        return {}
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        for index in range(requests):
+            await _send(client, scenario, index)
+
+        end_current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    allocated_blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return {
+        "requests": requests,
+        "peak_kib": round((peak - start_current) / 1024, 1),
+        "retained_kib_per_request": round((end_current - start_current) / 1024 / requests, 2),
+        "allocated_blocks_per_request": round(allocated_blocks / requests, 1),
+        "top_allocators": [
+            {"file": str(stat.traceback[0].filename), "size_diff_kib": round(stat.size_diff / 1024, 1)}
+            for stat in stats[:5]
+        ]
+    }
+
+
+async def run_benchmarks(
+    app,
+    scenarios: List[Scenario],
+    concurrency_levels: List[int],
+    requests: int,
+    warmup_requests: int = 3,
+    alloc_requests: int = 10
+) -> Dict[str, Any]:
+    """모든 시나리오/동시성 조합 실행"""
+    transport = httpx.ASGITransport(app=app)
+    results: Dict[str, Any] = {}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for scenario in scenarios:
+            print(f"▶ {scenario.name} ({scenario.method} {scenario.path})")
+
+            # 첫 요청의 지연 생성/캐시 효과 제외
+            for index in range(warmup_requests):
+                await _send(client, scenario, index)
+
+            levels = {}
+            for concurrency in concurrency_levels:
+                result = await run_load(client, scenario, concurrency, requests)
+                levels[str(concurrency)] = result
+                print(
+                    f"  c={concurrency:<3} p50={result['p50_ms']:>9.1f}ms p95={result['p95_ms']:>9.1f}ms "
+                    f"p99={result['p99_ms']:>9.1f}ms {result['throughput_rps']:>8.1f} req/s errors={result['errors']}"
+                )
+
+            allocations = await measure_allocations(client, scenario, alloc_requests)
+            if allocations:
+                print(
+                    f"  alloc peak={allocations['peak_kib']}KiB "
+                    f"retained/req={allocations['retained_kib_per_request']}KiB "
+                    f"blocks/req={allocations['allocated_blocks_per_request']}"
+                )
+
+            results[scenario.name] = {
+                "method": scenario.method,
+                "path": scenario.path,
+                "levels": levels,
+                "allocations": allocations
+            }
+
+    return results
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2
+) -> Dict[str, Any]:
+    """
+    기준 결과 대비 회귀 여부 판단
+    p95 지연과 최대 메모리는 증가, 처리량은 감소를 회귀로 본다
+    """
+    checks = []
+    for name, scenario in current["scenarios"].items():
+        baseline_scenario = baseline.get("scenarios", {}).get(name)
+        if not baseline_scenario:
+            continue
+
+        for level, result in scenario["levels"].items():
+            baseline_level = baseline_scenario["levels"].get(level)
+            if not baseline_level:
+                continue
+
+            for metric, higher_is_worse in (("p95_ms", True), ("p99_ms", True), ("throughput_rps", False)):
+                current_value, baseline_value = result[metric], baseline_level[metric]
+                if higher_is_worse:
+                    limit = baseline_value * (1 + tolerance)
+                    regressed = current_value > limit
+                else:
+                    limit = baseline_value * (1 - tolerance)
+                    regressed = current_value < limit
+                checks.append({
+                    "scenario": name,
+                    "concurrency": level,
+                    "metric": metric,
+                    "current": current_value,
+                    "baseline": baseline_value,
+                    "limit": round(limit, 3),
+                    "regressed": regressed
+                })
+
+        current_alloc = scenario.get("allocations") or {}
+        baseline_alloc = baseline_scenario.get("allocations") or {}
+        if "peak_kib" in current_alloc and "peak_kib" in baseline_alloc:
+            limit = baseline_alloc["peak_kib"] * (1 + tolerance)
+            checks.append({
+                "scenario": name,
+                "concurrency": "1",
+                "metric": "peak_kib",
+                "current": current_alloc["peak_kib"],
+                "baseline": baseline_alloc["peak_kib"],
+                "limit": round(limit, 1),
+                "regressed": current_alloc["peak_kib"] > limit
+            })
+
+    return {
+        "tolerance": tolerance,
+        "checks": checks,
+        "regressed": any(check["regressed"] for check in checks)
+    }
+
+
+def render_comparison(comparison: Dict[str, Any]) -> str:
+    """기준 비교 결과 텍스트"""
+    lines = [f"=== 기준 대비 비교 (허용 오차 {comparison['tolerance']:.0%}) ==="]
+    for check in comparison["checks"]:
+        mark = "✗" if check["regressed"] else "✓"
+        lines.append(
+            f"  {mark} {check['scenario']:<16} c={check['concurrency']:<3} {check['metric']:<15} "
+            f"{check['current']:>10} (기준 {check['baseline']}, 한계 {check['limit']})"
+        )
+    lines.append("결과: " + ("회귀 감지" if comparison["regressed"] else "회귀 없음"))
+    return "\n".join(lines)
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="오프라인 엔드포인트 벤치마크 (가짜 LLM/임베딩)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="실행할 시나리오 (쉼표 구분)")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시성 수준 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=40, help="동시성 수준별 요청 수")
+    parser.add_argument("--warmup", type=int, default=3, help="시나리오별 워밍업 요청 수")
+    parser.add_argument("--alloc-requests", type=int, default=10, help="메모리 할당 측정 요청 수 (0이면 생략)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="가짜 LLM 호출당 지연(초)")
+    parser.add_argument("--llm-latency-per-token", type=float, default=0.0, help="가짜 LLM 출력 토큰당 지연(초)")
+    parser.add_argument("--embedding-latency", type=float, default=0.005, help="가짜 임베딩 호출당 지연(초)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="비교할 기준 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀 판단 허용 오차 비율")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """벤치마크 실행 (회귀 감지 시 종료 코드 1)"""
+    args = _parse_args(argv)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"알 수 없는 시나리오: {', '.join(unknown)} (사용 가능: {', '.join(SCENARIOS)})")
+        return 2
+
+    config = BenchmarkConfig(
+        llm_latency=args.llm_latency,
+        llm_latency_per_token=args.llm_latency_per_token,
+        embedding_latency=args.embedding_latency
+    )
+    concurrency_levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    bench_app = BenchmarkApp(config)
+    try:
+        startup = bench_app.start()
+        for component in startup:
+            state = "✓" if component.success else "✗"
+            print(f"{state} {component.name} ({component.duration:.3f}s){'' if component.success else ': ' + str(component.error)}")
+
+        scenario_results = asyncio.run(run_benchmarks(
+            bench_app.app,
+            [SCENARIOS[name] for name in names],
+            concurrency_levels,
+            args.requests,
+            warmup_requests=args.warmup,
+            alloc_requests=args.alloc_requests
+        ))
+    finally:
+        bench_app.close()
+
+    results = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "llm_latency": config.llm_latency,
+            "llm_latency_per_token": config.llm_latency_per_token,
+            "embedding_latency": config.embedding_latency,
+            "requests": args.requests,
+            "concurrency": concurrency_levels
+        },
+        "scenarios": scenario_results
+    }
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.output}")
+
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준 저장: {args.baseline}")
+        return 0
+
+    if Path(args.baseline).exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("⚠ 기준과 설정(지연/요청 수/동시성)이 달라 비교 결과가 부정확할 수 있습니다.")
+        comparison = compare_results(results, baseline, args.tolerance)
+        print(render_comparison(comparison))
+        return 1 if comparison["regressed"] else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
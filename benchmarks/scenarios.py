@@ -0,0 +1,89 @@
+"""
+벤치마크 시나리오 (엔드포인트별 요청 페이로드)
+요청 번호로 페이로드를 순환 선택하므로 실행마다 동일한 요청 순서가 재현됨
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+USER_REQUESTS = [
+    "주문한 상품의 배송 시작을 안내하는 템플릿을 만들어주세요",
+    "병원 진료 예약 확정 안내 메시지가 필요합니다",
+    "회원가입 완료 후 환영 인사 템플릿을 만들어주세요",
+    "결제 완료 영수증 안내 알림톡을 작성해주세요",
+    "서비스 신청 접수 완료를 알리는 메시지를 만들어주세요",
+]
+
+POLICY_QUERIES = [
+    "알림톡에 광고성 내용을 넣을 수 있나요?",
+    "템플릿 변수는 몇 개까지 사용할 수 있나요?",
+    "이미지형 알림톡 심사 기준이 궁금합니다",
+    "블랙리스트에 해당하는 메시지 유형은 무엇인가요?",
+    "정보성 메시지의 기준을 알려주세요",
+]
+
+OPTIMIZE_TEMPLATES = [
+    "고객님 주문하신 상품이 배송 시작되었습니다. 주문번호는 #{주문번호} 입니다.",
+    "안녕하세요 #{고객명}님 예약이 완료되었습니다 #{예약일시}에 방문해주세요",
+    "#{고객명}님 결제가 완료되었습니다. 금액: #{결제금액}원",
+]
+
+
+@dataclass
+class Scenario:
+    """엔드포인트 벤치마크 시나리오"""
+    name: str
+    method: str
+    path: str
+    payloads: List[Dict[str, Any]]
+    uses_db: bool = False
+
+    def payload(self, index: int) -> Optional[Dict[str, Any]]:
+        """요청 번호에 해당하는 페이로드"""
+        if not self.payloads:
+            return None
+        return self.payloads[index % len(self.payloads)]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario(
+            name="policy_search",
+            method="POST",
+            path="/api/v1/policies/search",
+            payloads=[{"query": query, "limit": 5} for query in POLICY_QUERIES]
+        ),
+        Scenario(
+            name="similar_search",
+            method="POST",
+            path="/api/v1/templates/similar-search",
+            payloads=[{"query": request, "limit": 5} for request in USER_REQUESTS]
+        ),
+        Scenario(
+            name="smart_generate",
+            method="POST",
+            path="/api/v1/templates/smart-generate",
+            payloads=[{"user_request": request} for request in USER_REQUESTS]
+        ),
+        Scenario(
+            name="optimize",
+            method="POST",
+            path="/api/v1/templates/optimize",
+            payloads=[{"template": template} for template in OPTIMIZE_TEMPLATES]
+        ),
+        Scenario(
+            name="query",
+            method="POST",
+            path="/api/v1/query",
+            payloads=[{"query_text": query} for query in POLICY_QUERIES],
+            uses_db=True
+        ),
+        Scenario(
+            name="generate",
+            method="POST",
+            path="/api/v1/templates/generate",
+            payloads=[{"query_text": request} for request in USER_REQUESTS],
+            uses_db=True
+        ),
+    ]
+}
@@ -1,6 +1,6 @@
 """
 템플릿 벡터 데이터베이스 로딩 스크립트
-JSON 데이터를 벡터 데이터베이스에 임베딩
+템플릿 코퍼스(없으면 JSON) 데이터를 벡터 데이터베이스에 임베딩
 """
 
 import os
@@ -11,14 +11,15 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from app.services.template_vector_store import template_vector_store_service
+from app.services.template_vector_store import template_vector_store_service, TEMPLATE_DATA_PATH
+from app.corpus.store import resolve_template_data_path
 
 def main():
     """템플릿 벡터 데이터베이스 로딩"""
     print("=== 카카오 알림톡 템플릿 벡터 데이터베이스 로딩 ===\n")
 
-    # JSON 데이터 파일 경로
-    json_data_path = "./data/kakao_template_vectordb_data.json"
+    # 템플릿 코퍼스 디렉토리 (TEMPLATE_DATA_PATH, 없으면 예전 JSON)
+    json_data_path = str(resolve_template_data_path(TEMPLATE_DATA_PATH))
 
     if not Path(json_data_path).exists():
         print(f"❌ JSON 데이터 파일을 찾을 수 없습니다: {json_data_path}")
@@ -4,6 +4,7 @@ FastAPI 메인 애플리케이션
 """
 import os
 import time
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -11,9 +12,21 @@ import uvicorn
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.routing import Match
 from dotenv import load_dotenv
 
+from app.monitoring.startup_profiler import lifespan_stage, record_lifespan_stage
+from app.monitoring.timing import collect_timings
+from app.monitoring.metrics import (
+    metrics_registry,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_TOTAL,
+    HTTP_REQUESTS_IN_FLIGHT,
+    monitor_event_loop_lag
+)
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -54,52 +67,69 @@ async def lifespan(app: FastAPI):
     
     try:
         # 데이터베이스 연결 확인
-        from config.database import check_connection
-        if check_connection():
-            logger.info("✓ 데이터베이스 연결 성공")
+        with lifespan_stage("database_check"):
+            from config.database import check_connection
+            if check_connection():
+                logger.info("✓ 데이터베이스 연결 성공")
+            else:
+                logger.error("✗ 데이터베이스 연결 실패")
+
+        # 서비스 워밍업 (LLM/임베딩 클라이언트, 벡터 인덱스 병렬 로드)
+        from app.services.registry import service_registry
+        if os.getenv("SERVICE_WARMUP", "True").lower() == "true":
+            warmup_start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            with lifespan_stage("service_warmup"):
+                startup_report = await loop.run_in_executor(None, service_registry.warm_up)
+
+            for component in startup_report:
+                record_lifespan_stage(component.name, component.duration, parent="service_warmup")
+                if component.success:
+                    logger.info(f"✓ {component.name} 초기화 완료 ({component.duration:.3f}s)")
+                else:
+                    logger.warning(f"⚠ {component.name} 초기화 실패 ({component.duration:.3f}s): {component.error}")
+
+            logger.info(f"✓ 서비스 워밍업 완료 ({time.perf_counter() - warmup_start:.3f}s)")
         else:
-            logger.error("✗ 데이터베이스 연결 실패")
-            
+            logger.info("✓ 서비스 워밍업 생략 (최초 요청 시 지연 생성)")
+
         # 벡터 데이터베이스 상태 확인
-        try:
-            from app.services.vector_store_simple import simple_vector_store_service
-            vectordb_info = simple_vector_store_service.get_collection_info()
-            if vectordb_info:
-                logger.info(f"✓ 벡터 데이터베이스 로드 성공 (문서 수: {vectordb_info.get('count', 0)})")
-            else:
-                logger.warning("⚠ 벡터 데이터베이스 상태 확인 실패")
-        except Exception as e:
-            logger.warning(f"⚠ 벡터 데이터베이스 로드 실패: {e}")
-            logger.info("✓ 벡터 없이 시스템 시작")
-            
-        # RAG 서비스 초기화 확인
-        from app.services.rag_service import rag_service
-        logger.info("✓ RAG 서비스 초기화 완료")
-
-        # 템플릿 벡터 데이터베이스 상태 확인
-        try:
-            from app.services.template_vector_store import template_vector_store_service
-            template_store_info = template_vector_store_service.get_store_info()
-            if template_store_info.get('status') == 'available':
-                templates_count = template_store_info.get('templates_count', 0)
-                patterns_count = template_store_info.get('patterns_count', 0)
-                logger.info(f"✓ 템플릿 벡터DB 로드 성공 (템플릿: {templates_count}, 패턴: {patterns_count})")
-            else:
-                logger.warning("⚠ 템플릿 벡터DB 상태 확인 실패")
-        except Exception as e:
-            logger.warning(f"⚠ 템플릿 벡터DB 로드 실패: {e}")
-            logger.info("✓ 템플릿 벡터DB 없이 시스템 시작")
+        with lifespan_stage("vectordb_status"):
+            _log_vector_store_status(service_registry)
 
         logger.info("=== 시스템 초기화 완료 ===")
         
     except Exception as e:
         logger.error(f"시스템 초기화 중 오류: {e}")
     
+    # 이벤트 루프 지연 측정 (/metrics의 event_loop_lag_seconds)
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+
     yield  # 애플리케이션 실행
     
     # 종료 시 정리 작업
+    loop_lag_task.cancel()
     logger.info("=== 애플리케이션 종료 ===")
 
+def _log_vector_store_status(service_registry):
+    """로드된 벡터 스토어 상태 로깅"""
+    if service_registry.is_loaded("policy_vector_store"):
+        vectordb_info = service_registry.get("policy_vector_store").get_collection_info()
+        if vectordb_info:
+            logger.info(f"✓ 벡터 데이터베이스 로드 성공 (문서 수: {vectordb_info.get('count', 0)})")
+        else:
+            logger.warning("⚠ 벡터 데이터베이스 상태 확인 실패")
+
+    # 템플릿 벡터 데이터베이스 상태 확인
+    if service_registry.is_loaded("template_vector_store_service"):
+        template_store_info = service_registry.get("template_vector_store_service").get_store_info()
+        if template_store_info.get('status') == 'available':
+            templates_count = template_store_info.get('templates_count', 0)
+            patterns_count = template_store_info.get('patterns_count', 0)
+            logger.info(f"✓ 템플릿 벡터DB 로드 성공 (템플릿: {templates_count}, 패턴: {patterns_count})")
+        else:
+            logger.warning("⚠ 템플릿 벡터DB 상태 확인 실패")
+
 # FastAPI 앱 생성
 app = FastAPI(
     title=APP_TITLE,
@@ -135,17 +165,35 @@ async def log_requests(request: Request, call_next):
     # 요청 정보 로깅
     logger.info(f"📨 {request.method} {request.url.path}")
     
-    # 응답 처리
-    response = await call_next(request)
-    
-    # 처리 시간 계산
-    process_time = time.time() - start_time
+    # 응답 처리 (요청 단위 단계별 시간 수집)
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    status_code = 500
+    try:
+        with collect_timings():
+            response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        
+        # 처리 시간 계산 및 라우트별 메트릭 기록
+        process_time = time.time() - start_time
+        route = _route_template(request)
+        HTTP_REQUEST_DURATION.labels(method=request.method, route=route, status=status_code).observe(process_time)
+        HTTP_REQUESTS_TOTAL.labels(method=request.method, route=route, status=status_code).inc()
     
     # 응답 정보 로깅
     logger.info(f"📤 {response.status_code} ({process_time:.3f}s)")
     
     return response
 
+def _route_template(request: Request) -> str:
+    """메트릭 라벨용 라우트 경로 템플릿 (경로 파라미터로 인한 라벨 폭증 방지)"""
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return "unmatched"
+
 # 전역 예외 처리기
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -175,7 +223,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "message": exc.detail,
             "error_code": f"HTTP_{exc.status_code}",
             "error_details": None
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 # API 라우터 등록
@@ -191,11 +240,64 @@ async def root():
         "version": APP_VERSION,
         "docs": "/docs",
         "health": "/api/v1/health",
+        "metrics": "/metrics",
         "status": "running"
     }
 
+def _parse_args():
+    """명령행 인자 파싱"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="서버를 띄우지 않고 import 트리와 lifespan 단계별 시작 시간을 측정")
+    parser.add_argument("--profile-output", default="./logs/startup_profile.json",
+                        help="시작 시간 프로파일 JSON 저장 경로")
+    parser.add_argument("--profile-top", type=int, default=25,
+                        help="리포트에 출력할 상위 import 개수")
+    parser.add_argument("--profile-baseline", default=None,
+                        help="비교할 기준 프로파일 JSON (회귀 시 종료 코드 1)")
+    parser.add_argument("--profile-tolerance", type=float, default=0.2,
+                        help="기준 대비 허용 증가율 (기본 20%%)")
+    return parser.parse_args()
+
+def _profile_startup(args) -> int:
+    """시작 시간 프로파일 실행 및 리포트 출력"""
+    import json
+    from app.monitoring.startup_profiler import run_startup_profile, render_report, compare_profiles
+
+    profile = run_startup_profile(app, module="main", output_path=args.profile_output)
+    print(render_report(profile, top=args.profile_top))
+    print(f"\n프로파일 저장: {args.profile_output}")
+
+    if args.profile_baseline:
+        with open(args.profile_baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        comparison = compare_profiles(profile, baseline, tolerance=args.profile_tolerance)
+        print(f"\n[기준 대비 비교] 허용 증가율 {comparison['tolerance']:.0%}")
+        for name, check in comparison["checks"].items():
+            mark = "✗" if check["regressed"] else "✓"
+            print(f"  {mark} {name}: {check['current']:.3f}s (기준 {check['baseline']:.3f}s, 한도 {check['limit']:.3f}s)")
+
+        if comparison["regressed"]:
+            return 1
+
+    return 0
+
+# 메트릭 엔드포인트 (Prometheus 텍스트 노출 형식)
+@app.get("/metrics", tags=["Root"])
+async def metrics():
+    """요청 지연, LLM 토큰/지연, 벡터 검색 지연, 대기열, 캐시 적중률 메트릭"""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # 개발 서버 실행
 if __name__ == "__main__":
+    args = _parse_args()
+
+    if args.profile_startup:
+        raise SystemExit(_profile_startup(args))
+
     # 환경 변수에서 설정 읽기
     host = os.getenv("APP_HOST", "0.0.0.0")
     port = int(os.getenv("APP_PORT", 8000))
@@ -210,4 +312,4 @@ if __name__ == "__main__":
         port=port,
         reload=debug,
         log_level="info" if not debug else "debug"
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,67 @@
+"""
+승인 템플릿 엑셀 스트리밍 적재 스크립트
+시트를 행 묶음 단위로 읽어 열 기반 코퍼스(Parquet) 또는 JSONL로 기록하고, --embed면 묶음마다 바로 임베딩
+(시트 전체를 DataFrame/JSON으로 올리지 않으므로 수만~수십만 행 시트에서도 메모리가 일정)
+
+사용법:
+    python scripts/ingest_templates.py                                  # 코퍼스만 생성 (data/template_corpus)
+    python scripts/ingest_templates.py --output data/templates.jsonl    # JSONL로 생성
+    python scripts/ingest_templates.py --embed --rebuild                # 생성하면서 템플릿 인덱스 재구축
+    python scripts/ingest_templates.py --excel data/big.xlsx --sheet Best템플릿 --chunk-rows 5000
+
+생성된 코퍼스/JSONL은 TEMPLATE_DATA_PATH로 지정하거나 load_template_data()에 그대로 넘길 수 있음
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.corpus.ingest import SpreadsheetIngestion, DEFAULT_CHUNK_ROWS
+from app.corpus.store import DEFAULT_CORPUS_DIR
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="승인 템플릿 엑셀 → 코퍼스/JSONL 스트리밍 적재")
+    parser.add_argument("--excel", default="./data/JJ템플릿.xlsx", help="승인 템플릿 엑셀 경로")
+    parser.add_argument("--sheet", default="0", help="시트 번호 또는 이름 (기본: 첫 시트)")
+    parser.add_argument("--output", default=DEFAULT_CORPUS_DIR, help="코퍼스 디렉토리 또는 .jsonl 출력 경로")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="묶음당 행 수")
+    parser.add_argument("--embed", action="store_true", help="묶음마다 템플릿 벡터 스토어에 임베딩")
+    parser.add_argument("--rebuild", action="store_true", help="기존 템플릿/패턴 인덱스를 버리고 재구축 (--embed와 함께)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sheet = int(args.sheet) if args.sheet.isdigit() else args.sheet
+    ingestion = SpreadsheetIngestion(args.excel, args.output, sheet_name=sheet, chunk_rows=args.chunk_rows)
+
+    print("=== 승인 템플릿 스트리밍 적재 ===")
+    print(f"엑셀: {args.excel} (시트: {sheet}, 묶음: {args.chunk_rows}행)")
+    started = time.perf_counter()
+
+    if args.embed:
+        from app.services.registry import service_registry
+
+        template_store = service_registry.get("template_vector_store_service")
+        if template_store.templates is None or template_store.patterns is None:
+            print("❌ 벡터 백엔드를 사용할 수 없습니다")
+            return 1
+        template_store.add_template_chunks(ingestion, rebuild=args.rebuild)
+        template_store.load_pattern_data(ingestion.patterns, rebuild=args.rebuild)
+    else:
+        ingestion.run()
+
+    summary = ingestion.summary()
+    print(f"\n✅ 적재 완료: {args.output}")
+    print(f"   - 템플릿: {summary['total_templates']}개 / 패턴: {summary['total_patterns']}개")
+    print(f"   - 소요 시간: {time.perf_counter() - started:.1f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
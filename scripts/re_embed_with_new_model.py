@@ -1,53 +1,142 @@
 """
-새로운 임베딩 모델로 전체 재임베딩 스크립트
+새로운 임베딩 모델/차원으로 전체 재임베딩 스크립트
+
+사용법:
+    python scripts/re_embed_with_new_model.py                      # .env 설정 차원으로 재임베딩
+    python scripts/re_embed_with_new_model.py --dimensions 512     # 512차원으로 정책/템플릿 스토어 이전
+    python scripts/re_embed_with_new_model.py --dimensions full --stores policy
+    python scripts/re_embed_with_new_model.py --dimensions 256 --report   # 전체 차원 대비 recall 리포트 포함
+
+--dimensions로 바꾼 차원은 .env의 EMBEDDING_DIMENSIONS에도 같이 반영해야
+서버가 질의 시점에 같은 차원을 사용합니다 (불일치 시 인덱스 로드가 거부됨)
 """
 import os
 import sys
+import argparse
 from pathlib import Path
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from app.services.vector_store import vector_store_service
+STORES = ("policy", "templates")
+DEFAULT_TEMPLATE_DATA = "./data/template_corpus"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="임베딩 모델/차원 변경 후 벡터 스토어 재임베딩")
+    parser.add_argument("--dimensions", default=None, help="임베딩 차원 (예: 256, 512, full). 생략 시 .env 설정 사용")
+    parser.add_argument("--stores", default=",".join(STORES), help="재임베딩할 스토어 (policy,templates)")
+    parser.add_argument("--policies-dir", default="./data/cleaned_policies", help="정책 문서 디렉토리")
+    parser.add_argument("--template-data", default=DEFAULT_TEMPLATE_DATA, help="템플릿 코퍼스 디렉토리, JSONL 또는 JSON 경로")
+    parser.add_argument("--report", action="store_true", help="전체 차원 대비 recall 리포트 실행")
+    return parser.parse_args()
 
-def main():
-    print("=== 임베딩 모델 변경 후 재임베딩 프로세스 시작 ===")
+
+def migrate_policy_store(policies_dir: str) -> bool:
+    """정책 스토어 재임베딩"""
+    from app.services.registry import service_registry
+
+    vector_store_service = service_registry.get("policy_vector_store")
 
     # 1. 현재 벡터 스토어 정보 확인
-    print("\n1. 현재 벡터 스토어 상태 확인...")
+    print("\n1. 현재 정책 벡터 스토어 상태 확인...")
     info = vector_store_service.get_collection_info()
     print(f"컬렉션: {info.get('name', 'N/A')}")
     print(f"문서 수: {info.get('count', 0)}")
+    print(f"인덱스 차원: {info.get('metadata', {}).get('dimension', 'N/A')}")
 
     # 2. 재임베딩 실행
     print("\n2. 정책 문서 재임베딩 시작...")
-    success = vector_store_service.load_and_embed_policies()
+    success = vector_store_service.load_and_embed_policies(policies_dir, rebuild=True)
+    if not success:
+        print("\n❌ 정책 문서 재임베딩 실패!")
+        return False
+
+    # 3. 재임베딩 결과 확인
+    print("\n3. 재임베딩 결과 확인...")
+    new_info = vector_store_service.get_collection_info()
+    print(f"새 컬렉션: {new_info.get('name', 'N/A')}")
+    print(f"새 문서 수: {new_info.get('count', 0)}")
+    print(f"새 인덱스 차원: {new_info.get('metadata', {}).get('dimension', 'N/A')}")
+
+    # 4. 검색 테스트
+    print("\n4. 검색 기능 테스트...")
+    test_query = "카카오톡 알림톡 변수 사용 방법"
+    results = vector_store_service.get_relevant_policies(test_query, k=2)
+
+    print(f"테스트 쿼리: '{test_query}'")
+    print(f"검색 결과: {results['total_results']}건")
+
+    for i, policy in enumerate(results['policies'], 1):
+        print(f"  {i}. {policy['source']} (점수: {policy['relevance_score']:.4f})")
+    return True
 
-    if success:
-        # 3. 재임베딩 결과 확인
-        print("\n3. 재임베딩 결과 확인...")
-        new_info = vector_store_service.get_collection_info()
-        print(f"새 컬렉션: {new_info.get('name', 'N/A')}")
-        print(f"새 문서 수: {new_info.get('count', 0)}")
 
-        # 4. 검색 테스트
-        print("\n4. 검색 기능 테스트...")
-        test_query = "카카오톡 알림톡 변수 사용 방법"
-        results = vector_store_service.get_relevant_policies(test_query, k=2)
+def migrate_template_store(template_data: str) -> bool:
+    """템플릿/패턴 스토어 재임베딩"""
+    from app.services.registry import service_registry
 
-        print(f"테스트 쿼리: '{test_query}'")
-        print(f"검색 결과: {results['total_results']}건")
+    template_store = service_registry.get("template_vector_store_service")
 
-        for i, policy in enumerate(results['policies'], 1):
-            print(f"  {i}. {policy['source']} (점수: {policy['relevance_score']:.4f})")
+    print("\n1. 현재 템플릿 벡터 스토어 상태 확인...")
+    info = template_store.get_store_info()
+    print(f"템플릿 수: {info.get('templates_count', 0)} / 패턴 수: {info.get('patterns_count', 0)}")
+    print(f"인덱스 차원: {info.get('templates_index', {}).get('dimension', 'N/A')}")
 
-        print("\n=== 재임베딩 프로세스 완료 ===")
-    else:
+    print("\n2. 템플릿/패턴 재임베딩 시작...")
+    if not template_store.load_template_data(template_data, rebuild=True):
+        print("\n❌ 템플릿 재임베딩 실패!")
+        return False
+
+    print("\n3. 재임베딩 결과 확인...")
+    new_info = template_store.get_store_info()
+    print(f"템플릿 수: {new_info.get('templates_count', 0)} / 패턴 수: {new_info.get('patterns_count', 0)}")
+    print(f"새 인덱스 차원: {new_info.get('templates_index', {}).get('dimension', 'N/A')}")
+
+    print("\n4. 검색 기능 테스트...")
+    test_query = "주문하신 상품 배송 안내"
+    results = template_store.find_similar_templates(test_query, k=2)
+    print(f"테스트 쿼리: '{test_query}'")
+    print(f"검색 결과: {len(results)}건")
+    return True
+
+
+def main():
+    args = parse_args()
+    stores = [store.strip() for store in args.stores.split(",") if store.strip()]
+
+    # 서비스 생성 전에 차원 설정 (스토어별 설정보다 우선하도록 둘 다 지정)
+    if args.dimensions is not None:
+        for name in ("EMBEDDING_DIMENSIONS", "POLICY_EMBEDDING_DIMENSIONS", "TEMPLATE_EMBEDDING_DIMENSIONS"):
+            os.environ[name] = args.dimensions
+
+    print("=== 임베딩 모델 변경 후 재임베딩 프로세스 시작 ===")
+    print(f"임베딩 차원: {os.getenv('EMBEDDING_DIMENSIONS') or 'full'}")
+
+    success = True
+    if "policy" in stores:
+        print("\n--- 정책 스토어 ---")
+        success = migrate_policy_store(args.policies_dir) and success
+    if "templates" in stores:
+        print("\n--- 템플릿 스토어 ---")
+        success = migrate_template_store(args.template_data) and success
+
+    if not success:
         print("\n❌ 재임베딩 실패!")
         return 1
 
+    if args.report:
+        print("\n--- 전체 차원 대비 recall 리포트 ---")
+        from benchmarks.dimensions import main as dimension_report
+
+        dimensions = args.dimensions or os.getenv("EMBEDDING_DIMENSIONS") or "full"
+        report_stores = {"policy": "policy", "templates": "template"}
+        store_arg = report_stores[stores[0]] if len(stores) == 1 else "all"
+        dimension_report(["--dimensions", f"{dimensions},full", "--store", store_arg])
+
+    print("\n=== 재임베딩 프로세스 완료 ===")
     return 0
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
@@ -0,0 +1,45 @@
+"""
+단위 테스트 공용 픽스처
+외부 API 없이 실행되도록 결정적인 해시 임베딩 사용
+"""
+import zlib
+
+import numpy as np
+import pytest
+
+
+class HashEmbeddings:
+    """문자 bigram 해시 bag 임베딩 (같은 텍스트는 항상 같은 벡터)"""
+
+    dimensions = 64
+
+    def _embed(self, text: str):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for i in range(max(len(text) - 1, 1)):
+            vector[zlib.crc32(text[i:i + 2].encode("utf-8")) % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def hash_embeddings():
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def template_store_factory(tmp_path, monkeypatch, hash_embeddings):
+    """numpy 백엔드 템플릿 스토어 (dedup 모드별로 별도 디렉토리)"""
+    from app.services.template_vector_store import TemplateVectorStoreService
+
+    def create(dedup_mode: str = "collapse", name: str = "store"):
+        monkeypatch.setenv("TEMPLATE_PERSIST_DIRECTORY", str(tmp_path / name))
+        monkeypatch.setenv("TEMPLATE_DEDUP", dedup_mode)
+        return TemplateVectorStoreService(embeddings=hash_embeddings, backend="numpy")
+
+    return create
@@ -0,0 +1,46 @@
+"""생성 후보 순위 - 컴플라이언스 점수 → 필수 변수 누락 → 목표 길이 차이"""
+import pytest
+
+SHIPPED = "안녕하세요 #{고객명}님, 주문하신 상품이 발송되었습니다. 배송 조회는 아래 버튼을 눌러 확인해 주세요."
+
+
+class _FakeLLM:
+    model_name = "gpt-4o-mini"
+    temperature = 0.3
+
+
+@pytest.fixture
+def service():
+    pytest.importorskip("langchain")
+    pytest.importorskip("langchain_openai")
+    from app.services.template_generation_service import TemplateGenerationService
+
+    return TemplateGenerationService(llm=_FakeLLM())
+
+
+def test_compliant_candidate_ranks_first(service):
+    advertising = SHIPPED.replace("주문하신 상품이", "특가 이벤트로 주문하신 상품이")
+    no_greeting = SHIPPED.replace("안녕하세요 ", "")
+    ranked = service._rank_candidates([advertising, no_greeting, SHIPPED], ["고객명"], None)
+
+    assert ranked[0][0] == SHIPPED
+    assert ranked[0][1]["compliance_score"] == 100.0
+    scores = [validation["compliance_score"] for _, validation in ranked]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_ties_break_on_missing_variables_then_length(service, monkeypatch):
+    validations = {
+        "short": {"compliance_score": 100.0, "variables": ["고객명", "주문번호"], "length": 60},
+        "missing": {"compliance_score": 100.0, "variables": ["고객명"], "length": 100},
+        "close": {"compliance_score": 100.0, "variables": ["주문번호", "고객명"], "length": 98},
+        "weak": {"compliance_score": 85.7, "variables": ["고객명", "주문번호"], "length": 100},
+    }
+    monkeypatch.setattr(service, "_validate_template", lambda template: validations[template])
+
+    ranked = service._rank_candidates(["weak", "missing", "short", "close"], ["고객명", "주문번호"], 100)
+    assert [template for template, _ in ranked] == ["close", "short", "missing", "weak"]
+
+    # 목표 길이가 없으면 권장 길이 중간(115자) 기준
+    ranked = service._rank_candidates(["short", "close"], ["고객명"], None)
+    assert [template for template, _ in ranked] == ["close", "short"]
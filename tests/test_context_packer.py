@@ -0,0 +1,53 @@
+"""토큰 예산 컨텍스트 패킹 - 예산, 중복 제거, 문장 경계 자르기"""
+from app.services.context_packer import ContextSnippet, pack_context, truncate_at_sentence, TRUNCATION_MARK
+from app.services.token_counter import get_token_counter
+
+MODEL = "gpt-4o-mini"
+SENTENCES = [
+    "알림톡은 정보성 메시지만 발송할 수 있습니다.",
+    "광고성 문구가 포함되면 친구톡으로 발송해야 합니다.",
+    "변수는 #{변수명} 형식으로 작성합니다.",
+    "버튼 이름은 실제 동작과 일치해야 합니다.",
+    "수신 동의를 받지 않은 사용자에게는 발송할 수 없습니다.",
+]
+
+
+def test_pack_respects_budget_and_keeps_input_order():
+    counter = get_token_counter(MODEL)
+    snippets = [ContextSnippet(" ".join(SENTENCES[i:] + SENTENCES[:i]) * 2, score=i) for i in range(5)]
+    budget = counter.count(snippets[0].text) + 50
+
+    packed = pack_context(snippets, budget, MODEL, duplicate_threshold=1.01)
+    assert packed.tokens_used <= budget
+    assert packed.tokens_used == sum(counter.count(s.text) for s in packed.snippets)
+    assert packed.tokens_saved == packed.tokens_original - packed.tokens_used
+    # 점수가 가장 높은 스니펫이 먼저 통째로 담기고, 결과는 입력 순서
+    assert packed.snippets[-1].text == snippets[4].text
+    assert [s.score for s in packed.snippets] == sorted(s.score for s in packed.snippets)
+    assert packed.truncated + packed.dropped == len(snippets) - 1
+
+
+def test_pack_drops_near_duplicates():
+    snippets = [
+        ContextSnippet(" ".join(SENTENCES), score=0.9, group="policy"),
+        ContextSnippet(" ".join(SENTENCES[:4]), score=0.8, group="policy"),  # 앞 스니펫에 포함
+        ContextSnippet("템플릿 길이는 1000자 이하로 작성해야 합니다.", score=0.7, group="template"),
+    ]
+    packed = pack_context(snippets, 10_000, MODEL)
+    assert packed.duplicates == 1
+    assert [s.score for s in packed.snippets] == [0.9, 0.7]
+    assert [s.text for s in packed.by_group("template")] == [snippets[2].text]
+
+
+def test_truncate_at_sentence_boundary():
+    counter = get_token_counter(MODEL)
+    text = " ".join(SENTENCES)
+    budget = counter.count(" ".join(SENTENCES[:2])) + counter.count(TRUNCATION_MARK)
+    assert truncate_at_sentence(text, budget, counter) == " ".join(SENTENCES[:2]) + TRUNCATION_MARK
+    assert truncate_at_sentence(text, 10_000, counter) == text
+
+    # 문장 경계가 없으면 토큰 단위로 자름
+    long_sentence = "가나다라마바사아자차카타파하" * 20
+    truncated = truncate_at_sentence(long_sentence, 40, counter)
+    assert truncated.endswith(TRUNCATION_MARK)
+    assert counter.count(truncated) <= 40
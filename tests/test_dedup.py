@@ -0,0 +1,67 @@
+"""근접 중복 탐지 - 알려진 중복 쌍의 MinHash/LSH 재현율과 오탐"""
+import numpy as np
+
+from app.corpus.dedup import (
+    NearDuplicateIndex, diversify_by_cluster, estimated_similarity, minhash_signature, normalize_for_dedup
+)
+
+SYLLABLES = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초"
+
+
+def _random_template(rng, length=180):
+    words = ["".join(rng.choice(list(SYLLABLES), size=rng.integers(2, 6))) for _ in range(length // 4)]
+    return "안녕하세요 #{고객명}님, " + " ".join(words)[:length] + " 감사합니다."
+
+
+def _variant(rng, text):
+    """변수명 변경 + 단어 하나 교체 + 공백 차이"""
+    words = text.replace("#{고객명}", "#{회원명}").split(" ")
+    words[int(rng.integers(2, len(words)))] = "변경"
+    return "  ".join(words[:3]) + " " + " ".join(words[3:])
+
+
+def test_normalization_ignores_variable_names_and_whitespace():
+    assert normalize_for_dedup("안녕하세요  #{고객명}님\n") == normalize_for_dedup("안녕하세요 #{회원 이름}님")
+    assert estimated_similarity(
+        minhash_signature("#{고객명}님 주문이 완료되었습니다"), minhash_signature("#{성명}님  주문이 완료되었습니다")
+    ) == 1.0
+
+
+def test_lsh_recall_on_known_duplicates():
+    rng = np.random.default_rng(42)
+    bases = [_random_template(rng) for _ in range(40)]
+    records = [{"id": f"base_{i}", "text": text} for i, text in enumerate(bases)]
+    records += [{"id": f"dup_{i}", "text": _variant(rng, text)} for i, text in enumerate(bases)]
+
+    index = NearDuplicateIndex()
+    index.assign(records)
+    clusters = {record["id"]: record["metadata"]["cluster_id"] for record in records}
+
+    recalled = sum(clusters[f"dup_{i}"] == f"base_{i}" for i in range(len(bases)))
+    assert recalled / len(bases) >= 0.95
+    # 서로 다른 템플릿은 각자 대표
+    assert all(clusters[f"base_{i}"] == f"base_{i}" for i in range(len(bases)))
+    assert index.summary()["clusters"] == len(bases) + (len(bases) - recalled)
+
+
+def test_clusters_split_by_partition():
+    text = "안녕하세요 #{고객명}님, 주문하신 상품이 발송되었습니다. 배송 조회는 아래 버튼을 눌러 확인해주세요."
+    records = [
+        {"id": "a", "text": text, "metadata": {"category_1": "구매", "business_type": "상품"}},
+        {"id": "b", "text": text, "metadata": {"category_1": "구매", "business_type": "상품"}},
+        {"id": "c", "text": text, "metadata": {"category_1": "회원", "business_type": "상품"}},
+    ]
+    NearDuplicateIndex().assign(records)
+    assert [record["metadata"]["cluster_id"] for record in records] == ["a", "a", "c"]
+    assert records[1]["metadata"]["is_representative"] is False
+
+
+class _Doc:
+    def __init__(self, cluster_id=None, template_id=None):
+        self.metadata = {"cluster_id": cluster_id, "template_id": template_id}
+
+
+def test_diversify_keeps_best_hit_per_cluster():
+    results = [(_Doc("a"), 0.1), (_Doc("a"), 0.2), (_Doc("b"), 0.3), (_Doc(None, "t1"), 0.4), (_Doc("c"), 0.5)]
+    kept = diversify_by_cluster(results, 3)
+    assert [score for _, score in kept] == [0.1, 0.3, 0.4]
@@ -0,0 +1,148 @@
+"""FAISS 인덱스 구성 - 유형 선택/환경 변수, 저장·로드 왕복, 양자화 재정렬 (faiss 미설치 시 인덱스 테스트는 건너뜀)"""
+import numpy as np
+import pytest
+
+from app.services.faiss_index import (
+    IndexConfig, index_config_from_env, _default_nlist, _default_pq_m,
+    AUTO_HNSW_MIN_VECTORS, AUTO_IVFPQ_MIN_VECTORS
+)
+from app.services.vector_backends import Document
+
+
+def test_auto_index_type_by_corpus_size():
+    config = IndexConfig()
+    assert config.resolve(AUTO_HNSW_MIN_VECTORS - 1) == "flat"
+    assert config.resolve(AUTO_HNSW_MIN_VECTORS) == "hnsw"
+    assert config.resolve(AUTO_IVFPQ_MIN_VECTORS) == "ivfpq"
+    # 명시한 유형은 크기와 무관
+    assert IndexConfig(index_type="hnsw").resolve(10) == "hnsw"
+
+
+def test_store_settings_override_shared_defaults(monkeypatch):
+    monkeypatch.setenv("VECTOR_INDEX_TYPE", "hnsw")
+    monkeypatch.setenv("VECTOR_INDEX_NPROBE", "8")
+    monkeypatch.setenv("TEMPLATE_INDEX_TYPE", "flat")
+    monkeypatch.setenv("PATTERN_INDEX_TYPE", "bogus")
+
+    template = index_config_from_env("TEMPLATE")
+    assert (template.index_type, template.nprobe) == ("flat", 8)
+    assert index_config_from_env("POLICY").index_type == "hnsw"
+    assert index_config_from_env("PATTERN").index_type == "auto"
+
+
+def test_default_training_parameters():
+    # 리스트당 학습 벡터 39개 이상
+    assert _default_nlist(100) == 2
+    assert _default_nlist(1_000_000) == 4000
+    # 서브벡터 16차원 이상인 최대 분할
+    assert _default_pq_m(1536) == 96
+    assert _default_pq_m(64) == 4
+
+
+def _documents(count):
+    return [Document(page_content=f"문서 {i}", metadata={"row": i}) for i in range(count)]
+
+
+def _exact_top_k(vectors, query, k):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    return np.argsort(distances, kind="stable")[:k].tolist()
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivfpq"])
+def test_index_round_trip(tmp_path, hash_embeddings, index_type):
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_community")
+    from app.services.faiss_index import (
+        create_faiss_store, save_faiss_store, load_faiss_store, load_index_meta,
+        search_many_by_vectors, index_type_of
+    )
+
+    rng = np.random.default_rng(5)
+    vectors = rng.normal(size=(600, 32)).astype(np.float32)
+    queries = vectors[:5] + rng.normal(scale=0.01, size=(5, 32)).astype(np.float32)
+    config = IndexConfig(index_type=index_type, nprobe=64, ef_search=128)
+
+    store = create_faiss_store(_documents(len(vectors)), hash_embeddings, config, vectors=vectors)
+    before = search_many_by_vectors(store, queries, 5)
+    save_faiss_store(store, str(tmp_path), config)
+
+    loaded = load_faiss_store(str(tmp_path), hash_embeddings, config, dimensions=32)
+    assert index_type_of(loaded.index) == index_type
+    meta = load_index_meta(str(tmp_path))
+    assert (meta["index_type"], meta["ntotal"], meta["dimension"]) == (index_type, len(vectors), 32)
+    # 저장 파일에 남지 않는 검색 파라미터도 로드 후 다시 적용
+    if index_type == "hnsw":
+        assert loaded.index.hnsw.efSearch == 128
+
+    after = search_many_by_vectors(loaded, queries, 5)
+    for row, (expected, actual) in enumerate(zip(before, after)):
+        assert [doc.metadata["row"] for doc, _ in actual] == [doc.metadata["row"] for doc, _ in expected]
+        # 질의 바로 옆의 원본 벡터가 가장 가까움
+        assert actual[0][0].metadata["row"] == row
+    if index_type == "flat":
+        assert [doc.metadata["row"] for doc, _ in after[0]] == _exact_top_k(vectors, queries[0], 5)
+
+    with pytest.raises(ValueError):
+        load_faiss_store(str(tmp_path), hash_embeddings, config, dimensions=64)
+
+
+def test_reranker_orders_candidates_by_exact_distance(tmp_path):
+    from app.services.faiss_index import FullPrecisionReranker, VECTORS_FILE
+
+    rng = np.random.default_rng(9)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    query = rng.normal(size=8).astype(np.float32)
+    candidates = np.array([7, 3, -1, 7, 21, 40, 3, -1])
+
+    ids, distances = FullPrecisionReranker(vectors).rerank(query, candidates, 3)
+    unique = np.array([3, 7, 21, 40])
+    exact = ((vectors[unique] - query) ** 2).sum(axis=1)
+    assert ids.tolist() == unique[np.argsort(exact)][:3].tolist()
+    np.testing.assert_allclose(distances, np.sort(exact)[:3], rtol=1e-5)
+
+    # 저장된 원본 벡터는 memmap으로 열림
+    assert FullPrecisionReranker.open(str(tmp_path)) is None
+    np.save(tmp_path / VECTORS_FILE, vectors)
+    reranker = FullPrecisionReranker.open(str(tmp_path))
+    assert isinstance(reranker.vectors, np.memmap)
+    assert reranker.rerank(query, candidates, 3)[0].tolist() == ids.tolist()
+
+
+@pytest.mark.parametrize("index_type,quantization", [("flat", "sq8"), ("flat", "pq"), ("hnsw", "sq8"), ("hnsw", "pq")])
+def test_quantized_index_reranks_with_full_precision(tmp_path, hash_embeddings, index_type, quantization):
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_community")
+    from app.services.faiss_index import (
+        create_faiss_store, save_faiss_store, load_faiss_store, search_many_by_vectors, quantization_of, VECTORS_FILE
+    )
+
+    rng = np.random.default_rng(13)
+    vectors = rng.normal(size=(600, 32)).astype(np.float32)
+    queries = rng.normal(size=(4, 32)).astype(np.float32)
+    config = IndexConfig(index_type=index_type, quantization=quantization, rerank_factor=8, ef_search=128)
+
+    store = create_faiss_store(_documents(len(vectors)), hash_embeddings, config, vectors=vectors)
+    save_faiss_store(store, str(tmp_path), config)
+    loaded = load_faiss_store(str(tmp_path), hash_embeddings, config)
+
+    assert quantization_of(loaded.index) == quantization
+    assert (tmp_path / VECTORS_FILE).exists()
+    assert isinstance(loaded.reranker.vectors, np.memmap)
+
+    for query, results in zip(queries, search_many_by_vectors(loaded, queries, 10)):
+        rows = [doc.metadata["row"] for doc, _ in results]
+        # 반환 거리는 양자화 근사가 아닌 원본 벡터 기준
+        exact = ((vectors[rows] - query) ** 2).sum(axis=1)
+        np.testing.assert_allclose([distance for _, distance in results], exact, rtol=1e-4)
+        assert len(set(rows) & set(_exact_top_k(vectors, query, 10))) >= 8
+
+
+def test_pq_falls_back_to_sq8_on_small_corpus(hash_embeddings):
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_community")
+    from app.services.faiss_index import create_faiss_store, quantization_of
+
+    vectors = np.random.default_rng(1).normal(size=(100, 32)).astype(np.float32)
+    store = create_faiss_store(_documents(len(vectors)), hash_embeddings, IndexConfig(quantization="pq"), vectors=vectors)
+    assert quantization_of(store.index) == "sq8"
+    assert store.reranker is not None
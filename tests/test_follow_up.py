@@ -0,0 +1,23 @@
+"""후속 질문 판별 - 짧은 독립 질문과 첫 턴은 재구성하지 않음"""
+import pytest
+
+from app.services.follow_up import is_follow_up, needs_standalone_question
+
+HISTORY = ["HumanMessage: 배송 안내 템플릿 만들어줘", "AIMessage: ..."]
+
+
+@pytest.mark.parametrize("question", ["변수 형식은?", "광고 문구 기준", "버튼 규정", "야간 발송 가능?", "쿠폰 안내 템플릿"])
+def test_short_standalone_questions_are_not_follow_ups(question):
+    assert not is_follow_up(question)
+    assert not needs_standalone_question(question, HISTORY, "heuristic")
+
+
+@pytest.mark.parametrize("question", ["그럼 버튼은?", "그거 길이는?", "해당 템플릿 변수 규정", "아까 말한 기준 다시"])
+def test_questions_referring_to_history_are_follow_ups(question):
+    assert is_follow_up(question)
+    assert needs_standalone_question(question, HISTORY, "llm")
+
+
+def test_first_turn_and_off_mode_skip_condense():
+    assert not needs_standalone_question("그럼 버튼은?", [], "llm")
+    assert not needs_standalone_question("그럼 버튼은?", HISTORY, "off")
@@ -0,0 +1,94 @@
+"""Prometheus 텍스트 노출 형식 출력"""
+import re
+
+import pytest
+
+from app.monitoring.metrics import MetricsRegistry
+
+SAMPLE_LINE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*"(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*")*\})? '
+    r'(-?[0-9.e+-]+|\+Inf|-Inf|NaN)$'
+)
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "요청 수", ("method", "route"))
+    requests.labels(method="GET", route="/a").inc()
+    requests.labels(method="POST", route='/b"\\\n').inc(2.5)
+    registry.gauge("test_in_flight", "처리 중").set(3)
+    latency = registry.histogram("test_latency_seconds", "처리 시간", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        latency.observe(value)
+    return registry
+
+
+def test_exposition_format(registry):
+    text = registry.render()
+    assert text.endswith("\n")
+    lines = text.rstrip("\n").split("\n")
+
+    for line in lines:
+        if line.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) [a-zA-Z_:][a-zA-Z0-9_:]* .+$", line)
+        else:
+            assert SAMPLE_LINE.match(line), line
+
+    # 메트릭마다 HELP, TYPE이 샘플보다 먼저 (이름순)
+    assert lines[0] == "# HELP test_in_flight 처리 중"
+    assert lines[1] == "# TYPE test_in_flight gauge"
+    assert "# TYPE test_latency_seconds histogram" in lines
+    assert "# TYPE test_requests_total counter" in lines
+
+
+def test_samples_and_label_escaping(registry):
+    lines = registry.render().split("\n")
+    assert "test_in_flight 3" in lines
+    assert 'test_requests_total{method="GET",route="/a"} 1' in lines
+    assert 'test_requests_total{method="POST",route="/b\\"\\\\\\n"} 2.5' in lines
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    lines = registry.render().split("\n")
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_latency_seconds_sum 6.25" in lines
+    assert "test_latency_seconds_count 4" in lines
+
+
+def test_collector_failure_is_logged(caplog):
+    registry = MetricsRegistry()
+    registry.gauge("test_gauge", "게이지").set(1)
+
+    def broken():
+        raise RuntimeError("수집 실패")
+
+    registry.add_collector(broken)
+    with caplog.at_level("WARNING", logger="app.monitoring.metrics"):
+        text = registry.render()
+    assert "test_gauge 1" in text
+    assert "수집 실패" in caplog.text
+
+
+def test_event_loop_lag_records_blocking_calls():
+    import asyncio
+    import time
+
+    from app.monitoring.metrics import EVENT_LOOP_LAG, monitor_event_loop_lag
+
+    _, count_before, sum_before = EVENT_LOOP_LAG.labels().snapshot()
+
+    async def scenario():
+        task = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+        await asyncio.sleep(0.03)
+        # async 엔드포인트 안의 동기 LLM 호출처럼 루프를 막음
+        time.sleep(0.2)
+        await asyncio.sleep(0.03)
+        task.cancel()
+
+    asyncio.run(scenario())
+    _, count, total = EVENT_LOOP_LAG.labels().snapshot()
+    assert count > count_before
+    assert total - sum_before >= 0.15
@@ -0,0 +1,89 @@
+"""정책 마크다운 청킹 - 제목 경로 머리말, 청크 크기, 검색 결과 중복 제거"""
+from app.services.policy_chunker import Document, dedupe_chunks, split_policy_markdown
+
+POLICY = """# 알림톡 정책
+
+## 1. 공통 기준
+
+알림톡은 정보성 메시지만 발송할 수 있습니다. 광고성 내용은 포함할 수 없습니다.
+
+### 1.1 변수
+
+변수는 #{변수명} 형식으로 작성합니다. 변수만으로 이루어진 본문은 허용되지 않습니다.
+
+## 2. 버튼
+
+""" + "버튼 이름은 실제 동작과 일치해야 합니다. 웹링크 버튼은 승인된 도메인만 사용합니다. " * 12 + """
+
+```bash
+# 예시 주석은 제목이 아님
+echo ok
+```
+"""
+
+
+def _chunks(chunk_size=200):
+    return split_policy_markdown(POLICY, "policy.md", chunk_size=chunk_size)
+
+
+def test_chunks_stay_within_size_and_cover_source():
+    chunks = _chunks()
+    assert len(chunks) > 3
+    for chunk in chunks:
+        start, end = chunk.metadata["char_start"], chunk.metadata["char_end"]
+        assert end - start <= 200
+        # 머리말을 뺀 본문은 원문 구간 그대로
+        assert chunk.page_content.endswith(POLICY[start:end])
+    # 청크끼리 겹치지 않음
+    spans = sorted((c.metadata["char_start"], c.metadata["char_end"]) for c in chunks)
+    assert all(left[1] <= right[0] for left, right in zip(spans, spans[1:]))
+
+
+def test_breadcrumbs_follow_heading_path():
+    chunks = _chunks()
+    by_section = {}
+    for chunk in chunks:
+        by_section.setdefault(chunk.metadata["heading_path"], []).append(chunk)
+
+    # 본문 없는 문서 제목과 작은 하위 절은 한 청크로 합쳐지고, 경로는 공통 상위 제목
+    first = chunks[0]
+    assert first.page_content.startswith("# 알림톡 정책\n\n## 1. 공통 기준")
+    assert "### 1.1 변수" in first.page_content
+    assert first.metadata["heading_path"] == "알림톡 정책"
+
+    buttons = by_section["알림톡 정책 > 2. 버튼"]
+    assert len(buttons) > 1
+    # 제목으로 시작하는 청크는 상위 경로만, 이어지는 청크는 전체 경로를 머리말로
+    assert buttons[0].page_content.startswith("[알림톡 정책]\n## 2. 버튼")
+    assert all(chunk.page_content.startswith("[알림톡 정책 > 2. 버튼]\n") for chunk in buttons[1:])
+    # 코드 블록 안의 '#' 줄은 제목으로 보지 않음
+    assert not any("예시 주석" in chunk.metadata["heading_path"] for chunk in chunks)
+
+
+def _doc(text, start, end, source="policy.md"):
+    return Document(page_content=text, metadata={"source": source, "char_start": start, "char_end": end})
+
+
+def test_dedupe_drops_contained_and_trims_overlap():
+    source = "0123456789abcdefghij"
+    results = [
+        (_doc(source[0:10], 0, 10), 0.9),
+        (_doc(source[2:6], 2, 6), 0.8),       # 채택된 청크에 포함
+        (_doc(source[8:14], 8, 14), 0.7),     # 일부 겹침 → 겹친 부분 제거
+        (_doc(source[2:6], 2, 6, "other.md"), 0.6),
+    ]
+    kept = dedupe_chunks(results)
+    assert [(doc.page_content, doc.metadata["source"]) for doc, _ in kept] == [
+        ("0123456789", "policy.md"), ("abcd", "policy.md"), ("2345", "other.md")
+    ]
+
+
+def test_dedupe_replaces_kept_chunk_with_containing_chunk():
+    source = "0123456789abcdefghij"
+    results = [
+        (_doc(source[4:8], 4, 8), 0.9),
+        (_doc(source[12:15], 12, 15), 0.85),
+        (_doc(source[0:16], 0, 16), 0.8),     # 앞의 두 청크를 모두 포함
+    ]
+    kept = dedupe_chunks(results)
+    assert [(doc.page_content, score) for doc, score in kept] == [(source[0:16], 0.9)]
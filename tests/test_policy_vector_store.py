@@ -0,0 +1,103 @@
+"""정책 벡터 스토어 - 기본 백엔드 선택, 자동 임베딩 시점, 저장"""
+from pathlib import Path
+
+import pytest
+
+from app.services import vector_store_simple
+from app.services.vector_store_simple import SimpleVectorStoreService, default_policy_backends
+
+POLICY = """# 알림톡 정책
+
+## 광고성 정보
+
+할인, 이벤트, 프로모션 안내는 광고성 정보로 분류되어 알림톡으로 발송할 수 없습니다.
+
+## 변수
+
+변수는 #{변수명} 형식으로 작성합니다.
+"""
+
+
+class CountingEmbeddings:
+    def __init__(self, base):
+        self.base = base
+        self.texts = []
+
+    @property
+    def documents(self):
+        return len(self.texts)
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.base.embed_query(text)
+
+
+@pytest.fixture
+def policies_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "policies"
+    directory.mkdir()
+    (directory / "policy.md").write_text(POLICY, encoding="utf-8")
+    monkeypatch.setenv("POLICIES_DIR", str(directory))
+    monkeypatch.delenv("POLICY_VECTOR_BACKEND", raising=False)
+    monkeypatch.delenv("VECTOR_BACKEND", raising=False)
+    return directory
+
+
+def test_existing_faiss_index_is_kept_until_numpy_index_exists(tmp_path):
+    directory = tmp_path / "store"
+    directory.mkdir()
+    assert default_policy_backends(str(directory)) == ["numpy"]
+
+    for name in ("index.faiss", "index.pkl"):
+        (directory / name).touch()
+    assert default_policy_backends(str(directory)) == ["faiss", "numpy"]
+
+    for name in ("numpy_vectors.npy", "numpy_documents.json"):
+        (directory / name).touch()
+    assert default_policy_backends(str(directory)) == ["numpy"]
+
+
+def test_search_never_embeds_policies(tmp_path, policies_dir, hash_embeddings):
+    embeddings = CountingEmbeddings(hash_embeddings)
+    store = SimpleVectorStoreService(embeddings=embeddings, persist_directory=str(tmp_path / "store"))
+
+    assert store.similarity_search("광고성 정보", k=2) == []
+    assert store.get_relevant_policies("광고성 정보", k=2)["total_results"] == 0
+    assert store.collection.is_empty()
+    assert not any("알림톡" in text for text in embeddings.texts)
+
+
+def test_auto_embed_runs_at_construction_and_persists(tmp_path, policies_dir, hash_embeddings, monkeypatch):
+    monkeypatch.setattr(vector_store_simple, "POLICY_AUTO_EMBED", True)
+    directory = tmp_path / "store"
+    embeddings = CountingEmbeddings(hash_embeddings)
+    store = SimpleVectorStoreService(embeddings=embeddings, persist_directory=str(directory))
+
+    embedded = embeddings.documents
+    assert embedded > 0 and store.collection.count() == embedded
+    assert store.similarity_search("광고성 정보", k=1)
+    # 검색은 질의만 임베딩
+    assert embeddings.texts[embedded:] in ([], ["광고성 정보"])
+    # 임시 파일 없이 교체 저장
+    assert sorted(path.name for path in directory.glob("numpy_*")) == ["numpy_documents.json", "numpy_vectors.npy"]
+
+    # 저장된 인덱스가 있으면 다시 임베딩하지 않음
+    reloaded = CountingEmbeddings(hash_embeddings)
+    SimpleVectorStoreService(embeddings=reloaded, persist_directory=str(directory))
+    assert reloaded.documents == 0
+
+
+def test_auto_embed_failure_does_not_persist_dummy_policies(tmp_path, policies_dir, hash_embeddings, monkeypatch):
+    monkeypatch.setattr(vector_store_simple, "POLICY_AUTO_EMBED", True)
+
+    class FailingEmbeddings(CountingEmbeddings):
+        def embed_documents(self, texts):
+            raise RuntimeError("임베딩 API 오류")
+
+    directory = tmp_path / "store"
+    store = SimpleVectorStoreService(embeddings=FailingEmbeddings(hash_embeddings), persist_directory=str(directory))
+    assert store.collection.is_empty()
+    assert not list(Path(directory).glob("numpy_*"))
@@ -0,0 +1,84 @@
+"""서비스 레지스트리 - 지연 생성, 교체/폐기, 병렬 워밍업"""
+import threading
+import time
+
+import pytest
+
+from app.services.registry import ServiceRegistry, lazy_module_getattr, service_registry, _create_token_service
+
+
+def test_factory_runs_on_first_get_only():
+    registry = ServiceRegistry()
+    calls = []
+    registry.register("service", lambda: calls.append(1) or object())
+
+    assert not registry.is_loaded("service")
+    assert calls == []
+    instance = registry.get("service")
+    assert registry.get("service") is instance
+    assert calls == [1]
+    assert registry.startup_report["service"].success
+
+
+def test_concurrent_gets_create_once():
+    registry = ServiceRegistry()
+    calls = []
+
+    def slow_factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry.register("service", slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("service"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+
+
+def test_override_and_reset_discard_instances():
+    registry = ServiceRegistry()
+    registry.register("service", lambda: "original")
+    assert registry.get("service") == "original"
+
+    registry.override("service", lambda: "fake")
+    assert not registry.is_loaded("service")
+    assert registry.get("service") == "fake"
+
+    registry.reset("service")
+    assert not registry.is_loaded("service")
+    assert registry.get("service") == "fake"
+
+    registry.reset()
+    assert not registry.is_loaded("service")
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_warm_up_reports_failures_without_raising():
+    registry = ServiceRegistry()
+    registry.register("ok", lambda: "ready", warm_up=True)
+    registry.register("broken", lambda: 1 / 0, warm_up=True)
+    registry.register("lazy", lambda: "later")
+
+    report = {startup.name: startup for startup in registry.warm_up()}
+    assert set(report) == {"ok", "broken"}
+    assert report["ok"].success and not report["broken"].success
+    assert "division by zero" in report["broken"].error
+    assert not registry.is_loaded("lazy")
+
+
+def test_module_getattr_resolves_through_registry():
+    service_registry.override("token_service", lambda: "fake token service")
+    try:
+        module_getattr = lazy_module_getattr("app.services.token_service", "token_service")
+        assert module_getattr("token_service") == "fake token service"
+        with pytest.raises(AttributeError):
+            module_getattr("rag_service")
+    finally:
+        service_registry.override("token_service", _create_token_service)
@@ -0,0 +1,120 @@
+"""응답 캐시 - 키 정규화, 계층/TTL, 요청별 cache 옵션과 only 미스의 504"""
+import asyncio
+import json
+import unicodedata
+
+import pytest
+
+from app.services.response_cache import ResponseCache, request_cache_key, CACHE_BYPASS, CACHE_PREFER, CACHE_ONLY
+
+REQUEST = {"user_request": "주문 완료 안내 템플릿", "business_type": "상품", "include_variables": ["고객명"]}
+
+
+def test_cache_key_normalizes_request_and_separates_settings():
+    key = request_cache_key(REQUEST, "gpt-4o-mini", 0.3, "v1")
+    # NFD 입력, 공백 차이는 같은 요청
+    same = {**REQUEST, "user_request": unicodedata.normalize("NFD", "  주문 완료   안내 템플릿 "), "business_type": "상품 "}
+    assert request_cache_key(same, "gpt-4o-mini", 0.3, "v1") == key
+    # 빈 문자열은 None과 같은 요청
+    assert request_cache_key({**REQUEST, "category_1": ""}, "gpt-4o-mini", 0.3, "v1") == request_cache_key(
+        {**REQUEST, "category_1": None}, "gpt-4o-mini", 0.3, "v1"
+    )
+    assert request_cache_key(REQUEST, "gpt-4o-mini", 0.3000001, "v1") == key
+
+    assert request_cache_key({**REQUEST, "business_type": "서비스"}, "gpt-4o-mini", 0.3, "v1") != key
+    assert request_cache_key(REQUEST, "gpt-4o", 0.3, "v1") != key
+    assert request_cache_key(REQUEST, "gpt-4o-mini", 0.7, "v1") != key
+    # 재임베딩으로 인덱스 버전이 바뀌면 이전 항목은 적중하지 않음
+    assert request_cache_key(REQUEST, "gpt-4o-mini", 0.3, "v2") != key
+
+
+def test_memory_lru_and_disk_tier_shared_between_workers(tmp_path):
+    first = ResponseCache("test", max_size=2, directory=str(tmp_path))
+    for key in ("a", "b", "c"):
+        first.set(key * 64, {"template": key})
+    assert len(first._entries) == 2
+    assert first.get("c" * 64).tier == "memory"
+
+    # 다른 워커(빈 메모리 계층)는 디스크에서 읽고 메모리로 올림
+    second = ResponseCache("test", max_size=2, directory=str(tmp_path))
+    lookup = second.get("a" * 64)
+    assert (lookup.hit, lookup.tier, lookup.value) == (True, "disk", {"template": "a"})
+    assert second.get("a" * 64).tier == "memory"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_expired_and_corrupt_entries_miss(tmp_path):
+    cache = ResponseCache("test", max_size=0, directory=str(tmp_path), ttl_seconds=60)
+    cache.set("d" * 64, {"template": "d"})
+    path = cache._path("d" * 64)
+    record = json.loads(path.read_text(encoding="utf-8"))
+    path.write_text(json.dumps({**record, "created_at": record["created_at"] - 120}), encoding="utf-8")
+    assert not cache.get("d" * 64).hit
+
+    path.write_text("{broken", encoding="utf-8")
+    assert not cache.get("d" * 64).hit
+
+
+class _FakeLLM:
+    model_name = "gpt-4o-mini"
+    temperature = 0.3
+
+
+@pytest.fixture
+def generation_service(monkeypatch):
+    pytest.importorskip("langchain")
+    pytest.importorskip("langchain_openai")
+    from app.services.template_generation_service import TemplateGenerationService
+
+    service = TemplateGenerationService(llm=_FakeLLM())
+    service.response_cache = ResponseCache("test", max_size=8)
+    service.generated = []
+
+    def generate(**request):
+        service.generated.append(request)
+        return {"success": True, "template": f"생성 {len(service.generated)}"}
+
+    monkeypatch.setattr(service, "_generate_uncached", generate)
+    monkeypatch.setattr(service, "_index_version", lambda: "v1")
+    return service
+
+
+def test_cache_modes(generation_service):
+    service = generation_service
+
+    missed = service.generate_template("주문 완료 안내", cache=CACHE_ONLY)
+    assert not missed["success"] and missed["cache"]["status"] == "miss"
+    assert service.generated == []
+
+    first = service.generate_template("주문 완료 안내", include_variables=["주문번호", "고객명"], cache=CACHE_PREFER)
+    assert first["cache"]["status"] == "miss" and len(service.generated) == 1
+
+    # 변수 순서만 다른 요청은 같은 키
+    hit = service.generate_template("주문 완료 안내", include_variables=["고객명", "주문번호"], cache=CACHE_ONLY)
+    assert hit["cache"]["status"] == "hit" and hit["template"] == first["template"]
+
+    bypassed = service.generate_template("주문 완료 안내", include_variables=["고객명", "주문번호"], cache=CACHE_BYPASS)
+    assert bypassed["cache"]["status"] == "bypass" and bypassed["template"] == "생성 2"
+    # bypass 결과는 저장하지 않음
+    again = service.generate_template("주문 완료 안내", include_variables=["고객명", "주문번호"])
+    assert again["template"] == first["template"]
+
+
+def test_cache_only_miss_returns_504(generation_service):
+    pytest.importorskip("fastapi")
+    endpoints = pytest.importorskip("app.api.endpoints")
+    from fastapi import HTTPException, Response
+    from app.api.schemas import SmartTemplateGenerationRequest
+    from app.services.registry import service_registry, _create_template_generation_service
+
+    service_registry.override("template_generation_service", lambda: generation_service)
+    try:
+        request = SmartTemplateGenerationRequest(user_request="주문 완료 안내", cache="only")
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(endpoints.smart_generate_template(request, Response()))
+    finally:
+        service_registry.override("template_generation_service", _create_template_generation_service)
+
+    assert error.value.status_code == 504
+    assert error.value.headers["X-Cache"] == "MISS"
+    assert generation_service.generated == []
@@ -0,0 +1,46 @@
+"""템플릿 결정적 수정 - 문장 경계 자르기와 LLM 호출 조건"""
+from app.services.template_rewriter import (
+    deterministic_rewrite, semantic_issues, structural_issues, trim_to_sentence,
+    MAX_TEMPLATE_LENGTH, FIX_SENTENCE_TRIM
+)
+
+
+def _validation(**overrides):
+    validation = {
+        "length": 120,
+        "length_appropriate": True,
+        "has_greeting": True,
+        "variables": ["고객명"],
+        "variable_count": 1,
+        "has_politeness": True,
+        "potential_ad_content": False,
+        "sentence_count": 1,
+    }
+    validation.update(overrides)
+    return validation
+
+
+def test_only_ad_wording_and_tone_need_llm():
+    validation = _validation(length_appropriate=False, variable_count=0, has_greeting=False, sentence_count=9)
+    assert semantic_issues(validation) == []
+    assert set(structural_issues(validation)) == {"길이", "변수 미사용", "인사말", "문장 수"}
+
+    assert semantic_issues(_validation(potential_ad_content=True, has_politeness=False)) == ["광고성 표현", "정중한 어조"]
+
+
+def test_slightly_long_template_is_trimmed_at_sentence_boundary():
+    body = "안녕하세요 #{고객명}님, 주문하신 상품이 발송되었습니다. " + "배송 중 문의사항은 고객센터로 연락 주시기 바랍니다. " * 9
+    template = body + "항상 이용해 주셔서 감사합니다."
+    assert MAX_TEMPLATE_LENGTH < len(template) <= MAX_TEMPLATE_LENGTH + 60
+
+    result = deterministic_rewrite(template, _validation(length=len(template)))
+
+    assert FIX_SENTENCE_TRIM in result.fixes
+    assert len(result.template) <= MAX_TEMPLATE_LENGTH
+    assert result.template.endswith(".")
+    assert "#{고객명}" in result.template
+
+
+def test_trim_keeps_template_when_tail_has_variables():
+    template = "안내드립니다. " * 42 + "주문번호: #{주문번호}"
+    assert trim_to_sentence(template) == template
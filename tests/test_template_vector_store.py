@@ -0,0 +1,103 @@
+"""템플릿 벡터 스토어 - 근접 중복 collapse와 분류 필터 검색"""
+
+
+def _template(template_id, text, category_1, business_type):
+    return {
+        "id": template_id,
+        "text": text,
+        "metadata": {
+            "category_1": category_1,
+            "category_2": "안내",
+            "business_type": business_type,
+            "variables": ["고객명"],
+            "button": "X",
+            "length": len(text),
+            "has_greeting": text.startswith("안녕하세요"),
+        },
+    }
+
+
+SHIPPING = "안녕하세요 #{고객명}님, 주문하신 상품이 발송되었습니다. 배송 조회는 아래 버튼을 눌러 확인해주세요."
+TEMPLATES = [
+    _template("template_000", SHIPPING, "구매", "상품"),
+    # 본문은 근접 중복이지만 분류/업무가 다름 - collapse에서도 빠지면 안 됨
+    _template("template_001", SHIPPING.replace("#{고객명}", "#{회원명}"), "회원", "서비스"),
+    _template("template_002", SHIPPING.replace("확인해주세요", "확인해 주세요"), "구매", "상품"),
+    _template("template_003", "안녕하세요 #{고객명}님, 예약이 확정되었습니다. 방문 일시를 확인해주세요.", "예약", "서비스"),
+]
+
+
+def _filtered_categories(store, category, business_type=None):
+    docs = store.find_similar_templates(
+        "주문 상품 발송 안내", category_filter=category, business_type_filter=business_type, k=5
+    )
+    return sorted({(doc.metadata["category_1"], doc.metadata["business_type"]) for doc in docs})
+
+
+def test_collapse_keeps_near_duplicates_with_other_filter_values(template_store_factory):
+    collapsed = template_store_factory("collapse", "collapsed")
+    full = template_store_factory("off", "full")
+    collapsed.add_template_chunks([[dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES]], rebuild=True)
+    full.add_template_chunks([[dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES]], rebuild=True)
+
+    # 같은 분류 안의 근접 중복만 대표로 합쳐짐
+    assert collapsed.templates.count() == len(TEMPLATES) - 1
+    assert full.templates.count() == len(TEMPLATES)
+
+    for category, business_type in [("구매", None), ("회원", None), ("예약", None), (None, "서비스"), ("회원", "서비스")]:
+        expected = _filtered_categories(full, category, business_type)
+        assert expected
+        assert _filtered_categories(collapsed, category, business_type) == expected
+
+
+def test_similar_templates_are_diversified_across_clusters(template_store_factory):
+    store = template_store_factory("annotate")
+    store.add_template_chunks([[dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES]], rebuild=True)
+
+    docs = store.find_similar_templates("주문 상품 발송 안내", category_filter="구매", k=5)
+    clusters = [doc.metadata["cluster_id"] for doc in docs]
+    assert clusters == ["template_000"]
+
+
+def test_appended_batches_merge_category_stats(template_store_factory):
+    from app.services.template_stats import CategoryStatsTable, build_category_stats
+
+    first = [dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES[:2]]
+    second = [dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES[2:]]
+    store = template_store_factory("off")
+    store.add_template_chunks([first[:1], first[1:]], rebuild=True)
+    store.add_template_chunks([second], rebuild=False)
+
+    expected = build_category_stats(TEMPLATES)
+    assert store.category_stats.stats == expected
+    assert store.category_stats.stats["all"]["count"] == len(TEMPLATES)
+    assert {"category_1=구매", "category_1=회원", "category_1=예약"} <= set(store.category_stats.stats)
+
+    # 저장된 통계도 두 배치를 모두 포함
+    saved = CategoryStatsTable.load(store.templates_dir)
+    assert saved.stats["all"]["count"] == len(TEMPLATES)
+    assert saved.suggestions == CategoryStatsTable(expected).suggestions
+
+    # 재구축이면 이번 템플릿 기준으로 교체
+    store.add_template_chunks([second], rebuild=True)
+    assert store.category_stats.stats["all"]["count"] == len(second)
+
+
+def test_appended_batches_join_existing_clusters(template_store_factory):
+    first = [dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES[:2]]
+    store = template_store_factory("collapse")
+    store.add_template_chunks([first], rebuild=True)
+    assert store.templates.count() == 2
+
+    # 다음 묶음의 근접 중복(template_002)은 첫 묶음 대표의 클러스터로 합류해 임베딩하지 않음
+    second = [dict(t, metadata=dict(t["metadata"])) for t in TEMPLATES[2:]]
+    assert store.add_template_chunks([second], rebuild=False) == 1
+    assert second[0]["metadata"]["cluster_id"] == "template_000"
+    assert second[0]["metadata"]["is_representative"] is False
+
+    # 재시작한 스토어도 저장된 서명으로 기존 클러스터에 배정
+    restarted = template_store_factory("collapse")
+    again = [dict(TEMPLATES[2], id="template_004", metadata=dict(TEMPLATES[2]["metadata"]))]
+    assert restarted.add_template_chunks([again], rebuild=False) == 0
+    assert again[0]["metadata"]["cluster_id"] == "template_000"
+    assert restarted.templates.count() == len(TEMPLATES) - 1
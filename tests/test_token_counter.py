@@ -0,0 +1,86 @@
+"""로컬 토큰 카운터 - tiktoken이 없을 때의 근사 계산"""
+import sys
+import types
+
+import pytest
+
+from app.services.token_counter import TokenCounter, count_message_tokens, TOKENS_PER_MESSAGE, REPLY_PRIMING_TOKENS
+
+
+@pytest.fixture
+def approximate_counter(monkeypatch):
+    # import tiktoken이 ImportError가 되도록
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    counter = TokenCounter("cl100k_base")
+    assert not counter.exact
+    return counter
+
+
+def test_approximate_counts_by_character_class(approximate_counter):
+    assert approximate_counter.count("") == 0
+    assert approximate_counter.count(None) == 0
+    # 한글 5음절 × 1.1
+    assert approximate_counter.count("안녕하세요") == 6
+    # 영단어 4자당 1토큰, 공백은 세지 않음
+    assert approximate_counter.count("hello world") == 4
+    # 숫자 3자리당 1토큰, 기호는 1개당 1토큰
+    assert approximate_counter.count("12345!") == 3
+    # 변수 표기: '#', '{', '}' 기호 + 한글
+    assert approximate_counter.count("#{고객명}") == 3 + 4
+
+
+def test_approximate_ratio_follows_encoding(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    assert TokenCounter("o200k_base").count("안녕하세요") == 4
+    assert TokenCounter("unknown").count("안녕하세요") == 6
+
+
+def test_approximate_truncate_stays_within_budget(approximate_counter):
+    text = "안녕하세요 고객님, 주문하신 상품이 발송되었습니다. " * 10
+    truncated = approximate_counter.truncate(text, 30)
+    assert text.startswith(truncated)
+    assert approximate_counter.count(truncated) <= 30
+    assert approximate_counter.count(text[:len(truncated) + 1]) > 30
+    assert approximate_counter.truncate(text, 0) == ""
+    assert approximate_counter.truncate("짧은 문장", 100) == "짧은 문장"
+
+
+def test_message_tokens_include_structure(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    from app.services import token_counter
+
+    token_counter._counter_for_encoding.cache_clear()
+    try:
+        messages = [("system", "hello"), {"role": "user", "content": "안녕하세요"}]
+        expected = 2 * TOKENS_PER_MESSAGE + 2 + 6 + REPLY_PRIMING_TOKENS
+        assert count_message_tokens(messages, "gpt-4") == expected
+    finally:
+        token_counter._counter_for_encoding.cache_clear()
+
+
+class _FakeEncoding:
+    def __init__(self, name):
+        self.name = name
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+
+def test_missing_o200k_falls_back_to_cl100k(monkeypatch):
+    loaded = []
+
+    def get_encoding(name):
+        loaded.append(name)
+        if name == "o200k_base":
+            raise ValueError("Unknown encoding o200k_base")
+        return _FakeEncoding(name)
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+    counter = TokenCounter("o200k_base")
+    assert counter.exact
+    assert loaded == ["o200k_base", "cl100k_base"]
+    assert counter.count("안녕하세요") == 5
+
+    # 대체 인코딩도 없으면 근사치
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=lambda name: 1 / 0))
+    assert not TokenCounter("o200k_base").exact
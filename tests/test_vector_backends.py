@@ -0,0 +1,69 @@
+"""NumPy 전수 검색 인덱스 - 상위 k와 필터 결과를 직접 계산한 값과 비교"""
+import numpy as np
+
+from app.services.vector_backends import ExactIndex, NumpyBackend, Document, normalize_rows
+
+
+def _brute_force(vectors, query, k, mask=None):
+    vectors = normalize_rows(vectors)
+    query = query / np.linalg.norm(query)
+    distances = 2.0 - 2.0 * (vectors @ query)
+    candidates = np.arange(len(vectors)) if mask is None else np.flatnonzero(mask)
+    order = candidates[np.argsort(distances[candidates], kind="stable")][:k]
+    return order, distances[order]
+
+
+def test_exact_index_matches_brute_force():
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(300, 24)).astype(np.float32)
+    queries = rng.normal(size=(5, 24)).astype(np.float32)
+    index = ExactIndex(vectors)
+
+    distances, ids = index.search(queries, 10)
+    for row, query in enumerate(queries):
+        expected_ids, expected_distances = _brute_force(vectors, query, 10)
+        assert ids[row].tolist() == expected_ids.tolist()
+        np.testing.assert_allclose(distances[row], expected_distances, atol=1e-5)
+
+    # 질의 하나도 같은 결과
+    single_distances, single_ids = index.search(queries[0], 10)
+    assert single_ids[0].tolist() == ids[0].tolist()
+    np.testing.assert_allclose(single_distances[0], distances[0], atol=1e-6)
+
+
+def test_exact_index_masks_and_padding():
+    rng = np.random.default_rng(11)
+    vectors = rng.normal(size=(100, 16)).astype(np.float32)
+    queries = rng.normal(size=(2, 16)).astype(np.float32)
+    masks = [rng.random(100) < 0.2, np.zeros(100, dtype=bool)]
+    masks[0][:3] = True
+    index = ExactIndex(vectors)
+
+    distances, ids = index.search(queries, 50, masks)
+    candidates = int(masks[0].sum())
+    expected_ids, expected_distances = _brute_force(vectors, queries[0], 50, masks[0])
+    assert ids[0, :candidates].tolist() == expected_ids.tolist()
+    np.testing.assert_allclose(distances[0, :candidates], expected_distances, atol=1e-5)
+    # 후보가 k보다 적으면 FAISS처럼 -1 / inf로 채움
+    assert (ids[0, candidates:] == -1).all() and np.isinf(distances[0, candidates:]).all()
+    assert (ids[1] == -1).all()
+
+
+def test_numpy_backend_filters_match_brute_force(tmp_path):
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(120, 16)).astype(np.float32)
+    categories = ["회원", "구매", "예약"]
+    documents = [
+        Document(page_content=f"문서 {i}", metadata={"category_1": categories[i % 3], "page": i % 2})
+        for i in range(len(vectors))
+    ]
+    backend = NumpyBackend(str(tmp_path), "TEST")
+    backend.add(documents, vectors)
+
+    query = rng.normal(size=(1, 16)).astype(np.float32)
+    filter_dict = {"category_1": "구매", "page": 1}
+    results = backend.search(query, 5, [filter_dict])[0]
+
+    mask = np.array([doc.metadata == filter_dict for doc in documents])
+    expected_ids, _ = _brute_force(vectors, query[0], 5, mask)
+    assert [doc.page_content for doc, _ in results] == [f"문서 {i}" for i in expected_ids]